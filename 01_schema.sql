@@ -1,5 +1,6 @@
 -- ==========================================
 -- 맘스터치 주방 관리 시스템 - 스키마 정의
+-- 시각 컬럼은 모두 정수 epoch 초 (UTC 기준, 표시할 때만 localtime 으로 변환)
 -- ==========================================
 
 -- [1] Workstations
@@ -35,7 +36,7 @@ CREATE TABLE ZoneRealtimeState (
     zone_id INT NOT NULL UNIQUE,
     current_food_type VARCHAR(50) NULL,
     current_quantity INT DEFAULT 0,
-    busy_until TIMESTAMP NULL,
+    busy_until INTEGER NULL,
     FOREIGN KEY (zone_id) REFERENCES WorkstationZones(zone_id)
 );
 
@@ -51,7 +52,7 @@ CREATE TABLE StaffAssignment (
     assignment_id INTEGER PRIMARY KEY AUTOINCREMENT,
     staff_id INT NOT NULL,
     workstation_id INT NOT NULL,
-    assigned_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    assigned_at INTEGER DEFAULT (CAST(strftime('%s', 'now') AS INTEGER)),
     FOREIGN KEY (staff_id) REFERENCES Staff(staff_id),
     FOREIGN KEY (workstation_id) REFERENCES Workstations(workstation_id)
 );
@@ -90,8 +91,9 @@ CREATE TABLE CustomerOrders (
     order_id INTEGER PRIMARY KEY AUTOINCREMENT,
     order_number VARCHAR(20) UNIQUE,
     status VARCHAR(20) DEFAULT 'PENDING',
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    estimated_seconds_remaining INT NULL
+    created_at INTEGER DEFAULT (CAST(strftime('%s', 'now') AS INTEGER)),
+    estimated_seconds_remaining INT NULL,      -- 접수 시점 예상 대기 시간 (앞 주문 + 자기 주문)
+    remaining_work_seconds INT NOT NULL DEFAULT 0   -- 이 주문의 남은 작업 시간 (트리거로 유지)
 );
 
 -- [11] OrderItems
@@ -113,9 +115,9 @@ CREATE TABLE KitchenTaskQueue (
     assigned_workstation_id INT NULL,
     assigned_zone_id INT NULL,
     assigned_staff_id INT NULL,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    actual_start_time TIMESTAMP NULL,
-    actual_end_time TIMESTAMP NULL,
+    created_at INTEGER DEFAULT (CAST(strftime('%s', 'now') AS INTEGER)),
+    actual_start_time INTEGER NULL,
+    actual_end_time INTEGER NULL,
     FOREIGN KEY (order_item_id) REFERENCES OrderItems(order_item_id),
     FOREIGN KEY (task_definition_id) REFERENCES MenuTasks(task_definition_id),
     FOREIGN KEY (assigned_staff_id) REFERENCES Staff(staff_id)
@@ -128,12 +130,148 @@ CREATE TABLE BottleneckAnalysis (
     bottleneck_type VARCHAR(50) NOT NULL CHECK (bottleneck_type IN ('NO_STAFF', 'NO_FRYER_ZONE', 'FRYER_TEMP_RECOVERY', 'DEPENDENCY_WAIT')),
     wait_duration_seconds INT NOT NULL,
     problematic_workstation_id INT NULL,
-    recorded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    recorded_at INTEGER DEFAULT (CAST(strftime('%s', 'now') AS INTEGER)),
     FOREIGN KEY (queue_task_id) REFERENCES KitchenTaskQueue(queue_task_id),
     FOREIGN KEY (problematic_workstation_id) REFERENCES Workstations(workstation_id)
 );
 
+-- [14] QueueWorkload (진행 중인 모든 주문의 남은 작업 시간 합계, 단일 행)
+CREATE TABLE QueueWorkload (
+    workload_id INTEGER PRIMARY KEY CHECK (workload_id = 1),
+    remaining_seconds INT NOT NULL DEFAULT 0
+);
+
+INSERT INTO QueueWorkload (workload_id, remaining_seconds) VALUES (1, 0);
+
+-- [15] RecipeVersion (레시피 변경 카운터, 단일 행 - 레시피 그래프 캐시 무효화용)
+CREATE TABLE RecipeVersion (
+    version_id INTEGER PRIMARY KEY CHECK (version_id = 1),
+    version INT NOT NULL DEFAULT 0
+);
+
+INSERT INTO RecipeVersion (version_id, version) VALUES (1, 0);
+
+-- [16] QueueExpansionState (작업 큐로 전개된 마지막 order_item_id, 단일 행)
+CREATE TABLE QueueExpansionState (
+    state_id INTEGER PRIMARY KEY CHECK (state_id = 1),
+    last_order_item_id INT NOT NULL DEFAULT 0
+);
+
+INSERT INTO QueueExpansionState (state_id, last_order_item_id) VALUES (1, 0);
+
 -- 인덱스
 CREATE INDEX idx_queue_priority ON KitchenTaskQueue(status, created_at);
 CREATE INDEX idx_zone_state ON ZoneRealtimeState(zone_id, busy_until);
 CREATE INDEX idx_bottleneck_type ON BottleneckAnalysis(bottleneck_type);
+
+-- ==========================================
+-- 트리거 - 남은 작업 시간 증분 유지
+-- (진행 중 주문 = status NOT IN ('COMPLETED', 'CANCELLED'))
+-- ==========================================
+
+-- 주문 항목 추가: 주문/큐 전체 작업 시간 증가, 접수 시점 예상 대기 시간 기록
+CREATE TRIGGER trg_order_item_workload
+AFTER INSERT ON OrderItems
+BEGIN
+    UPDATE CustomerOrders
+    SET remaining_work_seconds = remaining_work_seconds + NEW.quantity * (
+        SELECT COALESCE(SUM(base_time_seconds), 0) FROM MenuTasks
+        WHERE menu_item_id = NEW.menu_item_id)
+    WHERE order_id = NEW.order_id;
+
+    UPDATE QueueWorkload
+    SET remaining_seconds = remaining_seconds + NEW.quantity * (
+        SELECT COALESCE(SUM(base_time_seconds), 0) FROM MenuTasks
+        WHERE menu_item_id = NEW.menu_item_id)
+    WHERE workload_id = 1
+    AND (SELECT status FROM CustomerOrders WHERE order_id = NEW.order_id)
+        NOT IN ('COMPLETED', 'CANCELLED');
+
+    UPDATE CustomerOrders
+    SET estimated_seconds_remaining = (SELECT remaining_seconds FROM QueueWorkload WHERE workload_id = 1)
+    WHERE order_id = NEW.order_id;
+END;
+
+-- 작업 완료: 해당 작업 시간만큼 감소
+CREATE TRIGGER trg_task_completed_workload
+AFTER UPDATE OF status ON KitchenTaskQueue
+WHEN NEW.status = 'COMPLETED' AND OLD.status <> 'COMPLETED'
+BEGIN
+    UPDATE QueueWorkload
+    SET remaining_seconds = remaining_seconds - (
+        SELECT base_time_seconds FROM MenuTasks
+        WHERE task_definition_id = NEW.task_definition_id)
+    WHERE workload_id = 1
+    AND (SELECT CO.status FROM OrderItems OI
+         JOIN CustomerOrders CO ON OI.order_id = CO.order_id
+         WHERE OI.order_item_id = NEW.order_item_id)
+        NOT IN ('COMPLETED', 'CANCELLED');
+
+    UPDATE CustomerOrders
+    SET remaining_work_seconds = remaining_work_seconds - (
+        SELECT base_time_seconds FROM MenuTasks
+        WHERE task_definition_id = NEW.task_definition_id)
+    WHERE order_id = (SELECT order_id FROM OrderItems WHERE order_item_id = NEW.order_item_id);
+END;
+
+-- 주문 취소/완료: 남은 작업 시간을 큐 전체 합계에서 제외
+CREATE TRIGGER trg_order_closed_workload
+AFTER UPDATE OF status ON CustomerOrders
+WHEN OLD.status NOT IN ('COMPLETED', 'CANCELLED')
+AND NEW.status IN ('COMPLETED', 'CANCELLED')
+BEGIN
+    UPDATE QueueWorkload
+    SET remaining_seconds = remaining_seconds - OLD.remaining_work_seconds
+    WHERE workload_id = 1;
+END;
+
+-- 주문 재개: 다시 큐 전체 합계에 포함
+CREATE TRIGGER trg_order_reopened_workload
+AFTER UPDATE OF status ON CustomerOrders
+WHEN OLD.status IN ('COMPLETED', 'CANCELLED')
+AND NEW.status NOT IN ('COMPLETED', 'CANCELLED')
+BEGIN
+    UPDATE QueueWorkload
+    SET remaining_seconds = remaining_seconds + NEW.remaining_work_seconds
+    WHERE workload_id = 1;
+END;
+
+-- ==========================================
+-- 트리거 - 레시피 변경 시 RecipeVersion 증가
+-- ==========================================
+
+CREATE TRIGGER trg_menutasks_insert_version
+AFTER INSERT ON MenuTasks
+BEGIN
+    UPDATE RecipeVersion SET version = version + 1 WHERE version_id = 1;
+END;
+
+CREATE TRIGGER trg_menutasks_update_version
+AFTER UPDATE ON MenuTasks
+BEGIN
+    UPDATE RecipeVersion SET version = version + 1 WHERE version_id = 1;
+END;
+
+CREATE TRIGGER trg_menutasks_delete_version
+AFTER DELETE ON MenuTasks
+BEGIN
+    UPDATE RecipeVersion SET version = version + 1 WHERE version_id = 1;
+END;
+
+CREATE TRIGGER trg_taskdependencies_insert_version
+AFTER INSERT ON TaskDependencies
+BEGIN
+    UPDATE RecipeVersion SET version = version + 1 WHERE version_id = 1;
+END;
+
+CREATE TRIGGER trg_taskdependencies_update_version
+AFTER UPDATE ON TaskDependencies
+BEGIN
+    UPDATE RecipeVersion SET version = version + 1 WHERE version_id = 1;
+END;
+
+CREATE TRIGGER trg_taskdependencies_delete_version
+AFTER DELETE ON TaskDependencies
+BEGIN
+    UPDATE RecipeVersion SET version = version + 1 WHERE version_id = 1;
+END;
@@ -13,8 +13,8 @@ INSERT INTO Staff (name, status) VALUES
 
 -- [6] StaffAssignment
 INSERT INTO StaffAssignment (staff_id, workstation_id, assigned_at) VALUES
-    (1, 1, datetime('now', 'localtime')),
-    (2, 1, datetime('now', 'localtime')),
-    (3, 3, datetime('now', 'localtime')),
-    (4, 3, datetime('now', 'localtime')),
-    (6, 4, datetime('now', 'localtime'));
+    (1, 1, CAST(strftime('%s', 'now') AS INTEGER)),
+    (2, 1, CAST(strftime('%s', 'now') AS INTEGER)),
+    (3, 3, CAST(strftime('%s', 'now') AS INTEGER)),
+    (4, 3, CAST(strftime('%s', 'now') AS INTEGER)),
+    (6, 4, CAST(strftime('%s', 'now') AS INTEGER));
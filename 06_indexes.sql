@@ -0,0 +1,27 @@
+-- ==========================================
+-- 인덱스 마이그레이션 (기존 DB 에 여러 번 적용해도 안전)
+-- ==========================================
+
+-- 주문 → 주문 항목 조인 (영수증, 주문 현황)
+CREATE INDEX IF NOT EXISTS idx_orderitems_order ON OrderItems(order_id);
+
+-- 메뉴별 레시피 작업 (주문 항목 INSERT 트리거의 작업 시간 합계, 메뉴 작업 조회)
+CREATE INDEX IF NOT EXISTS idx_menutasks_menu ON MenuTasks(menu_item_id, task_order);
+
+-- 작업장별 배치 스태프
+CREATE INDEX IF NOT EXISTS idx_staffassignment_workstation ON StaffAssignment(workstation_id, staff_id);
+
+-- 주문 항목별 작업 인스턴스 (준비 큐 적재 시 항목의 전체 작업)
+CREATE INDEX IF NOT EXISTS idx_queue_order_item ON KitchenTaskQueue(order_item_id);
+
+-- 미완료(QUEUED/WAITING_RESOURCE/IN_PROGRESS) 작업만 담는 부분 인덱스
+CREATE INDEX IF NOT EXISTS idx_queue_open_item ON KitchenTaskQueue(order_item_id)
+WHERE status <> 'COMPLETED';
+
+-- 자원이 잡힌 작업의 할당 정보 (스태프 중복 할당 방지, 할당기 적재) - 커버링 부분 인덱스
+CREATE INDEX IF NOT EXISTS idx_queue_active_resources
+ON KitchenTaskQueue(status, assigned_staff_id, assigned_workstation_id, assigned_zone_id)
+WHERE status IN ('WAITING_RESOURCE', 'IN_PROGRESS');
+
+-- 작업 정의의 선행 작업 (워커 가져가기의 의존성 검사)
+CREATE INDEX IF NOT EXISTS idx_taskdeps_task ON TaskDependencies(task_id, depends_on_task_id);
@@ -0,0 +1,52 @@
+-- ==========================================
+-- 완료 작업 이력 분리 마이그레이션 (기존 DB 에 여러 번 적용해도 안전)
+-- KitchenTaskQueue/BottleneckAnalysis 는 진행 중인 작업만 담는 핫 테이블로 두고,
+-- 완료된 주문의 작업과 병목 기록은 archive.py 가 이력 테이블로 옮긴다.
+-- ==========================================
+
+-- 완료 작업 이력 (KitchenTaskQueue 와 같은 컬럼, queue_task_id 유지)
+CREATE TABLE IF NOT EXISTS KitchenTaskHistory (
+    queue_task_id INTEGER PRIMARY KEY,
+    order_item_id INT NOT NULL,
+    task_definition_id INT NOT NULL,
+    status VARCHAR(20) NOT NULL,
+    assigned_workstation_id INT NULL,
+    assigned_zone_id INT NULL,
+    assigned_staff_id INT NULL,
+    created_at INTEGER,
+    actual_start_time INTEGER NULL,
+    actual_end_time INTEGER NULL,
+    FOREIGN KEY (order_item_id) REFERENCES OrderItems(order_item_id),
+    FOREIGN KEY (task_definition_id) REFERENCES MenuTasks(task_definition_id),
+    FOREIGN KEY (assigned_staff_id) REFERENCES Staff(staff_id)
+);
+
+-- 병목 기록 이력 (BottleneckAnalysis 와 같은 컬럼, analysis_id 유지)
+CREATE TABLE IF NOT EXISTS BottleneckHistory (
+    analysis_id INTEGER PRIMARY KEY,
+    queue_task_id INT NOT NULL,
+    bottleneck_type VARCHAR(50) NOT NULL,
+    wait_duration_seconds INT NOT NULL,
+    problematic_workstation_id INT NULL,
+    recorded_at INTEGER,
+    FOREIGN KEY (queue_task_id) REFERENCES KitchenTaskHistory(queue_task_id),
+    FOREIGN KEY (problematic_workstation_id) REFERENCES Workstations(workstation_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_task_history_order_item ON KitchenTaskHistory(order_item_id);
+CREATE INDEX IF NOT EXISTS idx_bottleneck_history_type ON BottleneckHistory(bottleneck_type);
+CREATE INDEX IF NOT EXISTS idx_bottleneck_history_task ON BottleneckHistory(queue_task_id);
+
+-- 작업별 병목 기록 (보관 시 작업 단위로 옮기고 지움)
+CREATE INDEX IF NOT EXISTS idx_bottleneck_task ON BottleneckAnalysis(queue_task_id);
+
+-- 핫 + 이력 통합 조회 (리포트용)
+CREATE VIEW IF NOT EXISTS KitchenTaskAll AS
+SELECT * FROM KitchenTaskQueue
+UNION ALL
+SELECT * FROM KitchenTaskHistory;
+
+CREATE VIEW IF NOT EXISTS BottleneckAll AS
+SELECT * FROM BottleneckAnalysis
+UNION ALL
+SELECT * FROM BottleneckHistory;
@@ -0,0 +1,51 @@
+-- ==========================================
+-- 변경 피드 마이그레이션 (기존 DB 에 여러 번 적용해도 안전)
+-- 주방 화면이 전체 재조회 대신 바뀐 행만 다시 읽도록 트리거가 변경된 행의 키를 남긴다.
+-- ==========================================
+
+-- [17] ChangeFeed (추가 전용 변경 기록, 소비자는 change_id 이후만 읽음)
+CREATE TABLE IF NOT EXISTS ChangeFeed (
+    change_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    table_name VARCHAR(30) NOT NULL,
+    row_id INT NOT NULL
+);
+
+-- 진행 중인 주문 (주방 화면 초기 적재)
+CREATE INDEX IF NOT EXISTS idx_orders_open ON CustomerOrders(order_id)
+WHERE status NOT IN ('COMPLETED', 'CANCELLED');
+
+CREATE TRIGGER IF NOT EXISTS trg_feed_task_insert
+AFTER INSERT ON KitchenTaskQueue
+BEGIN
+    INSERT INTO ChangeFeed (table_name, row_id) VALUES ('KitchenTaskQueue', NEW.queue_task_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_feed_task_update
+AFTER UPDATE OF status, assigned_workstation_id, assigned_zone_id, assigned_staff_id ON KitchenTaskQueue
+BEGIN
+    INSERT INTO ChangeFeed (table_name, row_id) VALUES ('KitchenTaskQueue', NEW.queue_task_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_feed_task_delete
+AFTER DELETE ON KitchenTaskQueue
+BEGIN
+    INSERT INTO ChangeFeed (table_name, row_id) VALUES ('KitchenTaskQueue', OLD.queue_task_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_feed_zone_update
+AFTER UPDATE ON ZoneRealtimeState
+BEGIN
+    INSERT INTO ChangeFeed (table_name, row_id) VALUES ('ZoneRealtimeState', NEW.zone_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_feed_order_insert
+AFTER INSERT ON CustomerOrders
+BEGIN
+    INSERT INTO ChangeFeed (table_name, row_id) VALUES ('CustomerOrders', NEW.order_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_feed_order_update
+AFTER UPDATE OF status ON CustomerOrders
+BEGIN
+    INSERT INTO ChangeFeed (table_name, row_id) VALUES ('CustomerOrders', NEW.order_id);
+END;
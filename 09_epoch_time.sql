@@ -0,0 +1,42 @@
+-- ==========================================
+-- 시각 컬럼 epoch 초 변환 마이그레이션 (한 번만 적용, PRAGMA user_version 으로 관리)
+-- 이전 DB 의 'YYYY-MM-DD HH:MM:SS' (localtime) 문자열을 정수 epoch 초로 바꾼다.
+-- 컬럼 선언은 그대로 두어도 TIMESTAMP(NUMERIC 친화도) 컬럼에 정수가 그대로 저장된다.
+-- 기존 컬럼 기본값(CURRENT_TIMESTAMP)은 바꿀 수 없으므로 모든 INSERT 는 시각을 직접 넘긴다.
+-- ==========================================
+
+UPDATE ZoneRealtimeState
+SET busy_until = CAST(strftime('%s', busy_until, 'utc') AS INTEGER)
+WHERE typeof(busy_until) = 'text';
+
+UPDATE StaffAssignment
+SET assigned_at = CAST(strftime('%s', assigned_at, 'utc') AS INTEGER)
+WHERE typeof(assigned_at) = 'text';
+
+UPDATE CustomerOrders
+SET created_at = CAST(strftime('%s', created_at, 'utc') AS INTEGER)
+WHERE typeof(created_at) = 'text';
+
+UPDATE KitchenTaskQueue
+SET created_at = CAST(strftime('%s', created_at, 'utc') AS INTEGER),
+    actual_start_time = CAST(strftime('%s', actual_start_time, 'utc') AS INTEGER),
+    actual_end_time = CAST(strftime('%s', actual_end_time, 'utc') AS INTEGER)
+WHERE typeof(created_at) = 'text'
+   OR typeof(actual_start_time) = 'text'
+   OR typeof(actual_end_time) = 'text';
+
+UPDATE BottleneckAnalysis
+SET recorded_at = CAST(strftime('%s', recorded_at, 'utc') AS INTEGER)
+WHERE typeof(recorded_at) = 'text';
+
+UPDATE KitchenTaskHistory
+SET created_at = CAST(strftime('%s', created_at, 'utc') AS INTEGER),
+    actual_start_time = CAST(strftime('%s', actual_start_time, 'utc') AS INTEGER),
+    actual_end_time = CAST(strftime('%s', actual_end_time, 'utc') AS INTEGER)
+WHERE typeof(created_at) = 'text'
+   OR typeof(actual_start_time) = 'text'
+   OR typeof(actual_end_time) = 'text';
+
+UPDATE BottleneckHistory
+SET recorded_at = CAST(strftime('%s', recorded_at, 'utc') AS INTEGER)
+WHERE typeof(recorded_at) = 'text';
@@ -0,0 +1,20 @@
+-- ==========================================
+-- 보온 재고 마이그레이션 (기존 DB 에 여러 번 적용해도 안전)
+-- 수요 예측으로 미리 튀긴 패티/텐더/감자튀김의 생산/충당/폐기를 기록한다.
+-- 재고 자체는 holding.HoldingCache 가 메모리에 두고, 이 테이블은 지표와 사후 분석용이다.
+-- ==========================================
+
+-- [18] HoldingLedger (보온 재고 입출 기록, 추가 전용)
+CREATE TABLE IF NOT EXISTS HoldingLedger (
+    ledger_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    food_type VARCHAR(50) NOT NULL,
+    event VARCHAR(10) NOT NULL CHECK (event IN ('PRODUCED', 'SERVED', 'WASTED')),
+    quantity INT NOT NULL,
+    queue_task_id INT NULL,         -- SERVED: 재고로 충당한 튀김 작업
+    recorded_at INTEGER NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_holding_recorded ON HoldingLedger(recorded_at);
+
+-- 시간대별 수요 학습 (접수 시각 범위로 주문 이력 조회)
+CREATE INDEX IF NOT EXISTS idx_orders_created ON CustomerOrders(created_at);
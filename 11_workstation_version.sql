@@ -0,0 +1,12 @@
+-- ==========================================
+-- 작업장 최대 인원 변경 → RecipeVersion 증가 (반복 적용 가능)
+-- ==========================================
+-- 레시피 그래프 캐시의 작업장별 동시 처리 슬롯(workstation_slots)은 Workstations.max_staff 에서 오므로
+-- 최대 인원이 바뀌면 레시피 변경과 같이 다음 refresh() 에서 다시 컴파일되게 한다.
+
+CREATE TRIGGER IF NOT EXISTS trg_workstations_max_staff_version
+AFTER UPDATE OF max_staff ON Workstations
+WHEN OLD.max_staff IS NOT NEW.max_staff
+BEGIN
+    UPDATE RecipeVersion SET version = version + 1 WHERE version_id = 1;
+END;
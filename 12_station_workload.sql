@@ -0,0 +1,105 @@
+-- ==========================================
+-- 작업장별 남은 작업 시간 마이그레이션 (기존 DB 에 여러 번 적용해도 안전)
+-- QueueWorkload 의 작업장별 버전 - 주문 접수 ETA 가 앞선 주문의 남은 작업을
+-- 작업장 인원 수로 나눌 때 큐 전체를 다시 집계하지 않고 작업장 수만큼만 읽는다.
+-- 같은 사건(주문 항목 추가, 작업 완료, 주문 취소/완료/재개)에 트리거로 증분 유지한다.
+-- ==========================================
+
+-- [19] StationWorkload (작업장별 진행 중인 주문의 남은 작업 시간 합계)
+CREATE TABLE IF NOT EXISTS StationWorkload (
+    workstation_id INTEGER PRIMARY KEY,
+    remaining_seconds INT NOT NULL DEFAULT 0,
+    FOREIGN KEY (workstation_id) REFERENCES Workstations(workstation_id)
+);
+
+-- 처음 적용할 때만 진행 중인 주문에서 한 번 계산 (테이블이 비어 있을 때)
+INSERT INTO StationWorkload (workstation_id, remaining_seconds)
+SELECT W.workstation_id, COALESCE((
+    SELECT SUM(OI.quantity * MT.base_time_seconds)
+    FROM CustomerOrders CO
+    JOIN OrderItems OI ON OI.order_id = CO.order_id
+    JOIN MenuTasks MT ON MT.menu_item_id = OI.menu_item_id
+    WHERE MT.workstation_id = W.workstation_id
+    AND CO.status NOT IN ('COMPLETED', 'CANCELLED')), 0) - COALESCE((
+    SELECT SUM(MT.base_time_seconds)
+    FROM CustomerOrders CO
+    JOIN OrderItems OI ON OI.order_id = CO.order_id
+    JOIN KitchenTaskQueue KTQ ON KTQ.order_item_id = OI.order_item_id
+    JOIN MenuTasks MT ON MT.task_definition_id = KTQ.task_definition_id
+    WHERE MT.workstation_id = W.workstation_id
+    AND KTQ.status = 'COMPLETED'
+    AND CO.status NOT IN ('COMPLETED', 'CANCELLED')), 0)
+FROM Workstations W
+WHERE NOT EXISTS (SELECT 1 FROM StationWorkload);
+
+CREATE TRIGGER IF NOT EXISTS trg_workstation_workload_row
+AFTER INSERT ON Workstations
+BEGIN
+    INSERT OR IGNORE INTO StationWorkload (workstation_id, remaining_seconds) VALUES (NEW.workstation_id, 0);
+END;
+
+-- 주문 항목 추가: 메뉴 작업이 있는 작업장마다 증가
+CREATE TRIGGER IF NOT EXISTS trg_order_item_station_workload
+AFTER INSERT ON OrderItems
+WHEN (SELECT status FROM CustomerOrders WHERE order_id = NEW.order_id) NOT IN ('COMPLETED', 'CANCELLED')
+BEGIN
+    UPDATE StationWorkload
+    SET remaining_seconds = remaining_seconds + NEW.quantity * (
+        SELECT COALESCE(SUM(MT.base_time_seconds), 0) FROM MenuTasks MT
+        WHERE MT.menu_item_id = NEW.menu_item_id AND MT.workstation_id = StationWorkload.workstation_id)
+    WHERE workstation_id IN (SELECT workstation_id FROM MenuTasks WHERE menu_item_id = NEW.menu_item_id);
+END;
+
+-- 작업 완료: 그 작업장에서 작업 시간만큼 감소
+CREATE TRIGGER IF NOT EXISTS trg_task_completed_station_workload
+AFTER UPDATE OF status ON KitchenTaskQueue
+WHEN NEW.status = 'COMPLETED' AND OLD.status <> 'COMPLETED'
+AND (SELECT CO.status FROM OrderItems OI
+     JOIN CustomerOrders CO ON OI.order_id = CO.order_id
+     WHERE OI.order_item_id = NEW.order_item_id) NOT IN ('COMPLETED', 'CANCELLED')
+BEGIN
+    UPDATE StationWorkload
+    SET remaining_seconds = remaining_seconds - (
+        SELECT base_time_seconds FROM MenuTasks WHERE task_definition_id = NEW.task_definition_id)
+    WHERE workstation_id = (SELECT workstation_id FROM MenuTasks WHERE task_definition_id = NEW.task_definition_id);
+END;
+
+-- 주문 취소/완료: 그 주문의 작업장별 남은 작업(전체 - 완료한 작업)을 뺌
+CREATE TRIGGER IF NOT EXISTS trg_order_closed_station_workload
+AFTER UPDATE OF status ON CustomerOrders
+WHEN OLD.status NOT IN ('COMPLETED', 'CANCELLED')
+AND NEW.status IN ('COMPLETED', 'CANCELLED')
+BEGIN
+    UPDATE StationWorkload
+    SET remaining_seconds = remaining_seconds - (
+        SELECT COALESCE(SUM(OI.quantity * MT.base_time_seconds), 0)
+        FROM OrderItems OI
+        JOIN MenuTasks MT ON MT.menu_item_id = OI.menu_item_id
+        WHERE OI.order_id = NEW.order_id AND MT.workstation_id = StationWorkload.workstation_id) + (
+        SELECT COALESCE(SUM(MT.base_time_seconds), 0)
+        FROM OrderItems OI
+        JOIN KitchenTaskQueue KTQ ON KTQ.order_item_id = OI.order_item_id
+        JOIN MenuTasks MT ON MT.task_definition_id = KTQ.task_definition_id
+        WHERE OI.order_id = NEW.order_id AND KTQ.status = 'COMPLETED'
+        AND MT.workstation_id = StationWorkload.workstation_id);
+END;
+
+-- 주문 재개: 다시 더함 (핫 테이블에 남은 작업 기준)
+CREATE TRIGGER IF NOT EXISTS trg_order_reopened_station_workload
+AFTER UPDATE OF status ON CustomerOrders
+WHEN OLD.status IN ('COMPLETED', 'CANCELLED')
+AND NEW.status NOT IN ('COMPLETED', 'CANCELLED')
+BEGIN
+    UPDATE StationWorkload
+    SET remaining_seconds = remaining_seconds + (
+        SELECT COALESCE(SUM(OI.quantity * MT.base_time_seconds), 0)
+        FROM OrderItems OI
+        JOIN MenuTasks MT ON MT.menu_item_id = OI.menu_item_id
+        WHERE OI.order_id = NEW.order_id AND MT.workstation_id = StationWorkload.workstation_id) - (
+        SELECT COALESCE(SUM(MT.base_time_seconds), 0)
+        FROM OrderItems OI
+        JOIN KitchenTaskQueue KTQ ON KTQ.order_item_id = OI.order_item_id
+        JOIN MenuTasks MT ON MT.task_definition_id = KTQ.task_definition_id
+        WHERE OI.order_id = NEW.order_id AND KTQ.status = 'COMPLETED'
+        AND MT.workstation_id = StationWorkload.workstation_id);
+END;
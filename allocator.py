@@ -0,0 +1,426 @@
+# -*- coding: utf-8 -*-
+"""
+자원 할당기 - 스태프/구역 상태를 메모리에 두고 QUEUED 작업 묶음을 한 번에 할당
+
+- 스태프: 작업장별 빈 스태프 목록 (Workstations.max_staff 명까지만 근무)
+- 구역: 작업장별 busy_until 최소 힙, ZoneCapacityRules.max_quantity 준수
+- PASSIVE 작업(감자튀김 등)은 스태프 없이 구역만 차지
+- 할당 결과는 트랜잭션 하나로 KitchenTaskQueue/ZoneRealtimeState 에 기록
+- 구역 busy_until 은 타이머 휠에 예약해, 지난 구역을 release_expired() 가 틱마다 O(1) 로 비움
+
+시각은 모두 정수 epoch 초이며, 문자열 변환(parse_time/format_time)은 입력/표시용이다.
+"""
+
+import heapq
+import time
+from collections import deque
+
+from dal import load_sql, transaction
+from timer_wheel import TimerWheel
+from tracing import traced
+
+TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+def parse_time(text):
+    """'YYYY-MM-DD HH:MM:SS' (localtime) -> 정수 epoch 초, NULL 은 0"""
+    if not text:
+        return 0
+    return int(time.mktime(time.strptime(text, TIME_FORMAT)))
+
+def format_time(ts):
+    """epoch 초 -> 'YYYY-MM-DD HH:MM:SS' (localtime)"""
+    return time.strftime(TIME_FORMAT, time.localtime(ts))
+
+def food_type_for_task(task_name, food_types):
+    """작업명에 포함된 식품 종류 (예: '싸이패티 튀기기' -> '싸이패티'), 없으면 None"""
+    for food_type in food_types:
+        if food_type in task_name:
+            return food_type
+    return None
+
+class ResourceAllocator:
+    """작업장별 스태프 free-list 와 구역 busy_until 힙을 유지하는 할당기"""
+
+    def __init__(self, recipe_cache):
+        self.recipe_cache = recipe_cache
+        self.station_staff = {}    # workstation_id -> 근무 가능한 staff_id 집합
+        self.staff_station = {}    # staff_id -> 배치된 workstation_id
+        self.free_staff = {}       # workstation_id -> deque(빈 staff_id)
+        self.zones = {}            # zone_id -> [workstation_id, food_type, quantity, busy_until]
+        self.zone_heaps = {}       # workstation_id -> [(busy_until, zone_id)]
+        self.capacity = {}         # zone_id -> {food_type: max_quantity}
+        self.food_types = []
+        self.active = {}           # queue_task_id -> (workstation_id, zone_id, staff_id)
+        self.staff_holds = {}      # staff_id -> 맡고 있는 작업 수 (튀김 배치는 여러 개)
+        self.zone_timers = None    # busy_until 에 구역을 비우는 타이머 휠 (첫 적재 때 생성)
+        self._dirty_zones = set()
+
+    def load(self, conn):
+        """DB 에서 스태프/구역/진행 중 할당 상태를 한 번 읽어 메모리 구조 생성"""
+        self.recipe_cache.refresh(conn)
+        self.active = {queue_task_id: (ws_id, zone_id, staff_id)
+                       for queue_task_id, ws_id, zone_id, staff_id
+                       in conn.execute(load_sql('select_active_assignments.sql'))}
+        self.staff_holds = {}
+        for _, _, staff_id in self.active.values():
+            if staff_id is not None:
+                self.staff_holds[staff_id] = self.staff_holds.get(staff_id, 0) + 1
+        self.load_roster(conn)
+
+        self.capacity = {}
+        for zone_id, food_type, max_quantity in conn.execute(load_sql('select_zone_capacity_rules.sql')):
+            self.capacity.setdefault(zone_id, {})[food_type] = max_quantity
+        # 긴 이름 먼저 비교해 부분 일치 오류 방지
+        self.food_types = sorted({f for rules in self.capacity.values() for f in rules},
+                                 key=len, reverse=True)
+
+        self.zones = {}
+        self.zone_heaps = {}
+        for zone_id, ws_id, food_type, quantity, busy_until in conn.execute(
+                load_sql('select_zone_allocation_state.sql')):
+            busy_until = busy_until or 0
+            self.zones[zone_id] = [ws_id, food_type, quantity, busy_until]
+            self.zone_heaps.setdefault(ws_id, []).append((busy_until, zone_id))
+        for heap in self.zone_heaps.values():
+            heapq.heapify(heap)
+        self.zone_timers = None
+        busy = [(zone[3], zone_id) for zone_id, zone in self.zones.items() if zone[3]]
+        for busy_until, zone_id in sorted(busy):
+            self._schedule_release(zone_id, busy_until, busy_until - 1)
+        self._dirty_zones = set()
+        return self
+
+    def load_roster(self, conn):
+        """
+        작업장별 근무 명단(StaffAssignment, ACTIVE 스태프, max_staff 명까지)을 다시 읽음
+
+        진행 중인 할당은 그대로 두므로 근무 중 재배치에도 부를 수 있다. 작업 중인 스태프는
+        빈 목록에 넣지 않고, 작업이 끝나면 새로 배치된 작업장의 빈 목록으로 돌아간다.
+        """
+        max_staff = {ws_id: limit for ws_id, _, limit in conn.execute(load_sql('select_workstation_limits.sql'))}
+        roster = {}
+        for ws_id, staff_id in conn.execute(load_sql('select_station_staff.sql')):
+            staff_ids = roster.setdefault(ws_id, [])
+            if len(staff_ids) < max_staff.get(ws_id, 1):
+                staff_ids.append(staff_id)
+        self.station_staff = {ws_id: set(staff_ids) for ws_id, staff_ids in roster.items()}
+        self.staff_station = {staff_id: ws_id for ws_id, staff_ids in roster.items() for staff_id in staff_ids}
+        self.free_staff = {ws_id: deque(s for s in staff_ids if s not in self.staff_holds)
+                           for ws_id, staff_ids in roster.items()}
+        return self
+
+    def _zone_room(self, zone_id, food_type):
+        """구역에 더 넣을 수 있는 수량"""
+        _, current_food, quantity, _ = self.zones[zone_id]
+        rules = self.capacity.get(zone_id)
+        if rules is None:
+            # 용량 규칙이 없는 구역 (조립대 등): 한 번에 작업 하나
+            return 1 if quantity == 0 else 0
+        limit = rules.get(food_type)
+        if limit is None or (quantity > 0 and current_food != food_type):
+            return 0
+        return max(limit - quantity, 0)
+
+    def _zone_accepts(self, zone_id, food_type):
+        return self._zone_room(zone_id, food_type) > 0
+
+    def blocked_reason(self, task, now):
+        """
+        작업을 지금 할당할 수 없는 이유 (병목 유형)
+
+        스태프가 필요한데 빈 스태프가 없으면 NO_STAFF, 튀김 구역이 모두 차 있으면
+        가장 먼저 비는 구역의 busy_until 이 이미 지났을 때 FRYER_TEMP_RECOVERY
+        (조리 시간은 끝났지만 구역이 아직 비지 않음), 아니면 NO_FRYER_ZONE.
+        용량 규칙이 없는 구역(조립대 등)이 모두 찬 경우는 일손 부족으로 보고 NO_STAFF.
+        """
+        _, task_def_id, workstation_id, menu_item_id = task
+        task_type = self.recipe_cache.graph(menu_item_id).tasks[task_def_id][4]
+        if task_type == 'ACTIVE' and not self.free_staff.get(workstation_id):
+            return 'NO_STAFF'
+        zones = [(zone[3], zone_id) for zone_id, zone in self.zones.items() if zone[0] == workstation_id]
+        if not any(zone_id in self.capacity for _, zone_id in zones):
+            return 'NO_STAFF'
+        earliest = min(busy_until for busy_until, _ in zones)
+        return 'FRYER_TEMP_RECOVERY' if earliest <= now else 'NO_FRYER_ZONE'
+
+    def batch_capacity(self, workstation_id, food_type):
+        """작업장 구역 한 곳에 한 번에 넣을 수 있는 최대 수량"""
+        return max((self.capacity.get(zone_id, {}).get(food_type, 0)
+                    for zone_id, zone in self.zones.items() if zone[0] == workstation_id), default=0)
+
+    def _pick_zone(self, workstation_id, food_type):
+        """busy_until 이 가장 이른 구역 중 이 식품을 받을 수 있는 구역을 힙에서 꺼냄"""
+        heap = self.zone_heaps[workstation_id]
+        skipped = []
+        chosen = None
+        while heap:
+            entry = heapq.heappop(heap)
+            if self._zone_accepts(entry[1], food_type):
+                chosen = entry[1]
+                break
+            skipped.append(entry)
+        for entry in skipped:
+            heapq.heappush(heap, entry)
+        return chosen
+
+    def _peek_zone(self, workstation_id, food_type):
+        """_pick_zone 이 고를 구역 (힙은 그대로 둠)"""
+        for _, zone_id in sorted(self.zone_heaps[workstation_id]):
+            if self._zone_accepts(zone_id, food_type):
+                return zone_id
+        return None
+
+    def station_options(self, workstation_id, task_definition_ids):
+        """
+        작업장에서 지금 시작할 수 있는 작업 정의별 자원 (메모리 상태는 바꾸지 않음)
+
+        반환: {task_definition_id: (zone_id, staff_id)} - 이어서 같은 작업을 assign() 하면
+              같은 구역/스태프가 잡힌다. 스태프나 구역이 없는 작업 정의는 빠짐
+        """
+        free = self.free_staff.get(workstation_id)
+        zoned = bool(self.zone_heaps.get(workstation_id))
+        options = {}
+        for task_def_id in task_definition_ids:
+            graph = self.recipe_cache.graph(self.recipe_cache.task_menu[task_def_id])
+            task_name, _, _, _, task_type = graph.tasks[task_def_id]
+            staff_id = None
+            if task_type == 'ACTIVE':
+                if not free:
+                    continue
+                staff_id = free[0]
+            zone_id = None
+            if zoned:
+                zone_id = self._peek_zone(workstation_id, food_type_for_task(task_name, self.food_types))
+                if zone_id is None:
+                    continue
+            options[task_def_id] = (zone_id, staff_id)
+        return options
+
+    def _occupy_zone(self, zone_id, food_type, seconds, now, units=1):
+        zone = self.zones[zone_id]
+        zone[1] = food_type
+        zone[2] += units
+        busy_until = max(zone[3], int(now + seconds))
+        if busy_until != zone[3]:
+            zone[3] = busy_until
+            self._schedule_release(zone_id, busy_until, now)
+        heapq.heappush(self.zone_heaps[zone[0]], (zone[3], zone_id))
+        self._dirty_zones.add(zone_id)
+
+    def _schedule_release(self, zone_id, busy_until, now):
+        if self.zone_timers is None:
+            self.zone_timers = TimerWheel(now)
+        self.zone_timers.schedule(busy_until, zone_id)
+
+    def release_expired(self, now=None):
+        """
+        busy_until 이 지난 구역을 비움 (메모리 연산만, 기록은 flush_zones)
+
+        busy_until 을 지우고, 남은 수량이 없으면 식품 종류도 지운다. 그 사이 다시 적재되어
+        busy_until 이 늘어난 구역은 새 예약이 있으므로 건너뛴다.
+        반환: 비운 zone_id 목록
+        """
+        if self.zone_timers is None:
+            return []
+        now = time.time() if now is None else now
+        released = []
+        for busy_until, zone_id in self.zone_timers.advance(now):
+            zone = self.zones.get(zone_id)
+            if zone is None or zone[3] != busy_until:
+                continue
+            zone[3] = 0
+            if zone[2] == 0:
+                zone[1] = None
+            self._dirty_zones.add(zone_id)
+            released.append(zone_id)
+        return released
+
+    def assign(self, tasks, now=None):
+        """
+        QUEUED 작업 묶음에 스태프/구역 할당 (메모리 연산만)
+
+        tasks: select_queued_tasks.sql 결과 [(queue_task_id, task_definition_id,
+               workstation_id, menu_item_id)]
+        반환: [(queue_task_id, workstation_id, zone_id, staff_id)]
+              스태프나 구역이 없어 할당하지 못한 작업은 빠짐 (QUEUED 유지)
+        """
+        now = time.time() if now is None else now
+        assignments = []
+        for queue_task_id, task_def_id, workstation_id, menu_item_id in tasks:
+            task_name, _, _, seconds, task_type = \
+                self.recipe_cache.graph(menu_item_id).tasks[task_def_id]
+
+            needs_staff = task_type == 'ACTIVE'
+            free = self.free_staff.get(workstation_id)
+            if needs_staff and not free:
+                continue
+
+            zone_id = None
+            if self.zone_heaps.get(workstation_id):
+                food_type = food_type_for_task(task_name, self.food_types)
+                zone_id = self._pick_zone(workstation_id, food_type)
+                if zone_id is None:
+                    continue
+                self._occupy_zone(zone_id, food_type, seconds, now)
+
+            staff_id = free.popleft() if needs_staff else None
+            if staff_id is not None:
+                self.staff_holds[staff_id] = 1
+            self.active[queue_task_id] = (workstation_id, zone_id, staff_id)
+            assignments.append((queue_task_id, workstation_id, zone_id, staff_id))
+        return assignments
+
+    def assign_batch(self, tasks, food_type, now=None):
+        """
+        같은 식품의 튀김 작업 여러 개를 구역 하나에 한 번에 적재 (메모리 연산만)
+
+        스태프 한 명이 배치 전체를 맡고, 구역 상태는 배치당 한 번만 바뀐다.
+        tasks: 같은 작업장의 실행 가능 작업 (select_queued_tasks.sql 행 형식, 먼저 온 순)
+        반환: 구역 여유만큼 앞에서부터 할당된 [(queue_task_id, workstation_id, zone_id, staff_id)]
+              스태프나 구역이 없으면 []
+        """
+        now = time.time() if now is None else now
+        workstation_id = tasks[0][2]
+        specs = [self.recipe_cache.graph(menu_item_id).tasks[task_def_id]
+                 for _, task_def_id, _, menu_item_id in tasks]
+
+        needs_staff = any(spec[4] == 'ACTIVE' for spec in specs)
+        free = self.free_staff.get(workstation_id)
+        if needs_staff and not free:
+            return []
+        if not self.zone_heaps.get(workstation_id):
+            return []
+        zone_id = self._pick_zone(workstation_id, food_type)
+        if zone_id is None:
+            return []
+
+        count = min(len(tasks), self._zone_room(zone_id, food_type))
+        seconds = max(spec[3] for spec in specs[:count])
+        self._occupy_zone(zone_id, food_type, seconds, now, units=count)
+
+        staff_id = free.popleft() if needs_staff else None
+        if staff_id is not None:
+            self.staff_holds[staff_id] = count
+        assignments = []
+        for queue_task_id, _, _, _ in tasks[:count]:
+            self.active[queue_task_id] = (workstation_id, zone_id, staff_id)
+            assignments.append((queue_task_id, workstation_id, zone_id, staff_id))
+        return assignments
+
+    def reserve(self, workstation_id, food_type, units, seconds, needs_staff, now, key):
+        """
+        주문 작업 없이 구역 하나(와 스태프)를 잡음 - 보온 재고 미리 튀기기용 (메모리 연산만)
+
+        구역 여유만큼만 잡고, 잡은 수량마다 자원 키 (key, i) 를 돌려준다. 끝나면 키마다 release().
+        스태프나 구역이 없으면 []
+        """
+        free = self.free_staff.get(workstation_id)
+        if needs_staff and not free:
+            return []
+        if not self.zone_heaps.get(workstation_id):
+            return []
+        zone_id = self._pick_zone(workstation_id, food_type)
+        if zone_id is None:
+            return []
+
+        count = min(units, self._zone_room(zone_id, food_type))
+        self._occupy_zone(zone_id, food_type, seconds, now, units=count)
+        staff_id = free.popleft() if needs_staff else None
+        if staff_id is not None:
+            self.staff_holds[staff_id] = count
+        keys = [(key, i) for i in range(count)]
+        for resource_key in keys:
+            self.active[resource_key] = (workstation_id, zone_id, staff_id)
+        return keys
+
+    def release(self, queue_task_id):
+        """작업 완료 시 스태프를 free-list 로, 구역 수량을 반환 (메모리 연산만)"""
+        assignment = self.active.pop(queue_task_id, None)
+        if assignment is None:
+            return
+        workstation_id, zone_id, staff_id = assignment
+        if staff_id is not None:
+            # 배치의 마지막 작업이 끝날 때 스태프 반환
+            holds = self.staff_holds.get(staff_id, 1) - 1
+            if holds > 0:
+                self.staff_holds[staff_id] = holds
+            else:
+                self.staff_holds.pop(staff_id, None)
+                home = self.staff_station.get(staff_id)
+                if home is not None:
+                    self.free_staff[home].append(staff_id)
+        if zone_id is not None and zone_id in self.zones:
+            zone = self.zones[zone_id]
+            zone[2] = max(zone[2] - 1, 0)
+            if zone[2] == 0:
+                zone[1] = None
+            self._dirty_zones.add(zone_id)
+
+    def flush_zones(self, conn):
+        """변경된 구역 상태를 ZoneRealtimeState 에 기록 (호출자 트랜잭션 안에서)"""
+        if not self._dirty_zones:
+            return
+        conn.executemany(load_sql('update_zone_state.sql'), [
+            (self.zones[z][1], self.zones[z][2],
+             self.zones[z][3] or None, z)
+            for z in sorted(self._dirty_zones)
+        ])
+        self._dirty_zones = set()
+
+    def persist(self, conn, assignments):
+        """assign/assign_batch 의 할당 결과와 변경된 구역 상태를 트랜잭션 하나로 기록"""
+        try:
+            with transaction(conn):
+                conn.executemany(load_sql('update_task_assignment.sql'), [
+                    (ws_id, zone_id, staff_id, queue_task_id)
+                    for queue_task_id, ws_id, zone_id, staff_id in assignments
+                ])
+                self.flush_zones(conn)
+        except Exception:
+            # 롤백되었으므로 메모리 상태를 DB 기준으로 다시 맞춤
+            self.load(conn)
+            raise
+
+    @traced('assignment')
+    def assign_queued(self, conn, tasks=None, now=None):
+        """
+        QUEUED 작업 묶음을 한 번에 할당하고 트랜잭션 하나로 저장
+
+        tasks 를 생략하면 select_queued_tasks.sql 의 QUEUED 작업 전체
+        """
+        if tasks is None:
+            tasks = conn.execute(load_sql('select_queued_tasks.sql')).fetchall()
+        assignments = self.assign(tasks, now)
+        self.persist(conn, assignments)
+        return assignments
+
+    @traced('assignment')
+    def assign_ready(self, conn, ready_queue, now=None, max_misses=8, on_miss=None):
+        """
+        준비 큐의 실행 가능 작업만 할당, 자원이 없는 작업은 준비 큐로 되돌림
+
+        작업장마다 힙 앞쪽부터 꺼내다가 max_misses 번 연속 실패하면 멈추므로
+        밀린 작업이 많아도 호출 비용은 (할당 수 + 작업장 수) 에 비례
+        on_miss(task, now): 할당하지 못한 작업마다 호출 (병목 감지용)
+        """
+        assignments = []
+        missed = []
+        for workstation_id in ready_queue.ready_workstations():
+            misses = 0
+            while misses < max_misses:
+                task = ready_queue.pop_ready(workstation_id)
+                if task is None:
+                    break
+                result = self.assign([task], now)
+                if result:
+                    assignments.extend(result)
+                    misses = 0
+                else:
+                    missed.append(task)
+                    misses += 1
+                    if on_miss is not None:
+                        on_miss(task, time.time() if now is None else now)
+        ready_queue.push_back(missed)
+        if assignments:
+            self.persist(conn, assignments)
+        return assignments
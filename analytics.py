@@ -0,0 +1,311 @@
+# -*- coding: utf-8 -*-
+"""
+교대/이력 분석 엔진 - 작업 이력을 열 배열로 읽어 NumPy 벡터 연산으로 집계
+
+KitchenTaskAll(핫 + 이력) 을 queue_task_id 순으로 chunk_size 행씩 읽어
+epoch 초 / 범주 코드 열 배열로 만들고 시간 구간(bucket_seconds)별로 계산한다.
+
+- 작업장별 스태프 가동률: 스태프별 작업 구간(튀김 배치는 한 번) / (max_staff × 구간 길이)
+- 메뉴별 조리 시간 백분위수: 주문 항목 생성 → 마지막 작업 완료
+- 대기열 길이 추이: sample_seconds 마다 생성됐지만 시작하지 않은 작업 수
+- ETA 오차 분포: 실제 주문 완료 시간 - 접수 시점 예상 대기 시간
+
+모든 작업이 끝난 과거 구간은 닫힌 구간으로 캐시하고, 다음 refresh() 는 열린 구간에
+걸친 작업만 다시 읽는다. 시각은 DB 에 저장된 정수 epoch 초를 그대로 쓴다.
+
+사용 예:
+    python analytics.py --db momstouch_complete.db --bucket-minutes 60
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+from tabulate import tabulate
+from colorama import Fore, init
+
+from dal import connect, load_sql, migrate
+
+# select_task_history.sql 열 위치
+QID, ORDER, ITEM, MENU, WS, STAFF, CREATED, START, END = range(9)
+COLUMNS = 9
+
+PERCENTILES = (50, 90, 99)
+
+def _empty():
+    return np.empty((0, COLUMNS), dtype=np.int64)
+
+def _group_max(keys, values):
+    """keys 별 최댓값 - (정렬된 고유 키, 최댓값, 키별 첫 행 위치)"""
+    unique, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    result = np.full(len(unique), np.iinfo(np.int64).min, dtype=np.int64)
+    np.maximum.at(result, inverse, values)
+    return unique, result, first
+
+def _percentiles(values):
+    return {f'p{p}': float(v) for p, v in zip(PERCENTILES, np.percentile(values, PERCENTILES))}
+
+class ShiftAnalytics:
+    """닫힌 시간 구간 캐시를 가진 증분 분석기"""
+
+    def __init__(self, bucket_seconds=3600, sample_seconds=60, chunk_size=50000):
+        self.bucket_seconds = bucket_seconds
+        self.sample_seconds = sample_seconds
+        self.chunk_size = chunk_size
+        self.closed = {}          # 구간 시작 -> 구간 통계 (다시 계산하지 않음)
+        self.open = {}            # 구간 시작 -> 구간 통계 (다음 refresh 에서 다시 계산)
+        self.open_start = None    # 첫 열린 구간 시작
+        self.resume_task_id = 0   # 다음에 읽을 첫 queue_task_id
+        self.carry = _empty()     # 닫힌 구간에 생성되어 열린 구간까지 이어진 완료 작업
+        self.slots = {}           # workstation_id -> max_staff
+        self.rows_loaded = 0      # 마지막 refresh 에서 읽은 행 수
+
+    def _load(self, conn):
+        """resume_task_id 이후 작업 이력을 chunk_size 행씩 읽어 int64 배열로"""
+        cursor = conn.execute(load_sql('select_task_history.sql'), (self.resume_task_id,))
+        chunks = []
+        while True:
+            rows = cursor.fetchmany(self.chunk_size)
+            if not rows:
+                break
+            chunks.append(np.array(rows, dtype=np.int64))
+        return np.concatenate(chunks) if chunks else _empty()
+
+    def _load_estimates(self, conn, first_order_id):
+        """order_id >= first_order_id 주문의 (order_id 배열, 예상 대기 시간 배열)"""
+        rows = conn.execute(load_sql('select_order_estimates.sql'), (first_order_id,)).fetchall()
+        estimates = np.array(rows, dtype=np.int64).reshape(-1, 2)
+        return estimates[:, 0], estimates[:, 1]
+
+    def refresh(self, conn, now=None):
+        """
+        새 작업 이력을 읽어 열린 구간을 다시 계산하고, 끝난 구간은 닫아서 캐시
+
+        now: 분석 기준 시각 (epoch 초), 생략하면 이력의 마지막 시각
+        """
+        self.slots = {workstation_id: max_staff for workstation_id, _, max_staff
+                      in conn.execute(load_sql('select_workstation_limits.sql'))}
+        rows = self._load(conn)
+        self.rows_loaded = len(rows)
+        if not len(rows) and not len(self.carry):
+            return self
+        data = np.concatenate([self.carry, rows])
+        bucket = self.bucket_seconds
+
+        if self.open_start is None:
+            self.open_start = int(rows[:, CREATED].min()) // bucket * bucket
+        times = data[:, [CREATED, START, END]]
+        horizon = int(times.max()) if now is None else int(now)
+
+        # 미완료 작업이 가장 먼저 생성된 시각 이전의 작업은 모두 끝났으므로 그 앞 구간은 닫을 수 있음
+        pending = data[:, END] < 0
+        cutoff = min(int(data[pending, CREATED].min()), horizon) if pending.any() else horizon
+        close_until = max(cutoff // bucket * bucket, self.open_start)
+        end = max(horizon // bucket * bucket + bucket, self.open_start + bucket)
+
+        order_ids, estimates = self._load_estimates(conn, int(rows[:, ORDER].min()) if len(rows) else 0)
+        stats = self._compute(data, order_ids, estimates, self.open_start, end, horizon)
+        self.open = {}
+        for start, bucket_stats in stats.items():
+            if start + bucket <= close_until:
+                self.closed[start] = bucket_stats
+            else:
+                self.open[start] = bucket_stats
+
+        if close_until > self.open_start:
+            reload = rows[rows[:, CREATED] >= close_until]
+            if len(reload):
+                self.resume_task_id = int(reload[:, QID].min())
+            elif len(rows):
+                self.resume_task_id = int(rows[:, QID].max()) + 1
+            self.carry = data[(data[:, QID] < self.resume_task_id) & (data[:, END] > close_until)]
+            self.open_start = close_until
+        return self
+
+    def _compute(self, data, order_ids, estimates, first, end, horizon):
+        """
+        [first, end) 구간별 통계
+
+        반환: {구간 시작: {'busy', 'queue', 'queue_times', 'prep_menu', 'prep_seconds', 'eta_error'}}
+        """
+        bucket = self.bucket_seconds
+        count = (end - first) // bucket
+        starts = first + bucket * np.arange(count, dtype=np.int64)
+        workstations = np.array(sorted(self.slots), dtype=np.int64)
+
+        # 스태프 가동률 - 같은 스태프/시작/종료 행(튀김 배치)은 한 번만
+        staffed = data[(data[:, STAFF] >= 0) & (data[:, START] >= 0)]
+        work = np.unique(np.column_stack([
+            staffed[:, STAFF], staffed[:, WS], staffed[:, START],
+            np.where(staffed[:, END] >= 0, staffed[:, END], horizon)]), axis=0)
+        ws_code = np.searchsorted(workstations, work[:, 1])
+        lo = np.maximum(work[:, 2], first)
+        hi = np.minimum(work[:, 3], end)
+        valid = (hi > lo) & (ws_code < len(workstations))
+        ws_code, lo, hi = ws_code[valid], lo[valid], hi[valid]
+        busy = np.zeros((count, len(workstations)))
+        first_bucket = (lo - first) // bucket
+        last_bucket = (hi - 1 - first) // bucket
+        for offset in range(int((last_bucket - first_bucket).max(initial=-1)) + 1):
+            index = first_bucket + offset
+            spans = index <= last_bucket
+            overlap = (np.minimum(hi, first + (index + 1) * bucket)
+                       - np.maximum(lo, first + index * bucket))
+            np.add.at(busy, (index[spans], ws_code[spans]), overlap[spans])
+
+        # 대기열 길이 - 생성 시각 ≤ t < 시작 시각 인 작업 수
+        samples = first + np.arange(0, count * bucket, self.sample_seconds, dtype=np.int64)
+        created = np.sort(data[:, CREATED])
+        started = np.sort(data[data[:, START] >= 0, START])
+        queue = (np.searchsorted(created, samples, side='right')
+                 - np.searchsorted(started, samples, side='right'))
+
+        # 주문 항목 조리 시간 / 주문 ETA 오차 - 모든 작업이 끝난 항목/주문만
+        fresh = data[data[:, CREATED] >= first]
+        done_end = np.where(fresh[:, END] >= 0, fresh[:, END], np.iinfo(np.int64).max)
+        _, item_end, item_first = _group_max(fresh[:, ITEM], done_end)
+        item_done = item_end < np.iinfo(np.int64).max
+        item_created = fresh[item_first, CREATED][item_done]
+        prep_menu = fresh[item_first, MENU][item_done]
+        prep_seconds = item_end[item_done] - item_created
+
+        unique_orders, order_end, order_first = _group_max(fresh[:, ORDER], done_end)
+        order_done = order_end < np.iinfo(np.int64).max
+        done_ids = unique_orders[order_done]
+        position = np.searchsorted(order_ids, done_ids)
+        found = position < len(order_ids)
+        found[found] = order_ids[position[found]] == done_ids[found]
+        estimate = np.full(len(done_ids), -1, dtype=np.int64)
+        estimate[found] = estimates[position[found]]
+        known = estimate >= 0
+        eta_created = fresh[order_first, CREATED][order_done][known]
+        eta_error = (order_end[order_done][known] - eta_created) - estimate[known]
+
+        item_bucket = (item_created - first) // bucket
+        eta_bucket = (eta_created - first) // bucket
+        sample_bucket = (samples - first) // bucket
+        stats = {}
+        for index, start in enumerate(starts.tolist()):
+            in_bucket = item_bucket == index
+            stats[start] = {
+                'busy': {int(ws): float(seconds) for ws, seconds in zip(workstations, busy[index])},
+                'queue': queue[sample_bucket == index],
+                'queue_times': samples[sample_bucket == index],
+                'prep_menu': prep_menu[in_bucket],
+                'prep_seconds': prep_seconds[in_bucket],
+                'eta_error': eta_error[eta_bucket == index],
+            }
+        return stats
+
+    def buckets(self):
+        """닫힌 + 열린 구간 통계를 시작 시각 순으로"""
+        merged = dict(self.closed)
+        merged.update(self.open)
+        return [(start, merged[start]) for start in sorted(merged)]
+
+    def report(self):
+        """
+        전체 구간 집계
+
+        반환: {'buckets': [구간 시작], 'utilisation': {workstation_id: 구간별 가동률 배열},
+               'queue_length': (시각 배열, 대기 작업 수 배열),
+               'prep_percentiles': {menu_item_id: {'count', 'p50', 'p90', 'p99'}},
+               'eta_error': {'count', 'mean', 'p50', 'p90', 'p99', 'histogram': (개수, 경계)}}
+        """
+        buckets = self.buckets()
+        starts = [start for start, _ in buckets]
+        utilisation = {}
+        for workstation_id, slots in self.slots.items():
+            capacity = max(slots, 1) * self.bucket_seconds
+            utilisation[workstation_id] = np.array(
+                [stats['busy'].get(workstation_id, 0.0) / capacity for _, stats in buckets])
+
+        if buckets:
+            queue = np.concatenate([stats['queue'] for _, stats in buckets])
+            prep_menu = np.concatenate([stats['prep_menu'] for _, stats in buckets])
+            prep_seconds = np.concatenate([stats['prep_seconds'] for _, stats in buckets])
+            eta_error = np.concatenate([stats['eta_error'] for _, stats in buckets])
+        else:
+            queue = prep_menu = prep_seconds = eta_error = np.empty(0, dtype=np.int64)
+        sample_times = np.concatenate([stats['queue_times'] for _, stats in buckets]) \
+            if buckets else np.empty(0, dtype=np.int64)
+
+        prep = {}
+        order = np.argsort(prep_menu, kind='stable')
+        menus, first = np.unique(prep_menu[order], return_index=True)
+        for menu_item_id, values in zip(menus.tolist(), np.split(prep_seconds[order], first[1:])):
+            prep[menu_item_id] = {'count': len(values), **_percentiles(values)}
+
+        eta = {'count': len(eta_error)}
+        if len(eta_error):
+            eta.update(mean=float(eta_error.mean()), **_percentiles(eta_error),
+                       histogram=np.histogram(eta_error, bins=10))
+        return {
+            'buckets': starts,
+            'utilisation': utilisation,
+            'queue_length': (sample_times, queue),
+            'prep_percentiles': prep,
+            'eta_error': eta,
+        }
+
+def format_bucket(start):
+    """구간 시작 (epoch 초) -> 'YYYY-MM-DD HH:MM' (localtime)"""
+    return time.strftime('%Y-%m-%d %H:%M', time.localtime(start))
+
+def print_report(conn, report):
+    """report() 결과를 표로 출력"""
+    workstation_names = {workstation_id: name for workstation_id, name, _
+                         in conn.execute(load_sql('select_workstation_limits.sql'))}
+    menu_names = dict(conn.execute("SELECT menu_item_id, name FROM MenuItems"))
+
+    print("\n📊 작업장별 스태프 가동률(%):")
+    workstations = sorted(report['utilisation'])
+    print(tabulate([[format_bucket(start)] + [f"{report['utilisation'][ws][i] * 100:.0f}" for ws in workstations]
+                    for i, start in enumerate(report['buckets'])],
+                   headers=["구간"] + [workstation_names.get(ws, ws) for ws in workstations], tablefmt="grid"))
+
+    print("\n📊 메뉴별 조리 시간(초):")
+    print(tabulate([[menu_names.get(menu_item_id, menu_item_id), p['count'],
+                     f"{p['p50']:.0f}", f"{p['p90']:.0f}", f"{p['p99']:.0f}"]
+                    for menu_item_id, p in sorted(report['prep_percentiles'].items())],
+                   headers=["메뉴", "항목 수", "p50", "p90", "p99"], tablefmt="grid"))
+
+    times, lengths = report['queue_length']
+    print("\n📊 구간별 대기열 길이 (평균 / 최대):")
+    bounds = np.searchsorted(times, report['buckets'][1:])
+    print(tabulate([[format_bucket(start), f"{chunk.mean():.1f}", int(chunk.max())]
+                    for start, chunk in zip(report['buckets'], np.split(lengths, bounds)) if len(chunk)],
+                   headers=["구간", "평균", "최대"], tablefmt="grid"))
+
+    eta = report['eta_error']
+    if eta['count']:
+        print(f"\n📊 ETA 오차(실제 - 예상, 초): 주문 {eta['count']}건, 평균 {eta['mean']:.0f}, "
+              f"p50 {eta['p50']:.0f} / p90 {eta['p90']:.0f} / p99 {eta['p99']:.0f}")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="작업 이력 교대/기간 분석 리포트")
+    parser.add_argument('--db', default='momstouch_complete.db', help="분석할 DB 파일")
+    parser.add_argument('--bucket-minutes', type=int, default=60, help="집계 구간 길이(분)")
+    parser.add_argument('--sample-seconds', type=int, default=60, help="대기열 길이 표본 간격(초)")
+    parser.add_argument('--chunk-size', type=int, default=50000, help="한 번에 읽을 행 수")
+    return parser.parse_args()
+
+def main():
+    init(autoreset=True)
+    args = parse_args()
+    conn = connect(args.db)
+    migrate(conn)
+    analytics = ShiftAnalytics(args.bucket_minutes * 60, args.sample_seconds, args.chunk_size)
+    started = time.perf_counter()
+    analytics.refresh(conn)
+    report = analytics.report()
+    elapsed = time.perf_counter() - started
+    print_report(conn, report)
+    conn.close()
+    print(Fore.GREEN + f"\n✅ 작업 {analytics.rows_loaded}건, 구간 {len(report['buckets'])}개 분석 "
+          f"({elapsed * 1000:.0f}ms, 닫힌 구간 {len(analytics.closed)}개 캐시)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""
+완료 작업 보관 - 끝난(완료/취소) 주문의 작업/병목 기록을 핫 테이블에서 이력 테이블로 옮김
+
+KitchenTaskQueue 와 BottleneckAnalysis 에는 진행 중인 작업만 남겨 큐 쿼리와 인덱스가
+이력 양과 무관하게 작게 유지되도록 한다. 한 번에 chunk_size 개 주문씩 트랜잭션 하나로
+옮기므로 쓰기 잠금을 오래 잡지 않는다. 리포트는 KitchenTaskAll / BottleneckAll 뷰로 합쳐 본다.
+"""
+
+import threading
+
+from dal import connect, load_sql, transaction
+from tracing import traced
+
+@traced('archival')
+def archive_chunk(conn, chunk_size=200):
+    """
+    끝난 주문 최대 chunk_size 개를 트랜잭션 하나로 이력 테이블로 옮김
+
+    취소 주문은 진행 중인 작업이 끝난 뒤 옮기고, 시작하지 않은 작업은 이력에 남기지 않고 지운다.
+
+    반환: (옮긴 주문 수, 옮긴 작업 수, 옮긴 병목 기록 수)
+    """
+    with transaction(conn):
+        order_ids = [(order_id,) for (order_id,) in conn.execute(
+            load_sql('select_archivable_orders.sql'), (chunk_size,))]
+        if not order_ids:
+            return 0, 0, 0
+        bottlenecks = conn.executemany(load_sql('insert_bottleneck_history.sql'), order_ids).rowcount
+        tasks = conn.executemany(load_sql('insert_task_history.sql'), order_ids).rowcount
+        conn.executemany(load_sql('delete_archived_bottlenecks.sql'), order_ids)
+        conn.executemany(load_sql('delete_archived_tasks.sql'), order_ids)
+    return len(order_ids), tasks, bottlenecks
+
+def archive_completed(conn, chunk_size=200, max_chunks=None):
+    """
+    옮길 주문이 없을 때까지 (또는 max_chunks 번) archive_chunk 반복
+
+    반환: {'orders', 'tasks', 'bottlenecks', 'chunks'}
+    """
+    totals = {'orders': 0, 'tasks': 0, 'bottlenecks': 0, 'chunks': 0}
+    while max_chunks is None or totals['chunks'] < max_chunks:
+        orders, tasks, bottlenecks = archive_chunk(conn, chunk_size)
+        if not orders:
+            break
+        totals['orders'] += orders
+        totals['tasks'] += tasks
+        totals['bottlenecks'] += bottlenecks
+        totals['chunks'] += 1
+    return totals
+
+def trim_change_feed(conn, keep_changes=100000):
+    """변경 피드에서 최근 keep_changes 개만 남기고 정리, 지운 행 수 반환 (뒤처진 소비자는 스냅샷을 다시 읽음)"""
+    with transaction(conn):
+        return conn.execute(load_sql('delete_change_feed.sql'), (max(keep_changes, 1),)).rowcount
+
+class ArchiveCompactor:
+    """
+    백그라운드 보관 스레드 - interval_seconds 마다 완료 주문을 청크 단위로 옮김
+
+    청크 사이에 pause_seconds 만큼 쉬어 주문 접수/할당 쓰기가 잠금을 잡을 틈을 준다.
+    주기마다 변경 피드도 최근 feed_keep 개만 남기고 정리한다.
+    """
+
+    def __init__(self, db_path, interval_seconds=30.0, chunk_size=200, pause_seconds=0.01,
+                 feed_keep=100000):
+        self.db_path = db_path
+        self.interval_seconds = interval_seconds
+        self.chunk_size = chunk_size
+        self.pause_seconds = pause_seconds
+        self.feed_keep = feed_keep
+        self.totals = {'orders': 0, 'tasks': 0, 'bottlenecks': 0, 'chunks': 0, 'feed_trimmed': 0}
+        self.last_error = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="archive-compactor", daemon=True)
+        self._thread.start()
+
+    def close(self):
+        """진행 중인 청크를 마친 뒤 종료"""
+        self._stop.set()
+        self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _compact(self, conn):
+        while not self._stop.is_set():
+            orders, tasks, bottlenecks = archive_chunk(conn, self.chunk_size)
+            if not orders:
+                return
+            self.totals['orders'] += orders
+            self.totals['tasks'] += tasks
+            self.totals['bottlenecks'] += bottlenecks
+            self.totals['chunks'] += 1
+            self._stop.wait(self.pause_seconds)
+        self.totals['feed_trimmed'] += trim_change_feed(conn, self.feed_keep)
+
+    def _run(self):
+        conn = connect(self.db_path)
+        try:
+            while not self._stop.is_set():
+                try:
+                    self._compact(conn)
+                except Exception as e:
+                    # 잠금 대기 초과 등은 다음 주기에 다시 시도
+                    self.last_error = e
+                self._stop.wait(self.interval_seconds)
+        finally:
+            conn.close()
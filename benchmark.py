@@ -0,0 +1,449 @@
+# -*- coding: utf-8 -*-
+"""
+러시아워 벤치마크 - 합성 주문 스트림으로 파이프라인 단계별 처리량/지연 측정
+
+분 단위 주문 곡선(점심/저녁 피크 등), 메뉴 구성 비율, 수량 분포로 주문을 만들고
+1분 구간마다 접수 → 큐 전개 → 할당 → 실행(즉시 완료) 을 돌리며 단계별 호출 시간을 잰다.
+리포트 쿼리는 --report-every 분마다, 완료 주문 이력 보관은 --archive-every 분마다 실행한다.
+결과는 JSON 으로 저장하고 --compare 로 이전 결과와 비교해 처리량이 허용 범위 이상 떨어지면 종료 코드 1.
+--policies 를 주면 같은 스트림을 스케줄링 정책마다 시뮬레이션해 주문 완료 시간 p50/p99 를 비교한다.
+--holding 을 주면 다른 seed 로 만든 '전날' 스트림으로 수요를 학습해 보온 재고(미리 튀기기)를
+켠 시뮬레이션과 끈 시뮬레이션의 주문 완료 시간, 재고 적중률, 폐기율, 예측 오차를 비교한다.
+--staffing 을 주면 (--off-staff 로 뺀 스태프를 퇴근 처리한 뒤) 고정 배치와 15분마다 예상 부하로
+다시 배치하는 경우를 비교한다.
+
+사용 예:
+    python benchmark.py --orders-per-minute 200 --hours 12 --output bench.json
+    python benchmark.py --orders-per-minute 200 --hours 12 --compare bench.json
+    python benchmark.py --orders-per-minute 60 --hours 4 --policies fifo,edf,scp,wfq
+    python benchmark.py --orders-per-minute 0.5 --hours 6 --curve flat --holding --hold-cover 0.8
+    python benchmark.py --orders-per-minute 0.5 --hours 6 --curve flat --staffing --off-staff 1
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from collections import deque
+
+from tabulate import tabulate
+from colorama import Fore, init
+
+from allocator import ResourceAllocator, format_time, parse_time
+from archive import archive_completed
+from dal import create_database, load_sql, transaction
+from holding import DemandForecaster, HoldingCache, PrefryPlanner
+from order_intake import place_orders
+from ready_queue import ReadyQueue
+from recipe_graph import RecipeGraphCache
+from scheduling import POLICIES, make_policy
+from simulation import SIM_START, KitchenSimulation, percentile
+from staffing import StaffingOptimizer, format_gain
+from task_queue import expand_new_order_items
+import tracing
+
+init(autoreset=True)
+
+# 영업 시작(10시) 기준 시간대별 주문량 배율
+RUSH_CURVES = {
+    'flat': [1.0] * 12,
+    'lunch_dinner': [0.4, 0.9, 2.2, 1.8, 0.7, 0.5, 0.6, 0.9, 1.9, 2.0, 1.0, 0.5],
+    'lunch_peak': [0.5, 1.2, 3.0, 2.0, 0.8, 0.6, 0.5, 0.5, 0.6, 0.6, 0.4, 0.3],
+}
+
+# 단계 이름 (출력/저장 순서)
+STAGES = ('intake', 'expansion', 'assignment', 'execution', 'reporting', 'archival')
+
+def curve_weight(curve, minute):
+    """영업 시작 후 minute 분의 주문량 배율 (곡선이 끝나면 처음부터 반복)"""
+    weights = RUSH_CURVES[curve]
+    return weights[(minute // 60) % len(weights)]
+
+def generate_rush_orders(menu_item_ids, orders_per_minute, hours, curve='lunch_dinner',
+                         mix=None, max_quantity=3, max_lines=3, seed=None, prefix='BENCH'):
+    """
+    분 단위 주문 묶음 생성 (메모리를 아끼도록 제너레이터)
+
+    mix: {menu_item_id: 가중치}, 생략하면 균등
+    수량은 1 이 가장 흔하고 max_quantity 로 갈수록 드물다
+    yield: (영업 시작 후 분, [order_info])
+    """
+    rng = random.Random(seed)
+    menu_ids = sorted(mix) if mix else list(menu_item_ids)
+    menu_weights = [mix[m] for m in menu_ids] if mix else None
+    quantities = list(range(1, max_quantity + 1))
+    quantity_weights = [1.0 / q for q in quantities]
+
+    sequence = 0
+    for minute in range(int(hours * 60)):
+        rate = orders_per_minute * curve_weight(curve, minute)
+        count = int(rate) + (1 if rng.random() < rate - int(rate) else 0)
+        orders = []
+        for _ in range(count):
+            sequence += 1
+            items = {}
+            for _ in range(rng.randint(1, max_lines)):
+                menu_id = rng.choices(menu_ids, menu_weights)[0]
+                quantity = rng.choices(quantities, quantity_weights)[0]
+                items[menu_id] = min(items.get(menu_id, 0) + quantity, max_quantity)
+            orders.append({'name': f'{prefix}-{sequence:08d}', 'items': sorted(items.items())})
+        yield minute, orders
+
+class StageTimer:
+    """단계별 호출 시간(초)과 처리 건수 누적"""
+
+    def __init__(self):
+        self.samples = {stage: [] for stage in STAGES}
+        self.items = {stage: 0 for stage in STAGES}
+
+    def record(self, stage, seconds, items):
+        self.samples[stage].append(seconds)
+        self.items[stage] += items
+
+    def summary(self):
+        result = {}
+        for stage in STAGES:
+            samples = sorted(self.samples[stage])
+            total = sum(samples)
+            result[stage] = {
+                'calls': len(samples),
+                'items': self.items[stage],
+                'seconds': round(total, 4),
+                'throughput': round(self.items[stage] / total, 1) if total else 0.0,
+                'p50_ms': round(percentile(samples, 50) * 1000, 3),
+                'p95_ms': round(percentile(samples, 95) * 1000, 3),
+                'p99_ms': round(percentile(samples, 99) * 1000, 3),
+            }
+        return result
+
+def _timed(timer, stage, func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    timer.record(stage, time.perf_counter() - start, len(result) if result is not None else 0)
+    return result
+
+@tracing.traced('execution')
+def _execute(conn, allocator, ready_queue, assignments, now, progress):
+    """할당된 작업을 바로 시작/완료 처리하고 끝난 주문을 COMPLETED 로, 완료 작업 목록 반환"""
+    stamp = int(now)
+    queue_task_ids = [queue_task_id for queue_task_id, _, _, _ in assignments]
+    item_orders, order_remaining = progress
+    completed_orders = []
+    with transaction(conn):
+        conn.executemany(load_sql('update_task_in_progress.sql'),
+                         [(stamp, queue_task_id) for queue_task_id in queue_task_ids])
+        conn.executemany(load_sql('update_task_completed.sql'),
+                         [(stamp, queue_task_id) for queue_task_id in queue_task_ids])
+        for queue_task_id in queue_task_ids:
+            order_id = item_orders[ready_queue.order_item_ids[queue_task_id]]
+            allocator.release(queue_task_id)
+            ready_queue.complete(queue_task_id)
+            order_remaining[order_id] -= 1
+            if order_remaining[order_id] == 0:
+                del order_remaining[order_id]
+                completed_orders.append(('COMPLETED', order_id))
+        conn.executemany(load_sql('update_order_status.sql'), completed_orders)
+        allocator.flush_zones(conn)
+    return queue_task_ids
+
+@tracing.traced('reporting')
+def _report(conn, recent_orders):
+    """대시보드 리포트 쿼리 묶음, 실행한 쿼리 목록 반환"""
+    executed = []
+    for filename in ('select_order_summary.sql', 'select_bottleneck_stats.sql',
+                     'select_zone_realtime_state.sql'):
+        conn.execute(load_sql(filename)).fetchall()
+        executed.append(filename)
+    for order_id, order_number in recent_orders:
+        conn.execute(load_sql('calculate_wait_time.sql'), (order_id,)).fetchall()
+        conn.execute(load_sql('select_receipt.sql'), (order_number,)).fetchall()
+        executed.extend(('calculate_wait_time.sql', 'select_receipt.sql'))
+    return executed
+
+def run_pipeline(conn, stream, report_every=60, start_time=None, archive_every=0, archive_chunk_size=200):
+    """
+    주문 스트림을 1분 구간씩 파이프라인에 흘리며 단계별 시간 측정
+
+    할당은 자원이 남는 한 반복하고, 할당된 작업은 즉시 완료 처리해 자원을 돌려준다.
+    archive_every 분마다 완료 주문을 이력 테이블로 옮긴다 (0 이면 보관하지 않음).
+    반환: (StageTimer, 처리 건수 dict)
+    """
+    start_time = parse_time(SIM_START) if start_time is None else start_time
+    recipe_cache = RecipeGraphCache()
+    allocator = ResourceAllocator(recipe_cache)
+    ready_queue = ReadyQueue(recipe_cache)
+    allocator.load(conn)
+    ready_queue.load(conn)
+
+    timer = StageTimer()
+    item_orders = {}
+    order_remaining = {}
+    recent_orders = deque(maxlen=20)
+    counts = {'orders': 0, 'order_items': 0, 'tasks': 0}
+
+    for minute, orders in stream:
+        now = start_time + minute * 60
+        created_at = now
+        if orders:
+            receipts = _timed(timer, 'intake', place_orders, conn, orders, recipe_cache, created_at)
+            for receipt in receipts:
+                order_remaining[receipt['order_id']] = 0
+                recent_orders.append((receipt['order_id'], receipt['order_number']))
+            expanded = _timed(timer, 'expansion', expand_new_order_items, conn, recipe_cache, created_at)
+            for order_item_id, order_id, _, _, count in expanded:
+                item_orders[order_item_id] = order_id
+                order_remaining[order_id] += count
+                counts['tasks'] += count
+            counts['orders'] += len(receipts)
+            counts['order_items'] += len(expanded)
+            ready_queue.sync(conn)
+
+        allocator.release_expired(now)
+        while True:
+            assignments = _timed(timer, 'assignment', allocator.assign_ready, conn, ready_queue, now)
+            if not assignments:
+                break
+            _timed(timer, 'execution', _execute, conn, allocator, ready_queue, assignments, now,
+                   (item_orders, order_remaining))
+
+        if report_every and (minute + 1) % report_every == 0:
+            _timed(timer, 'reporting', _report, conn, list(recent_orders))
+        if archive_every and (minute + 1) % archive_every == 0:
+            start = time.perf_counter()
+            archived = archive_completed(conn, archive_chunk_size)
+            timer.record('archival', time.perf_counter() - start, archived['orders'])
+
+    _timed(timer, 'reporting', _report, conn, list(recent_orders))
+    return timer, counts
+
+def demand_rows(stream, start_time=None):
+    """주문 스트림 -> 수요 예측 학습 행 (접수 시각, menu_item_id, quantity)"""
+    start_time = parse_time(SIM_START) if start_time is None else start_time
+    for minute, orders in stream:
+        for order_info in orders:
+            for menu_item_id, quantity in order_info['items']:
+                yield start_time + minute * 60, menu_item_id, quantity
+
+def run_simulation(conn, stream, seed=None, policy='fifo', history=None, holding=False, cover=0.8,
+                   restaff=False):
+    """
+    같은 스트림을 가상 시계 시뮬레이션으로 재생해 주문 완료 시간 분포 측정 (policy: 준비 큐 스케줄링 정책)
+
+    history: 수요 예측 학습 행 (demand_rows)
+    holding: 보온 재고를 켜고 예측 × cover 만큼 미리 튀김
+    restaff: 작업장 부하 예측으로 스태프를 주기적으로 다시 배치
+    """
+    recipe_cache = RecipeGraphCache()
+    allocator = ResourceAllocator(recipe_cache)
+    planner = staffing = None
+    if holding:
+        cache = HoldingCache(recipe_cache).load(conn)
+        planner = PrefryPlanner(cache, DemandForecaster().fit_rows(history, cache.menu_foods), allocator, cover)
+    if restaff:
+        staffing = StaffingOptimizer(recipe_cache).load(conn).fit_rows(history)
+    simulation = KitchenSimulation(conn, recipe_cache, allocator, ReadyQueue(recipe_cache, make_policy(policy)),
+                                   seed=seed, jitter=0.15, batch_window=60, holding=planner, staffing=staffing)
+    simulation.schedule_orders((minute * 60, order_info)
+                               for minute, orders in stream for order_info in orders)
+    stats = simulation.run()
+    return {key: round(value, 3) if isinstance(value, float) else value for key, value in stats.items()}
+
+def parse_mix(text):
+    """'1:5,2:3' → {1: 5.0, 2: 3.0}"""
+    if not text:
+        return None
+    mix = {}
+    for part in text.split(','):
+        menu_id, weight = part.split(':')
+        mix[int(menu_id)] = float(weight)
+    return mix
+
+def compare_results(current, baseline, tolerance):
+    """단계별 처리량 비교 행과 회귀 여부"""
+    rows = []
+    regressed = False
+    for stage in STAGES:
+        new = current['stages'][stage]['throughput']
+        old = baseline.get('stages', {}).get(stage, {}).get('throughput', 0)
+        if not old:
+            rows.append([stage, old, new, '-', ''])
+            continue
+        change = (new - old) / old
+        flag = '회귀' if change < -tolerance else ''
+        regressed = regressed or bool(flag)
+        rows.append([stage, old, new, f"{change * 100:+.1f}%", flag])
+    return rows, regressed
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="맘스터치 주방 파이프라인 러시아워 벤치마크")
+    parser.add_argument('--db', default='benchmark.db', help="벤치마크용 DB 파일 (매번 새로 생성)")
+    parser.add_argument('--orders-per-minute', type=float, default=50, help="기준 분당 주문 수")
+    parser.add_argument('--hours', type=float, default=12, help="영업 시간")
+    parser.add_argument('--curve', choices=sorted(RUSH_CURVES), default='lunch_dinner',
+                        help="시간대별 주문량 곡선")
+    parser.add_argument('--mix', help="메뉴 구성 비율 'menu_id:가중치,...' (생략하면 균등)")
+    parser.add_argument('--max-quantity', type=int, default=3, help="항목당 최대 수량")
+    parser.add_argument('--max-lines', type=int, default=3, help="주문당 최대 항목 수")
+    parser.add_argument('--report-every', type=int, default=60, help="리포트 쿼리 주기(분)")
+    parser.add_argument('--archive-every', type=int, default=0,
+                        help="완료 주문 이력 보관 주기(분), 0 이면 보관하지 않음")
+    parser.add_argument('--archive-chunk', type=int, default=200, help="보관 트랜잭션당 주문 수")
+    parser.add_argument('--simulate', action='store_true',
+                        help="같은 스트림을 가상 시계 시뮬레이션으로도 재생")
+    parser.add_argument('--policies',
+                        help=f"시뮬레이션으로 비교할 스케줄링 정책 목록 (쉼표 구분: {','.join(POLICIES)})")
+    parser.add_argument('--holding', action='store_true',
+                        help="보온 재고(수요 예측 미리 튀기기)를 켠/끈 시뮬레이션 비교")
+    parser.add_argument('--hold-cover', type=float, default=0.8,
+                        help="미리 튀길 양 = 보온 한도 안의 예상 수요 × 이 값")
+    parser.add_argument('--staffing', action='store_true',
+                        help="고정 스태프 배치와 예상 부하 기반 재배치 시뮬레이션 비교")
+    parser.add_argument('--off-staff', default='',
+                        help="--staffing 비교 전에 퇴근(OFF_WORK) 처리할 staff_id 목록 (쉼표 구분)")
+    parser.add_argument('--seed', type=int, default=42, help="난수 seed")
+    parser.add_argument('--output', default='benchmark_results.json', help="결과 저장 파일")
+    parser.add_argument('--trace', nargs='?', const='trace.json',
+                        help="단계 스팬/쿼리 실행을 Chrome Trace Event 형식으로 저장할 파일 (기본 trace.json)")
+    parser.add_argument('--profile', action='store_true', help="단계별/쿼리별 시간과 커밋·잠금 카운터 요약 출력")
+    parser.add_argument('--compare', help="비교할 이전 결과 파일")
+    parser.add_argument('--tolerance', type=float, default=0.10,
+                        help="회귀로 볼 처리량 감소 비율 (기본 10%%)")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    mix = parse_mix(args.mix)
+    tracer = tracing.enable() if args.trace or args.profile else None
+
+    def stream():
+        return generate_rush_orders(menu_ids, args.orders_per_minute, args.hours, args.curve, mix,
+                                    args.max_quantity, args.max_lines, args.seed)
+
+    print(Fore.CYAN + f"📦 벤치마크 DB 생성: {args.db}")
+    conn = create_database(args.db)
+    menu_ids = [mid for (mid,) in conn.execute("SELECT menu_item_id FROM MenuItems")]
+
+    print(Fore.CYAN + f"🏃 파이프라인 실행: 분당 {args.orders_per_minute}건 × {args.hours}시간 ({args.curve})")
+    wall_start = time.perf_counter()
+    timer, counts = run_pipeline(conn, stream(), args.report_every,
+                                 archive_every=args.archive_every, archive_chunk_size=args.archive_chunk)
+    wall_seconds = time.perf_counter() - wall_start
+    conn.close()
+
+    results = {
+        'config': {key: value for key, value in vars(args).items() if key not in ('compare', 'output')},
+        'created_at': format_time(time.time()),
+        'rows': counts,
+        'wall_seconds': round(wall_seconds, 3),
+        'stages': timer.summary(),
+    }
+    if args.simulate:
+        print(Fore.CYAN + "⏱️  가상 시계 시뮬레이션 재생...")
+        conn = create_database(args.db)
+        results['simulation'] = run_simulation(conn, stream(), args.seed)
+        conn.close()
+    if args.policies:
+        results['policies'] = {}
+        for policy in args.policies.split(','):
+            print(Fore.CYAN + f"⏱️  스케줄링 정책 {policy} 시뮬레이션...")
+            conn = create_database(args.db)
+            results['policies'][policy] = run_simulation(conn, stream(), args.seed, policy)
+            conn.close()
+    if args.holding or args.staffing:
+        # 전날(다른 seed) 같은 곡선의 주문으로 시간대별 수요 학습
+        history = list(demand_rows(generate_rush_orders(
+            menu_ids, args.orders_per_minute, args.hours, args.curve, mix,
+            args.max_quantity, args.max_lines, args.seed + 1)))
+    if args.holding:
+        results['holding'] = {}
+        for label, enabled in (('off', False), ('on', True)):
+            print(Fore.CYAN + f"⏱️  보온 재고 {label} 시뮬레이션...")
+            conn = create_database(args.db)
+            results['holding'][label] = run_simulation(conn, stream(), args.seed, history=history,
+                                                       holding=enabled, cover=args.hold_cover)
+            conn.close()
+    if args.staffing:
+        off_staff = [int(staff_id) for staff_id in args.off_staff.split(',') if staff_id]
+        results['staffing'] = {}
+        for label, enabled in (('static', False), ('optimized', True)):
+            print(Fore.CYAN + f"⏱️  스태프 배치 {label} 시뮬레이션...")
+            conn = create_database(args.db)
+            with transaction(conn):
+                conn.executemany(load_sql('update_staff_status.sql'),
+                                 [('OFF_WORK', staff_id) for staff_id in off_staff])
+            results['staffing'][label] = run_simulation(conn, stream(), args.seed, history=history,
+                                                        restaff=enabled)
+            conn.close()
+
+    print(tabulate([[stage, s['calls'], s['items'], s['seconds'], s['throughput'],
+                     s['p50_ms'], s['p95_ms'], s['p99_ms']]
+                    for stage, s in results['stages'].items()],
+                   headers=["단계", "호출", "건수", "총 시간(초)", "건/초", "p50(ms)", "p95(ms)", "p99(ms)"],
+                   tablefmt="grid"))
+    print(f"주문 {counts['orders']}건, 주문 항목 {counts['order_items']}건, "
+          f"작업 {counts['tasks']}건, 전체 {wall_seconds:.2f}초")
+    if 'simulation' in results:
+        sim = results['simulation']
+        print(f"시뮬레이션: CPU {sim['cpu_seconds']}초, 주문 완료시간 p50/p95/p99 "
+              f"{sim['latency_p50']:.0f} / {sim['latency_p95']:.0f} / {sim['latency_p99']:.0f}초")
+    if 'policies' in results:
+        print(tabulate([[policy, sim['orders_completed'], sim['latency_p50'], sim['latency_p95'],
+                         sim['latency_p99'], sim['cpu_seconds']]
+                        for policy, sim in results['policies'].items()],
+                       headers=["정책", "완료 주문", "p50(초)", "p95(초)", "p99(초)", "CPU(초)"],
+                       tablefmt="grid"))
+    if 'holding' in results:
+        rows = []
+        for label, sim in results['holding'].items():
+            metrics = sim.get('holding')
+            row = [label, sim['orders_completed'], sim['latency_p50'], sim['latency_p95'], sim['latency_p99']]
+            if metrics:
+                row += [f"{metrics['hit_rate'] * 100:.1f}%", f"{metrics['waste_rate'] * 100:.1f}%"]
+            rows.append(row)
+        print(tabulate(rows, headers=["보온 재고", "완료 주문", "p50(초)", "p95(초)", "p99(초)", "적중률", "폐기율"],
+                       tablefmt="grid"))
+        metrics = results['holding']['on']['holding']
+        print(tabulate([[food_type, food['produced'], food['served'], food['missed'], food['wasted'],
+                         metrics['forecast'].get(food_type, {}).get('forecast'),
+                         metrics['forecast'].get(food_type, {}).get('actual'),
+                         metrics['forecast'].get(food_type, {}).get('wape')]
+                        for food_type, food in metrics['foods'].items()],
+                       headers=["식품", "생산", "충당", "부족", "폐기", "예측 수요", "실제 수요", "WAPE"],
+                       tablefmt="grid"))
+
+    if 'staffing' in results:
+        rows = []
+        for label, sim in results['staffing'].items():
+            staffing = sim.get('staffing', {})
+            rows.append([label, sim['orders_completed'], sim['latency_p50'], sim['latency_p95'], sim['latency_p99'],
+                         staffing.get('restaffs', '-'), staffing.get('staff_moves', '-'),
+                         format_gain(staffing['predicted_gain']) if staffing else '-'])
+        print(tabulate(rows, headers=["스태프 배치", "완료 주문", "p50(초)", "p95(초)", "p99(초)",
+                                      "재배치", "이동 인원", "첫 재배치 예상 향상"], tablefmt="grid"))
+
+    if tracer is not None:
+        tracing.disable()
+        results['profile'] = tracer.summary()
+        if args.profile:
+            tracing.print_profile(tracer)
+        if args.trace:
+            print(Fore.GREEN + f"🧭 추적 저장: {args.trace} (이벤트 {tracer.write(args.trace)}개)")
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(Fore.GREEN + f"💾 결과 저장: {args.output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        rows, regressed = compare_results(results, baseline, args.tolerance)
+        print(tabulate(rows, headers=["단계", "이전 건/초", "현재 건/초", "변화", ""], tablefmt="grid"))
+        if regressed:
+            print(Fore.RED + f"❌ 처리량이 {args.tolerance * 100:.0f}% 이상 떨어진 단계가 있습니다")
+            return 1
+        print(Fore.GREEN + "✅ 회귀 없음")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+온라인 병목 감지기 - 작업 상태 전이를 따라가며 대기 시간과 원인을 기록
+
+- 준비(on_ready): 선행 작업이 끝나 실행 가능해진 시각과 막고 있던 작업장
+- 할당 실패(on_blocked): 그 순간 할당기 상태로 원인 분류 (작업당 첫 실패만, O(작업장 구역 수))
+- 시작(on_start): 생성 → 준비 구간은 DEPENDENCY_WAIT, 준비 → 시작 구간은 기록된 원인으로 남김
+
+준비 → 시작 구간은 그 사이에 할당이 실제로 실패했을 때만 병목이다. 작업 자신의 첫 실패 원인이
+없으면 같은 작업장의 마지막 실패가 대기 구간 안에 있을 때 그 원인을 쓰고(max_misses 로 스캔이 멈춰
+힙 뒤쪽 작업은 on_blocked 를 받지 못함), 그것도 없으면 기록하지 않는다 - 튀김 배치 대기 한도처럼
+자원이 있는데 일부러 기다린 시간은 병목이 아니다.
+
+작업장별 최근 window_seconds 동안의 유형별 횟수/대기 합계를 메모리에 유지하고,
+BottleneckAnalysis 행은 모아 두었다가 flush() 에서 executemany 한 번으로 쓴다.
+"""
+
+from collections import deque
+
+from dal import load_sql
+from tracing import span
+
+class BottleneckDetector:
+    """작업 전이 사건으로 병목을 분류하고 작업장별 이동 창 집계를 유지"""
+
+    def __init__(self, allocator, window_seconds=900):
+        self.allocator = allocator
+        self.window_seconds = window_seconds
+        self.ready_at = {}    # queue_task_id -> (실행 가능해진 시각, 막고 있던 작업장)
+        self.causes = {}      # queue_task_id -> 첫 할당 실패 때 분류한 병목 유형
+        self.station_blocked = {}   # workstation_id -> (마지막 할당 실패 시각, 병목 유형)
+        self.pending = []     # insert_bottleneck.sql 파라미터
+        self.recent = {}      # workstation_id -> deque[(기록 시각, 병목 유형, 대기 초)]
+        self.totals = {}      # workstation_id -> {병목 유형: [횟수, 대기 합계]} (이동 창 안)
+        self.recorded = 0
+        self.last_time = None  # 마지막 기록 시각 (이동 창 기준)
+
+    def on_ready(self, queue_task_id, now, blocker=None):
+        """선행 작업이 모두 끝나 작업이 실행 가능해짐"""
+        self.ready_at[queue_task_id] = (now, blocker)
+
+    def on_blocked(self, task, now):
+        """할당 실패 - 작업마다 처음 막힌 순간의 할당기 상태로 원인 분류"""
+        queue_task_id, workstation_id = task[0], task[2]
+        if queue_task_id not in self.causes:
+            self.causes[queue_task_id] = self.allocator.blocked_reason(task, now)
+        self.station_blocked[workstation_id] = (now, self.causes[queue_task_id])
+
+    def on_start(self, queue_task_id, workstation_id, task_type, created, now):
+        """작업 시작 - 생성/준비/시작 시각으로 대기 구간을 나눠 기록"""
+        ready, blocker = self.ready_at.pop(queue_task_id, (created, None))
+        cause = self.causes.pop(queue_task_id, None)
+        if ready > created:
+            self._record(queue_task_id, 'DEPENDENCY_WAIT', ready - created, blocker, now)
+        if now > ready:
+            if cause is None:
+                blocked_at, station_cause = self.station_blocked.get(workstation_id, (None, None))
+                if blocked_at is not None and ready <= blocked_at <= now:
+                    cause = station_cause
+            if cause is not None:
+                self._record(queue_task_id, cause, now - ready, workstation_id, now)
+
+    def _record(self, queue_task_id, bottleneck_type, wait, workstation_id, now):
+        wait = int(wait)
+        self.pending.append((queue_task_id, bottleneck_type, wait, workstation_id, int(now)))
+        self.recorded += 1
+        self.last_time = now
+        self.recent.setdefault(workstation_id, deque()).append((now, bottleneck_type, wait))
+        entry = self.totals.setdefault(workstation_id, {}).setdefault(bottleneck_type, [0, 0])
+        entry[0] += 1
+        entry[1] += wait
+        self._evict(workstation_id, now)
+
+    def _evict(self, workstation_id, now):
+        """이동 창 밖으로 나간 기록을 집계에서 뺌"""
+        recent = self.recent[workstation_id]
+        totals = self.totals[workstation_id]
+        while recent and recent[0][0] <= now - self.window_seconds:
+            _, bottleneck_type, wait = recent.popleft()
+            entry = totals[bottleneck_type]
+            entry[0] -= 1
+            entry[1] -= wait
+            if entry[0] == 0:
+                del totals[bottleneck_type]
+
+    def window_stats(self, now=None):
+        """작업장별 최근 window_seconds 동안의 {병목 유형: (횟수, 대기 합계)}, now 생략 시 마지막 기록 시각 기준"""
+        now = self.last_time if now is None else now
+        stats = {}
+        for workstation_id in self.recent:
+            self._evict(workstation_id, now)
+            if self.totals[workstation_id]:
+                stats[workstation_id] = {bottleneck_type: tuple(entry)
+                                         for bottleneck_type, entry in self.totals[workstation_id].items()}
+        return stats
+
+    def flush(self, conn):
+        """모아 둔 병목 기록을 BottleneckAnalysis 에 쓰기 (호출자 트랜잭션 안에서), 쓴 행 수 반환"""
+        if not self.pending:
+            return 0
+        count = len(self.pending)
+        with span('bottleneck', rows=count):
+            conn.executemany(load_sql('insert_bottleneck.sql'), self.pending)
+        self.pending = []
+        return count
@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+"""
+용량 계획 (what-if) - 주방 구성을 바꾼 시나리오마다 무작위 시뮬레이션을 프로세스 풀에서 여러 번 돌려 비교
+
+시나리오는 기본 DB(템플릿)에 적용할 변경 묶음이다.
+    {"name": "튀김기 구역 +2", "zones": {"1": 2}}             작업장에 구역 추가 (첫 구역의 용량 규칙 복사)
+    {"name": "튀김 3명", "max_staff": {"1": 3}, "staff": {"1": 3}}   작업장 최대 인원 / ACTIVE 근무 인원
+    {"name": "패티 12개", "capacity": {"싸이패티": 12}}          식품별 구역당 최대 수량
+    {"name": "텐더 위주", "mix": {"5": 3, "1": 1}}               메뉴 구성 비율 (benchmark 의 --mix 와 같음)
+staff 는 작업장의 ACTIVE 인원을 그 수로 맞추며(모자라면 스태프 추가, 남으면 OFF_WORK), max_staff 보다
+많으면 max_staff 도 올린다. 레시피가 작업장 ID 로 작업을 정하므로 '튀김기 추가'는 같은 작업장의 구역 추가로 표현한다.
+
+시나리오 × 반복마다 작업 하나를 만들어 spawn 프로세스 풀(기본 CPU 코어 수)에 나눠 준다. 작업마다
+템플릿을 메모리 DB 로 복사해 시나리오를 적용하고, 반복 번호로 정한 seed 로 주문 스트림과 작업 시간
+(base_time_seconds 주변 정규분포 지터)을 뽑아 KitchenSimulation 을 돌린다. 같은 seed 를 모든 시나리오에
+쓰므로(공통 난수) 시나리오 간 차이가 주문 운보다 구성 차이를 반영한다.
+결과는 시나리오별로 모든 반복의 주문 완료 시간을 합친 분포(p50/p95/p99), 반복별 p95 의 범위,
+작업장별 스태프 가동률 평균으로 합쳐 첫 시나리오 대비 비교한다.
+
+사용 예:
+    python capacity_planner.py --runs 20
+    python capacity_planner.py --scenarios whatif.json --runs 50 --orders-per-minute 0.6 --hours 4
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from tabulate import tabulate
+from colorama import Fore, init
+
+from allocator import ResourceAllocator
+from benchmark import RUSH_CURVES, generate_rush_orders
+from dal import clone_database, ensure_template, load_sql, transaction
+from recipe_graph import RecipeGraphCache
+from simulation import KitchenSimulation, percentile
+
+DEFAULT_SCENARIOS = [
+    {'name': '현재 구성'},
+    {'name': '메인 튀김기 구역 +2', 'zones': {1: 2}},
+    {'name': '버거 조립대 +1명', 'staff': {3: 3}},
+    {'name': '메인 튀김기 3명', 'max_staff': {1: 3}, 'staff': {1: 3}},
+    {'name': '텐더 위주 메뉴', 'mix': {1: 1, 2: 1, 3: 1, 4: 1, 5: 3}},
+]
+
+def _int_keys(mapping):
+    return {int(key): value for key, value in (mapping or {}).items()}
+
+def apply_scenario(conn, scenario):
+    """시나리오의 작업장/구역/용량/인원 변경을 DB 에 적용 (트랜잭션 하나)"""
+    with transaction(conn):
+        for workstation_id, max_staff in _int_keys(scenario.get('max_staff')).items():
+            conn.execute(load_sql('update_workstation_max_staff.sql'), (max_staff, workstation_id))
+        for workstation_id, count in _int_keys(scenario.get('zones')).items():
+            for n in range(count):
+                zone_id = conn.execute(load_sql('insert_workstation_zone.sql'),
+                                       (workstation_id, f'추가_{n + 1}')).lastrowid
+                conn.execute(load_sql('insert_zone_capacity_copy.sql'), (zone_id, workstation_id))
+                conn.execute(load_sql('insert_zone_state.sql'), (zone_id,))
+        for food_type, max_quantity in (scenario.get('capacity') or {}).items():
+            conn.execute(load_sql('update_zone_capacity.sql'), (max_quantity, food_type))
+
+        roster = {}
+        for workstation_id, staff_id in conn.execute(load_sql('select_station_staff.sql')):
+            roster.setdefault(workstation_id, []).append(staff_id)
+        limits = {workstation_id: max_staff for workstation_id, _, max_staff
+                  in conn.execute(load_sql('select_workstation_limits.sql'))}
+        for workstation_id, count in _int_keys(scenario.get('staff')).items():
+            staff_ids = roster.get(workstation_id, [])
+            for n in range(len(staff_ids), count):
+                staff_id = conn.execute(load_sql('insert_staff.sql'),
+                                        (f'추가 스태프 {workstation_id}-{n + 1}', 'ACTIVE')).lastrowid
+                conn.execute(load_sql('insert_staff_assignment.sql'), (staff_id, workstation_id, None))
+            conn.executemany(load_sql('update_staff_status.sql'),
+                             [('OFF_WORK', staff_id) for staff_id in staff_ids[count:]])
+            if count > limits.get(workstation_id, 1):
+                conn.execute(load_sql('update_workstation_max_staff.sql'), (count, workstation_id))
+
+def run_replication(scenario, seed, params):
+    """
+    시나리오 한 번 실행 (프로세스 풀 작업) - 템플릿을 메모리 DB 로 복사해 적용하고 시뮬레이션
+
+    반환: {'scenario', 'seed', 'latencies': 정렬된 주문 완료 시간, 'orders', 'completed', 'pending_tasks',
+           'utilisation': {workstation_id: 스태프 가동률}, 'cpu_seconds'}
+    """
+    conn = clone_database(ensure_template(), ':memory:')
+    try:
+        apply_scenario(conn, scenario)
+        menu_ids = [menu_item_id for (menu_item_id,) in conn.execute("SELECT menu_item_id FROM MenuItems")]
+        mix = _int_keys(scenario.get('mix')) or None
+        recipe_cache = RecipeGraphCache()
+        allocator = ResourceAllocator(recipe_cache)
+        simulation = KitchenSimulation(conn, recipe_cache, allocator, seed=seed, jitter=params['jitter'],
+                                       batch_window=params['batch_window'])
+        stream = generate_rush_orders(menu_ids, params['orders_per_minute'], params['hours'], params['curve'],
+                                      mix, seed=seed)
+        simulation.schedule_orders((minute * 60, order_info) for minute, orders in stream for order_info in orders)
+        stats = simulation.run()
+
+        span = max(stats['virtual_seconds'], 1)
+        utilisation = {}
+        for workstation_id, busy_seconds, _ in conn.execute(load_sql('select_station_busy_time.sql'),
+                                                             (simulation.start_time,)):
+            staff = len(allocator.station_staff.get(workstation_id, ()))
+            if staff:
+                utilisation[workstation_id] = busy_seconds / (staff * span)
+        return {
+            'scenario': scenario['name'], 'seed': seed,
+            'latencies': sorted(simulation.order_latencies),
+            'orders': stats['orders_placed'], 'completed': stats['orders_completed'],
+            'pending_tasks': stats['tasks_pending'], 'utilisation': utilisation,
+            'cpu_seconds': stats['cpu_seconds'],
+        }
+    finally:
+        conn.close()
+
+def run_plan(scenarios, runs, params, workers=None, base_seed=42, on_result=None):
+    """
+    시나리오 × runs 번을 프로세스 풀에서 실행해 시나리오별 결과 목록 반환 {name: [run_replication 결과]}
+
+    반복 i 는 모든 시나리오에서 seed = base_seed + i 를 쓴다. on_result(result): 작업이 끝날 때마다 호출
+    """
+    ensure_template()   # 작업 프로세스들이 동시에 만들지 않도록 먼저 한 번
+    results = {scenario['name']: [] for scenario in scenarios}
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count(), mp_context=context) as pool:
+        futures = [pool.submit(run_replication, scenario, base_seed + i, params)
+                   for scenario in scenarios for i in range(runs)]
+        for future in as_completed(futures):
+            result = future.result()
+            results[result['scenario']].append(result)
+            if on_result is not None:
+                on_result(result)
+    for runs_of_scenario in results.values():
+        runs_of_scenario.sort(key=lambda result: result['seed'])
+    return results
+
+def summarize(results):
+    """
+    시나리오별 분포 합치기
+
+    반환: {name: {'runs', 'orders', 'completed', 'pending_tasks', 'p50', 'p95', 'p99',
+                  'p95_low', 'p95_high', 'p95_stdev', 'utilisation': {workstation_id: 평균}}}
+    p50/p95/p99 는 모든 반복의 주문 완료 시간을 합친 분포, p95_low/high 는 반복별 p95 의 최소/최대
+    """
+    summary = {}
+    for name, runs in results.items():
+        latencies = sorted(latency for result in runs for latency in result['latencies'])
+        run_p95 = [percentile(result['latencies'], 95) for result in runs]
+        workstation_ids = sorted({ws for result in runs for ws in result['utilisation']})
+        summary[name] = {
+            'runs': len(runs),
+            'orders': sum(result['orders'] for result in runs),
+            'completed': sum(result['completed'] for result in runs),
+            'pending_tasks': sum(result['pending_tasks'] for result in runs),
+            'p50': percentile(latencies, 50),
+            'p95': percentile(latencies, 95),
+            'p99': percentile(latencies, 99),
+            'p95_low': min(run_p95, default=0),
+            'p95_high': max(run_p95, default=0),
+            'p95_stdev': round(statistics.pstdev(run_p95), 1) if run_p95 else 0.0,
+            'utilisation': {ws: round(statistics.mean(result['utilisation'].get(ws, 0.0) for result in runs), 3)
+                            for ws in workstation_ids},
+        }
+    return summary
+
+def print_summary(summary, station_names):
+    baseline = next(iter(summary.values()), None)
+    rows = []
+    for name, s in summary.items():
+        change = ''
+        if baseline and baseline['p95'] and s is not baseline:
+            change = f"{(s['p95'] - baseline['p95']) / baseline['p95'] * 100:+.1f}%"
+        rows.append([name, s['runs'], f"{s['completed']}/{s['orders']}", s['p50'], s['p95'],
+                     f"{s['p95_low']}~{s['p95_high']}", s['p99'], change])
+    print(tabulate(rows, headers=["시나리오", "반복", "완료/주문", "p50(초)", "p95(초)", "반복별 p95",
+                                  "p99(초)", "p95 변화"], tablefmt="grid"))
+    workstation_ids = sorted({ws for s in summary.values() for ws in s['utilisation']})
+    print(tabulate([[name] + [f"{s['utilisation'][ws] * 100:.0f}%" if ws in s['utilisation'] else '-'
+                              for ws in workstation_ids]
+                    for name, s in summary.items()],
+                   headers=["스태프 가동률"] + [station_names.get(ws, ws) for ws in workstation_ids],
+                   tablefmt="grid"))
+
+def load_scenarios(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        scenarios = json.load(f)
+    names = [scenario.get('name') for scenario in scenarios]
+    if not all(names) or len(set(names)) != len(names):
+        raise ValueError("시나리오마다 서로 다른 name 이 필요합니다")
+    return scenarios
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="주방 구성 what-if 몬테카를로 용량 계획 (프로세스 풀)")
+    parser.add_argument('--scenarios', help="시나리오 JSON 파일 (생략하면 기본 시나리오)")
+    parser.add_argument('--runs', type=int, default=20, help="시나리오당 무작위 시뮬레이션 횟수")
+    parser.add_argument('--workers', type=int, help="프로세스 수 (기본 CPU 코어 수)")
+    parser.add_argument('--orders-per-minute', type=float, default=0.5, help="기준 분당 주문 수")
+    parser.add_argument('--hours', type=float, default=4, help="영업 시간")
+    parser.add_argument('--curve', choices=sorted(RUSH_CURVES), default='flat', help="시간대별 주문량 곡선")
+    parser.add_argument('--jitter', type=float, default=0.15, help="작업 시간 표준편차 (base_time_seconds 비율)")
+    parser.add_argument('--batch-window', type=int, default=60, help="튀김 배치 대기 한도(초)")
+    parser.add_argument('--seed', type=int, default=42, help="첫 반복의 난수 seed")
+    parser.add_argument('--output', default='capacity_report.json', help="결과 저장 파일")
+    return parser.parse_args()
+
+def main():
+    init(autoreset=True)
+    args = parse_args()
+    scenarios = load_scenarios(args.scenarios) if args.scenarios else DEFAULT_SCENARIOS
+    params = {'orders_per_minute': args.orders_per_minute, 'hours': args.hours, 'curve': args.curve,
+              'jitter': args.jitter, 'batch_window': args.batch_window}
+    workers = args.workers or os.cpu_count()
+    total = len(scenarios) * args.runs
+    print(Fore.CYAN + f"🎲 시나리오 {len(scenarios)}개 × {args.runs}회 = {total}회 시뮬레이션 (프로세스 {workers}개)")
+
+    done = [0]
+    def progress(result):
+        done[0] += 1
+        if done[0] % max(total // 10, 1) == 0 or done[0] == total:
+            print(f"  {done[0]}/{total} 완료")
+
+    started = time.perf_counter()
+    results = run_plan(scenarios, args.runs, params, workers, args.seed, progress)
+    elapsed = time.perf_counter() - started
+    summary = summarize(results)
+
+    conn = clone_database(ensure_template(), ':memory:')
+    station_names = {workstation_id: name for workstation_id, name, _
+                     in conn.execute(load_sql('select_workstation_limits.sql'))}
+    conn.close()
+    print_summary(summary, station_names)
+    cpu_seconds = sum(result['cpu_seconds'] for runs in results.values() for result in runs)
+    print(f"전체 {elapsed:.1f}초, 시뮬레이션 CPU 합계 {cpu_seconds:.1f}초 (병렬 효율 {cpu_seconds / max(elapsed * workers, 1e-9) * 100:.0f}%)")
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump({'config': vars(args), 'scenarios': scenarios,
+                   'summary': {name: dict(s, utilisation={str(ws): u for ws, u in s['utilisation'].items()})
+                               for name, s in summary.items()}},
+                  f, ensure_ascii=False, indent=2)
+    print(Fore.GREEN + f"💾 결과 저장: {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,349 @@
+# -*- coding: utf-8 -*-
+"""
+데이터 접근 계층 - 쿼리 레지스트리, 연결 설정, 연결 풀
+
+queries/ 디렉터리의 SQL 파일은 import 시 한 번만 읽어 이름으로 꺼내 쓴다.
+같은 SQL 문자열은 sqlite3 연결의 statement 캐시에서 준비된 문장으로 재사용되므로
+캐시 크기를 쿼리 수보다 넉넉하게 잡는다.
+"""
+
+import glob
+import hashlib
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+import tracing
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+QUERIES_DIR = os.path.join(BASE_DIR, "queries")
+# 시드 + 마이그레이션을 한 번 적용해 둔 템플릿 DB (파일 내용 해시별)
+TEMPLATE_DIR = os.path.join(BASE_DIR, ".db_templates")
+
+# 스키마 + 기본 데이터 (실행 순서대로)
+SEED_FILES = ('01_schema.sql', '02_workstations.sql', '03_staff.sql', '04_menu.sql', '05_recipes.sql')
+# 기존 DB 에도 반복 적용 가능한 마이그레이션 (IF NOT EXISTS)
+MIGRATION_FILES = ('06_indexes.sql', '07_archive.sql', '08_change_feed.sql', '10_holding.sql',
+                   '11_workstation_version.sql', '12_station_workload.sql')
+# 데이터를 고치는 마이그레이션 (PRAGMA user_version 이 낮을 때 한 번만 적용)
+VERSIONED_MIGRATIONS = ((1, '09_epoch_time.sql'),)
+
+# 연결마다 적용하는 PRAGMA (WAL: 읽기가 쓰기를 막지 않음)
+PRAGMAS = (
+    ("journal_mode", "WAL"),
+    ("synchronous", "NORMAL"),
+    ("cache_size", -65536),        # 음수는 KiB 단위 → 64MB
+    ("mmap_size", 268435456),      # 256MB
+    ("temp_store", "MEMORY"),
+)
+STATEMENT_CACHE_SIZE = 256
+BUSY_TIMEOUT_SECONDS = 5.0
+
+# 주석, 문자열/식별자 리터럴, 파라미터 자리 표시자
+_SQL_TOKEN = re.compile(r"--[^\n]*|/\*.*?\*/|'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|\?", re.S)
+
+def parameter_count(sql):
+    """SQL 의 ? 파라미터 개수 (주석과 문자열 안의 ? 는 제외)"""
+    return sum(1 for token in _SQL_TOKEN.findall(sql) if token == '?')
+
+class QueryRegistry:
+    """queries/*.sql 을 한 번만 읽어 두는 파일 이름 → SQL 문 목록"""
+
+    def __init__(self, directory=QUERIES_DIR):
+        self.directory = directory
+        self.statements = {}
+        for filename in sorted(os.listdir(directory)):
+            if filename.endswith('.sql'):
+                with open(os.path.join(directory, filename), 'r', encoding='utf-8') as f:
+                    self.statements[filename] = f.read()
+
+    def get(self, name):
+        """이름('select_queued_tasks' 또는 'select_queued_tasks.sql')으로 SQL 문 조회"""
+        filename = name if name.endswith('.sql') else name + '.sql'
+        try:
+            return self.statements[filename]
+        except KeyError:
+            raise KeyError(f"알 수 없는 쿼리: {name}") from None
+
+    def validate(self, conn):
+        """
+        모든 쿼리를 EXPLAIN 으로 준비해 스키마와 맞는지 확인 (실행은 하지 않음)
+
+        없는 테이블/컬럼, 문법 오류가 있으면 파일별 오류를 모아 ValueError
+        """
+        errors = []
+        for filename, sql in self.statements.items():
+            try:
+                conn.execute("EXPLAIN " + sql, (None,) * parameter_count(sql)).fetchall()
+            except sqlite3.Error as e:
+                errors.append(f"{filename}: {e}")
+        if errors:
+            raise ValueError("쿼리 검증 실패\n  " + "\n  ".join(errors))
+        return len(self.statements)
+
+queries = QueryRegistry()
+
+def load_sql(filename):
+    """SQL 파일 내용 (시작 시 읽어 둔 레지스트리에서)"""
+    return queries.get(filename)
+
+def connect(db_path, readonly=False, check_same_thread=True):
+    """
+    PRAGMA 와 statement 캐시를 설정한 연결, readonly 면 쓰기 금지(query_only), 'file:' 로 시작하면 URI
+
+    추적(tracing.enable) 중이면 문장 지연을 재는 TracedConnection
+    """
+    conn = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT_SECONDS,
+                           cached_statements=STATEMENT_CACHE_SIZE,
+                           check_same_thread=check_same_thread,
+                           uri=db_path.startswith('file:'),
+                           factory=tracing.connection_factory())
+    for name, value in PRAGMAS:
+        conn.execute(f"PRAGMA {name} = {value}")
+    if readonly:
+        conn.execute("PRAGMA query_only = 1")
+    return conn
+
+def migrate(conn):
+    """마이그레이션 파일을 순서대로 적용하고 플래너 통계 갱신, 적용한 파일 목록 반환"""
+    applied = list(MIGRATION_FILES)
+    for filename in MIGRATION_FILES:
+        with open(os.path.join(BASE_DIR, filename), 'r', encoding='utf-8') as f:
+            conn.executescript(f.read())
+    user_version = conn.execute("PRAGMA user_version").fetchone()[0]
+    for version, filename in VERSIONED_MIGRATIONS:
+        if version <= user_version:
+            continue
+        with open(os.path.join(BASE_DIR, filename), 'r', encoding='utf-8') as f:
+            script = f.read()
+        # 파일 내용과 버전 기록을 한 트랜잭션으로 (중간에 실패하면 다음 실행에서 다시 적용)
+        try:
+            conn.executescript(f"BEGIN IMMEDIATE;\n{script}\nPRAGMA user_version = {version};\nCOMMIT;")
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+        applied.append(filename)
+    conn.execute("PRAGMA optimize")
+    conn.commit()
+    return tuple(applied)
+
+def schema_hash():
+    """시드/마이그레이션 SQL 파일 이름과 내용의 해시 (템플릿 버전 키)"""
+    digest = hashlib.sha256()
+    filenames = SEED_FILES + MIGRATION_FILES + tuple(filename for _, filename in VERSIONED_MIGRATIONS)
+    for filename in filenames:
+        digest.update(filename.encode('utf-8'))
+        with open(os.path.join(BASE_DIR, filename), 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+def _seed_database(conn):
+    """빈 DB 에 스키마, 기본 데이터, 마이그레이션 적용"""
+    for filename in SEED_FILES:
+        with open(os.path.join(BASE_DIR, filename), 'r', encoding='utf-8') as f:
+            conn.executescript(f.read())
+    conn.commit()
+    migrate(conn)
+
+def ensure_template():
+    """
+    현재 시드 파일 해시의 템플릿 DB 경로, 없으면 한 번 만들고 이전 버전 템플릿은 지움
+
+    임시 파일에 만든 뒤 이름을 바꾸므로 동시에 여러 프로세스가 만들어도 반쯤 만든 파일을 보지 않는다.
+    """
+    path = os.path.join(TEMPLATE_DIR, f"template_{schema_hash()}.db")
+    if os.path.exists(path):
+        return path
+    os.makedirs(TEMPLATE_DIR, exist_ok=True)
+    building = f"{path}.{os.getpid()}.tmp"
+    conn = sqlite3.connect(building)
+    try:
+        _seed_database(conn)
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
+    os.replace(building, path)
+    for stale in glob.glob(os.path.join(TEMPLATE_DIR, "template_*.db")):
+        if stale != path:
+            os.remove(stale)
+    return path
+
+def clone_database(source_path, db_path, check_same_thread=True):
+    """source_path DB 를 sqlite3 백업 API 로 db_path 에 통째로 복사해 연결 반환 (기존 파일은 지움)"""
+    if db_path != ':memory:' and not db_path.startswith('file:'):
+        for path in (db_path, db_path + '-wal', db_path + '-shm'):
+            if os.path.exists(path):
+                os.remove(path)
+    conn = connect(db_path, check_same_thread=check_same_thread)
+    source = sqlite3.connect(f"file:{source_path}?mode=ro", uri=True)
+    try:
+        source.backup(conn)
+    finally:
+        source.close()
+    # 백업이 헤더까지 덮어쓰므로 저널 모드를 다시 설정
+    conn.execute("PRAGMA journal_mode = WAL")
+    return conn
+
+def create_database(db_path):
+    """기존 파일을 지우고 템플릿 DB(시드 + 마이그레이션 적용)를 복사해 새 DB 생성, 쿼리 검증 후 연결 반환"""
+    conn = clone_database(ensure_template(), db_path)
+    queries.validate(conn)
+    return conn
+
+@contextmanager
+def transaction(conn):
+    """
+    쓰기 트랜잭션 (BEGIN IMMEDIATE ~ COMMIT)
+
+    이미 열린 트랜잭션 안에서 호출되면 커밋/롤백은 바깥 호출자에게 맡긴다.
+    """
+    if conn.in_transaction:
+        yield conn
+        return
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.rollback()
+        raise
+    else:
+        conn.commit()
+
+class ConnectionPool:
+    """
+    스레드 안전 연결 풀 - 쓰기 연결 하나 + 읽기 전용 연결 N 개
+
+    쓰기는 잠금으로 한 스레드씩, 읽기는 빈 연결을 빌려 쓰고 돌려준다.
+    WAL 모드라 리포트용 읽기가 주문 접수 쓰기를 막지 않는다.
+    """
+
+    def __init__(self, db_path, readers=4):
+        self.db_path = db_path
+        self._writer = connect(db_path, check_same_thread=False)
+        self._writer_lock = threading.Lock()
+        self._readers = queue.Queue()
+        for _ in range(readers):
+            self._readers.put(connect(db_path, readonly=True, check_same_thread=False))
+        self._reader_count = readers
+
+    @contextmanager
+    def writer(self):
+        """쓰기 연결 독점 사용, 예외로 빠져나오면 열린 트랜잭션 롤백"""
+        with self._writer_lock:
+            try:
+                yield self._writer
+            except BaseException:
+                if self._writer.in_transaction:
+                    self._writer.rollback()
+                raise
+
+    @contextmanager
+    def reader(self, timeout=None):
+        """읽기 연결 하나 대여 (모두 사용 중이면 timeout 까지 대기, 초과 시 queue.Empty)"""
+        conn = self._readers.get(timeout=timeout)
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            self._readers.put(conn)
+
+    def close(self):
+        """모든 연결 닫기 (대여 중인 읽기 연결이 돌아올 때까지 대기)"""
+        with self._writer_lock:
+            self._writer.close()
+        for _ in range(self._reader_count):
+            self._readers.get().close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+class MemoryDatabase:
+    """
+    메모리 운영 모드 - 템플릿(또는 마지막 체크포인트)을 memdb 에 복사해 쓰고 주기적으로 디스크에 백업
+
+    memdb VFS 라 같은 프로세스의 다른 연결(connect())도 같은 DB 를 본다. memdb 는 쓰기 트랜잭션이
+    열려 있으면 읽기도 기다리게 하므로 체크포인트는 항상 커밋된 상태만 복사한다. 긴 트랜잭션을
+    쥔 쓰기가 있으면 짧게 재시도하고, 임시 파일에 복사한 뒤 이름을 바꿔 반쯤 쓴 파일을 남기지 않는다.
+    """
+
+    def __init__(self, checkpoint_path=None, interval_seconds=30.0, resume=False, retry_seconds=0.05):
+        self.uri = f"file:/momstouch_{os.getpid()}_{id(self):x}?vfs=memdb"
+        self.checkpoint_path = checkpoint_path
+        self.interval_seconds = interval_seconds
+        self.retry_seconds = retry_seconds
+        self.checkpoints = 0
+        self.last_checkpoint_seconds = None
+        self.last_error = None
+        resumed = resume and checkpoint_path is not None and os.path.exists(checkpoint_path)
+        # 이 연결이 열려 있는 동안 memdb 가 유지된다
+        self.conn = clone_database(checkpoint_path if resumed else ensure_template(), self.uri)
+        if resumed:
+            migrate(self.conn)
+        self._stop = threading.Event()
+        self._thread = None
+        if checkpoint_path is not None and interval_seconds:
+            self._thread = threading.Thread(target=self._run, name="memory-checkpoint", daemon=True)
+            self._thread.start()
+
+    def connect(self, readonly=False, check_same_thread=True):
+        """같은 메모리 DB 에 대한 새 연결"""
+        return connect(self.uri, readonly=readonly, check_same_thread=check_same_thread)
+
+    def checkpoint(self, timeout=BUSY_TIMEOUT_SECONDS):
+        """커밋된 현재 상태를 checkpoint_path 에 통째로 백업, 걸린 초 반환 (timeout 안에 잠금을 못 얻으면 OperationalError)"""
+        started = time.perf_counter()
+        building = self.checkpoint_path + '.tmp'
+        source = sqlite3.connect(self.uri, uri=True, timeout=timeout)
+        target = sqlite3.connect(building)
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
+        # 이전 파일의 WAL 이 새 파일에 적용되지 않도록 함께 지움
+        for path in (self.checkpoint_path + '-wal', self.checkpoint_path + '-shm'):
+            if os.path.exists(path):
+                os.remove(path)
+        os.replace(building, self.checkpoint_path)
+        self.checkpoints += 1
+        self.last_checkpoint_seconds = time.perf_counter() - started
+        return self.last_checkpoint_seconds
+
+    def _run(self):
+        while not self._stop.wait(self.interval_seconds):
+            deadline = time.monotonic() + self.interval_seconds
+            while not self._stop.is_set():
+                try:
+                    self.checkpoint(timeout=self.retry_seconds)
+                    break
+                except sqlite3.OperationalError as e:
+                    # 쓰기 트랜잭션이 길게 열려 있음 - 다음 주기 전까지 틈을 노려 다시 시도
+                    self.last_error = e
+                    if time.monotonic() >= deadline:
+                        break
+                    self._stop.wait(self.retry_seconds)
+
+    def close(self, checkpoint=True):
+        """백그라운드 체크포인트를 멈추고 (열린 트랜잭션은 커밋) 마지막 체크포인트를 남긴 뒤 메모리 DB 해제"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        if self.conn.in_transaction:
+            self.conn.commit()
+        if checkpoint and self.checkpoint_path is not None:
+            self.checkpoint()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -7,7 +7,7 @@ Staff, StaffAssignment, MenuItems, MenuTasks, TaskDependencies,
 CustomerOrders, OrderItems, KitchenTaskQueue, BottleneckAnalysis
 """
 
-import sqlite3
+import argparse
 import os
 import sys
 import time
@@ -16,64 +16,75 @@ from datetime import datetime, timedelta
 from tabulate import tabulate
 from colorama import Fore, Style, init
 
+from dal import MemoryDatabase, create_database, ensure_template, load_sql, transaction
+from order_intake import place_orders
+from recipe_graph import RecipeGraphCache
+from task_queue import expand_new_order_items
+from allocator import ResourceAllocator, format_time
+from analytics import ShiftAnalytics, print_report
+from archive import archive_completed
+from bottleneck import BottleneckDetector
+from ready_queue import ReadyQueue
+from simulation import KitchenSimulation, generate_orders
+from stores import StoreRouter
+import tracing
+
 init(autoreset=True)
 
 DB_NAME = "momstouch_complete.db"
-QUERIES_DIR = "queries"
-
-def load_sql(filename):
-    """SQL 파일 읽기 헬퍼 함수"""
-    filepath = os.path.join(QUERIES_DIR, filename)
-    with open(filepath, 'r', encoding='utf-8') as f:
-        return f.read()
 
-def setup_database():
-    """momsTouch.sql 스키마로 데이터베이스 초기화"""
-    if os.path.exists(DB_NAME):
-        os.remove(DB_NAME)
-
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-
-    print(Fore.YELLOW + "📊 데이터베이스 생성 중 (01_schema.sql 실행)...")
-
-    # 01_schema.sql 파일 읽어서 실행
-    with open('01_schema.sql', 'r', encoding='utf-8') as f:
-        schema_sql = f.read()
-        cursor.executescript(schema_sql)
-
-    conn.commit()
-    print(Fore.GREEN + "✅ 데이터베이스 생성 완료!\n")
-    return conn
+# 메뉴별 레시피 DAG 캐시 (레시피가 바뀔 때만 재컴파일)
+recipe_cache = RecipeGraphCache()
+
+# 스태프/구역 자원 할당기 (demo_resource_assignment 에서 DB 상태 적재)
+allocator = ResourceAllocator(recipe_cache)
+
+# 의존성 기반 준비 큐 (선행 작업이 끝난 작업만 할당/실행)
+ready_queue = ReadyQueue(recipe_cache)
+
+# 작업 전이로 병목을 분류하는 감지기 (실행 단계에서 기록, 병목 분석 단계에서 조회)
+detector = BottleneckDetector(allocator)
+
+def setup_database(memory=False, checkpoint_seconds=30.0, store=None):
+    """
+    템플릿 DB(시드 + 마이그레이션 적용, 시드 파일 해시별로 한 번만 생성)를 복사해 데이터베이스 준비
+
+    memory 면 메모리 DB 로 운영하고 checkpoint_seconds 마다 DB_NAME 에 백업한다.
+    store 면 DB_NAME 대신 stores/ 의 매장 샤드를 공유 카탈로그에서 새로 만든다.
+    반환: (연결, MemoryDatabase 또는 None, DB 파일 경로)
+    """
+    started = time.perf_counter()
+    if store is not None:
+        router = StoreRouter()
+        db_path = os.path.relpath(router.add_store(store))
+        conn = router.reset_store(store)
+        print(Fore.GREEN + f"✅ 매장 {router.name(store)} 샤드를 카탈로그에서 생성: {db_path} "
+                           f"({(time.perf_counter() - started) * 1000:.1f}ms)\n")
+        return conn, None, db_path
+    template = ensure_template()
+    print(Fore.YELLOW + f"📊 템플릿 DB: {os.path.relpath(template)}")
+    if memory:
+        database = MemoryDatabase(DB_NAME, checkpoint_seconds)
+        conn = database.conn
+        print(Fore.GREEN + f"✅ 메모리 DB 로 복사 ({checkpoint_seconds:g}초마다 {DB_NAME} 에 체크포인트)")
+    else:
+        database = None
+        conn = create_database(DB_NAME)
+    print(Fore.GREEN + f"✅ 데이터베이스 준비 완료! ({(time.perf_counter() - started) * 1000:.1f}ms)\n")
+    return conn, database, DB_NAME
 
 def insert_initial_data(conn):
-    """기본 데이터 삽입 (모든 테이블)"""
-    cursor = conn.cursor()
-
-    print(Fore.CYAN + "📋 기본 데이터 삽입 중...\n")
-
-    # 1-4. Workstations 및 Zones
-    print("  [1-4] Workstations 및 Zones 생성 (02_workstations.sql)...")
-    with open('02_workstations.sql', 'r', encoding='utf-8') as f:
-        cursor.executescript(f.read())
-
-    # 5-6. Staff
-    print("  [5-6] Staff 생성 (03_staff.sql)...")
-    with open('03_staff.sql', 'r', encoding='utf-8') as f:
-        cursor.executescript(f.read())
-
-    # 7. MenuItems
-    print("  [7] MenuItems 생성 (04_menu.sql)...")
-    with open('04_menu.sql', 'r', encoding='utf-8') as f:
-        cursor.executescript(f.read())
-
-    # 8-9. MenuTasks & TaskDependencies
-    print("  [8-9] MenuTasks & TaskDependencies 생성 (05_recipes.sql)...")
-    with open('05_recipes.sql', 'r', encoding='utf-8') as f:
-        cursor.executescript(f.read())
-
-    conn.commit()
-    print(Fore.GREEN + "✅ 기본 데이터 삽입 완료!\n")
+    """기본 데이터 확인 (02~05 시드 파일은 템플릿에 이미 적용됨)"""
+    print(Fore.CYAN + "📋 기본 데이터 (템플릿에서 복사)\n")
+    seeds = [
+        ("[1-4] Workstations 및 Zones", '02_workstations.sql', "SELECT COUNT(*) FROM WorkstationZones"),
+        ("[5-6] Staff", '03_staff.sql', "SELECT COUNT(*) FROM Staff"),
+        ("[7] MenuItems", '04_menu.sql', "SELECT COUNT(*) FROM MenuItems"),
+        ("[8-9] MenuTasks & TaskDependencies", '05_recipes.sql', "SELECT COUNT(*) FROM MenuTasks"),
+    ]
+    for label, filename, sql in seeds:
+        print(f"  {label} ({filename}): {conn.execute(sql).fetchone()[0]}행")
+    print(Fore.GREEN + "✅ 기본 데이터 확인 완료!\n")
 
 def demo_customer_orders(conn):
     """고객 주문 접수 및 대기 시간 계산"""
@@ -81,12 +92,6 @@ def demo_customer_orders(conn):
     print("🛒 [주문 단계] 고객 주문 접수 및 영수증 발행")
     print("="*80)
 
-    cursor = conn.cursor()
-
-    # 메뉴 정보 미리 가져오기
-    cursor.execute("SELECT menu_item_id, name, price FROM MenuItems")
-    menu_dict = {mid: (name, price) for mid, name, price in cursor.fetchall()}
-
     orders = [
         {'name': 'ORD-001', 'items': [(1, 1)]},              # 싸이버거 1개
         {'name': 'ORD-002', 'items': [(2, 2), (5, 1)]},      # 싸이버거 세트 2개, 텐더 1개
@@ -94,49 +99,18 @@ def demo_customer_orders(conn):
         {'name': 'ORD-004', 'items': [(4, 1), (1, 1)]},      # 에드워드리 세트 1개, 싸이버거 1개
     ]
 
-    insert_order_sql = load_sql('insert_order.sql')
-    insert_order_item_sql = load_sql('insert_order_item.sql')
+    # 모든 주문을 하나의 트랜잭션으로 접수
+    receipts = place_orders(conn, orders, recipe_cache)
+    orders_by_number = {o['name']: o['items'] for o in orders}
 
-    for order_info in orders:
+    for receipt in receipts:
         print(Fore.CYAN + f"\n{'='*60}")
-        print(f"📝 고객 주문: {order_info['name']}")
+        print(f"📝 고객 주문: {receipt['order_number']}")
         print(f"{'='*60}")
 
-        # 주문 생성
-        cursor.execute(insert_order_sql, (order_info['name'],))
-        order_id = cursor.lastrowid
-
-        # 주문 내역 및 총액 계산
-        total_price = 0
-        order_summary = []
-        for menu_id, qty in order_info['items']:
-            cursor.execute(insert_order_item_sql, (order_id, menu_id, qty))
-            menu_name, price = menu_dict[menu_id]
-            subtotal = price * qty
-            total_price += subtotal
-            order_summary.append((menu_name, qty, subtotal))
-
-        conn.commit()
-
-        # 대기 시간 계산
-        cursor.execute("""
-            SELECT COALESCE(SUM(MT.base_time_seconds * OI.quantity), 0)
-            FROM OrderItems OI
-            JOIN MenuTasks MT ON OI.menu_item_id = MT.menu_item_id
-            WHERE OI.order_id = ?
-        """, (order_id,))
-        my_order_time = cursor.fetchone()[0]
-
-        # 앞 주문들의 남은 시간 계산
-        cursor.execute("""
-            SELECT COALESCE(SUM(MT.base_time_seconds * OI.quantity), 0)
-            FROM CustomerOrders CO
-            JOIN OrderItems OI ON CO.order_id = OI.order_id
-            JOIN MenuTasks MT ON OI.menu_item_id = MT.menu_item_id
-            WHERE CO.status IN ('PENDING', 'CONFIRMED')
-            AND CO.order_id < ?
-        """, (order_id,))
-        queue_time = cursor.fetchone()[0]
+        # 대기 시간 (작업장별 앞 주문 대기를 포함한 예상치 - 자기 주문만의 예상치 = 앞 주문 몫)
+        my_order_time = recipe_cache.estimate_seconds(orders_by_number[receipt['order_number']])
+        queue_time = receipt['eta_seconds'] - my_order_time
 
         total_wait_time = queue_time + my_order_time
         wait_minutes = total_wait_time // 60
@@ -144,10 +118,10 @@ def demo_customer_orders(conn):
         # 영수증 출력
         print(Fore.GREEN + "\n📄 영수증")
         print("-" * 60)
-        for name, qty, subtotal in order_summary:
+        for name, qty, subtotal in receipt['items']:
             print(f"  {name:25s} x {qty:2d}  {subtotal:7,}원")
         print("-" * 60)
-        print(f"  {'합계':25s}      {total_price:7,}원")
+        print(f"  {'합계':25s}      {receipt['total_price']:7,}원")
         print("=" * 60)
 
         print(Fore.YELLOW + f"⏰ 예상 대기 시간: 약 {wait_minutes}분")
@@ -155,7 +129,7 @@ def demo_customer_orders(conn):
             queue_minutes = queue_time // 60
             print(Fore.CYAN + f"   (현재 {queue_minutes}분 대기 중인 주문이 있습니다)")
 
-        print(Fore.GREEN + f"✅ 주문번호: {order_info['name']}" + Style.RESET_ALL)
+        print(Fore.GREEN + f"✅ 주문번호: {receipt['order_number']}" + Style.RESET_ALL)
 
     print(Fore.GREEN + "\n" + "="*80)
     print("✅ 모든 주문 접수 완료!")
@@ -167,40 +141,16 @@ def demo_task_queue_creation(conn):
     print("📋 [스케줄링] 주방 작업 큐 자동 생성")
     print("="*80)
 
-    cursor = conn.cursor()
-
     print("\n📍 OrderItems -> KitchenTaskQueue 변환 중...")
 
-    # SQL 파일 로드
-    select_order_items_sql = load_sql('select_order_items.sql')
-    select_menu_tasks_sql = load_sql('select_menu_tasks.sql')
-    insert_kitchen_task_sql = load_sql('insert_kitchen_task.sql')
-
-    # 모든 OrderItems 조회
-    cursor.execute(select_order_items_sql)
-
-    order_items = cursor.fetchall()
-    task_count = 0
-
-    for order_item_id, menu_item_id, quantity in order_items:
-        # 해당 메뉴의 모든 작업 조회
-        cursor.execute(select_menu_tasks_sql, (menu_item_id,))
+    # 새로 들어온 OrderItems 만 한 번에 전개 (워터마크 + executemany)
+    expanded = expand_new_order_items(conn, recipe_cache)
+    menu_names = dict(conn.execute("SELECT menu_item_id, name FROM MenuItems"))
 
-        tasks = cursor.fetchall()
-
-        # 수량만큼 반복하여 작업 생성
-        for qty_idx in range(quantity):
-            for task_def_id, task_name, task_order in tasks:
-                cursor.execute(insert_kitchen_task_sql, (order_item_id, task_def_id))
-
-                task_count += 1
-                if quantity > 1:
-                    print(f"  ✅ OrderItem {order_item_id} (#{qty_idx+1}/{quantity}) -> Task: {task_name}")
-                else:
-                    print(f"  ✅ OrderItem {order_item_id} -> Task: {task_name}")
-
-    conn.commit()
+    for order_item_id, _, menu_item_id, quantity, count in expanded:
+        print(f"  ✅ OrderItem {order_item_id} ({menu_names[menu_item_id]} x {quantity}) -> {count}개 작업")
 
+    task_count = sum(count for _, _, _, _, count in expanded)
     print(f"\n총 {task_count}개의 작업이 큐에 추가되었습니다.")
     print(Fore.GREEN + "\n✅ 작업 큐 생성 완료!\n")
 
@@ -210,88 +160,48 @@ def demo_resource_assignment(conn):
     print("👔 [자원 할당] Staff & Zone 할당 알고리즘")
     print("="*80)
     
-    cursor = conn.cursor()
-    
     print("\n📍 QUEUED 작업에 자원 할당 중...\n")
 
-    # SQL 파일 로드
-    select_queued_tasks_sql = load_sql('select_queued_tasks.sql')
-    select_available_staff_sql = load_sql('select_available_staff.sql')
-    select_workstation_zones_sql = load_sql('select_workstation_zones.sql')
-    update_task_assignment_sql = load_sql('update_task_assignment.sql')
-
-    # 모든 대기 중인 작업 조회
-    cursor.execute(select_queued_tasks_sql)
+    # 스태프/구역 상태를 메모리에 올리고, 선행 작업이 끝난 작업만 한 번에 할당
+    allocator.load(conn)
+    ready_queue.load(conn)
+    assignments = allocator.assign_ready(conn, ready_queue)
 
-    tasks = cursor.fetchall()
-    assigned_count = 0
-
-    for queue_id, task_def_id, workstation_id, menu_id in tasks:
-        # 1. Staff 할당 (활동중인 스태프, 중복 할당 방지)
-        cursor.execute(select_available_staff_sql, (workstation_id,))
-
-        staff_result = cursor.fetchone()
-        assigned_staff_id = staff_result[0] if staff_result else None
-
-        # 2. Zone 할당
-        cursor.execute(select_workstation_zones_sql, (workstation_id,))
-
-        zone_result = cursor.fetchone()
-        assigned_zone_id = zone_result[0] if zone_result else None
-
-        # 3. KitchenTaskQueue 업데이트
-        cursor.execute(update_task_assignment_sql,
-                      (workstation_id, assigned_zone_id, assigned_staff_id, queue_id))
-        
-        assigned_count += 1
-        conn.commit()
+    for queue_id, workstation_id, assigned_zone_id, assigned_staff_id in assignments:
         print(f"  ✅ Task {queue_id}: WS{workstation_id}, "
               f"Zone{assigned_zone_id}, Staff{assigned_staff_id}")
-    
-    print(Fore.GREEN + f"\n✅ {assigned_count}개 작업에 자원 할당 완료!\n")
+
+    waiting = conn.execute("SELECT COUNT(*) FROM KitchenTaskQueue WHERE status = 'QUEUED'").fetchone()[0]
+    print(Fore.GREEN + f"\n✅ {len(assignments)}개 작업에 자원 할당 완료! (자원 대기 {waiting}개)\n")
 
 def demo_zone_state_updates(conn):
-    """Zone의 상태 업데이트 (ZoneRealtimeState)"""
+    """Zone의 상태 업데이트 (할당기가 잡은 구역 → ZoneRealtimeState)"""
     print(Fore.CYAN + "="*80)
     print("⚙️  [실시간 상태] Zone 상태 업데이트")
     print("="*80)
-    
-    cursor = conn.cursor()
-    
-    print("\n📍 주요 Zone의 상태를 시뮬레이션 중...\n")
 
-    # SQL 파일 로드
-    select_zone_realtime_state_sql = load_sql('select_zone_realtime_state.sql')
-
-    # 메인 튀김기 좌측 (zone_id=1)에 싸이패티 작업 배정
-    cursor.execute("""
-        UPDATE ZoneRealtimeState
-        SET
-            current_food_type = '싸이패티',
-            current_quantity = 10,
-            busy_until = datetime('now', '+5 minutes', 'localtime')
-        WHERE zone_id = 1
-    """)
-
-    # 서브 튀김기 우측 (zone_id=4)에 감자튀김 작업 배정
-    cursor.execute("""
-        UPDATE ZoneRealtimeState
-        SET
-            current_food_type = '감자튀김',
-            current_quantity = 20,
-            busy_until = datetime('now', '+3 minutes', 'localtime')
-        WHERE zone_id = 4
-    """)
-
-    conn.commit()
+    # 자원 할당 단계에서 할당기가 잡은 구역 (busy_until 은 할당 시각 + 작업 시간)
+    now = int(time.time())
+    zone_names = dict(conn.execute("SELECT zone_id, zone_name FROM WorkstationZones"))
+    occupied = sorted((busy_until, zone_id, food_type, quantity)
+                      for zone_id, (_, food_type, quantity, busy_until) in allocator.zones.items()
+                      if busy_until)
+    print(f"\n📍 할당기가 사용 중으로 잡은 구역 {len(occupied)}곳\n")
+    for busy_until, zone_id, food_type, quantity in occupied:
+        print(f"  🔥 Zone {zone_id} ({zone_names[zone_id]}): {food_type or 'IDLE'} {quantity}개 "
+              f"~{format_time(busy_until)} (남은 {max(busy_until - now, 0)}초)")
+
+    # busy_until 이 지난 구역은 비우고, 바뀐 구역만 ZoneRealtimeState 에 기록
+    released = allocator.release_expired(now)
+    with transaction(conn):
+        allocator.flush_zones(conn)
+    print(f"\n  만료되어 비운 구역 {len(released)}곳 (남은 구역은 작업 실행 단계의 가상 시계로 비움)")
 
     # Zone 상태 표시
-    print("📍 Zone 실시간 상태:")
-    cursor.execute(select_zone_realtime_state_sql)
-    
-    zones = cursor.fetchall()
+    print("\n📍 Zone 실시간 상태:")
+    zones = conn.execute(load_sql('select_zone_realtime_state.sql')).fetchall()
     print(tabulate(zones, headers=["Zone ID", "Zone Name", "Current Food", "Qty", "Busy Until"], tablefmt="grid"))
-    
+
     print(Fore.GREEN + "\n✅ Zone 상태 업데이트 완료!\n")
 
 def demo_task_execution(conn):
@@ -300,90 +210,48 @@ def demo_task_execution(conn):
     print("🏃 [실행] 작업 처리 시뮬레이션")
     print("="*80)
     
-    cursor = conn.cursor()
-    
-    print("\n📍 작업 처리 중...\n")
-
-    # SQL 파일 로드
-    select_waiting_resource_tasks_sql = load_sql('select_waiting_resource_tasks.sql')
-    update_task_in_progress_sql = load_sql('update_task_in_progress.sql')
-    update_task_completed_sql = load_sql('update_task_completed.sql')
-
-    # WAITING_RESOURCE 상태의 작업들을 IN_PROGRESS로 변경
-    cursor.execute(select_waiting_resource_tasks_sql)
-
-    tasks_to_start = cursor.fetchall()
+    print("\n📍 작업 처리 중 (가상 시계, time.sleep 없음)...\n")
 
-    for (queue_id,) in tasks_to_start:
-        # IN_PROGRESS 상태로 변경
-        cursor.execute(update_task_in_progress_sql, (queue_id,))
+    def on_task_done(queue_id, now):
+        print(f"  ✅ Task {queue_id} 완료 ({format_time(now)})")
 
-        conn.commit()
-        time.sleep(0.3)  # 약간의 지연
+    # 자원이 할당된 작업부터 시작, 완료될 때마다 후속 작업을 바로 할당 (사건 힙 순서)
+    simulation = KitchenSimulation(conn, recipe_cache, allocator, ready_queue,
+                                   seed=42, jitter=0.1, start_time=time.time(),
+                                   on_task_done=on_task_done, detector=detector)
+    stats = simulation.run()
 
-        # COMPLETED 상태로 변경
-        cursor.execute(update_task_completed_sql, (queue_id,))
-
-        conn.commit()
-        print(f"  ✅ Task {queue_id} 완료")
-    
+    print(f"\n  가상 경과 {stats['virtual_seconds'] / 60:.1f}분, "
+          f"CPU {stats['cpu_seconds'] * 1000:.1f}ms, 완료 주문 {stats['orders_completed']}건")
     print(Fore.GREEN + "\n✅ 작업 처리 완료!\n")
 
 def demo_bottleneck_analysis(conn):
-    """병목 분석 데이터 기록 (BottleneckAnalysis)"""
+    """병목 분석 (작업 실행 중 BottleneckDetector 가 실제 대기 시간으로 기록한 결과)"""
     print(Fore.RED + "="*80)
     print("🚧 [분석] 병목 현상 분석")
     print("="*80)
-    
-    cursor = conn.cursor()
-    
-    print("\n📍 병목 분석 데이터 생성 중...\n")
-    
-    # 시뮬레이션: 특정 작업에서 병목 발생
-    bottlenecks = [
-        {
-            'queue_task_id': 5,
-            'bottleneck_type': 'NO_STAFF',
-            'wait_duration_seconds': 120,
-            'problematic_workstation_id': 1,
-            'reason': '튀김 담당 스태프 부족'
-        },
-        {
-            'queue_task_id': 8,
-            'bottleneck_type': 'FRYER_TEMP_RECOVERY',
-            'wait_duration_seconds': 90,
-            'problematic_workstation_id': 1,
-            'reason': '기름 온도 복구 대기'
-        },
-        {
-            'queue_task_id': 12,
-            'bottleneck_type': 'DEPENDENCY_WAIT',
-            'wait_duration_seconds': 150,
-            'problematic_workstation_id': 3,
-            'reason': '이전 작업 완료 대기'
-        },
-    ]
-    
-    # SQL 파일 로드
-    insert_bottleneck_sql = load_sql('insert_bottleneck.sql')
-    select_bottleneck_stats_sql = load_sql('select_bottleneck_stats.sql')
 
-    for bn in bottlenecks:
-        cursor.execute(insert_bottleneck_sql,
-                      (bn['queue_task_id'], bn['bottleneck_type'],
-                       bn['wait_duration_seconds'], bn['problematic_workstation_id']))
-
-        conn.commit()
-        print(f"  📌 Task {bn['queue_task_id']}: {bn['bottleneck_type']} "
-              f"({bn['wait_duration_seconds']}초) - {bn['reason']}")
+    # 실행 단계에서 감지기가 모아 둔 기록은 시뮬레이션 커밋 때 이미 저장됨
+    detector.flush(conn)
+    conn.commit()
+    print(f"\n📍 작업 전이에서 감지한 병목 {detector.recorded}건\n")
+
+    workstation_names = {workstation_id: name for workstation_id, name, _
+                         in conn.execute(load_sql('select_workstation_limits.sql'))}
+    window_rows = [
+        [workstation_names.get(workstation_id, 'N/A'), bottleneck_type, count, total_wait]
+        for workstation_id, by_type in sorted(detector.window_stats().items(),
+                                              key=lambda item: item[0] or 0)
+        for bottleneck_type, (count, total_wait) in sorted(by_type.items())
+    ]
+    print(f"📊 작업장별 최근 {detector.window_seconds // 60}분 병목:")
+    print(tabulate(window_rows, headers=["작업장", "병목 유형", "발생 횟수", "총 대기시간(초)"], tablefmt="grid"))
 
     # 병목 통계
     print("\n📊 병목 유형별 분석:")
-    cursor.execute(select_bottleneck_stats_sql)
-    
-    stats = cursor.fetchall()
+    stats = conn.execute(load_sql('select_bottleneck_stats.sql')).fetchall()
     print(tabulate(stats, headers=["병목 유형", "발생 횟수", "총 대기시간(초)"], tablefmt="grid"))
-    
+
     print(Fore.GREEN + "\n✅ 병목 분석 완료!\n")
 
 def demo_final_report(conn):
@@ -422,7 +290,9 @@ def demo_final_report(conn):
     # 4. ZoneRealtimeState
     print("\n✅ [4] ZoneRealtimeState - 구역 실시간 상태")
     cursor.execute("""
-        SELECT zone_id, current_food_type, current_quantity, busy_until FROM ZoneRealtimeState
+        SELECT zone_id, current_food_type, current_quantity,
+               datetime(busy_until, 'unixepoch', 'localtime')
+        FROM ZoneRealtimeState
     """)
     data = cursor.fetchall()
     print(tabulate(data, headers=["Zone ID", "현재 식품", "수량", "Busy Until"], tablefmt="grid"))
@@ -438,7 +308,7 @@ def demo_final_report(conn):
     # 6. StaffAssignment
     print("\n✅ [6] StaffAssignment - 스태프 배치")
     cursor.execute("""
-        SELECT SA.assignment_id, S.name, W.name, SA.assigned_at
+        SELECT SA.assignment_id, S.name, W.name, datetime(SA.assigned_at, 'unixepoch', 'localtime')
         FROM StaffAssignment SA
         JOIN Staff S ON SA.staff_id = S.staff_id
         JOIN Workstations W ON SA.workstation_id = W.workstation_id
@@ -478,7 +348,8 @@ def demo_final_report(conn):
     # 10. CustomerOrders
     print("\n✅ [10] CustomerOrders - 고객 주문")
     cursor.execute("""
-        SELECT order_id, order_number, status, created_at, estimated_seconds_remaining
+        SELECT order_id, order_number, status, datetime(created_at, 'unixepoch', 'localtime'),
+               estimated_seconds_remaining
         FROM CustomerOrders
     """)
     data = cursor.fetchall()
@@ -508,8 +379,8 @@ def demo_final_report(conn):
             COALESCE(W.name, 'N/A') as ws,
             COALESCE(CAST(KTQ.assigned_zone_id AS TEXT), 'N/A') as zone,
             COALESCE(CAST(KTQ.assigned_staff_id AS TEXT), 'N/A') as staff,
-            COALESCE(KTQ.actual_start_time, 'N/A') as start_time,
-            COALESCE(KTQ.actual_end_time, 'N/A') as end_time
+            COALESCE(datetime(KTQ.actual_start_time, 'unixepoch', 'localtime'), 'N/A') as start_time,
+            COALESCE(datetime(KTQ.actual_end_time, 'unixepoch', 'localtime'), 'N/A') as end_time
         FROM KitchenTaskQueue KTQ
         JOIN OrderItems OI ON KTQ.order_item_id = OI.order_item_id
         JOIN CustomerOrders CO ON OI.order_id = CO.order_id
@@ -526,7 +397,7 @@ def demo_final_report(conn):
     print("\n✅ [13] BottleneckAnalysis - 병목 현상 분석")
     cursor.execute("""
         SELECT BA.analysis_id, BA.queue_task_id, BA.bottleneck_type, 
-               BA.wait_duration_seconds, W.name, BA.recorded_at
+               BA.wait_duration_seconds, W.name, datetime(BA.recorded_at, 'unixepoch', 'localtime')
         FROM BottleneckAnalysis BA
         LEFT JOIN Workstations W ON BA.problematic_workstation_id = W.workstation_id
     """)
@@ -583,47 +454,122 @@ def demo_final_report(conn):
     
     print(Fore.GREEN + "\n✅ 모든 13개 테이블이 완벽하게 활용되었습니다!\n")
 
+def demo_full_day_simulation(conn, order_count, hours, seed, batch_window=None):
+    """하루 영업 주문을 가상 시계로 재생 (--simulate)"""
+    print(Fore.MAGENTA + "="*80)
+    print(f"⏱️  [시뮬레이션] {hours}시간 영업, 주문 {order_count}건 재생")
+    print("="*80)
+
+    menu_ids = [mid for (mid,) in conn.execute("SELECT menu_item_id FROM MenuItems")]
+    simulation = KitchenSimulation(conn, recipe_cache, allocator, ready_queue,
+                                   seed=seed, jitter=0.15, batch_window=batch_window,
+                                   detector=detector)
+    simulation.schedule_orders(generate_orders(menu_ids, order_count, hours * 3600, seed))
+    stats = simulation.run()
+
+    print(tabulate([
+        ["접수 주문", stats['orders_placed']],
+        ["완료 주문", stats['orders_completed']],
+        ["완료 작업", stats['tasks_completed']],
+        ["튀김 배치", stats['batches_started']],
+        ["미완료 작업", stats['tasks_pending']],
+        ["가상 경과 시간(분)", f"{stats['virtual_seconds'] / 60:.1f}"],
+        ["CPU 시간(초)", f"{stats['cpu_seconds']:.2f}"],
+        ["주문 완료시간 p50/p95/p99(초)",
+         f"{stats['latency_p50']:.0f} / {stats['latency_p95']:.0f} / {stats['latency_p99']:.0f}"],
+    ], tablefmt="grid"))
+
+    print("\n📊 병목 유형별 분석:")
+    stats_rows = conn.execute(load_sql('select_bottleneck_stats.sql')).fetchall()
+    print(tabulate(stats_rows, headers=["병목 유형", "발생 횟수", "총 대기시간(초)"], tablefmt="grid"))
+
+    # 완료 주문을 이력 테이블로 옮겨 핫 큐에는 진행 중 작업만 남김
+    archived = archive_completed(conn)
+    print(f"\n📦 이력 보관: 주문 {archived['orders']}건, 작업 {archived['tasks']}건, "
+          f"병목 기록 {archived['bottlenecks']}건 ({archived['chunks']}개 청크)")
+
+    # 핫 + 이력 전체를 열 배열로 읽어 구간별 가동률/조리 시간/대기열/ETA 오차 집계
+    print_report(conn, ShiftAnalytics().refresh(conn).report())
+    print(Fore.GREEN + "\n✅ 시뮬레이션 완료!\n")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="맘스터치 주방 자동화 데모")
+    parser.add_argument('--simulate', action='store_true',
+                        help="데모 대신 하루치 주문을 가상 시계로 재생")
+    parser.add_argument('--orders', type=int, default=100, help="시뮬레이션 주문 수")
+    parser.add_argument('--hours', type=float, default=12, help="시뮬레이션 영업 시간")
+    parser.add_argument('--seed', type=int, default=42, help="난수 seed")
+    parser.add_argument('--batch-window', type=float, default=60,
+                        help="튀김 배치를 모으는 최대 대기 시간(초), 음수면 배치 없이 작업별 조리")
+    parser.add_argument('--memory', action='store_true',
+                        help=f"메모리 DB 로 실행하고 주기적으로 {DB_NAME} 에 체크포인트")
+    parser.add_argument('--checkpoint-seconds', type=float, default=30.0,
+                        help="--memory 체크포인트 간격(초)")
+    parser.add_argument('--store', help=f"{DB_NAME} 대신 채울 매장 샤드 코드 (stores.py, 없으면 등록)")
+    parser.add_argument('--trace', nargs='?', const='trace.json',
+                        help="단계 스팬/쿼리 실행을 Chrome Trace Event 형식으로 저장할 파일 (기본 trace.json)")
+    parser.add_argument('--profile', action='store_true', help="끝날 때 단계별/쿼리별 시간과 커밋·잠금 카운터 요약 출력")
+    args = parser.parse_args()
+    if args.store and args.memory:
+        parser.error("--store 와 --memory 는 함께 쓸 수 없습니다")
+    return args
+
 if __name__ == "__main__":
     print(Fore.MAGENTA + Style.BRIGHT + "="*80)
     print("🍔 맘스터치 완전 자동화 데모 - momsTouch.sql 모든 테이블 활용")
     print("="*80 + "\n")
-    
-    # 1. 데이터베이스 생성
-    conn = setup_database()
-    time.sleep(0.5)
-    
-    # 2. 기본 데이터 삽입
+
+    args = parse_args()
+    # 연결을 열기 전에 켜야 문장 지연까지 잰다
+    tracer = tracing.enable() if args.trace or args.profile else None
+
+    # 1. 데이터베이스 생성 (템플릿 또는 매장 카탈로그 복사)
+    conn, database, db_path = setup_database(args.memory, args.checkpoint_seconds, args.store)
+
+    # 2. 기본 데이터 확인
     insert_initial_data(conn)
-    time.sleep(0.5)
-    
+
+    def finish():
+        # 메모리 모드면 마지막 체크포인트를 DB_NAME 에 남기고 해제
+        if database is not None:
+            database.close()
+        else:
+            conn.close()
+        if tracer is not None:
+            tracing.disable()
+            if args.profile:
+                tracing.print_profile(tracer)
+            if args.trace:
+                print(Fore.GREEN + f"🧭 추적 저장: {args.trace} (이벤트 {tracer.write(args.trace)}개)")
+
+    if args.simulate:
+        demo_full_day_simulation(conn, args.orders, args.hours, args.seed,
+                                 args.batch_window if args.batch_window >= 0 else None)
+        finish()
+        sys.exit(0)
+
     # 3. 고객 주문 접수
     demo_customer_orders(conn)
-    time.sleep(0.5)
-    
+
     # 4. 작업 큐 자동 생성
     demo_task_queue_creation(conn)
-    time.sleep(0.5)
-    
+
     # 5. 자원 할당
     demo_resource_assignment(conn)
-    time.sleep(0.5)
-    
+
     # 6. Zone 상태 업데이트
     demo_zone_state_updates(conn)
-    time.sleep(0.5)
-    
+
     # 7. 작업 처리 시뮬레이션
     demo_task_execution(conn)
-    time.sleep(0.5)
-    
+
     # 8. 병목 분석
     demo_bottleneck_analysis(conn)
-    time.sleep(0.5)
-    
+
     # 9. 최종 리포트
     demo_final_report(conn)
-    
-    conn.close()
-    
-    print(Fore.YELLOW + "\n📁 데이터베이스 파일: momstouch_complete.db")
+
+    finish()
+
+    print(Fore.YELLOW + f"\n📁 데이터베이스 파일: {db_path}")
     print("✨ 모든 13개 테이블과 모든 컬럼이 완벽하게 활용되었습니다!\n")
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+튀김 배치 합치기 - 여러 주문의 같은 튀김 작업을 구역 한 번의 적재로 묶음
+
+준비 큐에서 튀김 작업장의 실행 가능 작업을 (작업장, 식품 종류) 별로 모았다가
+ZoneCapacityRules.max_quantity 만큼 차거나 가장 오래 기다린 작업이 대기 한도를
+넘으면 한 배치로 적재한다. 배치는 스태프 한 명과 구역 하나를 쓰며,
+ZoneRealtimeState 는 배치당 한 번만 갱신된다.
+"""
+
+from allocator import food_type_for_task
+from tracing import traced
+
+class FryerBatcher:
+    """(작업장, 식품 종류) 별 대기 작업 묶음과 적재 시점 판단"""
+
+    def __init__(self, allocator, window_seconds=60):
+        self.allocator = allocator
+        self.window_seconds = window_seconds
+        self.groups = {}   # (workstation_id, food_type) -> [(모이기 시작한 시각, 작업 행)]
+
+    def _fryer_workstations(self):
+        """용량 규칙이 있는 구역을 가진 작업장"""
+        return {self.allocator.zones[zone_id][0]
+                for zone_id in self.allocator.capacity if zone_id in self.allocator.zones}
+
+    def _collect(self, ready_queue, now):
+        """튀김 작업장의 실행 가능 작업을 그룹으로 옮김, 식품 종류를 모르는 작업은 되돌림"""
+        others = []
+        recipe_cache = self.allocator.recipe_cache
+        for workstation_id in self._fryer_workstations():
+            while True:
+                task = ready_queue.pop_ready(workstation_id)
+                if task is None:
+                    break
+                _, task_def_id, _, menu_item_id = task
+                task_name = recipe_cache.graph(menu_item_id).tasks[task_def_id][0]
+                food_type = food_type_for_task(task_name, self.allocator.food_types)
+                if food_type is None:
+                    others.append(task)
+                    continue
+                self.groups.setdefault((workstation_id, food_type), []).append((now, task))
+        ready_queue.push_back(others)
+
+    @traced('assignment')
+    def dispatch(self, conn, ready_queue, now, on_miss=None):
+        """
+        가득 찼거나 대기 한도가 지난 그룹을 배치로 적재하고 트랜잭션 하나로 저장
+
+        on_miss(task, now): 적재할 때가 됐는데 자원이 없어 남은 작업마다 호출 (병목 감지용)
+        반환: 배치 목록, 배치마다 [(queue_task_id, workstation_id, zone_id, staff_id)]
+        """
+        self._collect(ready_queue, now)
+        batches = []
+        for (workstation_id, food_type), members in self.groups.items():
+            size = self.allocator.batch_capacity(workstation_id, food_type)
+            while members:
+                full = len(members) >= size
+                due = now - members[0][0] >= self.window_seconds
+                if not (full or due):
+                    break
+                batch = self.allocator.assign_batch([task for _, task in members], food_type, now)
+                if not batch:
+                    if on_miss is not None:
+                        for _, task in members:
+                            on_miss(task, now)
+                    break
+                del members[:len(batch)]
+                batches.append(batch)
+        self.groups = {key: members for key, members in self.groups.items() if members}
+
+        if batches:
+            self.allocator.persist(conn, [a for batch in batches for a in batch])
+        return batches
+
+    def next_deadline(self):
+        """가장 먼저 대기 한도가 끝나는 시각, 대기 중인 그룹이 없으면 None"""
+        if not self.groups:
+            return None
+        return min(members[0][0] for members in self.groups.values()) + self.window_seconds
+
+    def pending_count(self):
+        """배치를 기다리는 작업 수"""
+        return sum(len(members) for members in self.groups.values())
@@ -0,0 +1,310 @@
+# -*- coding: utf-8 -*-
+"""
+보온 재고 - 시간대별 수요 예측으로 패티/텐더/감자튀김을 미리 튀겨 두고 주문 튀김 작업을 충당
+
+- DemandForecaster: CustomerOrders/OrderItems 이력을 하루 중 시간대(slot)별 식품 수요율로 학습
+- HoldingCache: 식품별 보온 재고 (튀긴 묶음마다 보온 한도 시각, 지나면 폐기), 충당/부족/폐기 집계
+- PrefryPlanner: 예측 수요 × cover 에 모자란 만큼 할당기의 빈 튀김 구역/스태프로 미리 튀김
+
+큐 전개(expand_new_order_items)는 재고가 있는 튀김 작업을 재고로 충당해 바로 COMPLETED 로 기록하므로
+뒤따르는 조립 작업이 튀김 시간(예: 싸이패티 300초)을 기다리지 않는다. 재고는 메모리에만 두고
+생산/충당/폐기는 HoldingLedger 에 모아 써서 지표와 사후 분석에 쓴다.
+보온 한도는 식품마다 같으므로 재고 묶음은 만료 순으로 쌓이고, 가장 오래된 묶음부터 꺼내고 버린다.
+"""
+
+import itertools
+import time
+from collections import deque
+
+from allocator import food_type_for_task
+from dal import load_sql
+
+# 식품별 보온 한도 (초) - 감자튀김은 눅눅해지므로 짧게
+HOLD_SECONDS = {'싸이패티': 900, '텐더': 900, '감자튀김': 420}
+DEFAULT_HOLD_SECONDS = 600
+
+class DemandForecaster:
+    """하루 중 시간대(slot_seconds 단위, localtime)별 수요율 (식품 종류 등 키별) - 이력의 날짜 수로 나눈 평균"""
+
+    def __init__(self, slot_seconds=900):
+        self.slot_seconds = slot_seconds
+        self.slots = 86400 // slot_seconds
+        self.rates = {}     # 키(food_type 등) -> [시간대별 초당 수요 단위]
+        self.days = 0
+
+    def _time_of_day(self, ts):
+        local = time.localtime(ts)
+        return local.tm_hour * 3600 + local.tm_min * 60 + local.tm_sec
+
+    def fit(self, conn, menu_units, since=0):
+        """DB 주문 이력(since 이후, 취소 제외)으로 학습"""
+        return self.fit_rows(conn.execute(load_sql('select_demand_history.sql'), (since,)), menu_units)
+
+    def fit_rows(self, rows, menu_units):
+        """
+        rows: [(접수 시각, menu_item_id, quantity)]
+        menu_units: {menu_item_id: {키: 수량 1개당 단위}} - 식품 수요면 HoldingCache.menu_foods,
+                    {menu_item_id: {workstation_id: 작업 초}} 를 주면 작업장 부하(초)를 학습
+        """
+        totals = {}
+        days = set()
+        for created_at, menu_item_id, quantity in rows:
+            local = time.localtime(created_at)
+            days.add((local.tm_year, local.tm_yday))
+            slot = self._time_of_day(created_at) // self.slot_seconds
+            for key, units in menu_units.get(menu_item_id, {}).items():
+                totals.setdefault(key, [0] * self.slots)[slot] += units * quantity
+        self.days = len(days)
+        scale = 1.0 / (max(self.days, 1) * self.slot_seconds)
+        self.rates = {key: [count * scale for count in counts] for key, counts in totals.items()}
+        return self
+
+    def expected(self, key, start, seconds):
+        """[start, start + seconds) 동안 키(식품 종류 등)의 예상 수요 단위 수"""
+        rates = self.rates.get(key)
+        if not rates:
+            return 0.0
+        total = 0.0
+        at, end = start, start + seconds
+        while at < end:
+            offset = self._time_of_day(at)
+            slot = offset // self.slot_seconds
+            step = min(end - at, (slot + 1) * self.slot_seconds - offset)
+            total += rates[slot % self.slots] * step
+            at += step
+        return total
+
+    def accuracy(self, demand, start, end):
+        """
+        시간대별 예측 대비 실제 수요 - 식품별 {'forecast', 'actual', 'wape', 'bias'}
+
+        demand: {(food_type, 분 시작 epoch 초): 단위 수} (HoldingCache.demand)
+        wape = Σ|예측 - 실제| / Σ실제 (시간대 단위), bias = (Σ예측 - Σ실제) / Σ실제
+        """
+        actual = {}
+        for (food_type, minute), units in demand.items():
+            slot_start = minute - minute % self.slot_seconds
+            actual.setdefault(food_type, {})
+            actual[food_type][slot_start] = actual[food_type].get(slot_start, 0) + units
+        result = {}
+        for food_type in sorted(set(self.rates) | set(actual)):
+            observed = actual.get(food_type, {})
+            forecast_total = actual_total = error = 0.0
+            slot_start = start - start % self.slot_seconds
+            while slot_start < end:
+                lo, hi = max(slot_start, start), min(slot_start + self.slot_seconds, end)
+                forecast = self.expected(food_type, lo, hi - lo)
+                units = observed.get(slot_start, 0)
+                forecast_total += forecast
+                actual_total += units
+                error += abs(forecast - units)
+                slot_start += self.slot_seconds
+            result[food_type] = {
+                'forecast': round(forecast_total, 1),
+                'actual': int(actual_total),
+                'wape': round(error / actual_total, 3) if actual_total else None,
+                'bias': round((forecast_total - actual_total) / actual_total, 3) if actual_total else None,
+            }
+        return result
+
+class HoldingCache:
+    """식품별 보온 재고 - 묶음 [보온 한도 시각, 남은 수량] 을 만료 순 deque 로 유지"""
+
+    def __init__(self, recipe_cache, hold_seconds=None):
+        self.recipe_cache = recipe_cache
+        self.hold_seconds = dict(HOLD_SECONDS, **(hold_seconds or {}))
+        self.task_foods = {}    # task_definition_id -> food_type (튀김 작업만)
+        self.menu_foods = {}    # menu_item_id -> {food_type: 수량 1개당 단위}
+        self.fry_specs = {}     # food_type -> (workstation_id, 최장 튀김 초, task_type)
+        self.stock = {}         # food_type -> deque([보온 한도 시각, 남은 수량])
+        self.produced = {}
+        self.served = {}
+        self.missed = {}
+        self.wasted = {}
+        self.demand = {}        # (food_type, 분 시작 epoch 초) -> 요청 단위 수 (예측 정확도용)
+        self._ledger = []       # insert_holding_ledger.sql 파라미터
+
+    def load(self, conn):
+        """레시피와 튀김 구역 용량 규칙에서 튀김 작업 → 식품 종류 매핑 생성"""
+        self.recipe_cache.refresh(conn)
+        # 긴 이름 먼저 비교해 부분 일치 오류 방지
+        food_types = sorted({food_type for _, food_type, _ in
+                             conn.execute(load_sql('select_zone_capacity_rules.sql'))},
+                            key=len, reverse=True)
+        self.task_foods = {}
+        self.menu_foods = {}
+        self.fry_specs = {}
+        for menu_item_id, graph in self.recipe_cache.graphs.items():
+            for task_def_id, (task_name, workstation_id, _, seconds, task_type) in graph.tasks.items():
+                food_type = food_type_for_task(task_name, food_types)
+                if food_type is None:
+                    continue
+                self.task_foods[task_def_id] = food_type
+                foods = self.menu_foods.setdefault(menu_item_id, {})
+                foods[food_type] = foods.get(food_type, 0) + 1
+                spec = self.fry_specs.get(food_type)
+                if spec is None or seconds > spec[1]:
+                    self.fry_specs[food_type] = (workstation_id, seconds, task_type)
+        for food_type in self.fry_specs:
+            self.stock.setdefault(food_type, deque())
+        return self
+
+    def hold_for(self, food_type):
+        return self.hold_seconds.get(food_type, DEFAULT_HOLD_SECONDS)
+
+    def available(self, food_type):
+        return sum(count for _, count in self.stock.get(food_type, ()))
+
+    def _evict(self, food_type, now):
+        batches = self.stock[food_type]
+        while batches and batches[0][0] <= now:
+            expires_at, count = batches.popleft()
+            self.wasted[food_type] = self.wasted.get(food_type, 0) + count
+            self._ledger.append((food_type, 'WASTED', count, None, expires_at))
+
+    def evict(self, now):
+        """보온 한도가 지난 묶음을 폐기로 기록"""
+        for food_type in self.stock:
+            self._evict(food_type, now)
+
+    def add(self, food_type, count, now):
+        """지금 튀겨 나온 count 개를 재고에 넣음 (보온 한도 = now + hold_for)"""
+        self.stock.setdefault(food_type, deque()).append([now + self.hold_for(food_type), count])
+        self.produced[food_type] = self.produced.get(food_type, 0) + count
+        self._ledger.append((food_type, 'PRODUCED', count, None, now))
+
+    def take(self, task_definition_id, now):
+        """
+        튀김 작업 하나를 재고로 충당 - 꺼냈으면 식품 종류, 튀김 작업이 아니거나 재고가 없으면 None
+
+        충당한 작업의 기록은 record_served() 로 남긴다 (queue_task_id 는 INSERT 뒤에 정해지므로)
+        """
+        food_type = self.task_foods.get(task_definition_id)
+        if food_type is None:
+            return None
+        key = (food_type, now - now % 60)
+        self.demand[key] = self.demand.get(key, 0) + 1
+        self._evict(food_type, now)
+        batches = self.stock[food_type]
+        if not batches:
+            self.missed[food_type] = self.missed.get(food_type, 0) + 1
+            return None
+        batches[0][1] -= 1
+        if batches[0][1] == 0:
+            batches.popleft()
+        return food_type
+
+    def snapshot(self, now):
+        """
+        take() 전 재고/집계 상태 사본 - 호출자 트랜잭션이 롤백되면 restore() 로 되돌림
+
+        수요 기록은 now 가 속한 분의 항목만 담는다 (take() 는 그 분만 늘리므로)
+        """
+        minute = now - now % 60
+        return (
+            {food_type: deque([list(batch) for batch in batches]) for food_type, batches in self.stock.items()},
+            dict(self.served), dict(self.missed), dict(self.wasted),
+            minute, {food_type: self.demand.get((food_type, minute)) for food_type in self.stock},
+            list(self._ledger))
+
+    def restore(self, state):
+        """snapshot() 시점으로 재고/집계/기록 대기열을 되돌림"""
+        self.stock, self.served, self.missed, self.wasted, minute, demand, self._ledger = state
+        for food_type, count in demand.items():
+            if count is None:
+                self.demand.pop((food_type, minute), None)
+            else:
+                self.demand[(food_type, minute)] = count
+
+    def record_served(self, served_tasks, now):
+        """served_tasks: [(queue_task_id, food_type)] - take() 로 충당한 작업 기록"""
+        for queue_task_id, food_type in served_tasks:
+            self.served[food_type] = self.served.get(food_type, 0) + 1
+            self._ledger.append((food_type, 'SERVED', 1, queue_task_id, now))
+
+    def flush(self, conn):
+        """모인 생산/충당/폐기 기록을 HoldingLedger 에 씀 (호출자 트랜잭션 안에서)"""
+        if self._ledger:
+            conn.executemany(load_sql('insert_holding_ledger.sql'), self._ledger)
+            self._ledger = []
+
+    def metrics(self):
+        """식품별 생산/충당/부족/폐기/재고와 전체 적중률/폐기율"""
+        foods = {}
+        for food_type in sorted(self.fry_specs):
+            served = self.served.get(food_type, 0)
+            missed = self.missed.get(food_type, 0)
+            produced = self.produced.get(food_type, 0)
+            foods[food_type] = {
+                'produced': produced, 'served': served, 'missed': missed,
+                'wasted': self.wasted.get(food_type, 0), 'stock': self.available(food_type),
+                'hit_rate': round(served / (served + missed), 3) if served + missed else 0.0,
+            }
+        served = sum(food['served'] for food in foods.values())
+        requested = served + sum(food['missed'] for food in foods.values())
+        produced = sum(food['produced'] for food in foods.values())
+        wasted = sum(food['wasted'] for food in foods.values())
+        return {
+            'foods': foods,
+            'hit_rate': round(served / requested, 3) if requested else 0.0,
+            'waste_rate': round(wasted / produced, 3) if produced else 0.0,
+        }
+
+class PrefryPlanner:
+    """
+    예측 수요에 맞춰 빈 튀김 자원으로 미리 튀기기
+
+    목표 재고 = 튀겨 나온 뒤 보온 한도 안에 들어올 예상 수요 × cover. 재고와 튀기는 중인 수량을
+    빼고 모자란 만큼을 구역 하나(용량 한도)에 적재한다. 호출자는 주문 작업 할당 뒤에 start() 를
+    불러 남는 자원만 쓰게 하고, 완료 시각에 finish() 를 부른다.
+    """
+
+    def __init__(self, cache, forecaster, allocator, cover=0.8, interval=60):
+        self.cache = cache
+        self.forecaster = forecaster
+        self.allocator = allocator
+        self.cover = cover
+        self.interval = interval
+        self.cooking = {}       # food_type -> 튀기는 중인 수량
+        self._seq = itertools.count(1)
+
+    def plan(self, now):
+        """지금 모자란 [(food_type, 수량)]"""
+        shortages = []
+        for food_type, (_, seconds, _) in sorted(self.cache.fry_specs.items()):
+            expected = self.forecaster.expected(food_type, now + seconds, self.cache.hold_for(food_type))
+            shortage = (int(expected * self.cover) - self.cache.available(food_type)
+                        - self.cooking.get(food_type, 0))
+            if shortage > 0:
+                shortages.append((food_type, shortage))
+        return shortages
+
+    def start(self, now):
+        """
+        모자란 식품을 할당기 여유 자원으로 튀기기 시작 (메모리 연산만)
+
+        반환: [(food_type, 완료 시각, 자원 키 목록)] - 자원이 없는 식품은 빠짐
+        """
+        started = []
+        self.cache.evict(now)
+        for food_type, shortage in self.plan(now):
+            workstation_id, seconds, task_type = self.cache.fry_specs[food_type]
+            keys = self.allocator.reserve(workstation_id, food_type, shortage, seconds,
+                                          task_type == 'ACTIVE', now, ('holding', next(self._seq)))
+            if keys:
+                self.cooking[food_type] = self.cooking.get(food_type, 0) + len(keys)
+                started.append((food_type, now + seconds, keys))
+        return started
+
+    def finish(self, food_type, keys, now):
+        """튀김이 끝난 묶음 - 자원을 돌려주고 재고에 넣음"""
+        for key in keys:
+            self.allocator.release(key)
+        self.cooking[food_type] -= len(keys)
+        self.cache.add(food_type, len(keys), now)
+
+    def metrics(self, start, end):
+        """보온 재고 지표 + 기간 [start, end) 의 예측 정확도"""
+        metrics = self.cache.metrics()
+        metrics['forecast'] = self.forecaster.accuracy(self.cache.demand, start, end)
+        return metrics
@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+"""
+주방 실시간 화면 - 변경 피드(ChangeFeed)로 바뀐 행만 다시 읽어 바뀐 줄만 다시 그림
+
+시작할 때 한 번만 진행 중인 주문/작업과 구역 상태를 전부 읽고, 그 뒤로는
+마지막으로 읽은 change_id 이후 트리거가 남긴 키만 읽어 메모리 뷰에 반영한다.
+조회 비용은 전체 행 수가 아니라 그 사이 바뀐 행 수에 비례하고,
+화면은 내용이 달라진 줄만 커서를 옮겨 덮어쓴다.
+
+사용 예:
+    python kitchen_display.py --db momstouch_complete.db --interval 0.5
+"""
+
+import argparse
+import sys
+import time
+
+from colorama import Fore, init
+
+from dal import connect, load_sql, migrate
+
+STATUS_MARK = {'PENDING': '·', 'QUEUED': '…', 'IN_PROGRESS': '▶', 'COMPLETED': '✓'}
+CLOSED_ORDER_STATUSES = ('COMPLETED', 'CANCELLED')
+
+class KitchenView:
+    """주방 화면 메모리 뷰 - 변경 피드 구간을 적용하고 다시 그릴 키를 돌려줌"""
+
+    def __init__(self, batch_size=5000):
+        self.batch_size = batch_size
+        self.last_change_id = 0
+        self.zones = {}         # zone_id -> (zone_name, food_type, quantity, busy_until)
+        self.orders = {}        # order_id -> (order_number, status)  진행 중인 주문만
+        self.tasks = {}         # queue_task_id -> (order_id, task_name, status, staff_id)  미완료만
+        self.order_tasks = {}   # order_id -> {queue_task_id}
+        self.changes_applied = 0
+        self.reloads = 0
+
+    def load(self, conn):
+        """초기 적재 - 피드 위치를 먼저 읽고 스냅샷을 읽음 (사이 변경은 다음 poll 에서 다시 적용돼도 결과 동일)"""
+        self.zones, self.orders, self.tasks, self.order_tasks = {}, {}, {}, {}
+        self.last_change_id = conn.execute(load_sql('select_change_feed_head.sql')).fetchone()[1]
+        for zone_id, *row in conn.execute(load_sql('select_zone_realtime_state.sql')):
+            self.zones[zone_id] = tuple(row)
+        for order_id, order_number, status in conn.execute(load_sql('select_display_orders.sql')):
+            self.orders[order_id] = (order_number, status)
+        for row in conn.execute(load_sql('select_display_tasks.sql')):
+            self._put_task(row)
+        return self.dirty_all()
+
+    def dirty_all(self):
+        return {('zone', zone_id) for zone_id in self.zones} | {('order', order_id) for order_id in self.orders}
+
+    def poll(self, conn):
+        """
+        마지막 위치 이후 최대 batch_size 개 변경을 적용하고 다시 그릴 키 집합 반환
+
+        읽지 않은 변경이 이미 정리(trim)됐으면 스냅샷을 다시 읽는다.
+        """
+        tail, head = conn.execute(load_sql('select_change_feed_head.sql')).fetchone()
+        if head <= self.last_change_id:
+            return set()
+        if tail > self.last_change_id + 1:
+            stale = self.dirty_all()
+            self.reloads += 1
+            return stale | self.load(conn)
+        after, upto = self.last_change_id, min(head, self.last_change_id + self.batch_size)
+        changed = {}
+        for table_name, row_id in conn.execute(load_sql('select_changed_keys.sql'), (after, upto)):
+            changed.setdefault(table_name, set()).add(row_id)
+        dirty = set()
+
+        if 'ZoneRealtimeState' in changed:
+            for zone_id, *row in conn.execute(load_sql('select_changed_zones.sql'), (after, upto)):
+                self.zones[zone_id] = tuple(row)
+                dirty.add(('zone', zone_id))
+
+        if 'CustomerOrders' in changed:
+            for order_id, order_number, status in conn.execute(load_sql('select_changed_orders.sql'), (after, upto)):
+                if status in CLOSED_ORDER_STATUSES:
+                    self._drop_order(order_id)
+                else:
+                    self.orders[order_id] = (order_number, status)
+                dirty.add(('order', order_id))
+
+        if 'KitchenTaskQueue' in changed:
+            task_ids = changed['KitchenTaskQueue']
+            for row in conn.execute(load_sql('select_changed_tasks.sql'), (after, upto)):
+                task_ids.discard(row[0])
+                if row[3] == 'COMPLETED':
+                    dirty.add(('order', self._drop_task(row[0])))
+                else:
+                    dirty.add(('order', self._put_task(row)))
+            # 결과에 없는 키는 삭제(보관)된 작업
+            for queue_task_id in task_ids:
+                dirty.add(('order', self._drop_task(queue_task_id)))
+
+        self.changes_applied += upto - after
+        self.last_change_id = upto
+        dirty.discard(('order', None))
+        return dirty
+
+    def _put_task(self, row):
+        queue_task_id, order_id, task_name, status, staff_id = row
+        self.tasks[queue_task_id] = (order_id, task_name, status, staff_id)
+        self.order_tasks.setdefault(order_id, set()).add(queue_task_id)
+        return order_id
+
+    def _drop_task(self, queue_task_id):
+        task = self.tasks.pop(queue_task_id, None)
+        if task is None:
+            return None
+        order_id = task[0]
+        remaining = self.order_tasks.get(order_id)
+        if remaining is not None:
+            remaining.discard(queue_task_id)
+            if not remaining:
+                del self.order_tasks[order_id]
+        return order_id
+
+    def _drop_order(self, order_id):
+        self.orders.pop(order_id, None)
+        for queue_task_id in self.order_tasks.pop(order_id, ()):
+            self.tasks.pop(queue_task_id, None)
+
+    def line(self, key):
+        """키 하나의 화면 줄 (사라진 행이면 None)"""
+        kind, row_id = key
+        if kind == 'zone':
+            zone_name, food_type, quantity, busy_until = self.zones[row_id]
+            return f"{zone_name:<14} {food_type:<10} {quantity:>3}개  ~{busy_until}"
+        order = self.orders.get(row_id)
+        if order is None:
+            return None
+        order_number, status = order
+        tasks = sorted((self.tasks[queue_task_id] for queue_task_id in self.order_tasks.get(row_id, ())),
+                       key=lambda task: task[1])
+        steps = ' '.join(f"{STATUS_MARK.get(task_status, '?')}{task_name}"
+                         for _, task_name, task_status, _ in tasks)
+        return f"{order_number:<20} {status:<12} {steps}"
+
+class TerminalRenderer:
+    """
+    줄 단위 부분 갱신 렌더러 - 키마다 화면 줄을 고정하고 내용이 달라진 줄만 덮어씀
+
+    사라진 키의 줄은 지우고 비워 둔 뒤 다음 새 키가 재사용한다.
+    """
+
+    def __init__(self, out=sys.stdout, width=120, top=3):
+        self.out = out
+        self.width = width
+        self.top = top          # 위의 머리글 줄 수
+        self.slots = {}         # key -> 화면 줄 번호
+        self.text = {}          # 화면 줄 번호 -> 그려진 내용
+        self.free = []          # 비워 둔 줄 번호
+        self.next_line = top + 1
+        self.lines_written = 0
+
+    def clear(self):
+        self.out.write("\x1b[2J")
+
+    def _write(self, line_no, text):
+        self.out.write(f"\x1b[{line_no};1H\x1b[2K{text[:self.width]}")
+        self.lines_written += 1
+
+    def header(self, line_no, text):
+        if self.text.get(line_no) != text:
+            self.text[line_no] = text
+            self._write(line_no, text)
+
+    def update(self, lines):
+        """{키: 줄 내용 또는 None} 을 반영하고 다시 그린 줄 수 반환"""
+        written = self.lines_written
+        for key in sorted(lines, key=lambda key: (key[0] != 'zone', key[1])):
+            text = lines[key]
+            line_no = self.slots.get(key)
+            if text is None:
+                if line_no is not None:
+                    del self.slots[key]
+                    del self.text[line_no]
+                    self.free.append(line_no)
+                    self._write(line_no, '')
+                continue
+            if line_no is None:
+                if self.free:
+                    self.free.sort(reverse=True)
+                    line_no = self.free.pop()
+                else:
+                    line_no = self.next_line
+                    self.next_line += 1
+                self.slots[key] = line_no
+            if self.text.get(line_no) != text:
+                self.text[line_no] = text
+                self._write(line_no, text)
+        self.out.write(f"\x1b[{self.next_line};1H")
+        self.out.flush()
+        return self.lines_written - written
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="변경 피드 기반 주방 실시간 화면")
+    parser.add_argument('--db', default='momstouch_complete.db', help="표시할 DB 파일")
+    parser.add_argument('--interval', type=float, default=0.5, help="변경 피드 확인 간격(초)")
+    parser.add_argument('--batch-size', type=int, default=5000, help="한 번에 적용할 최대 변경 수")
+    parser.add_argument('--width', type=int, default=120, help="화면 폭(글자)")
+    return parser.parse_args()
+
+def main():
+    init()
+    args = parse_args()
+    conn = connect(args.db)
+    migrate(conn)
+    conn.execute("PRAGMA query_only = 1")
+    view = KitchenView(args.batch_size)
+    renderer = TerminalRenderer(width=args.width)
+    renderer.clear()
+    renderer.header(1, Fore.CYAN + "🍔 주방 실시간 화면 (Ctrl+C 종료)" + Fore.RESET)
+    dirty = view.load(conn)
+    try:
+        while True:
+            started = time.perf_counter()
+            written = renderer.update({key: view.line(key) for key in dirty})
+            elapsed = (time.perf_counter() - started) * 1000
+            renderer.header(2, f"주문 {len(view.orders)}건 · 작업 {len(view.tasks)}건 · "
+                               f"change_id {view.last_change_id} · 갱신 {written}줄 ({elapsed:.1f}ms)")
+            time.sleep(args.interval)
+            dirty = view.poll(conn)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        conn.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
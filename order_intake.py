@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+"""
+주문 접수 API - 여러 주문을 하나의 트랜잭션으로 일괄 저장 (그룹 커밋)
+"""
+
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+
+from dal import connect, load_sql, transaction
+from recipe_graph import RecipeGraphCache
+from tracing import traced
+
+def _menu_prices(conn):
+    """메뉴 ID -> (이름, 가격) 사전"""
+    rows = conn.execute("SELECT menu_item_id, name, price FROM MenuItems").fetchall()
+    return {mid: (name, price) for mid, name, price in rows}
+
+@traced('intake')
+def place_orders(conn, orders, recipe_cache=None, created_at=None):
+    """
+    주문 묶음 접수 - executemany + 단일 트랜잭션
+
+    orders: [{'name': 'ORD-001', 'items': [(menu_item_id, quantity), ...]}, ...]
+    recipe_cache: RecipeGraphCache 를 넘기면 작업 시간 직렬 합계 대신 레시피 임계 경로와
+                  작업장별 (앞 주문 + 자기 주문) 부하 / 인원 기반 예상치를 estimated_seconds_remaining 에 기록
+    created_at: 주문 생성 시각 (정수 epoch 초), 생략하면 현재 시각 (시뮬레이션용)
+    반환: 주문 순서대로 영수증 목록
+          {'order_id', 'order_number', 'items': [(메뉴명, 수량, 소계)], 'total_price',
+           'work_seconds', 'eta_seconds'}
+          eta_seconds 는 estimated_seconds_remaining 값 (앞 주문 남은 시간 + 자기 주문)
+    """
+    if not orders:
+        return []
+
+    menu_dict = _menu_prices(conn)
+    for order_info in orders:
+        for menu_id, qty in order_info['items']:
+            if menu_id not in menu_dict:
+                raise ValueError(f"존재하지 않는 메뉴 ID: {menu_id}")
+            if qty < 1:
+                raise ValueError(f"잘못된 수량: {qty}")
+
+    insert_order_sql = load_sql('insert_order.sql')
+    insert_order_item_sql = load_sql('insert_order_item.sql')
+
+    # 쓰기 잠금(BEGIN IMMEDIATE)을 먼저 잡아 이 배치의 order_id 가 연속으로 발급되도록 함
+    with transaction(conn):
+        last_id = conn.execute(
+            "SELECT COALESCE(MAX(order_id), 0) FROM CustomerOrders").fetchone()[0]
+        if recipe_cache is not None:
+            # 이 배치보다 앞선 주문의 작업장별 남은 작업 (트리거로 유지, INSERT 전에 작업장 수만큼 읽음)
+            queued = dict(conn.execute(load_sql('select_station_workload.sql')))
+        conn.executemany(insert_order_sql, [(o['name'], created_at) for o in orders])
+        order_ids = [row[0] for row in conn.execute(
+            "SELECT order_id FROM CustomerOrders WHERE order_id > ? ORDER BY order_id",
+            (last_id,))]
+
+        conn.executemany(insert_order_item_sql, [
+            (order_id, menu_id, qty)
+            for order_id, order_info in zip(order_ids, orders)
+            for menu_id, qty in order_info['items']
+        ])
+
+        # 트리거가 유지한 작업 시간/예상 대기 시간을 범위 조회 한 번으로 읽음
+        eta_rows = {order_id: (work, eta) for order_id, work, eta in conn.execute("""
+            SELECT order_id, remaining_work_seconds, COALESCE(estimated_seconds_remaining, 0)
+            FROM CustomerOrders WHERE order_id > ?
+        """, (last_id,))}
+
+        if recipe_cache is not None:
+            # 앞선 주문의 남은 작업을 작업장별로 나눠 인원(슬롯) 수로 나눔 - 전체 직렬 합계 대신
+            recipe_cache.refresh(conn)
+            for order_id, order_info in zip(order_ids, orders):
+                work = eta_rows[order_id][0]
+                eta_rows[order_id] = (work, recipe_cache.estimate_seconds(order_info['items'], queued))
+                for workstation_id, seconds in recipe_cache.workstation_load(order_info['items']).items():
+                    queued[workstation_id] = queued.get(workstation_id, 0) + seconds
+            conn.executemany(load_sql('update_order_eta.sql'),
+                             [(eta, order_id) for order_id, (_, eta) in eta_rows.items()])
+
+    receipts = []
+    for order_id, order_info in zip(order_ids, orders):
+        lines = []
+        total_price = 0
+        for menu_id, qty in order_info['items']:
+            menu_name, price = menu_dict[menu_id]
+            subtotal = price * qty
+            total_price += subtotal
+            lines.append((menu_name, qty, subtotal))
+        receipts.append({
+            'order_id': order_id,
+            'order_number': order_info['name'],
+            'items': lines,
+            'total_price': total_price,
+            'work_seconds': eta_rows[order_id][0],
+            'eta_seconds': eta_rows[order_id][1],
+        })
+    return receipts
+
+def commit_order_batch(conn, orders, recipe_cache=None, created_at=None, then=None):
+    """
+    그룹 커밋 한 번 - 주문 묶음을 한 트랜잭션으로 접수, 잘못된 주문이 섞여 있으면 주문마다 따로 접수
+
+    then(conn): 같은 트랜잭션에서 이어서 실행할 쓰기 (예: 작업 큐 전개), 커밋은 한 번
+    반환: 주문 순서대로 영수증 또는 그 주문의 예외
+          묶음 트랜잭션의 잠금 실패 등 배치 전체의 오류는 그대로 올라감
+    """
+    try:
+        with transaction(conn):
+            receipts = place_orders(conn, orders, recipe_cache, created_at)
+            if then is not None:
+                then(conn)
+        return receipts
+    except (sqlite3.IntegrityError, ValueError):
+        # 잘못된 주문 하나가 배치 전체를 실패시키지 않도록 개별 재시도
+        results = []
+        for order_info in orders:
+            try:
+                with transaction(conn):
+                    receipt = place_orders(conn, [order_info], recipe_cache, created_at)[0]
+                    if then is not None:
+                        then(conn)
+                results.append(receipt)
+            except Exception as e:
+                results.append(e)
+        return results
+
+def cancel_order(conn, order_id):
+    """
+    주문 취소 - 남은 작업 시간은 트리거가 큐 전체/작업장별 합계에서 제외
+
+    같은 트랜잭션에서 아직 시작하지 않은(QUEUED) 작업을 지워 워커/할당기가 가져가지 않게 하고,
+    아직 전개되지 않은 항목은 전개 쿼리가 건너뛴다. 자원이 잡힌/진행 중인 작업은 끝까지 진행된다.
+    """
+    with transaction(conn):
+        conn.execute(load_sql('update_order_status.sql'), ('CANCELLED', order_id))
+        conn.execute(load_sql('delete_order_queued_tasks.sql'), (order_id,))
+
+def get_wait_time(conn, order_id):
+    """주문의 (예상 대기 시간, 남은 작업 시간, 큐 전체 남은 시간) 조회 - O(1)"""
+    return conn.execute(load_sql('calculate_wait_time.sql'), (order_id,)).fetchone()
+
+class GroupCommitWriter:
+    """
+    여러 POS 단말의 주문을 모아 한 번에 커밋하는 단일 writer 스레드
+
+    submit() 은 Future 를 돌려주며, 첫 주문이 도착한 뒤 window_seconds 동안
+    (또는 max_batch 개가 찰 때까지) 들어온 주문을 place_orders() 한 번으로 저장한다.
+    """
+
+    def __init__(self, db_path, max_batch=500, window_seconds=0.005):
+        self.db_path = db_path
+        self.max_batch = max_batch
+        self.window_seconds = window_seconds
+        self._queue = queue.Queue()
+        self._recipes = RecipeGraphCache()
+        self._thread = threading.Thread(target=self._run, name="order-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, order_info):
+        """주문 하나를 writer 에 넘기고 영수증 Future 반환"""
+        future = Future()
+        self._queue.put((order_info, future))
+        return future
+
+    def close(self):
+        """남은 주문을 모두 커밋한 뒤 writer 종료"""
+        self._queue.put(None)
+        self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _collect_batch(self, first):
+        batch = [first]
+        deadline = time.monotonic() + self.window_seconds
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _commit_batch(self, conn, batch):
+        try:
+            results = commit_order_batch(conn, [order_info for order_info, _ in batch], self._recipes)
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+        else:
+            for (_, future), result in zip(batch, results):
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+    def _run(self):
+        conn = connect(self.db_path)
+        try:
+            stop = False
+            while not stop:
+                item = self._queue.get()
+                if item is None:
+                    break
+                batch, stop = self._collect_batch(item)
+                self._commit_batch(conn, batch)
+        finally:
+            conn.close()
@@ -0,0 +1,287 @@
+# -*- coding: utf-8 -*-
+"""
+POS 주문 접수 서버 - asyncio 줄 단위 JSON 프로토콜, 단일 writer 의 그룹 커밋
+
+POS/키오스크 단말은 TCP(또는 Unix 소켓)로 한 줄에 주문 하나를 JSON 으로 보내고,
+같은 연결로 주문 번호와 예상 대기 시간을 한 줄로 받는다. 연결마다 스레드를 만들지 않고
+이벤트 루프 하나가 모든 연결을 처리한다.
+
+모든 쓰기는 writer 태스크 하나를 거친다. writer 는 큐에 쌓인 주문을 한꺼번에 꺼내
+commit_order_batch() 로 주문 INSERT 와 작업 큐 전개를 트랜잭션 하나(커밋 한 번)로 저장한다.
+SQLite 호출은 전용 스레드 하나에서 돌아 이벤트 루프를 막지 않고, 커밋하는 동안 들어온
+주문은 다음 배치로 모이므로 부하가 커질수록 배치가 커진다(별도 대기 창 없음).
+서버가 떠 있는 동안 ArchiveCompactor 가 완료 주문 보관과 변경 피드 정리를 주기적으로 실행한다.
+
+요청:  {"items": [[menu_item_id, quantity], ...], "name": "선택, 생략하면 서버가 order_id 로 발급"}
+       서버 발급 번호(POS-)와 겹치지 않도록 POS- 로 시작하는 name 은 받지 않는다.
+응답:  {"ok": true, "order_id": 1, "order_number": "POS-000001", "eta_seconds": 420, "total_price": 12000}
+       {"ok": false, "error": "존재하지 않는 메뉴 ID: 99"}
+
+사용 예:
+    python pos_server.py --db momstouch_complete.db --port 8765
+    python pos_server.py --db pos_bench.db --fresh --bench-connections 500 --bench-orders 20000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from tabulate import tabulate
+from colorama import Fore, init
+
+from archive import ArchiveCompactor
+from dal import connect, create_database, load_sql, migrate
+from order_intake import commit_order_batch
+from recipe_graph import RecipeGraphCache
+from simulation import percentile
+from task_queue import expand_new_order_items
+
+POS_PREFIX = 'POS-'
+
+def pos_order_number(order_id):
+    """이름 없이 온 주문의 번호 (update_pos_order_numbers.sql 과 같은 형식)"""
+    return f"{POS_PREFIX}{order_id:06d}"
+
+class OrderWriter:
+    """
+    단일 writer - 주문을 asyncio 큐로 받아 모인 만큼 한 번에 커밋
+
+    DB 연결은 전용 스레드 하나(ThreadPoolExecutor max_workers=1)에서만 만들고 쓴다.
+    expand 면 같은 트랜잭션에서 새 주문 항목을 작업 큐로 전개한다 (작업장 워커가 바로 가져감).
+    """
+
+    def __init__(self, db_path, max_batch=1000, max_pending=10000, expand=True):
+        self.db_path = db_path
+        self.max_batch = max_batch
+        self.expand = expand
+        self.queue = asyncio.Queue(max_pending)
+        self.recipe_cache = RecipeGraphCache()
+        self.batches = 0
+        self.orders = 0
+        self.largest_batch = 0
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='order-writer')
+        self._conn = None
+        self._task = None
+
+    async def start(self):
+        await asyncio.get_running_loop().run_in_executor(self._executor, self._open)
+        self._task = asyncio.create_task(self._run(), name='order-writer')
+        return self
+
+    def _open(self):
+        self._conn = connect(self.db_path)
+        migrate(self._conn)
+        self.recipe_cache.refresh(self._conn)
+
+    async def submit(self, order_info):
+        """주문 하나를 writer 큐에 넣고 커밋될 때까지 기다려 영수증 반환 (큐가 차면 자리가 날 때까지 대기)"""
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((order_info, future))
+        return await future
+
+    def _then(self, conn):
+        """주문 INSERT 와 같은 트랜잭션 - 이름 없는 주문 번호 발급, 작업 큐 전개"""
+        conn.execute(load_sql('update_pos_order_numbers.sql'))
+        if self.expand:
+            expand_new_order_items(conn, self.recipe_cache)
+
+    def _commit(self, orders):
+        results = commit_order_batch(self._conn, orders, self.recipe_cache, then=self._then)
+        for result in results:
+            if not isinstance(result, Exception) and result['order_number'] is None:
+                result['order_number'] = pos_order_number(result['order_id'])
+        return results
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stop = False
+        while not stop:
+            item = await self.queue.get()
+            if item is None:
+                break
+            batch = [item]
+            while len(batch) < self.max_batch and not self.queue.empty():
+                item = self.queue.get_nowait()
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            try:
+                results = await loop.run_in_executor(
+                    self._executor, self._commit, [order_info for order_info, _ in batch])
+            except Exception as e:
+                results = [e] * len(batch)
+            self.batches += 1
+            self.orders += len(batch)
+            self.largest_batch = max(self.largest_batch, len(batch))
+            for (_, future), result in zip(batch, results):
+                if future.cancelled():
+                    continue    # 응답 전에 끊긴 연결 (주문은 이미 저장됨)
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+    async def close(self):
+        """큐에 남은 주문을 모두 커밋한 뒤 writer 와 연결 종료"""
+        if self._task is not None:
+            await self.queue.put(None)
+            await self._task
+        if self._conn is not None:
+            await asyncio.get_running_loop().run_in_executor(self._executor, self._conn.close)
+        self._executor.shutdown()
+
+def parse_order(line):
+    """요청 한 줄 -> order_info (형식이 틀리거나 name 이 서버 발급 번호 형식이면 ValueError)"""
+    request = json.loads(line)
+    items = request.get('items') if isinstance(request, dict) else None
+    if not items:
+        raise ValueError("items 가 비어 있습니다")
+    try:
+        items = [(int(menu_item_id), int(quantity)) for menu_item_id, quantity in items]
+    except (TypeError, ValueError):
+        raise ValueError("items 는 [[menu_item_id, quantity], ...] 형식이어야 합니다") from None
+    name = request.get('name')
+    if name and str(name).startswith(POS_PREFIX):
+        raise ValueError(f"{POS_PREFIX} 로 시작하는 주문 번호는 서버가 발급합니다")
+    return {'name': str(name) if name else None, 'items': items}
+
+class PosServer:
+    """연결마다 코루틴 하나 - 줄을 읽어 writer 에 넘기고 영수증을 같은 순서로 돌려줌"""
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.connections = 0
+        self.peak_connections = 0
+
+    async def handle(self, reader, stream):
+        self.connections += 1
+        self.peak_connections = max(self.peak_connections, self.connections)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    receipt = await self.writer.submit(parse_order(line))
+                    reply = {'ok': True, 'order_id': receipt['order_id'],
+                             'order_number': receipt['order_number'],
+                             'eta_seconds': receipt['eta_seconds'], 'total_price': receipt['total_price']}
+                except Exception as e:
+                    reply = {'ok': False, 'error': str(e)}
+                stream.write(json.dumps(reply, ensure_ascii=False).encode() + b'\n')
+                await stream.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.connections -= 1
+            stream.close()
+
+    async def listen(self, host='127.0.0.1', port=8765, unix_path=None):
+        if unix_path:
+            return await asyncio.start_unix_server(self.handle, path=unix_path)
+        return await asyncio.start_server(self.handle, host, port, backlog=1024)
+
+async def run_load(connect_stream, menu_item_ids, connections, orders, seed=42):
+    """
+    connections 개 동시 연결이 orders 건을 나눠 한 건씩 보내고 응답을 기다림
+
+    반환: (요청별 왕복 지연 초 목록, 실패 응답 수, 경과 초)
+    """
+    latencies, failures = [], []
+
+    async def client(index, count):
+        reader, stream = await connect_stream()
+        for n in range(count):
+            menu_item_id = menu_item_ids[(seed + index * 7 + n) % len(menu_item_ids)]
+            request = {'items': [[menu_item_id, 1 + (index + n) % 2]]}
+            started = time.perf_counter()
+            stream.write(json.dumps(request).encode() + b'\n')
+            await stream.drain()
+            reply = json.loads(await reader.readline())
+            latencies.append(time.perf_counter() - started)
+            if not reply['ok']:
+                failures.append(reply['error'])
+        stream.close()
+
+    per_client, extra = divmod(orders, connections)
+    started = time.perf_counter()
+    await asyncio.gather(*(client(i, per_client + (i < extra)) for i in range(connections)))
+    return sorted(latencies), len(failures), time.perf_counter() - started
+
+async def serve(args):
+    writer = await OrderWriter(args.db, args.max_batch, expand=not args.no_expand).start()
+    compactor = None
+    if args.archive_interval > 0:
+        compactor = ArchiveCompactor(args.db, args.archive_interval, feed_keep=args.feed_keep)
+    server = PosServer(writer)
+    listener = await server.listen(args.host, args.port, args.unix)
+    where = args.unix or f"{args.host}:{args.port}"
+    try:
+        if not args.bench_connections:
+            print(Fore.CYAN + f"🧾 주문 접수 서버 {where} (Ctrl+C 종료)")
+            async with listener:
+                await listener.serve_forever()
+            return 0
+
+        if args.unix:
+            connect_stream = lambda: asyncio.open_unix_connection(args.unix)
+        else:
+            connect_stream = lambda: asyncio.open_connection(args.host, args.port)
+        menu_item_ids = [menu_item_id for menu_item_id in sorted(writer.recipe_cache.graphs)]
+        print(Fore.CYAN + f"🧾 동시 연결 {args.bench_connections}개로 주문 {args.bench_orders}건 전송 중 ({where})")
+        latencies, failures, elapsed = await run_load(connect_stream, menu_item_ids,
+                                                      args.bench_connections, args.bench_orders)
+        rows = [
+            ['주문', f"{len(latencies)}건 (실패 {failures})"],
+            ['처리량', f"{len(latencies) / elapsed:,.0f} 주문/초"],
+            ['지연 p50 / p99', f"{percentile(latencies, 50) * 1000:.1f}ms / {percentile(latencies, 99) * 1000:.1f}ms"],
+            ['그룹 커밋', f"{writer.batches}회 (평균 {writer.orders / max(writer.batches, 1):.0f}건, 최대 {writer.largest_batch}건)"],
+            ['최대 동시 연결', server.peak_connections],
+        ]
+        if compactor is not None:
+            rows.append(['보관', f"주문 {compactor.totals['orders']}건 / 피드 정리 {compactor.totals['feed_trimmed']}행"])
+        print(tabulate(rows, tablefmt='github'))
+        return 1 if failures else 0
+    finally:
+        listener.close()
+        await listener.wait_closed()
+        await writer.close()
+        if compactor is not None:
+            compactor.close()
+        if args.unix and os.path.exists(args.unix):
+            os.remove(args.unix)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="asyncio POS 주문 접수 서버 (단일 writer 그룹 커밋)")
+    parser.add_argument('--db', default='momstouch_complete.db', help="주문을 저장할 DB 파일")
+    parser.add_argument('--fresh', action='store_true', help="DB 를 템플릿에서 새로 만들고 시작")
+    parser.add_argument('--host', default='127.0.0.1', help="TCP 주소")
+    parser.add_argument('--port', type=int, default=8765, help="TCP 포트")
+    parser.add_argument('--unix', help="TCP 대신 쓸 Unix 소켓 경로")
+    parser.add_argument('--max-batch', type=int, default=1000, help="그룹 커밋 한 번의 최대 주문 수")
+    parser.add_argument('--no-expand', action='store_true', help="접수만 하고 작업 큐 전개는 하지 않음")
+    parser.add_argument('--archive-interval', type=float, default=30.0,
+                        help="완료 주문 보관/변경 피드 정리 주기(초), 0 이면 끔")
+    parser.add_argument('--feed-keep', type=int, default=100000, help="변경 피드에 남길 최근 변경 수")
+    parser.add_argument('--bench-connections', type=int, default=0,
+                        help="서버를 띄운 채로 이 수만큼 동시 연결로 부하를 주고 지연을 출력")
+    parser.add_argument('--bench-orders', type=int, default=10000, help="부하 테스트 주문 수")
+    return parser.parse_args()
+
+def main():
+    init(autoreset=True)
+    args = parse_args()
+    if args.fresh:
+        create_database(args.db).close()
+    try:
+        return asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,38 @@
+-- 작업장 워커가 실행 가능 작업 하나를 원자적으로 가져감 (UPDATE 한 문장이라 두 워커가 같은 작업을 잡을 수 없음)
+-- 후보: 먼저 생성된 순(idx_queue_priority 순서라 첫 실행 가능 작업에서 멈춤)으로 QUEUED 이고, 자원 계획에 있는(지금 자원이 있는) 작업 정의이며, 같은 수량 단위의 선행 작업이 모두 완료된 작업
+-- 같은 주문 항목 안에서 같은 작업 정의의 k 번째 행끼리 수량 k 번째 단위로 본다 (ReadyQueue 와 같은 규칙)
+-- Parameters: workstation_id, 자원 계획 JSON, 자원 계획 JSON, actual_start_time (NULL 이면 현재 시각), 자원 계획 JSON
+--   자원 계획 JSON: {"task_definition_id": [zone_id, staff_id], ...}
+UPDATE KitchenTaskQueue
+SET
+    status = 'IN_PROGRESS',
+    assigned_workstation_id = ?,
+    assigned_zone_id = json_extract(?, '$."' || task_definition_id || '"[0]'),
+    assigned_staff_id = json_extract(?, '$."' || task_definition_id || '"[1]'),
+    actual_start_time = COALESCE(?, CAST(strftime('%s', 'now') AS INTEGER))
+WHERE queue_task_id = (
+    SELECT KTQ.queue_task_id
+    FROM KitchenTaskQueue KTQ
+    WHERE KTQ.status = 'QUEUED'
+      AND KTQ.task_definition_id IN (SELECT CAST(key AS INTEGER) FROM json_each(?))
+      AND NOT EXISTS (
+          SELECT 1
+          FROM TaskDependencies TD
+          JOIN KitchenTaskQueue PRE
+            ON PRE.order_item_id = KTQ.order_item_id
+           AND PRE.task_definition_id = TD.depends_on_task_id
+          WHERE TD.task_id = KTQ.task_definition_id
+            AND PRE.status <> 'COMPLETED'
+            AND (SELECT COUNT(*) FROM KitchenTaskQueue UNIT
+                 WHERE UNIT.order_item_id = PRE.order_item_id
+                   AND UNIT.task_definition_id = PRE.task_definition_id
+                   AND UNIT.queue_task_id < PRE.queue_task_id)
+              = (SELECT COUNT(*) FROM KitchenTaskQueue UNIT
+                 WHERE UNIT.order_item_id = KTQ.order_item_id
+                   AND UNIT.task_definition_id = KTQ.task_definition_id
+                   AND UNIT.queue_task_id < KTQ.queue_task_id)
+      )
+    ORDER BY KTQ.created_at, KTQ.queue_task_id
+    LIMIT 1
+)
+RETURNING queue_task_id, task_definition_id, order_item_id;
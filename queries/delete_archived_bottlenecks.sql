@@ -0,0 +1,9 @@
+-- 이력으로 옮긴 병목 기록 삭제
+-- Parameters: order_id
+DELETE FROM BottleneckAnalysis
+WHERE queue_task_id IN (
+    SELECT KTQ.queue_task_id
+    FROM OrderItems OI
+    JOIN KitchenTaskQueue KTQ ON KTQ.order_item_id = OI.order_item_id
+    WHERE OI.order_id = ?
+);
@@ -0,0 +1,8 @@
+-- 이력으로 옮긴 작업 삭제
+-- Parameters: order_id
+DELETE FROM KitchenTaskQueue
+WHERE order_item_id IN (
+    SELECT order_item_id
+    FROM OrderItems
+    WHERE order_id = ?
+);
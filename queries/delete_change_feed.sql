@@ -0,0 +1,4 @@
+-- 오래된 변경 기록 정리 (최근 keep_changes 개만 남김)
+-- Parameters: keep_changes
+DELETE FROM ChangeFeed
+WHERE change_id <= (SELECT MAX(change_id) FROM ChangeFeed) - ?;
@@ -0,0 +1,5 @@
+-- 취소된 주문의 아직 시작하지 않은 작업 삭제 (자원이 잡힌/진행 중인 작업은 그대로 끝까지)
+-- Parameters: order_id
+DELETE FROM KitchenTaskQueue
+WHERE status = 'QUEUED'
+AND order_item_id IN (SELECT order_item_id FROM OrderItems WHERE order_id = ?);
@@ -0,0 +1,4 @@
+-- 스태프의 작업장 배치 삭제 (재배치 전)
+-- Parameters: staff_id
+DELETE FROM StaffAssignment
+WHERE staff_id = ?;
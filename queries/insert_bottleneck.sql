@@ -1,6 +1,7 @@
 -- 병목 분석 데이터 삽입
--- Parameters: queue_task_id, bottleneck_type, wait_duration_seconds, problematic_workstation_id
+-- Parameters: queue_task_id, bottleneck_type, wait_duration_seconds, problematic_workstation_id,
+--             recorded_at (NULL 이면 현재 시각)
 INSERT INTO BottleneckAnalysis (
     queue_task_id, bottleneck_type, wait_duration_seconds,
     problematic_workstation_id, recorded_at
-) VALUES (?, ?, ?, ?, datetime('now', 'localtime'));
+) VALUES (?, ?, ?, ?, COALESCE(?, CAST(strftime('%s', 'now') AS INTEGER)));
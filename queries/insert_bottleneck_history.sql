@@ -0,0 +1,8 @@
+-- 주문 작업의 병목 기록을 이력 테이블로 복사
+-- Parameters: order_id
+INSERT INTO BottleneckHistory
+SELECT BA.*
+FROM OrderItems OI
+JOIN KitchenTaskQueue KTQ ON KTQ.order_item_id = OI.order_item_id
+JOIN BottleneckAnalysis BA ON BA.queue_task_id = KTQ.queue_task_id
+WHERE OI.order_id = ?;
@@ -0,0 +1,4 @@
+-- 보온 재고 입출 기록 추가
+-- Parameters: food_type, event, quantity, queue_task_id, recorded_at
+INSERT INTO HoldingLedger (food_type, event, quantity, queue_task_id, recorded_at)
+VALUES (?, ?, ?, ?, ?);
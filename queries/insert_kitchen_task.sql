@@ -1,5 +1,5 @@
 -- 주방 작업 큐에 작업 추가
--- Parameters: order_item_id, task_definition_id
+-- Parameters: order_item_id, task_definition_id, created_at (NULL 이면 현재 시각)
 INSERT INTO KitchenTaskQueue (
     order_item_id, task_definition_id, status, created_at
-) VALUES (?, ?, 'QUEUED', datetime('now', 'localtime'));
+) VALUES (?, ?, 'QUEUED', COALESCE(?, CAST(strftime('%s', 'now') AS INTEGER)));
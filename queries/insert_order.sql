@@ -1,4 +1,4 @@
 -- 고객 주문 생성
--- Parameters: order_number, status, created_at
+-- Parameters: order_number, created_at (NULL 이면 현재 시각)
 INSERT INTO CustomerOrders (order_number, status, created_at)
-VALUES (?, 'PENDING', datetime('now', 'localtime'));
+VALUES (?, 'PENDING', COALESCE(?, CAST(strftime('%s', 'now') AS INTEGER)));
@@ -0,0 +1,4 @@
+-- 스태프 추가
+-- Parameters: name, status
+INSERT INTO Staff (name, status)
+VALUES (?, ?);
@@ -0,0 +1,4 @@
+-- 스태프를 작업장에 배치
+-- Parameters: staff_id, workstation_id, assigned_at (NULL 이면 현재 시각)
+INSERT INTO StaffAssignment (staff_id, workstation_id, assigned_at)
+VALUES (?, ?, COALESCE(?, CAST(strftime('%s', 'now') AS INTEGER)));
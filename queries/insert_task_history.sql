@@ -0,0 +1,8 @@
+-- 주문의 작업을 이력 테이블로 복사 (취소 주문의 시작하지 않은 작업은 옮기지 않고 삭제만 됨)
+-- Parameters: order_id
+INSERT INTO KitchenTaskHistory
+SELECT KTQ.*
+FROM OrderItems OI
+JOIN KitchenTaskQueue KTQ ON KTQ.order_item_id = OI.order_item_id
+WHERE OI.order_id = ?
+AND KTQ.status <> 'QUEUED';
@@ -0,0 +1,4 @@
+-- 작업장에 구역 추가
+-- Parameters: workstation_id, zone_name
+INSERT INTO WorkstationZones (workstation_id, zone_name)
+VALUES (?, ?);
@@ -0,0 +1,6 @@
+-- 새 구역에 같은 작업장 첫 구역의 용량 규칙을 복사
+-- Parameters: zone_id (새 구역), workstation_id
+INSERT INTO ZoneCapacityRules (zone_id, food_type, max_quantity)
+SELECT ?, food_type, max_quantity
+FROM ZoneCapacityRules
+WHERE zone_id = (SELECT MIN(zone_id) FROM WorkstationZones WHERE workstation_id = ?);
@@ -0,0 +1,4 @@
+-- 새 구역의 실시간 상태 행 (비어 있음)
+-- Parameters: zone_id
+INSERT INTO ZoneRealtimeState (zone_id, current_food_type, current_quantity, busy_until)
+VALUES (?, NULL, 0, NULL);
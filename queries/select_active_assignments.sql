@@ -0,0 +1,4 @@
+-- 진행 중인 작업의 자원 할당 현황 (할당기 초기 적재용)
+SELECT queue_task_id, assigned_workstation_id, assigned_zone_id, assigned_staff_id
+FROM KitchenTaskQueue
+WHERE status IN ('WAITING_RESOURCE', 'IN_PROGRESS');
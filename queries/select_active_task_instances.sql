@@ -0,0 +1,12 @@
+-- 완료되지 않은 작업이 남은 주문 항목의 모든 작업 (준비 큐 초기 적재용, 우선순위 정책용 주문 접수 시각/ETA 포함)
+SELECT KTQ.queue_task_id, KTQ.order_item_id, KTQ.task_definition_id, OI.menu_item_id, KTQ.status,
+       OI.order_id, CO.created_at, COALESCE(CO.estimated_seconds_remaining, 0)
+FROM KitchenTaskQueue KTQ
+JOIN OrderItems OI ON KTQ.order_item_id = OI.order_item_id
+JOIN CustomerOrders CO ON OI.order_id = CO.order_id
+WHERE KTQ.order_item_id IN (
+    SELECT order_item_id
+    FROM KitchenTaskQueue
+    WHERE status <> 'COMPLETED'
+)
+ORDER BY KTQ.order_item_id, KTQ.queue_task_id;
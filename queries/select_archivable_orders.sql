@@ -0,0 +1,19 @@
+-- 이력으로 옮길 끝난 주문
+-- 완료 주문: 핫 테이블에 COMPLETED 작업이 남아 있고 미완료 작업은 없는 주문
+-- 취소 주문: 자원이 잡혔거나 진행 중인 작업이 없는 주문 (시작하지 않은 QUEUED 작업은 보관 때 버림)
+-- Parameters: limit
+SELECT DISTINCT OI.order_id
+FROM KitchenTaskQueue KTQ
+JOIN OrderItems OI ON KTQ.order_item_id = OI.order_item_id
+JOIN CustomerOrders CO ON OI.order_id = CO.order_id
+WHERE KTQ.status IN ('COMPLETED', 'QUEUED')
+AND CO.status IN ('COMPLETED', 'CANCELLED')
+AND NOT EXISTS (
+    SELECT 1
+    FROM OrderItems OI2
+    JOIN KitchenTaskQueue KTQ2 ON KTQ2.order_item_id = OI2.order_item_id
+    WHERE OI2.order_id = OI.order_id
+    AND (KTQ2.status IN ('WAITING_RESOURCE', 'IN_PROGRESS')
+         OR (KTQ2.status = 'QUEUED' AND CO.status = 'COMPLETED'))
+)
+LIMIT ?;
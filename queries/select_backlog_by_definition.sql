@@ -0,0 +1,5 @@
+-- 작업 정의별 미완료 작업 수 (스태프 재배치의 남은 부하)
+SELECT task_definition_id, COUNT(*)
+FROM KitchenTaskQueue
+WHERE status <> 'COMPLETED'
+GROUP BY task_definition_id;
@@ -1,4 +1,4 @@
--- 병목 유형별 통계
+-- 병목 유형별 통계 (핫 + 이력)
 SELECT bottleneck_type, COUNT(*) as count, SUM(wait_duration_seconds) as total_wait
-FROM BottleneckAnalysis
+FROM BottleneckAll
 GROUP BY bottleneck_type;
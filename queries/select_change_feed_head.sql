@@ -0,0 +1,4 @@
+-- 변경 피드에 남아 있는 첫/마지막 change_id
+SELECT
+    COALESCE((SELECT MIN(change_id) FROM ChangeFeed), 0),
+    COALESCE((SELECT MAX(change_id) FROM ChangeFeed), 0);
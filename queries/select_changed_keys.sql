@@ -0,0 +1,5 @@
+-- 구간 안에서 바뀐 행의 (테이블, 키)
+-- Parameters: after_change_id, upto_change_id
+SELECT DISTINCT table_name, row_id
+FROM ChangeFeed
+WHERE change_id > ? AND change_id <= ?;
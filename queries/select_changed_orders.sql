@@ -0,0 +1,10 @@
+-- 구간 안에서 바뀐 주문의 현재 값
+-- Parameters: after_change_id, upto_change_id
+SELECT order_id, order_number, status
+FROM CustomerOrders
+WHERE order_id IN (
+    SELECT row_id
+    FROM ChangeFeed
+    WHERE change_id > ? AND change_id <= ?
+    AND table_name = 'CustomerOrders'
+);
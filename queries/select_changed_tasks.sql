@@ -0,0 +1,12 @@
+-- 구간 안에서 바뀐 작업의 현재 값 (삭제된 작업은 나오지 않음)
+-- Parameters: after_change_id, upto_change_id
+SELECT KTQ.queue_task_id, OI.order_id, MT.task_name, KTQ.status, KTQ.assigned_staff_id
+FROM KitchenTaskQueue KTQ
+JOIN OrderItems OI ON KTQ.order_item_id = OI.order_item_id
+JOIN MenuTasks MT ON KTQ.task_definition_id = MT.task_definition_id
+WHERE KTQ.queue_task_id IN (
+    SELECT row_id
+    FROM ChangeFeed
+    WHERE change_id > ? AND change_id <= ?
+    AND table_name = 'KitchenTaskQueue'
+);
@@ -0,0 +1,16 @@
+-- 구간 안에서 바뀐 구역의 현재 상태 (select_zone_realtime_state.sql 과 같은 열)
+-- Parameters: after_change_id, upto_change_id
+SELECT
+    ZRS.zone_id,
+    WZ.zone_name,
+    COALESCE(ZRS.current_food_type, 'IDLE') as food_type,
+    ZRS.current_quantity,
+    COALESCE(datetime(ZRS.busy_until, 'unixepoch', 'localtime'), 'N/A') as busy_until
+FROM ZoneRealtimeState ZRS
+JOIN WorkstationZones WZ ON ZRS.zone_id = WZ.zone_id
+WHERE ZRS.zone_id IN (
+    SELECT row_id
+    FROM ChangeFeed
+    WHERE change_id > ? AND change_id <= ?
+    AND table_name = 'ZoneRealtimeState'
+);
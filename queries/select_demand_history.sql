@@ -0,0 +1,7 @@
+-- 수요 예측 학습용 주문 이력 (취소 주문 제외)
+-- Parameters: since (epoch 초)
+SELECT CO.created_at, OI.menu_item_id, OI.quantity
+FROM CustomerOrders CO
+JOIN OrderItems OI ON OI.order_id = CO.order_id
+WHERE CO.created_at >= ? AND CO.status <> 'CANCELLED'
+ORDER BY CO.created_at;
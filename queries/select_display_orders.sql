@@ -0,0 +1,4 @@
+-- 주방 화면 초기 적재 - 진행 중인 주문
+SELECT order_id, order_number, status
+FROM CustomerOrders
+WHERE status NOT IN ('COMPLETED', 'CANCELLED');
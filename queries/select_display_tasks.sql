@@ -0,0 +1,6 @@
+-- 주방 화면 초기 적재 - 완료되지 않은 작업
+SELECT KTQ.queue_task_id, OI.order_id, MT.task_name, KTQ.status, KTQ.assigned_staff_id
+FROM KitchenTaskQueue KTQ
+JOIN OrderItems OI ON KTQ.order_item_id = OI.order_item_id
+JOIN MenuTasks MT ON KTQ.task_definition_id = MT.task_definition_id
+WHERE KTQ.status <> 'COMPLETED';
@@ -0,0 +1,4 @@
+-- 작업 큐 전개 워터마크 조회
+SELECT last_order_item_id
+FROM QueueExpansionState
+WHERE state_id = 1;
@@ -0,0 +1,10 @@
+-- 식품 종류별 보온 재고 생산/충당/폐기 합계
+-- Parameters: since (epoch 초)
+SELECT food_type,
+       SUM(CASE WHEN event = 'PRODUCED' THEN quantity ELSE 0 END) AS produced,
+       SUM(CASE WHEN event = 'SERVED' THEN quantity ELSE 0 END) AS served,
+       SUM(CASE WHEN event = 'WASTED' THEN quantity ELSE 0 END) AS wasted
+FROM HoldingLedger
+WHERE recorded_at >= ?
+GROUP BY food_type
+ORDER BY food_type;
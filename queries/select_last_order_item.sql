@@ -0,0 +1,3 @@
+-- 마지막 주문 항목 ID (전개 워터마크를 건너뛴 취소 항목 너머까지 올리기 위함)
+SELECT COALESCE(MAX(order_item_id), 0)
+FROM OrderItems;
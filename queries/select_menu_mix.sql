@@ -0,0 +1,8 @@
+-- 메뉴별 판매 수량 / 주문 수 (매장 간 합산 가능한 부분 집계)
+-- Parameters: since (주문 생성 시각 하한, epoch 초)
+SELECT OI.menu_item_id, SUM(OI.quantity) AS quantity, COUNT(DISTINCT OI.order_id) AS orders
+FROM CustomerOrders CO
+JOIN OrderItems OI ON OI.order_id = CO.order_id
+WHERE CO.created_at >= ?
+GROUP BY OI.menu_item_id
+ORDER BY OI.menu_item_id;
@@ -0,0 +1,10 @@
+-- 마지막으로 읽은 이후 새로 전개된 작업 (준비 큐 증분 적재용)
+-- Parameters: last_queue_task_id
+-- (+order_item_id: 정렬에 idx_queue_order_item 전체 스캔 대신 rowid 범위 검색을 쓰도록)
+SELECT KTQ.queue_task_id, KTQ.order_item_id, KTQ.task_definition_id, OI.menu_item_id, KTQ.status,
+       OI.order_id, CO.created_at, COALESCE(CO.estimated_seconds_remaining, 0)
+FROM KitchenTaskQueue KTQ
+JOIN OrderItems OI ON KTQ.order_item_id = OI.order_item_id
+JOIN CustomerOrders CO ON OI.order_id = CO.order_id
+WHERE KTQ.queue_task_id > ?
+ORDER BY +KTQ.order_item_id, KTQ.queue_task_id;
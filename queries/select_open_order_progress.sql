@@ -0,0 +1,7 @@
+-- 완료되지 않은 작업이 남은 주문 항목별 주문/생성 시각/남은 작업 수
+SELECT OI.order_item_id, OI.order_id, CO.created_at, COUNT(*) as open_tasks
+FROM KitchenTaskQueue KTQ
+JOIN OrderItems OI ON KTQ.order_item_id = OI.order_item_id
+JOIN CustomerOrders CO ON OI.order_id = CO.order_id
+WHERE KTQ.status <> 'COMPLETED'
+GROUP BY OI.order_item_id, OI.order_id, CO.created_at;
@@ -0,0 +1,4 @@
+-- 완료되지 않은 작업 수 (워커 종료 판단)
+SELECT COUNT(*)
+FROM KitchenTaskQueue
+WHERE status <> 'COMPLETED';
@@ -0,0 +1,6 @@
+-- 분석용 주문 접수 시점 예상 대기 시간 (order_id 이후만)
+-- Parameters: first_order_id
+SELECT order_id, COALESCE(estimated_seconds_remaining, -1)
+FROM CustomerOrders
+WHERE order_id >= ?
+ORDER BY order_id;
@@ -1,3 +1,8 @@
--- 모든 주문 항목 조회
-SELECT OI.order_item_id, OI.menu_item_id, OI.quantity
-FROM OrderItems OI;
+-- 아직 작업 큐로 전개되지 않은 주문 항목 조회 (워터마크 이후만, 취소/완료된 주문은 건너뜀)
+-- Parameters: last_order_item_id
+SELECT OI.order_item_id, OI.order_id, OI.menu_item_id, OI.quantity
+FROM OrderItems OI
+JOIN CustomerOrders CO ON OI.order_id = CO.order_id
+WHERE OI.order_item_id > ?
+AND CO.status NOT IN ('COMPLETED', 'CANCELLED')
+ORDER BY OI.order_item_id;
@@ -0,0 +1,21 @@
+-- 완료 주문의 완료 시간(접수 → 마지막 작업 종료) 히스토그램 (매장 간 합산 가능한 부분 집계)
+-- 핫 큐와 이력을 따로 찾아 주문 항목 인덱스를 타도록 KitchenTaskAll 뷰 대신 두 테이블을 직접 조회
+-- Parameters: bucket_seconds, since (주문 생성 시각 하한, epoch 초)
+SELECT latency / ? AS bucket, COUNT(*) AS orders
+FROM (
+    SELECT (SELECT MAX(finished) FROM (
+                SELECT MAX(Q.actual_end_time) AS finished
+                FROM OrderItems OI
+                JOIN KitchenTaskQueue Q ON Q.order_item_id = OI.order_item_id
+                WHERE OI.order_id = CO.order_id
+                UNION ALL
+                SELECT MAX(H.actual_end_time)
+                FROM OrderItems OI
+                JOIN KitchenTaskHistory H ON H.order_item_id = OI.order_item_id
+                WHERE OI.order_id = CO.order_id)) - CO.created_at AS latency
+    FROM CustomerOrders CO
+    WHERE CO.status = 'COMPLETED'
+      AND CO.created_at >= ?
+)
+GROUP BY bucket
+ORDER BY bucket;
@@ -3,7 +3,7 @@
 
 SELECT
     CO.order_number,
-    CO.created_at,
+    datetime(CO.created_at, 'unixepoch', 'localtime') as created_at,
     CO.status,
     MI.name as menu_name,
     MI.price,
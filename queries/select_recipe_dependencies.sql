@@ -0,0 +1,3 @@
+-- 레시피 그래프 컴파일용 전체 작업 의존성 조회
+SELECT task_id, depends_on_task_id
+FROM TaskDependencies;
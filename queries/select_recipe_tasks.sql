@@ -0,0 +1,5 @@
+-- 레시피 그래프 컴파일용 전체 메뉴 작업 조회
+SELECT task_definition_id, menu_item_id, workstation_id, task_name,
+       task_order, base_time_seconds, task_type
+FROM MenuTasks
+ORDER BY menu_item_id, task_order;
@@ -0,0 +1,4 @@
+-- 레시피 변경 카운터 조회 (MenuTasks/TaskDependencies 트리거가 증가)
+SELECT version
+FROM RecipeVersion
+WHERE version_id = 1;
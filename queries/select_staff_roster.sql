@@ -0,0 +1,5 @@
+-- 전체 스태프의 근무 상태와 현재 배치 작업장 (배치가 없으면 NULL)
+SELECT S.staff_id, S.name, S.status, SA.workstation_id
+FROM Staff S
+LEFT JOIN StaffAssignment SA ON SA.staff_id = S.staff_id
+ORDER BY S.staff_id, SA.assignment_id;
@@ -0,0 +1,5 @@
+-- 자원이 할당되었거나 실행 중인 작업
+SELECT queue_task_id, status
+FROM KitchenTaskQueue
+WHERE status IN ('WAITING_RESOURCE', 'IN_PROGRESS')
+ORDER BY queue_task_id;
@@ -0,0 +1,11 @@
+-- 작업장별 스태프 작업 시간 합계 (튀김 배치는 스태프 한 명이 같은 시각에 시작한 묶음을 한 번으로)
+-- Parameters: since (epoch 초)
+SELECT assigned_workstation_id, SUM(actual_end_time - actual_start_time), COUNT(*)
+FROM (
+    SELECT DISTINCT assigned_workstation_id, assigned_staff_id, actual_start_time, actual_end_time
+    FROM KitchenTaskQueue
+    WHERE status = 'COMPLETED'
+    AND assigned_staff_id IS NOT NULL
+    AND actual_start_time >= ?
+)
+GROUP BY assigned_workstation_id;
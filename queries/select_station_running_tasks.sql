@@ -0,0 +1,7 @@
+-- 작업장에서 실행 중인 작업 (워커 재시작 시 이어받기)
+-- Parameters: workstation_id
+SELECT queue_task_id, task_definition_id, actual_start_time
+FROM KitchenTaskQueue
+WHERE status = 'IN_PROGRESS'
+  AND assigned_workstation_id = ?
+ORDER BY queue_task_id;
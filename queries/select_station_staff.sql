@@ -0,0 +1,6 @@
+-- 작업장별 근무 중인 스태프 명단 (배치 순서)
+SELECT SA.workstation_id, SA.staff_id
+FROM StaffAssignment SA
+JOIN Staff S ON SA.staff_id = S.staff_id
+WHERE S.status = 'ACTIVE'
+ORDER BY SA.workstation_id, SA.assignment_id;
@@ -0,0 +1,3 @@
+-- 작업장별 진행 중인 주문의 남은 작업 시간 (트리거로 증분 유지, 작업장 수만큼만 읽음)
+SELECT workstation_id, remaining_seconds
+FROM StationWorkload;
@@ -0,0 +1,20 @@
+-- 매장 병목 유형별 부분 집계 (핫 + 이력, 작업의 주문 생성 시각 기준 - 체인 리포트에서 매장별 합산)
+-- (CROSS JOIN: 주문 생성 시각 범위부터 읽도록 조인 순서 고정 - 기간이 짧으면 최근 주문만 따라감)
+-- Parameters: since (주문 생성 시각 하한, epoch 초), since
+SELECT bottleneck_type, COUNT(*) AS count, SUM(wait_duration_seconds) AS total_wait
+FROM (
+    SELECT BA.bottleneck_type, BA.wait_duration_seconds
+    FROM CustomerOrders CO
+    CROSS JOIN OrderItems OI ON OI.order_id = CO.order_id
+    JOIN KitchenTaskQueue KTQ ON KTQ.order_item_id = OI.order_item_id
+    JOIN BottleneckAnalysis BA ON BA.queue_task_id = KTQ.queue_task_id
+    WHERE CO.created_at >= ?
+    UNION ALL
+    SELECT BH.bottleneck_type, BH.wait_duration_seconds
+    FROM CustomerOrders CO
+    CROSS JOIN OrderItems OI ON OI.order_id = CO.order_id
+    JOIN KitchenTaskHistory KTH ON KTH.order_item_id = OI.order_item_id
+    JOIN BottleneckHistory BH ON BH.queue_task_id = KTH.queue_task_id
+    WHERE CO.created_at >= ?
+)
+GROUP BY bottleneck_type;
@@ -0,0 +1,8 @@
+-- 매장 처리량 부분 집계 (체인 리포트에서 매장별 합산)
+-- Parameters: since (주문 생성 시각 하한, epoch 초)
+SELECT COUNT(*) AS orders,
+       COALESCE(SUM(CASE WHEN status = 'COMPLETED' THEN 1 ELSE 0 END), 0) AS completed,
+       MIN(created_at) AS first_created,
+       MAX(created_at) AS last_created
+FROM CustomerOrders
+WHERE created_at >= ?;
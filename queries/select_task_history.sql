@@ -0,0 +1,17 @@
+-- 분석용 작업 이력 (핫 + 이력, queue_task_id 이후만) - 시각은 epoch 초, 없으면 -1
+-- Parameters: first_queue_task_id
+SELECT
+    T.queue_task_id,
+    OI.order_id,
+    T.order_item_id,
+    OI.menu_item_id,
+    MT.workstation_id,
+    COALESCE(T.assigned_staff_id, -1),
+    T.created_at,
+    COALESCE(T.actual_start_time, -1),
+    COALESCE(T.actual_end_time, -1)
+FROM KitchenTaskAll T
+JOIN OrderItems OI ON T.order_item_id = OI.order_item_id
+JOIN MenuTasks MT ON T.task_definition_id = MT.task_definition_id
+WHERE T.queue_task_id >= ?
+ORDER BY T.queue_task_id;
@@ -1,6 +1,5 @@
--- WAITING_RESOURCE 상태의 작업 조회
+-- WAITING_RESOURCE 상태의 작업 조회 (자원 할당 완료, 시작 대기)
 SELECT queue_task_id
 FROM KitchenTaskQueue
 WHERE status = 'WAITING_RESOURCE'
-ORDER BY created_at
-LIMIT 6;
+ORDER BY created_at, queue_task_id;
@@ -0,0 +1,4 @@
+-- 작업장 이름과 최대 근무 인원 (작업장 목록/이름 조회도 이 쿼리를 씀)
+SELECT workstation_id, name, max_staff
+FROM Workstations
+ORDER BY workstation_id;
@@ -0,0 +1,10 @@
+-- 구역 할당용 상태 조회 (작업장, 현재 식품/수량, busy_until)
+SELECT
+    WZ.zone_id,
+    WZ.workstation_id,
+    ZRS.current_food_type,
+    COALESCE(ZRS.current_quantity, 0),
+    ZRS.busy_until
+FROM WorkstationZones WZ
+LEFT JOIN ZoneRealtimeState ZRS ON WZ.zone_id = ZRS.zone_id
+ORDER BY WZ.zone_id;
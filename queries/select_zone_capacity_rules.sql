@@ -0,0 +1,3 @@
+-- 구역별 식품 최대 수량 규칙
+SELECT zone_id, food_type, max_quantity
+FROM ZoneCapacityRules;
@@ -0,0 +1,5 @@
+-- 작업 큐 전개 워터마크 갱신
+-- Parameters: last_order_item_id
+UPDATE QueueExpansionState
+SET last_order_item_id = ?
+WHERE state_id = 1;
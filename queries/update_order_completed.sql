@@ -0,0 +1,15 @@
+-- 주문 항목이 속한 주문에 남은 작업이 없으면 COMPLETED 로 (작업 완료와 같은 트랜잭션에서)
+-- 쓰기 트랜잭션끼리는 직렬화되므로 마지막 두 작업이 동시에 끝나도 한 워커만 완료로 바꾼다
+-- Parameters: order_item_id
+UPDATE CustomerOrders
+SET status = 'COMPLETED'
+WHERE order_id = (SELECT order_id FROM OrderItems WHERE order_item_id = ?)
+  AND status NOT IN ('COMPLETED', 'CANCELLED')
+  AND NOT EXISTS (
+      SELECT 1
+      FROM OrderItems OI
+      JOIN KitchenTaskQueue KTQ ON KTQ.order_item_id = OI.order_item_id
+      WHERE OI.order_id = CustomerOrders.order_id
+        AND KTQ.status <> 'COMPLETED'
+  )
+RETURNING order_id, created_at;
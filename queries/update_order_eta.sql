@@ -0,0 +1,5 @@
+-- 주문의 예상 대기 시간 갱신 (레시피 임계 경로 기반)
+-- Parameters: estimated_seconds_remaining, order_id
+UPDATE CustomerOrders
+SET estimated_seconds_remaining = ?
+WHERE order_id = ?;
@@ -0,0 +1,5 @@
+-- 주문 상태 변경 (취소/완료 시 트리거가 큐 전체 남은 시간에서 제외)
+-- Parameters: status, order_id
+UPDATE CustomerOrders
+SET status = ?
+WHERE order_id = ?;
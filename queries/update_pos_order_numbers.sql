@@ -0,0 +1,5 @@
+-- 이름 없이 접수된 주문에 order_id 로 POS 번호 발급 (AUTOINCREMENT 라 보관/재시작 뒤에도 겹치지 않음)
+-- order_number UNIQUE 인덱스로 NULL 행만 찾음
+UPDATE CustomerOrders
+SET order_number = printf('POS-%06d', order_id)
+WHERE order_number IS NULL;
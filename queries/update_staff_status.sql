@@ -0,0 +1,5 @@
+-- 스태프 근무 상태 변경 (ACTIVE / BREAK / OFF_WORK)
+-- Parameters: status, staff_id
+UPDATE Staff
+SET status = ?
+WHERE staff_id = ?;
@@ -1,7 +1,7 @@
 -- 작업을 COMPLETED 상태로 변경
--- Parameters: queue_task_id
+-- Parameters: actual_end_time (NULL 이면 현재 시각), queue_task_id
 UPDATE KitchenTaskQueue
 SET
     status = 'COMPLETED',
-    actual_end_time = datetime('now', 'localtime')
+    actual_end_time = COALESCE(?, CAST(strftime('%s', 'now') AS INTEGER))
 WHERE queue_task_id = ?;
@@ -0,0 +1,9 @@
+-- 워커가 가져간 작업을 COMPLETED 로 (다른 경로로 이미 끝났거나 보관된 작업은 건드리지 않음)
+-- Parameters: actual_end_time (NULL 이면 현재 시각), queue_task_id
+UPDATE KitchenTaskQueue
+SET
+    status = 'COMPLETED',
+    actual_end_time = COALESCE(?, CAST(strftime('%s', 'now') AS INTEGER))
+WHERE queue_task_id = ?
+  AND status = 'IN_PROGRESS'
+RETURNING order_item_id;
@@ -0,0 +1,8 @@
+-- 보온 재고로 충당한 튀김 작업을 바로 COMPLETED 로 (시작 = 종료 시각, 자원 할당 없음)
+-- Parameters: actual_start_time, actual_end_time (NULL 이면 현재 시각), queue_task_id
+UPDATE KitchenTaskQueue
+SET
+    status = 'COMPLETED',
+    actual_start_time = COALESCE(?, CAST(strftime('%s', 'now') AS INTEGER)),
+    actual_end_time = COALESCE(?, CAST(strftime('%s', 'now') AS INTEGER))
+WHERE queue_task_id = ?;
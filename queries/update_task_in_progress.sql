@@ -1,7 +1,7 @@
 -- 작업을 IN_PROGRESS 상태로 변경
--- Parameters: queue_task_id
+-- Parameters: actual_start_time (NULL 이면 현재 시각), queue_task_id
 UPDATE KitchenTaskQueue
 SET
     status = 'IN_PROGRESS',
-    actual_start_time = datetime('now', 'localtime')
+    actual_start_time = COALESCE(?, CAST(strftime('%s', 'now') AS INTEGER))
 WHERE queue_task_id = ?;
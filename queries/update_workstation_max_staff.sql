@@ -0,0 +1,5 @@
+-- 작업장 최대 근무 인원 변경
+-- Parameters: max_staff, workstation_id
+UPDATE Workstations
+SET max_staff = ?
+WHERE workstation_id = ?;
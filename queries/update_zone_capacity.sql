@@ -0,0 +1,5 @@
+-- 식품 종류의 구역당 최대 수량 변경 (모든 구역)
+-- Parameters: max_quantity, food_type
+UPDATE ZoneCapacityRules
+SET max_quantity = ?
+WHERE food_type = ?;
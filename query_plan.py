@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+쿼리 실행 계획 회귀 검사 - queries/*.sql 전체를 EXPLAIN QUERY PLAN 으로 확인
+
+주문이 쌓일수록 커지는 테이블을 핫 쿼리가 통째로 훑으면(전체 스캔, 자동 인덱스) 실패로 본다.
+미완료 작업만 담는 부분 인덱스 스캔은 진행 중 작업량에 비례하므로 허용하고,
+전체 집계가 목적인 리포트 쿼리는 검사에서 뺀다.
+
+사용 예:
+    python query_plan.py                                  # 새 스키마(:memory:)로 검사
+    python query_plan.py --db momstouch_complete.db --verbose
+"""
+
+import argparse
+import re
+import sys
+
+from tabulate import tabulate
+from colorama import Fore, init
+
+from dal import connect, create_database, migrate, parameter_count, queries
+
+init(autoreset=True)
+
+# 주문마다 행이 늘어나는 테이블
+GROWING_TABLES = ('CustomerOrders', 'OrderItems', 'KitchenTaskQueue', 'BottleneckAnalysis',
+                  'KitchenTaskHistory', 'BottleneckHistory', 'ChangeFeed', 'HoldingLedger')
+
+# 전체 데이터를 집계하는 리포트 쿼리 (전체 스캔 허용)
+REPORT_QUERIES = {'select_order_summary.sql', 'select_bottleneck_stats.sql', 'select_station_busy_time.sql'}
+
+_COMMENT = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_TABLE_REF = re.compile(
+    r"\b(?:FROM|JOIN|UPDATE|INTO)\s+(\w+)"
+    r"(?:\s+(?:AS\s+)?(?!(?:ON|WHERE|JOIN|LEFT|INNER|CROSS|NATURAL|SET|GROUP|ORDER|LIMIT|VALUES|USING)\b)(\w+))?",
+    re.I)
+_PLAN_STEP = re.compile(r"(SCAN|SEARCH) (\w+)(.*)")
+
+def table_aliases(sql):
+    """별칭/테이블 이름 → 테이블 이름"""
+    aliases = {}
+    for table, alias in _TABLE_REF.findall(_COMMENT.sub(' ', sql)):
+        aliases[table] = table
+        if alias:
+            aliases[alias] = table
+    return aliases
+
+def partial_indexes(conn):
+    """커지는 테이블에 걸린 부분 인덱스 이름"""
+    names = set()
+    for table in GROWING_TABLES:
+        for row in conn.execute(f"PRAGMA index_list({table})"):
+            if row[4]:  # partial
+                names.add(row[1])
+    return names
+
+def query_plan(conn, sql):
+    """EXPLAIN QUERY PLAN 단계 설명 목록 (파라미터는 NULL 로 바인딩)"""
+    return [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, (None,) * parameter_count(sql))]
+
+def full_scans(plan, aliases, allowed_indexes):
+    """계획 중 커지는 테이블을 통째로 훑는 단계"""
+    problems = []
+    for step in plan:
+        match = _PLAN_STEP.match(step)
+        if not match:
+            continue
+        kind, name, rest = match.groups()
+        if aliases.get(name, name) not in GROWING_TABLES:
+            continue
+        if 'AUTOMATIC' in rest:
+            problems.append(step)
+        elif kind == 'SCAN' and not any(index in rest.split() for index in allowed_indexes):
+            problems.append(step)
+    return problems
+
+def check_query_plans(conn, registry=queries):
+    """
+    레지스트리의 모든 쿼리 계획 검사
+
+    반환: [(파일 이름, 계획 단계 목록, 문제 단계 목록)] - 리포트 쿼리의 문제 목록은 항상 비어 있음
+    """
+    allowed = partial_indexes(conn)
+    results = []
+    for filename, sql in registry.statements.items():
+        plan = query_plan(conn, sql)
+        problems = [] if filename in REPORT_QUERIES else full_scans(plan, table_aliases(sql), allowed)
+        results.append((filename, plan, problems))
+    return results
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="queries/*.sql 실행 계획 전체 스캔 검사")
+    parser.add_argument('--db', help="검사할 DB 파일 (생략하면 새 스키마를 메모리에 생성)")
+    parser.add_argument('--verbose', action='store_true', help="모든 쿼리의 계획 출력")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    if args.db:
+        conn = connect(args.db)
+        migrate(conn)
+    else:
+        conn = create_database(':memory:')
+
+    results = check_query_plans(conn)
+    conn.close()
+
+    rows = []
+    for filename, plan, problems in results:
+        if problems:
+            status = Fore.RED + "FULL SCAN" + Fore.RESET
+        elif filename in REPORT_QUERIES:
+            status = "report"
+        else:
+            status = "ok"
+        if problems or args.verbose:
+            rows.append([filename, status, "\n".join(problems or plan)])
+    if rows:
+        print(tabulate(rows, headers=["쿼리", "결과", "계획"], tablefmt="grid"))
+
+    failed = [filename for filename, _, problems in results if problems]
+    if failed:
+        print(Fore.RED + f"❌ 전체 스캔으로 떨어진 핫 쿼리 {len(failed)}개: {', '.join(failed)}")
+        return 1
+    print(Fore.GREEN + f"✅ 쿼리 {len(results)}개 실행 계획 검사 통과")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+"""
+의존성 기반 준비 큐 - 선행 작업이 모두 끝난 작업만 꺼낼 수 있음
+
+KitchenTaskQueue 의 작업 인스턴스마다 남은 선행 작업 수(in-degree)를 두고,
+작업이 완료되면 후속 작업의 카운터만 줄여 O(out-degree) 로 실행 가능 작업을 푼다.
+같은 주문 항목 안에서 수량 k 번째 단위의 작업끼리만 의존성으로 연결된다.
+작업장 힙의 순서는 스케줄링 정책(scheduling.py)이 정하며, 기본은 FIFO(queue_task_id 순)이다.
+"""
+
+import heapq
+import threading
+
+from dal import load_sql
+from scheduling import FifoPolicy
+
+class ReadyQueue:
+    """작업장별 실행 가능 작업 힙 + 작업 인스턴스별 남은 선행 작업 수"""
+
+    def __init__(self, recipe_cache, policy=None):
+        self.recipe_cache = recipe_cache
+        self.policy = policy or FifoPolicy()
+        self.tasks = {}         # queue_task_id -> (task_definition_id, workstation_id, menu_item_id)
+        self.order_item_ids = {}  # queue_task_id -> order_item_id
+        self.unmet = {}         # queue_task_id -> 남은 선행 작업 수
+        self.dependents = {}    # queue_task_id -> [후속 queue_task_id]
+        self.ready = {}         # workstation_id -> [(정책 키, queue_task_id)] 최소 힙
+        self.keys = {}          # queue_task_id -> 힙 항목 (되돌릴 때 같은 키로)
+        self.task_orders = {}   # queue_task_id -> order_id
+        self.orders = {}        # order_id -> (접수 시각, ETA 초, 임계 경로 초)
+        self.open_tasks = {}    # order_id -> 미완료 작업 수
+        self.last_queue_task_id = 0
+        self._cond = threading.Condition()
+
+    def load(self, conn):
+        """완료되지 않은 작업 전체를 읽어 큐를 새로 구성"""
+        self.recipe_cache.refresh(conn)
+        with self._cond:
+            self.tasks, self.unmet, self.dependents, self.ready = {}, {}, {}, {}
+            self.order_item_ids, self.keys, self.task_orders = {}, {}, {}
+            self.orders, self.open_tasks = {}, {}
+            self._add_rows(conn.execute(load_sql('select_active_task_instances.sql')).fetchall())
+            self.last_queue_task_id = max(self.last_queue_task_id, conn.execute(
+                "SELECT COALESCE(MAX(queue_task_id), 0) FROM KitchenTaskQueue").fetchone()[0])
+        return self
+
+    def sync(self, conn):
+        """마지막 적재 이후 새로 전개된 작업만 추가, 새로 실행 가능해진 작업 수 반환"""
+        self.recipe_cache.refresh(conn)
+        rows = conn.execute(load_sql('select_new_task_instances.sql'),
+                            (self.last_queue_task_id,)).fetchall()
+        with self._cond:
+            count = self._add_rows(rows)
+            if rows:
+                self.last_queue_task_id = max(self.last_queue_task_id, max(r[0] for r in rows))
+            if count:
+                self._cond.notify_all()
+        return count
+
+    def _add_rows(self, rows):
+        """
+        rows: (queue_task_id, order_item_id, task_definition_id, menu_item_id, status,
+               order_id, 주문 접수 시각, 주문 ETA 초)  order_item_id, queue_task_id 순 정렬
+        같은 task_definition_id 의 k 번째 행을 수량 k 번째 단위로 보고 의존성 연결
+        """
+        # 정책 키가 주문 전체를 보도록 항목별 작업보다 주문 정보를 먼저 모음
+        for row in rows:
+            if row[4] == 'COMPLETED':
+                continue
+            order_id, created_at, eta_seconds = row[5:8]
+            critical = self.recipe_cache.graph(row[3]).critical_path_seconds
+            known = self.orders.get(order_id)
+            if known is None or known[2] < critical:
+                self.orders[order_id] = (created_at, eta_seconds, critical)
+            self.open_tasks[order_id] = self.open_tasks.get(order_id, 0) + 1
+
+        ready_count = 0
+        start = 0
+        while start < len(rows):
+            order_item_id = rows[start][1]
+            end = start
+            while end < len(rows) and rows[end][1] == order_item_id:
+                end += 1
+            item_rows = rows[start:end]
+            start = end
+
+            graph = self.recipe_cache.graph(item_rows[0][3])
+            occurrence = {}
+            instance = {}
+            status_of = {}
+            for queue_task_id, _, task_def_id, _, status, *_ in item_rows:
+                unit = occurrence.get(task_def_id, 0)
+                occurrence[task_def_id] = unit + 1
+                instance[(unit, task_def_id)] = queue_task_id
+                status_of[queue_task_id] = status
+
+            for (unit, task_def_id), queue_task_id in instance.items():
+                status = status_of[queue_task_id]
+                if status == 'COMPLETED':
+                    continue
+                task = graph.tasks.get(task_def_id)
+                workstation_id = task[1] if task else None
+                self.tasks[queue_task_id] = (task_def_id, workstation_id, graph.menu_item_id)
+                self.order_item_ids[queue_task_id] = order_item_id
+                self.task_orders[queue_task_id] = item_rows[0][5]
+                unmet = 0
+                for depends_on in graph.predecessors.get(task_def_id, ()):
+                    pred_id = instance.get((unit, depends_on))
+                    if pred_id is None or status_of[pred_id] == 'COMPLETED':
+                        continue
+                    unmet += 1
+                    self.dependents.setdefault(pred_id, []).append(queue_task_id)
+                self.unmet[queue_task_id] = unmet
+                if unmet == 0 and status == 'QUEUED':
+                    self._push_ready(queue_task_id)
+                    ready_count += 1
+        return ready_count
+
+    def _push_ready(self, queue_task_id):
+        """실행 가능해진 작업의 정책 키를 정해 작업장 힙에 넣음 (잠금 안에서)"""
+        task_def_id, workstation_id, menu_item_id = self.tasks[queue_task_id]
+        task = self.recipe_cache.graph(menu_item_id).tasks.get(task_def_id)
+        order_id = self.task_orders[queue_task_id]
+        key = self.policy.key(queue_task_id, workstation_id, task[3] if task else 0,
+                              order_id, self.orders[order_id])
+        entry = self.keys[queue_task_id] = (key, queue_task_id)
+        heapq.heappush(self.ready.setdefault(workstation_id, []), entry)
+
+    def _pop(self, workstation_id):
+        key, queue_task_id = heapq.heappop(self.ready[workstation_id])
+        self.policy.on_pop(workstation_id, key)
+        return self._entry(queue_task_id)
+
+    def _entry(self, queue_task_id):
+        task_def_id, workstation_id, menu_item_id = self.tasks[queue_task_id]
+        return (queue_task_id, task_def_id, workstation_id, menu_item_id)
+
+    def pop_ready(self, workstation_id):
+        """작업장의 실행 가능 작업 하나 (select_queued_tasks.sql 행 형식), 없으면 None"""
+        with self._cond:
+            if not self.ready.get(workstation_id):
+                return None
+            return self._pop(workstation_id)
+
+    def ready_workstations(self):
+        """실행 가능 작업이 있는 작업장 목록"""
+        with self._cond:
+            return [workstation_id for workstation_id, heap in self.ready.items() if heap]
+
+    def pop_all_ready(self):
+        """모든 작업장의 실행 가능 작업을 정책 순서대로 꺼냄"""
+        with self._cond:
+            tasks = []
+            for workstation_id in self.ready:
+                while self.ready[workstation_id]:
+                    tasks.append((self.ready[workstation_id][0], self._pop(workstation_id)))
+            self.ready = {}
+            return [task for _, task in sorted(tasks)]
+
+    def wait_ready(self, workstation_id, timeout=None):
+        """작업장에 실행 가능 작업이 생길 때까지 대기 후 하나 꺼냄 (폴링 없음)"""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self.ready.get(workstation_id), timeout):
+                return None
+            return self._pop(workstation_id)
+
+    def push_back(self, tasks):
+        """자원이 없어 할당하지 못한 작업을 다시 실행 가능 목록으로"""
+        with self._cond:
+            for queue_task_id, _, workstation_id, _ in tasks:
+                heapq.heappush(self.ready.setdefault(workstation_id, []), self.keys[queue_task_id])
+            if tasks:
+                self._cond.notify_all()
+
+    def complete(self, queue_task_id):
+        """작업 완료 - 후속 작업의 카운터를 줄이고 새로 실행 가능해진 작업 목록 반환"""
+        released = []
+        with self._cond:
+            if self.tasks.pop(queue_task_id, None) is not None:
+                order_id = self.task_orders.pop(queue_task_id)
+                self.open_tasks[order_id] -= 1
+                if not self.open_tasks[order_id]:
+                    del self.open_tasks[order_id]
+                    del self.orders[order_id]
+                    self.policy.forget(order_id)
+            self.order_item_ids.pop(queue_task_id, None)
+            self.unmet.pop(queue_task_id, None)
+            self.keys.pop(queue_task_id, None)
+            for next_id in self.dependents.pop(queue_task_id, ()):
+                self.unmet[next_id] -= 1
+                if self.unmet[next_id] == 0:
+                    self._push_ready(next_id)
+                    released.append(self._entry(next_id))
+            if released:
+                self._cond.notify_all()
+        return released
+
+    def pending_count(self):
+        """완료되지 않은 작업 수"""
+        return len(self.tasks)
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+"""
+레시피 그래프 캐시 - MenuTasks + TaskDependencies 를 메뉴별 DAG 로 한 번만 컴파일
+
+각 메뉴 그래프는 위상 정렬 순서, 작업별 가장 이른 시작 시간, 임계 경로 길이,
+작업장별 부하(초)를 미리 계산해 둔다. RecipeVersion 카운터가 바뀌면
+(레시피 테이블 트리거) 다음 refresh() 에서 다시 컴파일한다.
+"""
+
+import heapq
+
+from dal import load_sql
+
+class RecipeGraph:
+    """메뉴 하나의 컴파일된 레시피 DAG"""
+
+    def __init__(self, menu_item_id, tasks, dependencies):
+        """
+        tasks: {task_definition_id: (task_name, workstation_id, task_order,
+                                     base_time_seconds, task_type)}
+        dependencies: [(task_id, depends_on_task_id)] - 이 메뉴의 작업끼리만
+        """
+        self.menu_item_id = menu_item_id
+        self.tasks = tasks
+        self.predecessors = {task_id: [] for task_id in tasks}
+        self.successors = {task_id: [] for task_id in tasks}
+        for task_id, depends_on in dependencies:
+            self.predecessors[task_id].append(depends_on)
+            self.successors[depends_on].append(task_id)
+
+        self.topo_order = self._topological_order()
+
+        # 가장 이른 시작 시간 / 임계 경로 (선행 작업이 모두 끝나야 시작)
+        self.earliest_start = {}
+        finish = {}
+        critical_prev = {}
+        for task_id in self.topo_order:
+            start = 0
+            for depends_on in self.predecessors[task_id]:
+                if finish[depends_on] > start:
+                    start = finish[depends_on]
+                    critical_prev[task_id] = depends_on
+            self.earliest_start[task_id] = start
+            finish[task_id] = start + tasks[task_id][3]
+
+        last = max(finish, key=finish.get) if finish else None
+        self.critical_path_seconds = finish[last] if finish else 0
+        self.critical_path = []
+        while last is not None:
+            self.critical_path.append(last)
+            last = critical_prev.get(last)
+        self.critical_path.reverse()
+
+        # 작업장별 부하 벡터 (1인분 기준)
+        self.workstation_load = {}
+        for name, workstation_id, order, seconds, task_type in tasks.values():
+            self.workstation_load[workstation_id] = self.workstation_load.get(workstation_id, 0) + seconds
+        self.total_seconds = sum(self.workstation_load.values())
+
+    def _topological_order(self):
+        """Kahn 알고리즘 - 동시에 가능한 작업은 task_order 순"""
+        in_degree = {task_id: len(deps) for task_id, deps in self.predecessors.items()}
+        ready = [(self.tasks[t][2], t) for t, degree in in_degree.items() if degree == 0]
+        heapq.heapify(ready)
+        order = []
+        while ready:
+            _, task_id = heapq.heappop(ready)
+            order.append(task_id)
+            for next_id in self.successors[task_id]:
+                in_degree[next_id] -= 1
+                if in_degree[next_id] == 0:
+                    heapq.heappush(ready, (self.tasks[next_id][2], next_id))
+        if len(order) != len(self.tasks):
+            raise ValueError(f"메뉴 {self.menu_item_id} 의 작업 의존성에 순환이 있습니다")
+        return order
+
+class RecipeGraphCache:
+    """메뉴별 RecipeGraph 캐시 - RecipeVersion 이 바뀔 때만 재컴파일"""
+
+    def __init__(self):
+        self.version = None
+        self.graphs = {}
+        self.workstation_slots = {}
+        self.task_menu = {}
+
+    def refresh(self, conn):
+        """레시피 버전 확인 후 필요하면 다시 컴파일 (평소엔 PK 조회 1회)"""
+        version = conn.execute(load_sql('select_recipe_version.sql')).fetchone()[0]
+        if version != self.version:
+            self._compile(conn)
+            self.version = version
+        return self
+
+    def invalidate(self):
+        """다음 refresh() 에서 무조건 다시 컴파일"""
+        self.version = None
+
+    def _compile(self, conn):
+        tasks_by_menu = {}
+        task_menu = {}
+        for (task_id, menu_item_id, workstation_id, task_name,
+             task_order, seconds, task_type) in conn.execute(load_sql('select_recipe_tasks.sql')):
+            tasks_by_menu.setdefault(menu_item_id, {})[task_id] = (
+                task_name, workstation_id, task_order, seconds, task_type)
+            task_menu[task_id] = menu_item_id
+
+        deps_by_menu = {menu_item_id: [] for menu_item_id in tasks_by_menu}
+        for task_id, depends_on in conn.execute(load_sql('select_recipe_dependencies.sql')):
+            menu_item_id = task_menu.get(task_id)
+            if menu_item_id is None or task_menu.get(depends_on) != menu_item_id:
+                raise ValueError(f"작업 {task_id} -> {depends_on} 의존성이 같은 메뉴 안에 있지 않습니다")
+            deps_by_menu[menu_item_id].append((task_id, depends_on))
+
+        self.graphs = {menu_item_id: RecipeGraph(menu_item_id, tasks, deps_by_menu[menu_item_id])
+                       for menu_item_id, tasks in tasks_by_menu.items()}
+        self.task_menu = task_menu
+        self.workstation_slots = {ws_id: max(max_staff, 1) for ws_id, _, max_staff in conn.execute(
+            load_sql('select_workstation_limits.sql'))}
+
+    def graph(self, menu_item_id):
+        """메뉴의 RecipeGraph (작업이 없는 메뉴는 빈 그래프)"""
+        graph = self.graphs.get(menu_item_id)
+        if graph is None:
+            graph = RecipeGraph(menu_item_id, {}, [])
+        return graph
+
+    def workstation_load(self, items):
+        """주문 항목 [(menu_item_id, quantity)] 의 작업장별 부하(초)"""
+        load = {}
+        for menu_item_id, quantity in items:
+            for workstation_id, seconds in self.graph(menu_item_id).workstation_load.items():
+                load[workstation_id] = load.get(workstation_id, 0) + seconds * quantity
+        return load
+
+    def estimate_seconds(self, items, queued=None):
+        """
+        주문 항목 [(menu_item_id, quantity)] 의 예상 조리 시간(초)
+
+        의존성이 없는 작업은 병렬로 진행되므로 단순 합계 대신
+        max(가장 긴 임계 경로, 가장 붐비는 작업장의 부하 / 작업장 인원) 을 사용
+        queued: {workstation_id: 초} 앞선 주문의 남은 작업 - 주면 작업장 부하에 더해
+                앞 주문 대기까지 포함한 예상 완료 시간을 계산
+        """
+        critical = max((self.graph(menu_item_id).critical_path_seconds for menu_item_id, _ in items),
+                       default=0)
+        load = self.workstation_load(items)
+        for workstation_id, seconds in (queued or {}).items():
+            load[workstation_id] = load.get(workstation_id, 0) + seconds
+        busiest = max((seconds / self.workstation_slots.get(workstation_id, 1)
+                       for workstation_id, seconds in load.items()), default=0)
+        return int(max(critical, busiest))
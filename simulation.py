@@ -0,0 +1,325 @@
+# -*- coding: utf-8 -*-
+"""
+이산 사건 시뮬레이션 - 가상 시계로 주문 → 큐 → 할당 → 실행 → 병목 기록 파이프라인 구동
+
+time.sleep 없이 주문 도착은 힙에서, 작업 완료/배치 대기 한도는 타이머 휠에서 시각 순으로 꺼내며,
+작업 시간은 MenuTasks.base_time_seconds (선택적으로 seed 고정 지터)를 사용한다.
+휠은 다음 주문 도착 전까지 1초 틱씩 돌며(틱당 O(1)) 첫 만료에서 멈추고, 예약이 없으면 바로 건너뛴다.
+지난 구역 busy_until 은 사건마다 할당기의 타이머 휠로 비운다.
+actual_start_time / actual_end_time 등 모든 시각은 정수 epoch 초의 가상 시각으로 기록된다.
+병목은 BottleneckDetector 가 준비/할당 실패/시작 사건으로 분류해 커밋 때 모아 쓴다.
+batch_window 를 주면 튀김 작업은 FryerBatcher 로 묶여 한 번에 적재되고,
+배치 완료 사건 하나가 모든 구성 작업을 완료시킨다.
+holding(PrefryPlanner)을 주면 주문 작업을 할당한 뒤 남는 튀김 자원으로 interval 마다 미리 튀기고,
+큐 전개가 보온 재고로 튀김 작업을 충당한다.
+staffing(StaffingOptimizer)을 주면 interval 마다 예상 부하로 스태프를 다시 배치하고 할당기 명단을 새로 읽는다.
+"""
+
+import heapq
+import itertools
+import random
+import time
+
+from allocator import ResourceAllocator, parse_time
+from bottleneck import BottleneckDetector
+from dal import load_sql
+from fryer_batch import FryerBatcher
+from order_intake import place_orders
+from ready_queue import ReadyQueue
+from task_queue import expand_new_order_items
+from timer_wheel import TimerWheel
+from tracing import nearest_rank, traced
+
+SIM_START = '2025-01-01 10:00:00'
+
+# 타이머 휠 항목 종류 (같은 시각에는 완료를 주문 도착보다 먼저 처리해 반환된 자원을 새 주문이 쓸 수 있게 함)
+TASK_DONE = 0
+HOLDING_DONE = 1
+BATCH_DEADLINE = 2
+HOLDING_TICK = 3
+RESTAFF_TICK = 4
+
+def percentile(values, p):
+    """정렬된 값 목록의 p 백분위수 (nearest-rank), 비어 있으면 0"""
+    if not values:
+        return 0
+    return values[nearest_rank(len(values), p) - 1]
+
+def generate_orders(menu_item_ids, count, duration_seconds, seed=None, max_quantity=2, prefix='SIM'):
+    """영업 시간 동안 균등하게 흩어진 무작위 주문 [(도착 오프셋 초, order_info)]"""
+    rng = random.Random(seed)
+    offsets = sorted(rng.uniform(0, duration_seconds) for _ in range(count))
+    arrivals = []
+    for i, offset in enumerate(offsets):
+        items = {}
+        for _ in range(rng.randint(1, 3)):
+            menu_id = rng.choice(menu_item_ids)
+            items[menu_id] = min(items.get(menu_id, 0) + rng.randint(1, max_quantity), max_quantity)
+        arrivals.append((offset, {'name': f'{prefix}-{i + 1:06d}', 'items': sorted(items.items())}))
+    return arrivals
+
+class KitchenSimulation:
+    """가상 시계 기반 주방 시뮬레이션"""
+
+    def __init__(self, conn, recipe_cache, allocator=None, ready_queue=None, seed=None,
+                 jitter=0.0, start_time=None, commit_every=500, on_task_done=None,
+                 batch_window=None, detector=None, holding=None, staffing=None):
+        self.conn = conn
+        self.recipe_cache = recipe_cache
+        self.allocator = allocator or ResourceAllocator(recipe_cache)
+        self.ready_queue = ready_queue or ReadyQueue(recipe_cache)
+        self.rng = random.Random(seed)
+        self.jitter = jitter
+        self.start_time = parse_time(SIM_START) if start_time is None else int(start_time)
+        self.now = self.start_time
+        self.commit_every = commit_every
+        self.on_task_done = on_task_done
+        self.batcher = FryerBatcher(self.allocator, batch_window) if batch_window is not None else None
+        self.detector = detector or BottleneckDetector(self.allocator)
+        self._deadline_at = None
+        self.holding = holding
+        self._prefry_at = self.start_time
+        self.staffing = staffing
+        self._restaff_at = self.start_time
+        self.restaffs = []          # 적용한 재배치 [(시각, 이동 인원, 예상 처리량 향상)]
+
+        self._arrivals = []         # 주문 도착 힙 [(시각, 순번, order_info)]
+        self._seq = itertools.count()
+        self.timers = TimerWheel(self.start_time)
+        self._events_since_commit = 0
+        self._attached = False      # DB 의 기존 작업은 첫 run() 에서 한 번만 이어받음
+
+        self.item_orders = {}       # order_item_id -> order_id
+        self.order_arrival = {}     # order_id -> 도착(생성) 시각
+        self.order_remaining = {}   # order_id -> 남은 작업 수
+        self.completed_orders = []  # update_order_status.sql 파라미터
+        self.order_latencies = []
+        self.orders_placed = 0
+        self.tasks_completed = 0
+        self.batches_started = 0
+
+    def schedule_orders(self, arrivals):
+        """arrivals: [(시작 시각 기준 오프셋 초, order_info)]"""
+        for offset, order_info in arrivals:
+            heapq.heappush(self._arrivals, (self.start_time + int(round(offset)), next(self._seq), order_info))
+
+    def _push(self, at, kind, payload):
+        self.timers.schedule(at, (kind, payload))
+
+    def _duration(self, seconds):
+        if not self.jitter:
+            return seconds
+        return max(1, int(round(seconds * self.rng.gauss(1.0, self.jitter))))
+
+    def _attach_existing(self):
+        """시뮬레이션 전에 DB 에 있던 미완료 작업/주문을 이어받음"""
+        self.allocator.load(self.conn)
+        self.ready_queue.load(self.conn)
+        for order_item_id, order_id, created_at, open_tasks in self.conn.execute(
+                load_sql('select_open_order_progress.sql')):
+            self.item_orders[order_item_id] = order_id
+            self.order_arrival[order_id] = created_at
+            self.order_remaining[order_id] = self.order_remaining.get(order_id, 0) + open_tasks
+
+        started = self.conn.execute(load_sql('select_started_tasks.sql')).fetchall()
+        waiting = [queue_task_id for queue_task_id, status in started if status == 'WAITING_RESOURCE']
+        running = [queue_task_id for queue_task_id, status in started if status == 'IN_PROGRESS']
+        self._start_tasks(waiting)
+        for queue_task_id in running:
+            self._push(self.now + self._task_seconds(queue_task_id), TASK_DONE, (queue_task_id,))
+
+    def _task_seconds(self, queue_task_id):
+        task_def_id, _, menu_item_id = self.ready_queue.tasks[queue_task_id]
+        return self._duration(self.recipe_cache.graph(menu_item_id).tasks[task_def_id][3])
+
+    def _handle_arrivals(self, orders):
+        created_at = self.now
+        receipts = place_orders(self.conn, orders, self.recipe_cache, created_at)
+        for receipt in receipts:
+            self.order_arrival[receipt['order_id']] = self.now
+            self.order_remaining[receipt['order_id']] = 0
+        cache = self.holding.cache if self.holding is not None else None
+        for order_item_id, order_id, _, _, count in expand_new_order_items(
+                self.conn, self.recipe_cache, created_at, cache):
+            self.item_orders[order_item_id] = order_id
+            self.order_remaining[order_id] += count
+        self.ready_queue.sync(self.conn)
+        self.orders_placed += len(orders)
+        for receipt in receipts:
+            if self.order_remaining[receipt['order_id']] == 0:
+                # 모든 작업을 보온 재고로 충당한 주문
+                del self.order_remaining[receipt['order_id']]
+                self.completed_orders.append(('COMPLETED', receipt['order_id']))
+                self.order_latencies.append(0)
+
+    @traced('execution')
+    def _handle_done(self, queue_task_ids):
+        """완료 사건 - 배치면 구성 작업 모두를 같은 시각에 완료"""
+        end = self.now
+        self.conn.executemany(load_sql('update_task_completed.sql'),
+                              [(end, queue_task_id) for queue_task_id in queue_task_ids])
+        for queue_task_id in queue_task_ids:
+            self._complete_task(queue_task_id)
+
+    def _complete_task(self, queue_task_id):
+        self.allocator.release(queue_task_id)
+
+        order_id = self.item_orders[self.ready_queue.order_item_ids[queue_task_id]]
+        workstation_id = self.ready_queue.tasks[queue_task_id][1]
+        for next_id, _, _, _ in self.ready_queue.complete(queue_task_id):
+            self.detector.on_ready(next_id, self.now, workstation_id)
+
+        self.tasks_completed += 1
+        self.order_remaining[order_id] -= 1
+        if self.order_remaining[order_id] == 0:
+            self.completed_orders.append(('COMPLETED', order_id))
+            self.order_latencies.append(self.now - self.order_arrival[order_id])
+        if self.on_task_done:
+            self.on_task_done(queue_task_id, self.now)
+
+    @traced('execution')
+    def _begin(self, queue_task_ids):
+        """작업을 지금 시작으로 기록하고 대기 시간은 감지기에 넘김, 작업별 소요 시간 반환"""
+        start = self.now
+        self.conn.executemany(load_sql('update_task_in_progress.sql'),
+                              [(start, queue_task_id) for queue_task_id in queue_task_ids])
+        seconds = []
+        for queue_task_id in queue_task_ids:
+            task_def_id, workstation_id, menu_item_id = self.ready_queue.tasks[queue_task_id]
+            _, _, _, base_seconds, task_type = self.recipe_cache.graph(menu_item_id).tasks[task_def_id]
+            created = self.order_arrival[self.item_orders[self.ready_queue.order_item_ids[queue_task_id]]]
+            self.detector.on_start(queue_task_id, workstation_id, task_type, created, self.now)
+            seconds.append(base_seconds)
+        return seconds
+
+    def _start_tasks(self, queue_task_ids):
+        """할당된 작업을 지금 시작하고 작업마다 완료 사건 예약"""
+        if not queue_task_ids:
+            return
+        for queue_task_id, seconds in zip(queue_task_ids, self._begin(queue_task_ids)):
+            self._push(self.now + self._duration(seconds), TASK_DONE, (queue_task_id,))
+
+    def _start_batch(self, queue_task_ids):
+        """튀김 배치를 시작하고 가장 긴 작업 기준으로 완료 사건 하나만 예약"""
+        seconds = max(self._begin(queue_task_ids))
+        self._push(self.now + self._duration(seconds), TASK_DONE, tuple(queue_task_ids))
+        self.batches_started += 1
+
+    def _dispatch(self):
+        if self.staffing is not None and self.now >= self._restaff_at:
+            self._restaff()
+        if self.batcher is not None:
+            for batch in self.batcher.dispatch(self.conn, self.ready_queue, self.now,
+                                               on_miss=self.detector.on_blocked):
+                self._start_batch([queue_task_id for queue_task_id, _, _, _ in batch])
+            # 대기 한도가 끝나면 자원 반환이 없어도 다시 할당을 시도하도록 깨움
+            deadline = self.batcher.next_deadline()
+            if deadline is not None and deadline > self.now and deadline != self._deadline_at:
+                self._push(deadline, BATCH_DEADLINE, None)
+                self._deadline_at = deadline
+        assignments = self.allocator.assign_ready(self.conn, self.ready_queue, now=self.now,
+                                                  on_miss=self.detector.on_blocked)
+        self._start_tasks([queue_task_id for queue_task_id, _, _, _ in assignments])
+        if self.holding is not None and self.now >= self._prefry_at:
+            self._prefry()
+
+    def _prefry(self):
+        """주문 작업에 쓰고 남은 튀김 자원으로 미리 튀기고, 주문이 더 올 동안 다음 시도를 예약"""
+        for food_type, done_at, keys in self.holding.start(self.now):
+            self._push(done_at, HOLDING_DONE, (food_type, keys))
+        self._prefry_at = self.now + self.holding.interval
+        if self._arrivals:
+            self._push(self._prefry_at, HOLDING_TICK, None)
+
+    def _restaff(self):
+        """예상 부하로 스태프를 다시 배치하고, 주문이 더 올 동안 다음 재배치를 예약"""
+        plan = self.staffing.plan(self.conn, self.now)
+        if plan['moves']:
+            self.staffing.apply(self.conn, plan, self.now)
+            self.allocator.load_roster(self.conn)
+            self.restaffs.append((self.now, len(plan['moves']), plan['gain']))
+        self._restaff_at = self.now + self.staffing.interval
+        if self._arrivals:
+            self._push(self._restaff_at, RESTAFF_TICK, None)
+
+    def _flush(self):
+        """완료 주문/병목 기록을 모아 쓰고 커밋"""
+        self.allocator.flush_zones(self.conn)
+        if self.completed_orders:
+            self.conn.executemany(load_sql('update_order_status.sql'), self.completed_orders)
+            self.completed_orders = []
+        self.detector.flush(self.conn)
+        if self.holding is not None:
+            self.holding.cache.flush(self.conn)
+        self.conn.commit()
+        self._events_since_commit = 0
+
+    @traced('simulation')
+    def run(self, until=None):
+        """
+        사건이 없어질 때까지 (또는 until 시각까지) 실행하고 통계 반환
+
+        until 로 멈춘 뒤 다시 run() 하면 남은 사건부터 이어서 진행한다 (통계는 처음부터 누적).
+        """
+        cpu_start = time.process_time()
+        if not self.conn.in_transaction:
+            self.conn.execute("BEGIN IMMEDIATE")
+        if not self._attached:
+            self._attach_existing()
+            self._attached = True
+
+        while self._arrivals or self.timers:
+            # 다음 주문 도착 전까지 타이머 휠을 틱 단위로 돌려 첫 만료 시각을 찾음
+            limit = self._arrivals[0][0] if self._arrivals else None
+            if until is not None and (limit is None or limit > until):
+                limit = until
+            at, fired = self.timers.expire_next(limit)
+            if not fired and not (self._arrivals and self._arrivals[0][0] <= at):
+                break
+            self.now = at
+
+            # 같은 시각의 사건을 모두 처리한 뒤 한 번만 할당
+            arrivals = []
+            while self._arrivals and self._arrivals[0][0] <= at:
+                arrivals.append(heapq.heappop(self._arrivals)[2])
+            self.allocator.release_expired(at)
+            for _, (kind, payload) in fired:
+                if kind == TASK_DONE:
+                    self._handle_done(payload)
+                elif kind == HOLDING_DONE:
+                    self.holding.finish(payload[0], payload[1], at)
+            if arrivals:
+                self._handle_arrivals(arrivals)
+            self._events_since_commit += len(fired) + len(arrivals)
+            self.allocator.flush_zones(self.conn)
+            self._dispatch()
+
+            if self._events_since_commit >= self.commit_every:
+                self._flush()
+                self.conn.execute("BEGIN IMMEDIATE")
+        if self.holding is not None:
+            self.holding.cache.evict(self.now)
+        self._flush()
+
+        latencies = sorted(self.order_latencies)
+        stats = {
+            'orders_placed': self.orders_placed,
+            'orders_completed': len(latencies),
+            'tasks_completed': self.tasks_completed,
+            'batches_started': self.batches_started,
+            'tasks_pending': self.ready_queue.pending_count(),
+            'virtual_seconds': self.now - self.start_time,
+            'cpu_seconds': time.process_time() - cpu_start,
+            'latency_p50': percentile(latencies, 50),
+            'latency_p95': percentile(latencies, 95),
+            'latency_p99': percentile(latencies, 99),
+        }
+        if self.holding is not None:
+            stats['holding'] = self.holding.metrics(self.start_time, self.now)
+        if self.staffing is not None:
+            stats['staffing'] = {
+                'restaffs': len(self.restaffs),
+                'staff_moves': sum(moves for _, moves, _ in self.restaffs),
+                'predicted_gain': self.restaffs[0][2] if self.restaffs else 0.0,
+            }
+        return stats
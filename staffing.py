@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+"""
+스태프 배치 최적화 - 작업장별 예상 부하로 StaffAssignment 를 다시 짬
+
+작업장 부하(초) = 지금 남은 ACTIVE 작업 시간 (select_backlog_by_definition.sql)
+                + horizon 초 동안 들어올 주문의 ACTIVE 작업 시간 (메뉴별 작업장 부하 벡터 × 시간대별 예상 주문)
+PASSIVE 작업(감자튀김 등)은 스태프가 필요 없으므로 뺀다. 튀김은 FryerBatcher 가 구역 용량만큼 묶어
+스태프 한 명이 배치 하나를 맡으므로(batched) 튀김 작업 1개의 스태프 시간은 작업 초 / 구역 용량으로 본다.
+
+스태프는 어느 작업장에서나 일할 수 있다고 보고(숙련도 정보 없음) 예상 처리 시간 max(부하 / 인원) 을
+최소로 하는 작업장별 인원을 정한다. ACTIVE 작업이 있는 작업장에 부하 순으로 한 명씩 먼저 두고, 남은
+사람은 부하/인원이 가장 큰 작업장(max_staff 미만)에 한 명씩 더한다. 사람끼리 바꿔 설 수 있으므로 이
+탐욕 배분이 최대값을 최소로 만든다. 인원이 정해지면 지금 서 있는 사람은 그대로 두고 모자란 작업장만
+남는 사람으로 채워 이동을 최소화한다. 예상 처리량 향상이 min_gain 미만이면 사람을 옮기지 않는다.
+BREAK/OFF_WORK 스태프는 배치하지 않는다.
+
+DB 조회는 명단과 작업장별 집계 쿼리뿐이고 계산은 (작업장 수 × 스태프 수) 라 큐가 바뀔 때마다 다시 돌려도 싸다.
+적용(apply) 뒤에는 할당기의 load_roster() 로 새 명단을 읽는다.
+
+사용 예:
+    python staffing.py --db momstouch_complete.db
+    python staffing.py --db momstouch_complete.db --available 2,3,4,5,6 --apply
+"""
+
+import argparse
+import sys
+import time
+
+from tabulate import tabulate
+from colorama import Fore, init
+
+from allocator import food_type_for_task
+from dal import connect, load_sql, transaction
+from holding import DemandForecaster
+from recipe_graph import RecipeGraphCache
+
+class StaffingOptimizer:
+    """예상 부하 기반 작업장별 인원 배분과 StaffAssignment 재작성"""
+
+    def __init__(self, recipe_cache, forecaster=None, horizon=3600, interval=900, batched=True, min_gain=0.1):
+        self.recipe_cache = recipe_cache
+        self.forecaster = forecaster    # 작업장별 부하(초)를 학습한 DemandForecaster, 없으면 남은 작업만
+        self.horizon = horizon
+        self.interval = interval        # 시뮬레이션에서 다시 짜는 주기 (초)
+        self.batched = batched
+        self.min_gain = min_gain
+        self.limits = {}                # workstation_id -> (이름, max_staff)
+        self.task_costs = {}            # task_definition_id -> (workstation_id, 작업 1개의 스태프 초), ACTIVE 만
+        self.staffed = set()            # ACTIVE 작업이 있는 작업장
+
+    def load(self, conn):
+        self.recipe_cache.refresh(conn)
+        self.limits = {workstation_id: (name, max_staff) for workstation_id, name, max_staff
+                       in conn.execute(load_sql('select_workstation_limits.sql'))}
+        batch_sizes = {}
+        if self.batched:
+            for _, food_type, max_quantity in conn.execute(load_sql('select_zone_capacity_rules.sql')):
+                batch_sizes[food_type] = max(batch_sizes.get(food_type, 1), max_quantity)
+        # 긴 이름 먼저 비교해 부분 일치 오류 방지
+        food_types = sorted(batch_sizes, key=len, reverse=True)
+        self.task_costs = {}
+        for graph in self.recipe_cache.graphs.values():
+            for task_def_id, (task_name, workstation_id, _, seconds, task_type) in graph.tasks.items():
+                if task_type != 'ACTIVE':
+                    continue
+                food_type = food_type_for_task(task_name, food_types)
+                self.task_costs[task_def_id] = (workstation_id, seconds / batch_sizes.get(food_type, 1))
+        self.staffed = {workstation_id for workstation_id, _ in self.task_costs.values()}
+        return self
+
+    def menu_loads(self):
+        """메뉴 1개당 작업장별 ACTIVE 작업의 스태프 초 {menu_item_id: {workstation_id: 초}}"""
+        loads = {}
+        for menu_item_id, graph in self.recipe_cache.graphs.items():
+            for task_def_id in graph.tasks:
+                cost = self.task_costs.get(task_def_id)
+                if cost is not None:
+                    station = loads.setdefault(menu_item_id, {})
+                    station[cost[0]] = station.get(cost[0], 0) + cost[1]
+        return loads
+
+    def fit(self, conn, since=0):
+        """DB 주문 이력으로 시간대별 작업장 부하 학습"""
+        self.forecaster = DemandForecaster().fit(conn, self.menu_loads(), since)
+        return self
+
+    def fit_rows(self, rows):
+        """주문 이력 행 [(접수 시각, menu_item_id, quantity)] 으로 학습"""
+        self.forecaster = DemandForecaster().fit_rows(rows, self.menu_loads())
+        return self
+
+    def station_load(self, conn, now):
+        """작업장별 부하 초 = 남은 ACTIVE 작업 + horizon 동안 예상 유입"""
+        load = {workstation_id: 0.0 for workstation_id in self.staffed}
+        for task_def_id, count in conn.execute(load_sql('select_backlog_by_definition.sql')):
+            cost = self.task_costs.get(task_def_id)
+            if cost is not None:
+                load[cost[0]] += cost[1] * count
+        if self.forecaster is not None:
+            for workstation_id in load:
+                load[workstation_id] += self.forecaster.expected(workstation_id, now, self.horizon)
+        return load
+
+    def _max_staff(self, workstation_id):
+        return self.limits.get(workstation_id, (None, 1))[1]
+
+    def counts(self, load, staff_count):
+        """예상 처리 시간 max(부하 / 인원) 을 최소로 하는 작업장별 인원"""
+        counts = {workstation_id: 0 for workstation_id in self.limits}
+        remaining = staff_count
+        for workstation_id in sorted(self.staffed, key=lambda ws: (-load.get(ws, 0), ws)):
+            if remaining and self._max_staff(workstation_id) > 0:
+                counts[workstation_id] = 1
+                remaining -= 1
+        while remaining:
+            candidates = [ws for ws in self.staffed if 0 < counts[ws] < self._max_staff(ws)]
+            if not candidates:
+                break
+            busiest = max(candidates, key=lambda ws: (load.get(ws, 0) / counts[ws], -ws))
+            counts[busiest] += 1
+            remaining -= 1
+        return counts
+
+    @staticmethod
+    def drain_seconds(load, counts):
+        """예상 처리 시간 = max(부하 / 인원), 부하가 있는데 사람이 없으면 inf"""
+        worst = 0.0
+        for workstation_id, seconds in load.items():
+            if seconds <= 0:
+                continue
+            staff = counts.get(workstation_id, 0)
+            if staff == 0:
+                return float('inf')
+            worst = max(worst, seconds / staff)
+        return worst
+
+    def plan(self, conn, now=None, available=None):
+        """
+        새 배치 계산 (DB 는 바꾸지 않음)
+
+        available: 배치할 staff_id 목록, 생략하면 Staff.status 가 ACTIVE 인 전원
+        반환: {'load', 'current', 'target': 작업장별 인원, 'assignment': {staff_id: workstation_id},
+               'moves': [(staff_id, 이전 작업장, 새 작업장)], 'current_seconds', 'planned_seconds',
+               'gain': 예상 처리량 향상 비율 (현재 처리 시간 / 새 처리 시간 - 1),
+                       부하가 있는 작업장에 지금 사람이 없어 비율을 낼 수 없으면 None}
+        """
+        now = int(time.time()) if now is None else now
+        status = {}
+        current = {}
+        for staff_id, _, staff_status, workstation_id in conn.execute(load_sql('select_staff_roster.sql')):
+            status[staff_id] = staff_status
+            if workstation_id is not None:
+                current.setdefault(staff_id, workstation_id)
+        if available is None:
+            available = [staff_id for staff_id, staff_status in status.items() if staff_status == 'ACTIVE']
+        available = sorted(set(available))
+
+        load = self.station_load(conn, now)
+        target = self.counts(load, len(available))
+        current_counts = {workstation_id: 0 for workstation_id in self.limits}
+        for staff_id in available:
+            workstation_id = current.get(staff_id)
+            if workstation_id in current_counts and current_counts[workstation_id] < self._max_staff(workstation_id):
+                current_counts[workstation_id] += 1
+
+        # 지금 서 있는 사람을 먼저 그대로 두고, 모자란 작업장은 부하가 큰 곳부터 남는 사람으로 채움
+        assignment = {}
+        filled = {workstation_id: 0 for workstation_id in target}
+        for staff_id in available:
+            workstation_id = current.get(staff_id)
+            if workstation_id in filled and filled[workstation_id] < target[workstation_id]:
+                assignment[staff_id] = workstation_id
+                filled[workstation_id] += 1
+        spare = [staff_id for staff_id in available if staff_id not in assignment]
+        for workstation_id in sorted(target, key=lambda ws: (-load.get(ws, 0), ws)):
+            while filled[workstation_id] < target[workstation_id] and spare:
+                assignment[spare.pop(0)] = workstation_id
+                filled[workstation_id] += 1
+
+        current_seconds = self.drain_seconds(load, current_counts)
+        planned_seconds = self.drain_seconds(load, target)
+        if not current_seconds > planned_seconds * (1 + self.min_gain):
+            # 옮겨도 얻는 게 적으면 지금 배치 유지
+            target = current_counts
+            planned_seconds = current_seconds
+            assignment = {staff_id: current[staff_id] for staff_id in available if staff_id in current}
+        if planned_seconds == 0 or current_seconds == planned_seconds:
+            gain = 0.0
+        elif current_seconds == float('inf'):
+            gain = None     # JSON 에 Infinity 가 들어가지 않도록
+        else:
+            gain = current_seconds / planned_seconds - 1
+        moves = [(staff_id, current.get(staff_id), assignment.get(staff_id)) for staff_id in available
+                 if current.get(staff_id) != assignment.get(staff_id)]
+        return {
+            'load': load, 'current': current_counts, 'target': target, 'assignment': assignment,
+            'moves': moves, 'current_seconds': current_seconds, 'planned_seconds': planned_seconds,
+            'gain': gain,
+        }
+
+    def apply(self, conn, plan, now=None):
+        """plan 의 이동만 StaffAssignment 에 반영 (트랜잭션 하나), 이동 인원 반환"""
+        with transaction(conn):
+            for staff_id, _, workstation_id in plan['moves']:
+                conn.execute(load_sql('delete_staff_assignment.sql'), (staff_id,))
+                if workstation_id is not None:
+                    conn.execute(load_sql('insert_staff_assignment.sql'), (staff_id, workstation_id, now))
+        return len(plan['moves'])
+
+def format_gain(gain):
+    return "∞ (현재 배치로는 처리 불가)" if gain is None else f"{gain * 100:+.1f}%"
+
+def print_plan(conn, optimizer, plan):
+    names = {staff_id: name for staff_id, name, _, _ in conn.execute(load_sql('select_staff_roster.sql'))}
+    rows = []
+    for workstation_id, (name, max_staff) in sorted(optimizer.limits.items()):
+        load = plan['load'].get(workstation_id, 0.0)
+        target = plan['target'][workstation_id]
+        rows.append([name, max_staff, f"{load:,.0f}", plan['current'][workstation_id], target,
+                     f"{load / target:,.0f}" if target else ('-' if not load else '∞')])
+    print(tabulate(rows, headers=["작업장", "최대 인원", "부하(초)", "현재 인원", "새 인원", "1인당 부하(초)"],
+                   tablefmt="grid"))
+    stations = {workstation_id: name for workstation_id, (name, _) in optimizer.limits.items()}
+    if plan['moves']:
+        print(tabulate([[names.get(staff_id, staff_id), stations.get(before, '-'), stations.get(after, '-')]
+                        for staff_id, before, after in plan['moves']],
+                       headers=["스태프", "현재 작업장", "새 작업장"], tablefmt="grid"))
+    else:
+        print(Fore.GREEN + "현재 배치가 이미 최적입니다")
+    print(f"예상 처리 시간 {plan['current_seconds']:,.0f}초 → {plan['planned_seconds']:,.0f}초, "
+          f"예상 처리량 {format_gain(plan['gain'])}")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="작업장 부하 예측 기반 스태프 재배치")
+    parser.add_argument('--db', default='momstouch_complete.db', help="DB 파일")
+    parser.add_argument('--horizon', type=int, default=3600, help="부하에 더할 예상 주문 구간(초)")
+    parser.add_argument('--history-days', type=int, default=28, help="수요 학습에 쓸 최근 주문 이력(일)")
+    parser.add_argument('--no-batching', action='store_true', help="튀김을 배치로 묶지 않는 주방으로 계산")
+    parser.add_argument('--min-gain', type=float, default=0.1, help="사람을 옮길 최소 예상 처리량 향상 비율")
+    parser.add_argument('--available', help="배치할 staff_id 목록 (쉼표 구분, 생략하면 ACTIVE 전원)")
+    parser.add_argument('--apply', action='store_true', help="새 배치를 StaffAssignment 에 기록")
+    return parser.parse_args()
+
+def main():
+    init(autoreset=True)
+    args = parse_args()
+    conn = connect(args.db)
+    now = int(time.time())
+    optimizer = StaffingOptimizer(RecipeGraphCache(), horizon=args.horizon, batched=not args.no_batching,
+                                  min_gain=args.min_gain).load(conn)
+    optimizer.fit(conn, since=now - args.history_days * 86400)
+    available = [int(staff_id) for staff_id in args.available.split(',')] if args.available else None
+    plan = optimizer.plan(conn, now, available)
+    print_plan(conn, optimizer, plan)
+    if args.apply and plan['moves']:
+        moved = optimizer.apply(conn, plan, now)
+        print(Fore.GREEN + f"💾 StaffAssignment {moved}명 재배치")
+    conn.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,320 @@
+# -*- coding: utf-8 -*-
+"""
+작업장 워커 - 작업장마다 별도 프로세스가 실행 가능 작업을 원자적으로 가져가 실행하고 완료를 보고
+
+튀김기, 버거 조립대, 음료/사이드가 각자 자기 프로세스에서 돈다. 작업장의 스태프와 구역은
+그 작업장 워커만 쓰므로 메모리(ResourceAllocator)에서 고르고, 프로세스끼리 경합하는 것은
+작업 가져가기뿐이다. 가져가기는 claim_station_task.sql 의 UPDATE ... RETURNING 한 문장으로,
+지금 자원이 있는 작업 정의와 그 자원(구역/스태프) 계획을 JSON 으로 넘겨
+선행 작업이 끝난 가장 오래된 작업 하나를 IN_PROGRESS 로 바꾸며 자원까지 기록한다.
+
+WAL 잠금:
+- 쓰기는 모두 BEGIN IMMEDIATE (dal.transaction) 로 시작해 쓰기 잠금을 먼저 잡는다.
+  읽기 트랜잭션을 쓰기로 올리다 다른 커밋과 부딪히면 busy_timeout 없이 바로 실패하기 때문이다.
+- 잠금 안에서 최신 커밋을 보고 후보를 고르므로 두 워커가 같은 작업을 잡을 수 없고,
+  주문 완료 판단도 작업 완료와 같은 트랜잭션이라 마지막 두 작업이 동시에 끝나도 한 번만 바뀐다.
+- busy_timeout 이 지나 실패하면 메모리 상태를 DB 기준으로 다시 읽고 다음 회차에 재시도한다.
+- 가져갈 작업이 없으면 변경 피드(ChangeFeed) 끝 위치가 바뀔 때까지 쓰기 잠금을 잡지 않는다.
+
+작업 시간은 MenuTasks.base_time_seconds 를 주방 시계(KitchenClock) 배속으로 실제 시간에 맞춘다.
+speed 0 이면 작업이 바로 끝나 순수 가져가기/완료 처리량을 잰다.
+중앙 할당기(simulation.py)와 같은 DB 에서 동시에 돌리지 않는다 (자원을 서로 모름).
+
+사용 예:
+    python station_worker.py --orders 300 --hours 1 --speed 60      # 작업장별 워커 + 주문 공급
+    python station_worker.py --db momstouch_complete.db --workstation 3   # 기존 DB 에 워커 하나만
+"""
+
+import argparse
+import heapq
+import json
+import multiprocessing
+import queue
+import sqlite3
+import sys
+import time
+from collections import deque
+
+from tabulate import tabulate
+from colorama import Fore, init
+
+from allocator import ResourceAllocator
+from dal import connect, create_database, load_sql, migrate, transaction
+from order_intake import place_orders
+from recipe_graph import RecipeGraphCache
+from simulation import generate_orders, percentile
+from task_queue import expand_new_order_items
+
+class KitchenClock:
+    """프로세스끼리 공유하는 주방 시계 - origin 부터 speed 배속으로 흐름 (0 이면 실제 시각, 작업은 바로 끝남)"""
+
+    def __init__(self, origin, speed=1.0):
+        self.origin = origin
+        self.speed = speed
+
+    def now(self):
+        """현재 주방 시각 (정수 epoch 초)"""
+        if not self.speed:
+            return int(time.time())
+        return int(self.origin + (time.time() - self.origin) * self.speed)
+
+    def real_seconds(self, kitchen_seconds):
+        """주방 시간 kitchen_seconds 가 실제로 걸리는 초"""
+        return kitchen_seconds / self.speed if self.speed else 0.0
+
+class StationWorker:
+    """작업장 하나의 워커 - 자원은 메모리에서 고르고 작업 가져가기/완료만 DB 에서 경합"""
+
+    def __init__(self, conn, workstation_id, clock, recipe_cache=None):
+        self.conn = conn
+        self.workstation_id = workstation_id
+        self.clock = clock
+        self.recipe_cache = recipe_cache or RecipeGraphCache()
+        self.allocator = ResourceAllocator(self.recipe_cache)
+        self.task_definition_ids = []
+        self.running = []           # [(완료될 실제 시각, queue_task_id)] 최소 힙
+        self.idle_head = None       # 빈 가져가기 때의 변경 피드 끝 위치
+        self.latencies = []         # 이 워커가 완료시킨 주문의 접수~완료 주방 초
+        self.claimed = 0
+        self.completed = 0
+        self.empty_claims = 0
+        self.skipped_claims = 0
+        self.lock_errors = 0
+
+    def load(self):
+        """자원 상태를 읽고, 이 작업장에서 실행 중이던 작업은 남은 시간만큼 이어서 실행"""
+        self.allocator.load(self.conn)
+        task_menu = self.recipe_cache.task_menu
+        self.task_definition_ids = sorted(
+            task_def_id for task_def_id, menu_item_id in task_menu.items()
+            if self.recipe_cache.graph(menu_item_id).tasks[task_def_id][1] == self.workstation_id)
+        self.running = []
+        now, wall = self.clock.now(), time.time()
+        for queue_task_id, task_def_id, started in self.conn.execute(
+                load_sql('select_station_running_tasks.sql'), (self.workstation_id,)):
+            left = max((started or now) + self._task_seconds(task_def_id) - now, 0)
+            heapq.heappush(self.running, (wall + self.clock.real_seconds(left), queue_task_id))
+        self.idle_head = None
+        return self
+
+    def _task_seconds(self, task_def_id):
+        return self.recipe_cache.graph(self.recipe_cache.task_menu[task_def_id]).tasks[task_def_id][3]
+
+    def _feed_head(self):
+        return self.conn.execute(load_sql('select_change_feed_head.sql')).fetchone()[1]
+
+    def claim(self):
+        """빈 자원만큼 실행 가능 작업을 하나씩 원자적으로 가져감, 가져간 수 반환"""
+        if self.idle_head is not None and self._feed_head() == self.idle_head:
+            self.skipped_claims += 1
+            return 0
+        claimed = 0
+        while True:
+            options = self.allocator.station_options(self.workstation_id, self.task_definition_ids)
+            if not options:
+                break
+            plan = json.dumps({str(task_def_id): [zone_id, staff_id]
+                               for task_def_id, (zone_id, staff_id) in options.items()})
+            now = self.clock.now()
+            with transaction(self.conn):
+                rows = self.conn.execute(load_sql('claim_station_task.sql'),
+                                         (self.workstation_id, plan, plan, now, plan)).fetchall()
+                if not rows:
+                    self.idle_head = self._feed_head()
+                    self.empty_claims += 1
+                    break
+                queue_task_id, task_def_id, _ = rows[0]
+                menu_item_id = self.recipe_cache.task_menu[task_def_id]
+                self.allocator.assign([(queue_task_id, task_def_id, self.workstation_id, menu_item_id)], now)
+                self.allocator.flush_zones(self.conn)
+            seconds = self.clock.real_seconds(self._task_seconds(task_def_id))
+            heapq.heappush(self.running, (time.time() + seconds, queue_task_id))
+            claimed += 1
+        if claimed:
+            self.idle_head = None
+        self.claimed += claimed
+        return claimed
+
+    def complete(self, queue_task_ids):
+        """작업 완료를 보고하고 남은 작업이 없는 주문은 같은 트랜잭션에서 완료로 바꿈"""
+        now = self.clock.now()
+        with transaction(self.conn):
+            for queue_task_id in queue_task_ids:
+                self.allocator.release(queue_task_id)
+                rows = self.conn.execute(load_sql('update_task_finished.sql'),
+                                         (now, queue_task_id)).fetchall()
+                if not rows:
+                    continue        # 다른 경로로 이미 완료되었거나 보관된 작업
+                for _, created_at in self.conn.execute(load_sql('update_order_completed.sql'),
+                                                       (rows[0][0],)).fetchall():
+                    self.latencies.append(now - created_at)
+            self.allocator.flush_zones(self.conn)
+        self.completed += len(queue_task_ids)
+        self.idle_head = None
+
+    def step(self):
+        """완료 시각이 된 작업을 보고하고 새 작업을 가져감, 처리한 작업 수 반환"""
+        self.allocator.release_expired(self.clock.now())
+        wall = time.time()
+        finished = []
+        while self.running and self.running[0][0] <= wall:
+            finished.append(heapq.heappop(self.running)[1])
+        try:
+            if finished:
+                self.complete(finished)
+            return len(finished) + self.claim()
+        except sqlite3.OperationalError:
+            # busy_timeout 안에 잠금을 못 얻음 - 롤백되었으므로 DB 기준으로 다시 맞추고 다음 회차에 재시도
+            self.lock_errors += 1
+            self.load()
+            return 0
+
+    def run(self, stop=None, poll_seconds=0.05):
+        """stop 이 설정되고 실행 중인 작업이 없을 때까지 (stop 이 없으면 Ctrl+C 까지) 반복"""
+        while stop is None or not stop.is_set() or self.running:
+            if self.step():
+                continue
+            wait = poll_seconds
+            if self.running:
+                wait = min(wait, max(self.running[0][0] - time.time(), 0))
+            time.sleep(wait)
+
+    def report(self):
+        return {
+            'workstation_id': self.workstation_id,
+            'claimed': self.claimed,
+            'completed': self.completed,
+            'empty_claims': self.empty_claims,
+            'skipped_claims': self.skipped_claims,
+            'lock_errors': self.lock_errors,
+            'cpu_seconds': time.process_time(),
+            'latencies': self.latencies,
+        }
+
+def run_station(db_path, workstation_id, clock, stop, results, poll_seconds=0.05):
+    """워커 프로세스 진입점 - 자기 연결을 열어 워커를 돌리고 통계를 results 큐로 보냄"""
+    conn = connect(db_path)
+    try:
+        worker = StationWorker(conn, workstation_id, clock).load()
+        worker.run(stop, poll_seconds)
+        results.put(worker.report())
+    finally:
+        conn.close()
+
+def run_kitchen(db_path, arrivals, speed=0.0, workstation_ids=None, poll_seconds=0.05, timeout=None):
+    """
+    작업장마다 워커 프로세스를 띄우고 주문을 도착 시각에 맞춰 넣은 뒤, 작업이 모두 끝나면 멈춤
+
+    arrivals: generate_orders() 형식 [(주방 시계 기준 오프셋 초, order_info)]
+    반환: (워커별 report() 목록, 실제 경과 초) - timeout 초가 지나면 남은 작업과 상관없이 멈춤
+    """
+    conn = connect(db_path)
+    recipe_cache = RecipeGraphCache().refresh(conn)
+    if workstation_ids is None:
+        workstation_ids = [row[0] for row in conn.execute(load_sql('select_workstation_limits.sql'))]
+
+    context = multiprocessing.get_context('spawn')
+    stop, results = context.Event(), context.Queue()
+    clock = KitchenClock(time.time(), speed)
+    workers = [context.Process(target=run_station, name=f"station-{workstation_id}",
+                               args=(db_path, workstation_id, clock, stop, results, poll_seconds))
+               for workstation_id in workstation_ids]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+
+    pending = deque(sorted(arrivals, key=lambda arrival: arrival[0]))
+    try:
+        while timeout is None or time.perf_counter() - started < timeout:
+            now = clock.now()
+            due = []
+            while pending and (not speed or clock.origin + pending[0][0] <= now):
+                due.append(pending.popleft()[1])
+            if due:
+                place_orders(conn, due, recipe_cache, now)
+                expand_new_order_items(conn, recipe_cache, now)
+            if not pending and not conn.execute(load_sql('select_open_task_count.sql')).fetchone()[0]:
+                break
+            if not any(worker.is_alive() for worker in workers):
+                break
+            time.sleep(poll_seconds)
+    finally:
+        stop.set()
+        reports = []
+        while len(reports) < len(workers):
+            try:
+                reports.append(results.get(timeout=1.0))
+            except queue.Empty:
+                if not any(worker.is_alive() for worker in workers):
+                    break       # 비정상 종료한 워커는 통계 없음
+        for worker in workers:
+            worker.join()
+        conn.close()
+    return sorted(reports, key=lambda report: report['workstation_id']), time.perf_counter() - started
+
+def print_reports(conn, reports, elapsed):
+    names = {workstation_id: name for workstation_id, name, _
+             in conn.execute(load_sql('select_workstation_limits.sql'))}
+    rows = [[names.get(r['workstation_id'], r['workstation_id']), r['claimed'], r['completed'],
+             r['empty_claims'], r['skipped_claims'], r['lock_errors'], f"{r['cpu_seconds']:.2f}"]
+            for r in reports]
+    print(tabulate(rows, headers=['작업장', '가져감', '완료', '빈 가져가기', '건너뜀', '잠금 실패', 'CPU 초'],
+                   tablefmt='github'))
+    completed = sum(r['completed'] for r in reports)
+    latencies = sorted(latency for r in reports for latency in r['latencies'])
+    print(Fore.GREEN + f"\n완료 작업 {completed}건 / {elapsed:.2f}초 = {completed / max(elapsed, 1e-9):,.0f} 작업/초, "
+          f"완료 주문 {len(latencies)}건")
+    if latencies:
+        print(f"주문 접수~완료 (주방 초) p50 {percentile(latencies, 50)} / p99 {percentile(latencies, 99)}")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="작업장별 프로세스 워커 (원자적 작업 가져가기)")
+    parser.add_argument('--db', default='station_workers.db',
+                        help="DB 파일 (--workstation 이 없으면 매번 새로 생성)")
+    parser.add_argument('--workstation', type=int,
+                        help="이 작업장 워커 하나만 기존 DB 에서 실행 (Ctrl+C 로 종료)")
+    parser.add_argument('--orders', type=int, default=300, help="공급할 주문 수")
+    parser.add_argument('--hours', type=float, default=1.0, help="주문 도착 구간(주방 시간)")
+    parser.add_argument('--speed', type=float, default=0.0,
+                        help="주방 시계 배속 (0 이면 주문을 한 번에 넣고 작업은 바로 완료)")
+    parser.add_argument('--seed', type=int, default=42, help="난수 seed")
+    parser.add_argument('--poll', type=float, default=0.05, help="할 일이 없을 때 확인 간격(초)")
+    parser.add_argument('--timeout', type=float, default=600, help="최대 실행 시간(실제 초)")
+    return parser.parse_args()
+
+def main():
+    init(autoreset=True)
+    args = parse_args()
+
+    if args.workstation is not None:
+        conn = connect(args.db)
+        migrate(conn)
+        worker = StationWorker(conn, args.workstation, KitchenClock(time.time(), args.speed or 1.0)).load()
+        print(f"작업장 {args.workstation} 워커 시작 (Ctrl+C 종료)")
+        started = time.perf_counter()
+        try:
+            worker.run(poll_seconds=args.poll)
+        except KeyboardInterrupt:
+            pass
+        print_reports(conn, [worker.report()], time.perf_counter() - started)
+        conn.close()
+        return 0
+
+    conn = create_database(args.db)
+    menu_item_ids = [row[0] for row in conn.execute("SELECT menu_item_id FROM MenuItems ORDER BY menu_item_id")]
+    conn.close()
+    arrivals = generate_orders(menu_item_ids, args.orders, args.hours * 3600, seed=args.seed, prefix='WRK')
+    print(Fore.CYAN + f"주문 {args.orders}건, 배속 {args.speed or '즉시'}, 작업장별 워커 프로세스 실행 중...")
+    reports, elapsed = run_kitchen(args.db, arrivals, args.speed, poll_seconds=args.poll,
+                                   timeout=args.timeout)
+    conn = connect(args.db)
+    print_reports(conn, reports, elapsed)
+    open_tasks = conn.execute(load_sql('select_open_task_count.sql')).fetchone()[0]
+    conn.close()
+    if open_tasks:
+        print(Fore.RED + f"⚠️ 끝나지 않은 작업 {open_tasks}건")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,347 @@
+# -*- coding: utf-8 -*-
+"""
+다점포 샤딩 - 매장마다 DB 파일 하나, 공유 메뉴/레시피 카탈로그, 매장 라우터, 체인 리포트 병렬 집계
+
+stores/ 디렉터리 구성:
+    stores.json     매장 목록 {code: {'name', 'file', 'catalog_digest'}} 과 카탈로그 다이제스트
+    catalog.db      공유 카탈로그 (MenuItems / MenuTasks / TaskDependencies 의 원본, 템플릿에서 생성)
+    <code>.db       매장 샤드 (카탈로그를 복사해 만든 완전한 주방 DB, 작업장/구역/스태프는 매장별)
+
+StoreRouter 는 매장 코드로 샤드의 쓰기 연결과 레시피 캐시를 찾아 주문을 넣는다. 매장마다 파일과
+WAL 쓰기 잠금이 따로이고 샤드 연결은 처음 쓸 때 한 번만 열리므로, 매장을 늘려도 한 매장의 주문
+접수/작업 처리 경로에는 사전 조회 한 번 외의 비용이 붙지 않는다. 메뉴 ID 가 카탈로그에서 오므로
+모든 샤드에서 같은 메뉴는 같은 ID 이고, 카탈로그가 바뀌면 sync_catalog() 가 다이제스트가 다른 샤드에만
+카탈로그 테이블을 한 트랜잭션으로 다시 써 넣는다 (레시피 트리거가 RecipeVersion 을 올려 캐시가 다시 컴파일됨).
+
+체인 리포트는 샤드마다 읽기 전용 연결로 부분 집계(병목 유형별 건수/대기 합, 처리량, 주문 완료 시간
+히스토그램, 메뉴별 수량)를 스레드 풀에서 동시에 구한 뒤 합친다. 집계는 SQLite 안에서 돌고 그동안
+GIL 이 풀리므로 샤드 수만큼 병렬로 진행되며, 부분 집계는 모두 합으로 합칠 수 있는 형태라
+백분위수도 합친 히스토그램에서 구한다 (bucket_seconds 해상도).
+
+사용 예:
+    python stores.py --add gangnam:강남점,hongdae:홍대점,jamsil:잠실점
+    python demo_complete.py --simulate --store gangnam --seed 1
+    python stores.py --report --since "2025-01-01 10:00:00"
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from tabulate import tabulate
+from colorama import Fore, init
+
+from allocator import parse_time
+from dal import BASE_DIR, clone_database, connect, ensure_template, load_sql, migrate, queries, transaction
+from order_intake import place_orders
+from recipe_graph import RecipeGraphCache
+from tracing import nearest_rank
+
+STORES_DIR = os.path.join(BASE_DIR, "stores")
+MANIFEST = "stores.json"
+CATALOG = "catalog.db"
+# 카탈로그로 공유하는 테이블 (부모 → 자식 순서, 작업장/구역/스태프는 매장별)
+CATALOG_TABLES = ('MenuItems', 'MenuTasks', 'TaskDependencies')
+
+_STORE_CODE = re.compile(r"^[A-Za-z0-9_-]+$")
+
+def catalog_digest(conn):
+    """카탈로그 테이블 내용의 해시 (샤드가 최신 카탈로그인지 비교)"""
+    digest = hashlib.sha256()
+    for table in CATALOG_TABLES:
+        digest.update(table.encode('utf-8'))
+        for row in conn.execute(f"SELECT * FROM {table} ORDER BY 1"):
+            digest.update(repr(row).encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+class StoreRouter:
+    """매장 코드 → 샤드 DB 라우터 (샤드 연결과 레시피 캐시는 처음 쓸 때 열어 재사용)"""
+
+    def __init__(self, directory=STORES_DIR):
+        self.directory = directory
+        self.manifest_path = os.path.join(directory, MANIFEST)
+        self.catalog_path = os.path.join(directory, CATALOG)
+        self._writers = {}        # code -> 쓰기 연결
+        self._caches = {}         # code -> RecipeGraphCache
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                self.manifest = json.load(f)
+        else:
+            os.makedirs(directory, exist_ok=True)
+            conn = clone_database(ensure_template(), self.catalog_path)
+            try:
+                self.manifest = {'catalog_digest': catalog_digest(conn), 'stores': {}}
+            finally:
+                conn.close()
+            self._save()
+
+    def _save(self):
+        # 임시 파일에 쓴 뒤 이름을 바꿔 다른 프로세스가 반쯤 쓴 목록을 읽지 않게 함
+        building = f"{self.manifest_path}.{os.getpid()}.tmp"
+        with open(building, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, ensure_ascii=False, indent=2)
+        os.replace(building, self.manifest_path)
+
+    @property
+    def stores(self):
+        """매장 코드 목록 (등록 순서)"""
+        return list(self.manifest['stores'])
+
+    def name(self, code):
+        return self.manifest['stores'][code]['name']
+
+    def path(self, code):
+        """매장 샤드 DB 경로, 없는 매장이면 KeyError"""
+        try:
+            return os.path.join(self.directory, self.manifest['stores'][code]['file'])
+        except KeyError:
+            raise KeyError(f"등록되지 않은 매장: {code}") from None
+
+    def add_store(self, code, name=None):
+        """카탈로그를 복사해 새 매장 샤드를 만들고 등록, 샤드 경로 반환 (이미 있으면 그대로)"""
+        if not _STORE_CODE.match(code):
+            raise ValueError(f"매장 코드는 영문/숫자/_/- 만: {code}")
+        if code not in self.manifest['stores']:
+            self.manifest['stores'][code] = {'name': name or code, 'file': f"{code}.db", 'catalog_digest': None}
+            self.reset_store(code).close()
+        return self.path(code)
+
+    def reset_store(self, code):
+        """매장 샤드를 카탈로그에서 새로 만들고(기존 주문/작업은 지움) 쿼리 검증 후 연결 반환"""
+        writer = self._writers.pop(code, None)
+        if writer is not None:
+            writer.close()
+        conn = clone_database(self.catalog_path, self.path(code))
+        queries.validate(conn)
+        self.manifest['stores'][code]['catalog_digest'] = self.manifest['catalog_digest']
+        self._save()
+        return conn
+
+    def writer(self, code):
+        """매장 샤드의 쓰기 연결 (처음 열 때만 마이그레이션 확인)"""
+        conn = self._writers.get(code)
+        if conn is None:
+            conn = connect(self.path(code))
+            migrate(conn)
+            self._writers[code] = conn
+        return conn
+
+    def recipe_cache(self, code):
+        cache = self._caches.get(code)
+        if cache is None:
+            cache = self._caches[code] = RecipeGraphCache()
+        return cache
+
+    def place_orders(self, code, orders, created_at=None):
+        """한 매장에 주문 묶음 접수 (order_intake.place_orders 를 샤드 연결로)"""
+        return place_orders(self.writer(code), orders, self.recipe_cache(code), created_at)
+
+    def route_orders(self, orders, created_at=None):
+        """
+        여러 매장 주문을 매장별로 나눠 접수
+
+        orders: [{'store': code, 'name': ..., 'items': [...]}, ...]
+        반환: 입력 순서대로 영수증 (각각 'store' 포함), 매장마다 트랜잭션 하나
+        """
+        by_store = {}
+        for index, order_info in enumerate(orders):
+            by_store.setdefault(order_info['store'], []).append(index)
+        receipts = [None] * len(orders)
+        for code, indexes in by_store.items():
+            for index, receipt in zip(indexes, self.place_orders(code, [orders[i] for i in indexes], created_at)):
+                receipts[index] = dict(receipt, store=code)
+        return receipts
+
+    def sync_catalog(self):
+        """
+        catalog.db 의 메뉴/레시피를 다이제스트가 다른 샤드에 다시 써 넣기, 갱신한 매장 코드 목록 반환
+
+        ID 를 그대로 옮기므로 샤드의 기존 주문 항목/작업은 같은 메뉴/작업 정의를 계속 가리킨다.
+        """
+        catalog = connect(f"file:{self.catalog_path}?mode=ro")
+        try:
+            digest = catalog_digest(catalog)
+            tables = {table: catalog.execute(f"SELECT * FROM {table}").fetchall() for table in CATALOG_TABLES}
+        finally:
+            catalog.close()
+        self.manifest['catalog_digest'] = digest
+        updated = []
+        for code, store in self.manifest['stores'].items():
+            if store['catalog_digest'] == digest:
+                continue
+            conn = self.writer(code)
+            with transaction(conn):
+                for table in reversed(CATALOG_TABLES):
+                    conn.execute(f"DELETE FROM {table}")
+                for table in CATALOG_TABLES:
+                    rows = tables[table]
+                    if rows:
+                        marks = ', '.join('?' * len(rows[0]))
+                        conn.executemany(f"INSERT INTO {table} VALUES ({marks})", rows)
+            store['catalog_digest'] = digest
+            updated.append(code)
+        self._save()
+        return updated
+
+    def close(self):
+        for conn in self._writers.values():
+            conn.close()
+        self._writers.clear()
+
+def store_partial(path, since=0, bucket_seconds=60):
+    """
+    샤드 하나의 부분 집계 (읽기 전용 연결, 스레드 풀 작업)
+
+    반환: {'bottlenecks': {유형: [건수, 대기 합]}, 'orders', 'completed', 'first_created', 'last_created',
+           'latency_histogram': {bucket: 주문 수}, 'menu_mix': {menu_item_id: [수량, 주문 수]}, 'seconds'}
+    """
+    started = time.perf_counter()
+    conn = connect(f"file:{path}?mode=ro", readonly=True, check_same_thread=False)
+    try:
+        orders, completed, first_created, last_created = conn.execute(
+            load_sql('select_store_throughput.sql'), (since,)).fetchone()
+        partial = {
+            'bottlenecks': {bottleneck_type: [count, total_wait or 0] for bottleneck_type, count, total_wait
+                            in conn.execute(load_sql('select_store_bottlenecks.sql'), (since, since))},
+            'orders': orders, 'completed': completed,
+            'first_created': first_created, 'last_created': last_created,
+            'latency_histogram': dict(conn.execute(load_sql('select_order_latency_histogram.sql'),
+                                                   (bucket_seconds, since))),
+            'menu_mix': {menu_item_id: [quantity, menu_orders] for menu_item_id, quantity, menu_orders
+                         in conn.execute(load_sql('select_menu_mix.sql'), (since,))},
+        }
+    finally:
+        conn.close()
+    partial['seconds'] = time.perf_counter() - started
+    return partial
+
+def merge_partials(partials):
+    """매장별 부분 집계를 체인 전체 하나로 합치기 (모두 합/최소/최대라 순서와 무관)"""
+    merged = {'bottlenecks': {}, 'orders': 0, 'completed': 0, 'first_created': None, 'last_created': None,
+              'latency_histogram': {}, 'menu_mix': {}}
+    for partial in partials:
+        for bottleneck_type, (count, total_wait) in partial['bottlenecks'].items():
+            totals = merged['bottlenecks'].setdefault(bottleneck_type, [0, 0])
+            totals[0] += count
+            totals[1] += total_wait
+        merged['orders'] += partial['orders']
+        merged['completed'] += partial['completed']
+        if partial['first_created'] is not None:
+            merged['first_created'] = min(filter(None, (merged['first_created'], partial['first_created'])))
+            merged['last_created'] = max(filter(None, (merged['last_created'], partial['last_created'])))
+        for bucket, count in partial['latency_histogram'].items():
+            merged['latency_histogram'][bucket] = merged['latency_histogram'].get(bucket, 0) + count
+        for menu_item_id, (quantity, menu_orders) in partial['menu_mix'].items():
+            totals = merged['menu_mix'].setdefault(menu_item_id, [0, 0])
+            totals[0] += quantity
+            totals[1] += menu_orders
+    return merged
+
+def histogram_percentiles(histogram, bucket_seconds, ps=(50, 95, 99)):
+    """{bucket: 건수} 히스토그램의 백분위수 (구간 상한, 초)"""
+    counts = sorted(histogram.items())
+    total = sum(count for _, count in counts)
+    result = {}
+    for p in ps:
+        if not total:
+            result[p] = 0
+            continue
+        rank = nearest_rank(total, p)
+        seen = 0
+        for bucket, count in counts:
+            seen += count
+            if seen >= rank:
+                result[p] = (bucket + 1) * bucket_seconds
+                break
+    return result
+
+def chain_report(router, since=0, bucket_seconds=60, workers=None):
+    """
+    모든 샤드의 부분 집계를 스레드 풀에서 동시에 구해 합치기
+
+    반환: ({code: 부분 집계}, 체인 합계)
+    """
+    codes = router.stores
+    if not codes:
+        return {}, merge_partials([])
+    with ThreadPoolExecutor(max_workers=workers or min(len(codes), 32)) as pool:
+        partials = dict(zip(codes, pool.map(lambda code: store_partial(router.path(code), since, bucket_seconds),
+                                            codes)))
+    return partials, merge_partials(partials.values())
+
+def _throughput(partial):
+    span = (partial['last_created'] or 0) - (partial['first_created'] or 0)
+    return partial['completed'] / (span / 3600) if span > 0 else 0.0
+
+def print_report(router, partials, merged, bucket_seconds):
+    catalog = connect(f"file:{router.catalog_path}?mode=ro")
+    menu_names = dict(catalog.execute("SELECT menu_item_id, name FROM MenuItems"))
+    catalog.close()
+
+    rows = []
+    for label, partial in [(router.name(code), partials[code]) for code in partials] + [("체인 합계", merged)]:
+        p = histogram_percentiles(partial['latency_histogram'], bucket_seconds)
+        rows.append([label, partial['orders'], partial['completed'], f"{_throughput(partial):.1f}",
+                     p[50], p[95], p[99],
+                     f"{partial['seconds'] * 1000:.1f}" if 'seconds' in partial else ''])
+    print(Fore.CYAN + "\n🏪 매장별 처리량")
+    print(tabulate(rows, headers=["매장", "주문", "완료", "완료/시간", "p50(초)", "p95(초)", "p99(초)",
+                                  "집계(ms)"], tablefmt="grid"))
+
+    print(Fore.CYAN + "\n📊 병목 유형별 분석 (체인)")
+    print(tabulate([[bottleneck_type, count, total_wait, f"{total_wait / count:.1f}" if count else '-']
+                    for bottleneck_type, (count, total_wait) in sorted(merged['bottlenecks'].items())],
+                   headers=["병목 유형", "발생 횟수", "총 대기시간(초)", "평균(초)"], tablefmt="grid"))
+
+    total_quantity = sum(quantity for quantity, _ in merged['menu_mix'].values())
+    print(Fore.CYAN + "\n🍔 메뉴 구성 (체인)")
+    print(tabulate([[menu_names.get(menu_item_id, menu_item_id), quantity, menu_orders,
+                     f"{quantity / total_quantity * 100:.1f}%"]
+                    for menu_item_id, (quantity, menu_orders)
+                    in sorted(merged['menu_mix'].items(), key=lambda item: -item[1][0])],
+                   headers=["메뉴", "수량", "주문 수", "비율"], tablefmt="grid"))
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="다점포 샤드 관리와 체인 리포트")
+    parser.add_argument('--dir', default=STORES_DIR, help="매장 샤드 디렉터리")
+    parser.add_argument('--add', default='',
+                        help="추가할 매장 'code:이름,...' (이름 생략 가능)")
+    parser.add_argument('--sync-catalog', action='store_true', help="catalog.db 메뉴/레시피를 샤드에 반영")
+    parser.add_argument('--report', action='store_true', help="체인 리포트 출력")
+    parser.add_argument('--since', help="리포트 대상 주문 생성 시각 하한 'YYYY-MM-DD HH:MM:SS'")
+    parser.add_argument('--bucket-seconds', type=int, default=60, help="주문 완료 시간 히스토그램 구간(초)")
+    parser.add_argument('--workers', type=int, help="리포트 스레드 수 (기본 매장 수)")
+    return parser.parse_args()
+
+def main():
+    init(autoreset=True)
+    args = parse_args()
+    router = StoreRouter(args.dir)
+    try:
+        for spec in filter(None, args.add.split(',')):
+            code, _, name = spec.partition(':')
+            print(Fore.GREEN + f"✅ 매장 추가: {code} → {os.path.relpath(router.add_store(code, name or None))}")
+        if args.sync_catalog:
+            updated = router.sync_catalog()
+            print(Fore.GREEN + f"✅ 카탈로그 반영: {', '.join(updated) if updated else '모두 최신'}")
+        if args.report or not (args.add or args.sync_catalog):
+            since = parse_time(args.since) if args.since else 0
+            started = time.perf_counter()
+            partials, merged = chain_report(router, since, args.bucket_seconds, args.workers)
+            print_report(router, partials, merged, args.bucket_seconds)
+            print(f"\n매장 {len(partials)}곳 병렬 집계 {(time.perf_counter() - started) * 1000:.1f}ms")
+    except (KeyError, ValueError, sqlite3.Error) as e:
+        print(Fore.RED + f"❌ {e}")
+        return 1
+    finally:
+        router.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+작업 큐 전개 - 새로 들어온 OrderItems 만 KitchenTaskQueue 작업으로 일괄 변환
+
+QueueExpansionState 워터마크 이후의 주문 항목만 읽고, 수량 × 레시피 작업을
+캐시된 레시피 그래프에서 펼쳐 executemany 한 번으로 넣는다. 워터마크는 같은
+트랜잭션에서 갱신되므로 여러 번 호출해도 같은 항목이 두 번 전개되지 않는다.
+보온 재고(holding.HoldingCache)를 주면 재고가 있는 튀김 작업은 넣자마자 COMPLETED 로 바꾼다.
+"""
+
+import time
+
+from dal import load_sql, transaction
+from tracing import traced
+
+@traced('expansion')
+def expand_new_order_items(conn, recipe_cache, created_at=None, holding=None):
+    """
+    워터마크 이후 주문 항목을 작업 큐로 전개 (취소/완료된 주문의 항목은 건너뜀)
+
+    created_at: 작업 생성 시각 (정수 epoch 초), 생략하면 현재 시각 (시뮬레이션용)
+    holding: 보온 재고, 재고로 충당한 튀김 작업은 시작 = 종료 = created_at 으로 바로 완료
+             (트랜잭션이 실패하면 꺼낸 재고와 집계는 호출 전으로 되돌림)
+    반환: [(order_item_id, order_id, menu_item_id, quantity, 실행할 작업 수)]
+          실행할 작업 수에서 재고로 충당한 작업은 빠짐
+    """
+    now = int(time.time()) if created_at is None else created_at
+    state = holding.snapshot(now) if holding is not None else None
+    try:
+        with transaction(conn):
+            recipe_cache.refresh(conn)
+            last_id = conn.execute(load_sql('select_expansion_watermark.sql')).fetchone()[0]
+            order_items = conn.execute(load_sql('select_order_items.sql'), (last_id,)).fetchall()
+            # 취소/완료된 주문의 항목은 읽지 않으므로 워터마크는 마지막 주문 항목까지 올림
+            new_last_id = conn.execute(load_sql('select_last_order_item.sql')).fetchone()[0]
+            if not order_items:
+                if new_last_id > last_id:
+                    conn.execute(load_sql('update_expansion_watermark.sql'), (new_last_id,))
+                return []
+
+            rows = []
+            served = []     # (rows 인덱스, food_type)
+            expanded = []
+            for order_item_id, order_id, menu_item_id, quantity in order_items:
+                topo_order = recipe_cache.graph(menu_item_id).topo_order
+                served_before = len(served)
+                for _ in range(quantity):
+                    for task_def_id in topo_order:
+                        if holding is not None:
+                            food_type = holding.take(task_def_id, now)
+                            if food_type is not None:
+                                served.append((len(rows), food_type))
+                        rows.append((order_item_id, task_def_id, created_at))
+                expanded.append((order_item_id, order_id, menu_item_id, quantity,
+                                 len(topo_order) * quantity - (len(served) - served_before)))
+
+            last_task_id = None
+            if served:
+                last_task_id = conn.execute(
+                    "SELECT COALESCE(MAX(queue_task_id), 0) FROM KitchenTaskQueue").fetchone()[0]
+            conn.executemany(load_sql('insert_kitchen_task.sql'), rows)
+            if served:
+                task_ids = [queue_task_id for (queue_task_id,) in conn.execute(
+                    "SELECT queue_task_id FROM KitchenTaskQueue WHERE queue_task_id > ? ORDER BY queue_task_id",
+                    (last_task_id,))]
+                served_tasks = [(task_ids[index], food_type) for index, food_type in served]
+                conn.executemany(load_sql('update_task_from_holding.sql'),
+                                 [(now, now, queue_task_id) for queue_task_id, _ in served_tasks])
+                holding.record_served(served_tasks, now)
+                holding.flush(conn)
+            conn.execute(load_sql('update_expansion_watermark.sql'), (new_last_id,))
+    except Exception:
+        if state is not None:
+            holding.restore(state)
+        raise
+    return expanded
@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+"""테스트 공용 픽스처 - 저장소 루트 모듈을 가져오고 시드된 DB 를 메모리에 만든다"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dal import create_database  # noqa: E402
+from recipe_graph import RecipeGraphCache  # noqa: E402
+
+# 시뮬레이션 시작 시각과 같은 기준 (2025-01-01 10:00:00 UTC)
+START = 1735725600
+
+@pytest.fixture
+def conn():
+    conn = create_database(':memory:')
+    yield conn
+    conn.close()
+
+@pytest.fixture
+def recipe_cache(conn):
+    return RecipeGraphCache().refresh(conn)
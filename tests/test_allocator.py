@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""자원 할당기 - 스태프 free-list / 구역 힙 / 구역 상태가 DB(ZoneRealtimeState, 작업 할당)와 맞는지"""
+
+from collections import Counter
+
+from allocator import ResourceAllocator
+from conftest import START
+from dal import load_sql
+from fryer_batch import FryerBatcher
+from order_intake import place_orders
+from ready_queue import ReadyQueue
+from simulation import KitchenSimulation, generate_orders
+from task_queue import expand_new_order_items
+
+def _assert_consistent(allocator, conn):
+    # 구역 상태 = ZoneRealtimeState (flush_zones 뒤)
+    db_zones = {zone_id: [ws_id, food_type, quantity, busy_until or 0]
+                for zone_id, ws_id, food_type, quantity, busy_until
+                in conn.execute(load_sql('select_zone_allocation_state.sql'))}
+    assert allocator.zones == db_zones
+
+    # 작업장 힙에는 그 작업장 구역이 한 번씩
+    for ws_id, heap in allocator.zone_heaps.items():
+        assert Counter(zone_id for _, zone_id in heap) == Counter(
+            zone_id for zone_id, zone in allocator.zones.items() if zone[0] == ws_id)
+
+    # 진행 중 할당 = WAITING_RESOURCE/IN_PROGRESS 작업의 할당 열
+    db_active = {queue_task_id: (ws_id, zone_id, staff_id) for queue_task_id, ws_id, zone_id, staff_id
+                 in conn.execute(load_sql('select_active_assignments.sql'))}
+    assert allocator.active == db_active
+    assert allocator.staff_holds == dict(Counter(
+        staff_id for _, _, staff_id in db_active.values() if staff_id is not None))
+
+    # 빈 스태프 + 작업 중 스태프 = 작업장 명단, 겹치지 않음
+    for ws_id, staff_ids in allocator.station_staff.items():
+        free = list(allocator.free_staff[ws_id])
+        assert len(free) == len(set(free))
+        assert not set(free) & set(allocator.staff_holds)
+        busy = {staff_id for staff_id in allocator.staff_holds if allocator.staff_station.get(staff_id) == ws_id}
+        assert set(free) | busy == staff_ids
+
+    # 같은 DB 에서 새로 적재한 할당기와 같은 상태
+    fresh = ResourceAllocator(allocator.recipe_cache).load(conn)
+    assert fresh.zones == allocator.zones
+    assert fresh.active == allocator.active
+    assert {ws_id: set(free) for ws_id, free in fresh.free_staff.items()} == \
+           {ws_id: set(free) for ws_id, free in allocator.free_staff.items()}
+
+def test_allocator_matches_zone_state_during_simulation(conn, recipe_cache):
+    simulation = KitchenSimulation(conn, recipe_cache, seed=3, jitter=0.2, batch_window=20)
+    simulation.schedule_orders(generate_orders(sorted(recipe_cache.graphs), 80, 3600, seed=3))
+
+    checked = 0
+    for minutes in range(10, 120, 10):
+        simulation.run(until=simulation.start_time + minutes * 60)
+        if simulation.allocator.active:
+            checked += 1
+        _assert_consistent(simulation.allocator, conn)
+    assert checked    # 할당이 걸린 상태에서도 검사함
+    simulation.run()
+    _assert_consistent(simulation.allocator, conn)
+    assert not simulation.allocator.active
+
+def test_fryer_dispatch_loads_same_food_into_one_zone(conn, recipe_cache):
+    # 싸이버거 2개씩 세 주문 = 싸이패티 튀김 6개 (구역 하나에 10장까지)
+    place_orders(conn, [{'name': f'ORD-{i:03d}', 'items': [(1, 2)]} for i in range(3)], created_at=START)
+    expand_new_order_items(conn, recipe_cache, START)
+    ready_queue = ReadyQueue(recipe_cache).load(conn)
+    allocator = ResourceAllocator(recipe_cache).load(conn)
+
+    batches = FryerBatcher(allocator, window_seconds=0).dispatch(conn, ready_queue, START)
+    assert len(batches) == 1
+    (batch,) = batches
+    assert len(batch) == 6
+    ((zone_id,),) = {(zone_id,) for _, _, zone_id, _ in batch}
+    assert allocator.zones[zone_id][1:3] == ['싸이패티', 6]
+
+    rows = conn.execute("SELECT queue_task_id, assigned_zone_id FROM KitchenTaskQueue "
+                        "WHERE status = 'WAITING_RESOURCE'").fetchall()
+    assert sorted(rows) == sorted((queue_task_id, zone_id) for queue_task_id, _, zone_id, _ in batch)
+    _assert_consistent(allocator, conn)
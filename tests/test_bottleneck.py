@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""병목 감지기 - 대기 구간 분류, 작업장 실패 원인 대체, 이동 창 집계, 일괄 기록"""
+
+from types import SimpleNamespace
+
+from bottleneck import BottleneckDetector
+from conftest import START
+from dal import transaction
+
+FRYER, ASSEMBLY = 1, 3
+
+def _detector(window_seconds=900):
+    # 할당기 상태 대신 실패 원인을 고정
+    allocator = SimpleNamespace(blocked_reason=lambda task, now: 'NO_FRYER_ZONE')
+    return BottleneckDetector(allocator, window_seconds)
+
+def _task(queue_task_id, workstation_id):
+    return (queue_task_id, 1, workstation_id, 1)
+
+def test_waits_split_into_dependency_and_cause():
+    detector = _detector()
+    detector.on_ready(10, START + 30, blocker=FRYER)
+    detector.on_blocked(_task(10, ASSEMBLY), START + 35)
+    detector.on_blocked(_task(10, ASSEMBLY), START + 50)   # 두 번째 실패는 원인을 바꾸지 않음
+    detector.on_start(10, ASSEMBLY, 'ACTIVE', START, START + 60)
+    assert detector.pending == [(10, 'DEPENDENCY_WAIT', 30, FRYER, START + 60),
+                                (10, 'NO_FRYER_ZONE', 30, ASSEMBLY, START + 60)]
+
+def test_wait_without_failed_assignment_is_not_bottleneck():
+    # 배치 대기 한도처럼 자원이 있는데 일부러 기다린 시간
+    detector = _detector()
+    detector.on_ready(10, START, blocker=None)
+    detector.on_start(10, FRYER, 'ACTIVE', START, START + 45)
+    assert detector.pending == []
+
+def test_station_failure_covers_tasks_behind_the_scan():
+    detector = _detector()
+    detector.on_ready(10, START)
+    detector.on_ready(11, START)
+    detector.on_blocked(_task(10, FRYER), START + 20)
+    # 11 은 on_blocked 를 받지 못했지만 같은 작업장이 대기 구간 안에 막혀 있었음
+    detector.on_start(11, FRYER, 'ACTIVE', START, START + 40)
+    assert detector.pending == [(11, 'NO_FRYER_ZONE', 40, FRYER, START + 40)]
+
+    # 작업장 실패가 준비되기 전 일이면 쓰지 않음
+    detector.on_ready(12, START + 30)
+    detector.on_start(12, FRYER, 'ACTIVE', START + 30, START + 50)
+    assert len(detector.pending) == 1
+
+def test_window_stats_evict_old_records():
+    detector = _detector(window_seconds=600)
+    for queue_task_id, created in ((1, START), (2, START + 300), (3, START + 700)):
+        detector.on_ready(queue_task_id, created + 10, blocker=FRYER)
+        detector.on_start(queue_task_id, ASSEMBLY, 'ACTIVE', created, created + 10)
+    assert detector.window_stats() == {FRYER: {'DEPENDENCY_WAIT': (2, 20)}}
+    assert detector.window_stats(START + 2000) == {}
+    assert detector.recorded == 3
+
+def test_flush_writes_pending_rows(conn):
+    detector = _detector()
+    detector.on_ready(10, START + 30, blocker=FRYER)
+    detector.on_start(10, ASSEMBLY, 'ACTIVE', START, START + 30)
+    with transaction(conn):
+        assert detector.flush(conn) == 1
+        assert detector.flush(conn) == 0
+    assert conn.execute("SELECT queue_task_id, bottleneck_type, wait_duration_seconds, "
+                        "problematic_workstation_id, recorded_at FROM BottleneckAnalysis").fetchall() == \
+        [(10, 'DEPENDENCY_WAIT', 30, FRYER, START + 30)]
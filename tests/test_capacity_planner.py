@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""용량 계획 - 시나리오 적용, 같은 seed 의 재현성, 반복 결과 합치기"""
+
+from capacity_planner import apply_scenario, run_replication, summarize
+from dal import load_sql
+
+PARAMS = {'orders_per_minute': 0.5, 'hours': 0.5, 'curve': 'flat', 'jitter': 0.15, 'batch_window': 60}
+
+def _station_staff(conn):
+    roster = {}
+    for workstation_id, staff_id in conn.execute(load_sql('select_station_staff.sql')):
+        roster.setdefault(workstation_id, []).append(staff_id)
+    return roster
+
+def test_apply_scenario_changes_kitchen(conn):
+    zones = conn.execute("SELECT COUNT(*) FROM WorkstationZones WHERE workstation_id = 1").fetchone()[0]
+    apply_scenario(conn, {'name': 'what-if', 'zones': {'1': 2}, 'staff': {'1': 3, '3': 1},
+                          'capacity': {'싸이패티': 12}})
+
+    assert conn.execute("SELECT COUNT(*) FROM WorkstationZones WHERE workstation_id = 1").fetchone()[0] == zones + 2
+    # 새 구역도 첫 구역의 용량 규칙과 보온 상태 행을 가짐
+    assert conn.execute("SELECT COUNT(*) FROM WorkstationZones WZ LEFT JOIN ZoneRealtimeState ZRS "
+                        "ON WZ.zone_id = ZRS.zone_id WHERE ZRS.zone_id IS NULL").fetchone()[0] == 0
+    assert {max_quantity for (max_quantity,) in conn.execute(
+        "SELECT max_quantity FROM ZoneCapacityRules WHERE food_type = '싸이패티'")} == {12}
+
+    roster = _station_staff(conn)
+    assert len(roster[1]) == 3 and len(roster[3]) == 1
+    limits = {workstation_id: max_staff for workstation_id, _, max_staff
+              in conn.execute(load_sql('select_workstation_limits.sql'))}
+    assert limits[1] == 3
+
+def test_replication_is_reproducible_per_seed():
+    first = run_replication({'name': '현재 구성'}, 7, PARAMS)
+    again = run_replication({'name': '현재 구성'}, 7, PARAMS)
+    assert first['orders'] > 0
+    assert first['completed'] == first['orders'] == len(first['latencies'])
+    assert first['pending_tasks'] == 0
+    assert first['latencies'] == again['latencies']
+    assert 0 < first['utilisation'][1] <= 1
+
+    # 같은 seed 라도 구성이 바뀌면 주문 스트림은 같고 완료 시간만 달라짐
+    more_staff = run_replication({'name': '조립 +1', 'staff': {3: 3}}, 7, PARAMS)
+    assert more_staff['orders'] == first['orders']
+
+def test_summarize_merges_runs():
+    results = {'A': [{'latencies': [100, 200], 'orders': 2, 'completed': 2, 'pending_tasks': 0,
+                      'utilisation': {1: 0.5}},
+                     {'latencies': [300, 400], 'orders': 2, 'completed': 2, 'pending_tasks': 0,
+                      'utilisation': {1: 0.7, 3: 0.2}}]}
+    summary = summarize(results)['A']
+    assert (summary['runs'], summary['orders'], summary['completed']) == (2, 4, 4)
+    assert summary['p95_low'] <= summary['p95'] <= summary['p95_high'] == 400
+    assert summary['utilisation'] == {1: 0.6, 3: 0.1}
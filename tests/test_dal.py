@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""DAL - 중첩 트랜잭션, 쓰기1+읽기N 연결 풀"""
+
+import queue
+import sqlite3
+import threading
+
+import pytest
+
+from dal import ConnectionPool, create_database, transaction
+
+@pytest.fixture
+def pool(tmp_path):
+    path = str(tmp_path / 'pool.db')
+    create_database(path).close()
+    with ConnectionPool(path, readers=2) as pool:
+        yield pool
+
+def _order_count(conn):
+    return conn.execute("SELECT COUNT(*) FROM CustomerOrders").fetchone()[0]
+
+def test_nested_transaction_defers_to_outer(conn):
+    with pytest.raises(RuntimeError):
+        with transaction(conn):
+            with transaction(conn):
+                conn.execute("INSERT INTO CustomerOrders (order_number) VALUES ('ORD-001')")
+            assert conn.in_transaction
+            raise RuntimeError
+    assert _order_count(conn) == 0
+
+def test_writer_rolls_back_on_error(pool):
+    with pytest.raises(RuntimeError):
+        with pool.writer() as conn:
+            conn.execute("INSERT INTO CustomerOrders (order_number) VALUES ('ORD-001')")
+            raise RuntimeError
+    with pool.writer() as conn:
+        assert not conn.in_transaction
+        with transaction(conn):
+            conn.execute("INSERT INTO CustomerOrders (order_number) VALUES ('ORD-002')")
+    with pool.reader() as conn:
+        assert conn.execute("SELECT order_number FROM CustomerOrders").fetchall() == [('ORD-002',)]
+
+def test_readers_are_read_only_and_bounded(pool):
+    with pool.reader() as first, pool.reader() as second:
+        assert first is not second
+        with pytest.raises(sqlite3.OperationalError):
+            first.execute("INSERT INTO CustomerOrders (order_number) VALUES ('ORD-001')")
+        with pytest.raises(queue.Empty):
+            with pool.reader(timeout=0.01):
+                pass
+    with pool.reader(timeout=0.01) as conn:
+        assert _order_count(conn) == 0
+
+def test_reader_sees_commits_while_writer_is_held(pool):
+    committed = threading.Event()
+    release = threading.Event()
+
+    def write():
+        with pool.writer() as conn:
+            with transaction(conn):
+                conn.execute("INSERT INTO CustomerOrders (order_number) VALUES ('ORD-001')")
+            committed.set()
+            release.wait(5)
+
+    thread = threading.Thread(target=write)
+    thread.start()
+    try:
+        assert committed.wait(5)
+        # 쓰기 연결을 다른 스레드가 쥐고 있어도 WAL 읽기는 막히지 않음
+        with pool.reader(timeout=1) as conn:
+            assert _order_count(conn) == 1
+    finally:
+        release.set()
+        thread.join()
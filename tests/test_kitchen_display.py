@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""주방 화면 뷰 - 증분 적용 결과가 스냅샷과 같은지, 피드 정리 뒤 스냅샷 재적재"""
+
+from archive import archive_completed, trim_change_feed
+from conftest import START
+from dal import transaction
+from kitchen_display import KitchenView
+from order_intake import place_orders
+from task_queue import expand_new_order_items
+
+def _state(view):
+    return view.zones, view.orders, view.tasks, view.order_tasks
+
+def _complete_order(conn, order_id):
+    with transaction(conn):
+        conn.execute("""
+            UPDATE KitchenTaskQueue SET status = 'COMPLETED', actual_start_time = ?, actual_end_time = ?
+            WHERE order_item_id IN (SELECT order_item_id FROM OrderItems WHERE order_id = ?)
+        """, (START, START + 60, order_id))
+        conn.execute("UPDATE CustomerOrders SET status = 'COMPLETED' WHERE order_id = ?", (order_id,))
+
+def test_poll_matches_snapshot_after_archive(conn, recipe_cache):
+    view = KitchenView()
+    view.load(conn)
+    receipts = place_orders(conn, [{'name': 'ORD-001', 'items': [(1, 1)]},
+                                   {'name': 'ORD-002', 'items': [(2, 1)]}], created_at=START)
+    expand_new_order_items(conn, recipe_cache, START)
+    view.poll(conn)
+    assert set(view.orders) == {receipt['order_id'] for receipt in receipts}
+
+    _complete_order(conn, receipts[0]['order_id'])
+    assert archive_completed(conn)['orders'] == 1
+    dirty = view.poll(conn)
+
+    assert ('order', receipts[0]['order_id']) in dirty
+    assert view.reloads == 0
+    fresh = KitchenView()
+    fresh.load(conn)
+    assert _state(view) == _state(fresh)
+
+def test_poll_reloads_when_unread_changes_were_trimmed(conn, recipe_cache):
+    view = KitchenView()
+    view.load(conn)
+    receipts = place_orders(conn, [{'name': 'ORD-001', 'items': [(1, 1)]},
+                                   {'name': 'ORD-002', 'items': [(3, 2)]}], created_at=START)
+    expand_new_order_items(conn, recipe_cache, START)
+    _complete_order(conn, receipts[0]['order_id'])
+    archive_completed(conn)
+    assert trim_change_feed(conn, keep_changes=1) > 0
+
+    dirty = view.poll(conn)
+
+    assert view.reloads == 1
+    assert ('order', receipts[1]['order_id']) in dirty
+    fresh = KitchenView()
+    fresh.load(conn)
+    assert _state(view) == _state(fresh)
+    assert view.last_change_id == fresh.last_change_id
+    # 재적재 뒤에는 다시 증분으로 따라감
+    place_orders(conn, [{'name': 'ORD-003', 'items': [(5, 1)]}], created_at=START)
+    view.poll(conn)
+    assert view.reloads == 1
+    assert [number for number, _ in view.orders.values()] == ['ORD-002', 'ORD-003']
+
+def test_archive_moves_cancelled_orders_out_of_hot_tables(conn, recipe_cache):
+    view = KitchenView()
+    view.load(conn)
+    cancelled, kept = place_orders(conn, [{'name': 'ORD-001', 'items': [(2, 1)]},
+                                          {'name': 'ORD-002', 'items': [(1, 1)]}], created_at=START)
+    expand_new_order_items(conn, recipe_cache, START)
+    task_ids = [queue_task_id for (queue_task_id,) in conn.execute("""
+        SELECT KTQ.queue_task_id FROM KitchenTaskQueue KTQ
+        JOIN OrderItems OI ON KTQ.order_item_id = OI.order_item_id
+        WHERE OI.order_id = ? ORDER BY KTQ.queue_task_id
+    """, (cancelled['order_id'],))]
+    with transaction(conn):
+        conn.execute("UPDATE KitchenTaskQueue SET status = 'IN_PROGRESS', actual_start_time = ? "
+                     "WHERE queue_task_id = ?", (START, task_ids[0]))
+        conn.execute("INSERT INTO BottleneckAnalysis (queue_task_id, bottleneck_type, wait_duration_seconds, "
+                     "recorded_at) VALUES (?, 'NO_STAFF', 30, ?)", (task_ids[0], START))
+        # 시작하지 않은 작업이 남은 예전 취소 주문 (취소 시 QUEUED 삭제 이전 데이터)
+        conn.execute("UPDATE CustomerOrders SET status = 'CANCELLED' WHERE order_id = ?", (cancelled['order_id'],))
+
+    # 진행 중인 작업이 있는 동안은 옮기지 않음
+    assert archive_completed(conn)['orders'] == 0
+    with transaction(conn):
+        conn.execute("UPDATE KitchenTaskQueue SET status = 'COMPLETED', actual_end_time = ? "
+                     "WHERE queue_task_id = ?", (START + 60, task_ids[0]))
+    totals = archive_completed(conn)
+
+    assert (totals['orders'], totals['tasks'], totals['bottlenecks']) == (1, 1, 1)
+    assert conn.execute("SELECT COUNT(*) FROM KitchenTaskQueue WHERE queue_task_id IN (%s)"
+                        % ','.join('?' * len(task_ids)), task_ids).fetchone()[0] == 0
+    assert conn.execute("SELECT queue_task_id FROM KitchenTaskHistory").fetchall() == [(task_ids[0],)]
+    assert conn.execute("SELECT COUNT(*) FROM BottleneckAnalysis").fetchone()[0] == 0
+    view.poll(conn)
+    fresh = KitchenView()
+    fresh.load(conn)
+    assert _state(view) == _state(fresh)
+    assert list(view.orders) == [kept['order_id']]
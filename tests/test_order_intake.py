@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""주문 접수 - 그룹 커밋 개별 재시도, writer Future 오류 전달, 종료 시 남은 주문 커밋, 취소/대기 시간, 작업장별 남은 작업"""
+
+import json
+import sqlite3
+import time
+
+import pytest
+
+from conftest import START
+from dal import connect, create_database, load_sql, transaction
+from order_intake import GroupCommitWriter, cancel_order, commit_order_batch, get_wait_time, place_orders
+from simulation import KitchenSimulation, generate_orders
+from task_queue import expand_new_order_items
+
+def _order_numbers(conn):
+    return [number for (number,) in conn.execute(
+        "SELECT order_number FROM CustomerOrders ORDER BY order_id")]
+
+def test_batch_falls_back_to_per_order_commits(conn, recipe_cache):
+    expanded = []
+    orders = [{'name': 'ORD-001', 'items': [(1, 1)]},
+              {'name': 'ORD-BAD', 'items': [(999, 1)]},
+              {'name': 'ORD-002', 'items': [(5, 2)]}]
+
+    results = commit_order_batch(conn, orders, recipe_cache, START,
+                                 then=lambda c: expanded.append(expand_new_order_items(c, recipe_cache, START)))
+
+    assert [r['order_number'] for r in (results[0], results[2])] == ['ORD-001', 'ORD-002']
+    assert isinstance(results[1], ValueError)
+    assert _order_numbers(conn) == ['ORD-001', 'ORD-002']
+    # then 은 성공한 주문마다 같은 트랜잭션에서 한 번씩
+    assert [[item[1] for item in items] for items in expanded] == [[results[0]['order_id']],
+                                                                  [results[2]['order_id']]]
+    assert not conn.in_transaction
+
+def test_intake_eta_counts_queued_work_per_station(conn, recipe_cache):
+    first, second = place_orders(conn, [{'name': 'ORD-001', 'items': [(2, 3)]},
+                                        {'name': 'ORD-002', 'items': [(2, 1)]}], recipe_cache, START)
+    queued = recipe_cache.workstation_load([(2, 3)])
+    assert first['eta_seconds'] == recipe_cache.estimate_seconds([(2, 3)])
+    assert second['eta_seconds'] == recipe_cache.estimate_seconds([(2, 1)], queued)
+    assert second['eta_seconds'] < first['work_seconds'] + second['work_seconds']
+
+def _station_backlog(conn):
+    """진행 중인 주문의 작업장별 남은 작업 시간을 처음부터 다시 계산"""
+    backlog = dict(conn.execute("SELECT workstation_id, 0 FROM Workstations"))
+    for workstation_id, seconds in conn.execute("""
+        SELECT MT.workstation_id, SUM(OI.quantity * MT.base_time_seconds)
+        FROM CustomerOrders CO
+        JOIN OrderItems OI ON OI.order_id = CO.order_id
+        JOIN MenuTasks MT ON MT.menu_item_id = OI.menu_item_id
+        WHERE CO.status NOT IN ('COMPLETED', 'CANCELLED')
+        GROUP BY MT.workstation_id
+    """):
+        backlog[workstation_id] += seconds
+    for workstation_id, seconds in conn.execute("""
+        SELECT MT.workstation_id, SUM(MT.base_time_seconds)
+        FROM CustomerOrders CO
+        JOIN OrderItems OI ON OI.order_id = CO.order_id
+        JOIN KitchenTaskQueue KTQ ON KTQ.order_item_id = OI.order_item_id
+        JOIN MenuTasks MT ON MT.task_definition_id = KTQ.task_definition_id
+        WHERE CO.status NOT IN ('COMPLETED', 'CANCELLED') AND KTQ.status = 'COMPLETED'
+        GROUP BY MT.workstation_id
+    """):
+        backlog[workstation_id] -= seconds
+    return backlog
+
+def test_station_workload_matches_recompute(conn, recipe_cache):
+    simulation = KitchenSimulation(conn, recipe_cache, seed=5)
+    simulation.schedule_orders(generate_orders(sorted(recipe_cache.graphs), 40, 1800, seed=5))
+    for minutes in (10, 20, 30):
+        simulation.run(until=simulation.start_time + minutes * 60)
+        assert dict(conn.execute(load_sql('select_station_workload.sql'))) == _station_backlog(conn)
+        open_orders = [order_id for (order_id,) in conn.execute(
+            "SELECT order_id FROM CustomerOrders WHERE status NOT IN ('COMPLETED', 'CANCELLED')")]
+        assert open_orders
+    conn.commit()
+    cancel_order(conn, open_orders[0])
+    assert dict(conn.execute(load_sql('select_station_workload.sql'))) == _station_backlog(conn)
+    simulation.run()
+    assert set(dict(conn.execute(load_sql('select_station_workload.sql'))).values()) == {0}
+
+def test_cancel_removes_order_from_queue_workload(conn):
+    first, second = place_orders(conn, [{'name': 'ORD-001', 'items': [(1, 1)]},
+                                        {'name': 'ORD-002', 'items': [(3, 2)]}], created_at=START)
+    _, _, queue_before = get_wait_time(conn, second['order_id'])
+    assert queue_before == first['work_seconds'] + second['work_seconds']
+
+    cancel_order(conn, first['order_id'])
+    assert get_wait_time(conn, second['order_id']) == (second['eta_seconds'], second['work_seconds'],
+                                                       second['work_seconds'])
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / 'intake.db')
+    create_database(path).close()
+    return path
+
+def test_writer_futures_carry_per_order_errors(db_path):
+    with GroupCommitWriter(db_path, window_seconds=0.05) as writer:
+        futures = [writer.submit({'name': 'ORD-001', 'items': [(1, 1)]}),
+                   writer.submit({'name': 'ORD-BAD', 'items': [(1, 0)]}),
+                   writer.submit({'name': 'ORD-002', 'items': [(4, 1)]})]
+        assert futures[0].result(timeout=5)['order_number'] == 'ORD-001'
+        with pytest.raises(ValueError):
+            futures[1].result(timeout=5)
+        assert futures[2].result(timeout=5)['order_number'] == 'ORD-002'
+
+def test_writer_fails_every_future_on_batch_error(db_path):
+    conn = connect(db_path)
+    conn.execute("CREATE TRIGGER fail_orders AFTER INSERT ON CustomerOrders BEGIN SELECT no_such_fn(); END")
+    conn.commit()
+    conn.close()
+
+    with GroupCommitWriter(db_path, window_seconds=0.05) as writer:
+        futures = [writer.submit({'name': f'ORD-{i:03d}', 'items': [(1, 1)]}) for i in range(3)]
+        for future in futures:
+            with pytest.raises(sqlite3.OperationalError):
+                future.result(timeout=5)
+
+def test_close_commits_orders_still_in_window(db_path):
+    writer = GroupCommitWriter(db_path, window_seconds=30)
+    futures = [writer.submit({'name': f'ORD-{i:03d}', 'items': [(1, 1)]}) for i in range(5)]
+    started = time.monotonic()
+    writer.close()
+
+    assert time.monotonic() - started < 5
+    assert all(future.done() for future in futures)
+    assert [future.result()['order_number'] for future in futures] == [f'ORD-{i:03d}' for i in range(5)]
+    conn = connect(db_path)
+    assert _order_numbers(conn) == [f'ORD-{i:03d}' for i in range(5)]
+    conn.close()
+
+def _claim_all(conn, recipe_cache):
+    """모든 작업장에서 가져갈 작업이 없을 때까지 가져가고 바로 완료, 가져간 작업의 order_id 목록"""
+    plans = {}
+    for task_def_id, menu_item_id in recipe_cache.task_menu.items():
+        workstation_id = recipe_cache.graph(menu_item_id).tasks[task_def_id][1]
+        plans.setdefault(workstation_id, {})[str(task_def_id)] = [None, None]
+    claimed = []
+    while True:
+        progressed = False
+        for workstation_id, plan in plans.items():
+            plan = json.dumps(plan)
+            with transaction(conn):
+                rows = conn.execute(load_sql('claim_station_task.sql'),
+                                    (workstation_id, plan, plan, START, plan)).fetchall()
+                for queue_task_id, _, order_item_id in rows:
+                    conn.execute("UPDATE KitchenTaskQueue SET status = 'COMPLETED', actual_end_time = ? "
+                                 "WHERE queue_task_id = ?", (START, queue_task_id))
+                    claimed.append(conn.execute("SELECT order_id FROM OrderItems WHERE order_item_id = ?",
+                                                (order_item_id,)).fetchone()[0])
+                    progressed = True
+        if not progressed:
+            return claimed
+
+def test_cancelled_order_has_no_claimable_tasks(conn, recipe_cache):
+    first, second, kept = place_orders(conn, [
+        {'name': 'ORD-001', 'items': [(2, 1)]},
+        {'name': 'ORD-002', 'items': [(4, 1)]},
+        {'name': 'ORD-003', 'items': [(1, 1)]}], recipe_cache, START)
+    expand_new_order_items(conn, recipe_cache, START)
+    cancel_order(conn, first['order_id'])
+    assert conn.execute(load_sql('select_open_task_count.sql')).fetchone()[0] == \
+        len(recipe_cache.graph(4).topo_order) + len(recipe_cache.graph(1).topo_order)
+
+    # 전개 전에 취소된 주문은 작업으로 펼치지 않음 (워터마크는 넘어감)
+    (late,) = place_orders(conn, [{'name': 'ORD-004', 'items': [(5, 2)]}], recipe_cache, START)
+    cancel_order(conn, second['order_id'])
+    cancel_order(conn, late['order_id'])
+    assert expand_new_order_items(conn, recipe_cache, START) == []
+    assert conn.execute(load_sql('select_expansion_watermark.sql')).fetchone()[0] == \
+        conn.execute("SELECT MAX(order_item_id) FROM OrderItems").fetchone()[0]
+
+    claimed = _claim_all(conn, recipe_cache)
+    assert set(claimed) == {kept['order_id']}
+    assert len(claimed) == len(recipe_cache.graph(1).topo_order)
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""POS 주문 접수 서버 - 줄 단위 JSON 응답, 잘못된 주문 격리, 동시 연결의 그룹 커밋"""
+
+import asyncio
+import json
+
+from dal import connect, create_database
+from pos_server import OrderWriter, PosServer, run_load
+
+async def _serve(db_path, client):
+    """임시 포트에 서버를 띄우고 client(connect_stream) 실행 뒤 writer 반환"""
+    writer = await OrderWriter(db_path).start()
+    server = PosServer(writer)
+    listener = await server.listen(port=0)
+    port = listener.sockets[0].getsockname()[1]
+    try:
+        result = await client(lambda: asyncio.open_connection('127.0.0.1', port))
+    finally:
+        listener.close()
+        await listener.wait_closed()
+        await writer.close()
+    return writer, result
+
+def test_replies_line_per_request_in_order(tmp_path):
+    db_path = str(tmp_path / 'pos.db')
+    create_database(db_path).close()
+    requests = [b'{"items": [[1, 2]]}\n',
+                b'{"items": [[99, 1]]}\n',
+                b'{"items": []}\n',
+                b'not json\n',
+                b'{"items": [[5, 1]], "name": "KIOSK-7"}\n',
+                b'{"items": [[5, 1]], "name": "POS-000009"}\n',
+                b'{"items": [[4, 1]]}\n']
+
+    async def client(connect_stream):
+        reader, stream = await connect_stream()
+        replies = []
+        for request in requests:
+            stream.write(request)
+            await stream.drain()
+            replies.append(json.loads(await reader.readline()))
+        stream.close()
+        return replies
+
+    _, replies = asyncio.run(_serve(db_path, client))
+    assert [reply['ok'] for reply in replies] == [True, False, False, False, True, False, True]
+    assert replies[0]['order_number'] == 'POS-000001'
+    assert replies[0]['eta_seconds'] > 0
+    assert '99' in replies[1]['error']
+    assert replies[4]['order_number'] == 'KIOSK-7'
+    # 서버 발급 번호 형식은 단말이 쓸 수 없고, 발급 번호는 실패한 주문이 있어도 order_id 를 따름
+    assert 'POS-' in replies[5]['error']
+    assert replies[6]['order_number'] == f"POS-{replies[6]['order_id']:06d}" == 'POS-000003'
+
+    # 잘못된 주문은 저장되지 않고, 받은 주문은 같은 커밋에서 작업 큐까지 전개됨
+    conn = connect(db_path)
+    assert conn.execute("SELECT order_id, order_number FROM CustomerOrders ORDER BY order_id").fetchall() == \
+        [(1, 'POS-000001'), (2, 'KIOSK-7'), (3, 'POS-000003')]
+    assert conn.execute("SELECT COUNT(*) FROM KitchenTaskQueue").fetchone()[0] == 2 * 2 + 2 + 6
+    conn.close()
+
+    # 다시 띄워도 이전 실행의 번호와 겹치지 않음
+    requests = [b'{"items": [[1, 1]]}\n']
+    _, replies = asyncio.run(_serve(db_path, client))
+    assert replies[0]['order_number'] == 'POS-000004'
+
+def test_concurrent_connections_share_commits(tmp_path):
+    db_path = str(tmp_path / 'pos.db')
+    create_database(db_path).close()
+
+    async def client(connect_stream):
+        return await run_load(connect_stream, [1, 2, 3, 4, 5], connections=20, orders=300)
+
+    writer, (latencies, failures, _) = asyncio.run(_serve(db_path, client))
+    assert failures == 0
+    assert len(latencies) == writer.orders == 300
+
+    conn = connect(db_path)
+    numbers = [number for (number,) in conn.execute("SELECT order_number FROM CustomerOrders")]
+    assert len(numbers) == len(set(numbers)) == 300
+    conn.close()
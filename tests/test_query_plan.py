@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+"""쿼리 실행 계획 회귀 검사 - queries/*.sql 전체가 커지는 테이블을 통째로 훑지 않는지"""
+
+import os
+from types import SimpleNamespace
+
+from dal import BASE_DIR
+from query_plan import check_query_plans
+
+def test_no_query_falls_back_to_full_scan(conn):
+    results = check_query_plans(conn)
+    assert {filename for filename, _, _ in results} == {
+        filename for filename in os.listdir(os.path.join(BASE_DIR, 'queries')) if filename.endswith('.sql')}
+    assert [(filename, problems) for filename, _, problems in results if problems] == []
+
+def test_full_scan_is_reported(conn):
+    registry = SimpleNamespace(statements={
+        'scan_tasks.sql': "SELECT COUNT(*) FROM KitchenTaskQueue WHERE actual_end_time > ?"})
+    (filename, _, problems), = check_query_plans(conn, registry)
+    assert filename == 'scan_tasks.sql' and problems
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""준비 큐 - 스케줄링 정책별 작업장 힙 순서, 되돌린 작업의 키 유지"""
+
+import pytest
+
+from conftest import START
+from dal import transaction
+from order_intake import place_orders
+from ready_queue import ReadyQueue
+from scheduling import make_policy
+from task_queue import expand_new_order_items
+
+FRYER = 1
+
+def _ready_queue(conn, recipe_cache, policy, orders, etas=None):
+    """
+    orders: [(주문 이름, [(menu_item_id, 수량)])] 를 같은 시각에 접수·전개한 준비 큐
+    etas: {주문 이름: 접수 때 안내한 ETA 초} - 주면 접수 시 계산한 값 대신 사용
+    """
+    receipts = place_orders(conn, [{'name': name, 'items': items} for name, items in orders], created_at=START)
+    expand_new_order_items(conn, recipe_cache, START)
+    order_names = {receipt['order_id']: name for (name, _), receipt in zip(orders, receipts)}
+    with transaction(conn):
+        conn.executemany("UPDATE CustomerOrders SET estimated_seconds_remaining = ? WHERE order_id = ?",
+                         [(etas[name], order_id) for order_id, name in order_names.items() if name in (etas or {})])
+    return ReadyQueue(recipe_cache, make_policy(policy)).load(conn), order_names
+
+def _pop_orders(ready_queue, order_names, workstation_id=FRYER):
+    names = []
+    while (task := ready_queue.pop_ready(workstation_id)) is not None:
+        names.append(order_names[ready_queue.task_orders[task[0]]])
+    return names
+
+# 세트(임계 경로 515초) 뒤에 텐더(270초), 싸이버거(360초) - 첫 작업은 모두 튀김기
+ORDERS = [('SET', [(4, 1)]), ('TENDER', [(5, 1)]), ('BURGER', [(1, 1)])]
+# 마감: 싸이버거 < 세트 < 텐더 (접수 순서와도, 임계 경로 순서와도 다름)
+ETAS = {'SET': 900, 'TENDER': 3600, 'BURGER': 400}
+
+@pytest.mark.parametrize('policy, expected', [
+    ('fifo', ['SET', 'TENDER', 'BURGER']),
+    ('scp', ['TENDER', 'BURGER', 'SET']),
+    ('edf', ['BURGER', 'SET', 'TENDER']),
+])
+def test_policy_orders_fryer_heap(conn, recipe_cache, policy, expected):
+    ready_queue, order_names = _ready_queue(conn, recipe_cache, policy, ORDERS, ETAS)
+    assert _pop_orders(ready_queue, order_names) == expected
+
+@pytest.mark.parametrize('policy, expected', [
+    ('fifo', ['BURGERS', 'BURGERS', 'BURGERS', 'TENDER']),
+    ('wfq', ['BURGERS', 'TENDER', 'BURGERS', 'BURGERS']),
+])
+def test_wfq_interleaves_orders_on_station(conn, recipe_cache, policy, expected):
+    # wfq 에서는 싸이버거 3개 주문의 패티 세 장이 튀김기를 독차지하지 않고 텐더 주문이 두 번째로 들어감
+    orders = [('BURGERS', [(1, 3)]), ('TENDER', [(5, 1)])]
+    ready_queue, order_names = _ready_queue(conn, recipe_cache, policy, orders)
+    assert _pop_orders(ready_queue, order_names) == expected
+
+def test_push_back_keeps_original_key(conn, recipe_cache):
+    orders = [('BURGERS', [(1, 3)]), ('TENDER', [(5, 1)])]
+    ready_queue, order_names = _ready_queue(conn, recipe_cache, 'wfq', orders)
+    task = ready_queue.pop_ready(FRYER)
+    key = ready_queue.keys[task[0]]
+
+    # 자원이 없어 되돌려도 새 키(가상 시각 이후)가 아니라 처음 키로 다시 맨 앞에
+    ready_queue.push_back([task])
+    assert ready_queue.keys[task[0]] == key
+    assert ready_queue.pop_ready(FRYER) == task
+    assert _pop_orders(ready_queue, order_names) == ['TENDER', 'BURGERS', 'BURGERS']
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""레시피 그래프 캐시 - 임계 경로/위상 순서, 작업장 부하 기반 예상 시간, 레시피 변경 시 재컴파일"""
+
+import pytest
+
+from dal import transaction
+
+def test_set_menu_graph(recipe_cache):
+    # 싸이버거 세트: 패티(300)/감자(180)/음료(30) 동시 시작, 조립(90)은 패티와 음료를 기다림
+    graph = recipe_cache.graph(2)
+    assert graph.topo_order == [3, 4, 5, 6]
+    assert graph.predecessors[6] == [3, 5]
+    assert graph.earliest_start == {3: 0, 4: 0, 5: 0, 6: 300}
+    assert graph.critical_path == [3, 6]
+    assert graph.critical_path_seconds == 390
+    assert graph.workstation_load == {1: 300, 2: 180, 4: 30, 3: 90}
+    assert graph.total_seconds == 600
+
+def test_unknown_menu_is_empty_graph(recipe_cache):
+    graph = recipe_cache.graph(999)
+    assert graph.topo_order == [] and graph.critical_path_seconds == 0
+    assert recipe_cache.estimate_seconds([(999, 3)]) == 0
+
+def test_estimate_uses_busiest_station_per_staff(recipe_cache):
+    # 싸이버거 4개: 임계 경로 360초, 튀김기 1200초를 두 명이 나눠 600초
+    items = [(1, 4)]
+    assert recipe_cache.estimate_seconds([(1, 1)]) == 360
+    assert recipe_cache.estimate_seconds(items) == 600
+    # 다른 작업장이 밀려 있어도 튀김기가 더 붐비면 그대로
+    assert recipe_cache.estimate_seconds(items, {3: 900}) == 600
+    # 앞 주문이 튀김기에 남긴 600초가 더해짐
+    assert recipe_cache.estimate_seconds(items, {1: 600}) == 900
+
+def test_refresh_recompiles_only_after_recipe_change(conn, recipe_cache):
+    graphs = recipe_cache.graphs
+    assert recipe_cache.refresh(conn).graphs is graphs
+
+    with transaction(conn):
+        conn.execute("UPDATE MenuTasks SET base_time_seconds = 400 WHERE task_definition_id = 1")
+    recipe_cache.refresh(conn)
+    assert recipe_cache.graphs is not graphs
+    assert recipe_cache.graph(1).critical_path_seconds == 460
+
+def test_dependency_cycle_is_rejected(conn, recipe_cache):
+    with transaction(conn):
+        conn.execute("INSERT INTO TaskDependencies (task_id, depends_on_task_id) VALUES (1, 2)")
+    with pytest.raises(ValueError):
+        recipe_cache.refresh(conn)
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""스태프 배치 - 남은 작업 부하로 인원 배분, 최소 이동, 향상이 작으면 유지, 적용"""
+
+import json
+
+from conftest import START
+from dal import load_sql
+from order_intake import place_orders
+from staffing import StaffingOptimizer, format_gain
+from task_queue import expand_new_order_items
+
+FRYER, ASSEMBLY, DRINKS = 1, 3, 4
+
+def _backlog(conn, recipe_cache, items):
+    place_orders(conn, [{'name': 'ORD-001', 'items': items}], created_at=START)
+    expand_new_order_items(conn, recipe_cache, START)
+
+def test_idle_kitchen_keeps_current_roster(conn, recipe_cache):
+    optimizer = StaffingOptimizer(recipe_cache).load(conn)
+    plan = optimizer.plan(conn, START)
+    assert plan['moves'] == []
+    assert plan['target'] == plan['current'] == {FRYER: 2, 2: 0, ASSEMBLY: 2, DRINKS: 1}
+    assert plan['gain'] == 0.0
+
+def test_moves_fryer_staff_to_assembly_backlog(conn, recipe_cache):
+    # 에드워드리 버거 10개: 튀김 360초(배치 10장이라 1장 36초), 조립 1550초
+    _backlog(conn, recipe_cache, [(3, 10)])
+    optimizer = StaffingOptimizer(recipe_cache).load(conn)
+    plan = optimizer.plan(conn, START)
+    assert plan['load'] == {FRYER: 360.0, ASSEMBLY: 1550.0, DRINKS: 0.0}
+    assert plan['target'] == {FRYER: 1, 2: 0, ASSEMBLY: 3, DRINKS: 1}
+    # 튀김기 두 명 중 한 명만 옮기고 나머지는 그대로
+    assert len(plan['moves']) == 1
+    ((staff_id, before, after),) = plan['moves']
+    assert (before, after) == (FRYER, ASSEMBLY)
+    assert plan['current_seconds'] == 775.0
+    assert round(plan['planned_seconds']) == 517
+    assert round(plan['gain'], 2) == 0.5
+
+    assert optimizer.apply(conn, plan, START) == 1
+    roster = {staff_id: workstation_id for staff_id, _, _, workstation_id
+              in conn.execute(load_sql('select_staff_roster.sql'))}
+    assert roster[staff_id] == ASSEMBLY
+    assert optimizer.plan(conn, START)['moves'] == []
+
+def test_small_gain_does_not_move_staff(conn, recipe_cache):
+    _backlog(conn, recipe_cache, [(3, 10)])
+    optimizer = StaffingOptimizer(recipe_cache, min_gain=0.6).load(conn)
+    plan = optimizer.plan(conn, START)
+    assert plan['moves'] == []
+    assert plan['target'] == plan['current']
+    assert plan['gain'] == 0.0
+
+def test_unstaffed_station_reports_no_gain(conn, recipe_cache):
+    # 튀김기 두 명이 빠져 튀김 부하를 맡을 사람이 없음 - 향상 비율 대신 None (JSON 에 Infinity 없음)
+    _backlog(conn, recipe_cache, [(1, 20)])
+    optimizer = StaffingOptimizer(recipe_cache).load(conn)
+    plan = optimizer.plan(conn, START, available=[3, 4, 6])
+    assert plan['current'][FRYER] == 0
+    assert plan['current_seconds'] == float('inf')
+    assert plan['target'][FRYER] == 1
+    assert plan['gain'] is None
+    assert format_gain(plan['gain']).startswith('∞')
+    json.dumps({'predicted_gain': plan['gain']}, allow_nan=False)
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""작업장 워커 - 같은 DB 의 워커 여럿이 같은 작업을 두 번 잡거나 주문을 두 번 완료하지 않는지"""
+
+import threading
+import time
+
+from conftest import START
+from dal import connect, create_database, load_sql
+from order_intake import place_orders
+from recipe_graph import RecipeGraphCache
+from simulation import generate_orders
+from station_worker import KitchenClock, StationWorker
+from task_queue import expand_new_order_items
+
+# 가져가기/완료/주문 완료 순서를 커밋 순서대로 남기는 기록 (모든 워커 연결에서 보이도록 영구 트리거)
+EVENT_LOG = """
+CREATE TABLE EventLog (seq INTEGER PRIMARY KEY AUTOINCREMENT, event TEXT, row_id INT);
+CREATE TRIGGER log_claim AFTER UPDATE OF status ON KitchenTaskQueue
+WHEN NEW.status = 'IN_PROGRESS' AND OLD.status <> 'IN_PROGRESS'
+BEGIN INSERT INTO EventLog (event, row_id) VALUES ('CLAIM', NEW.queue_task_id); END;
+CREATE TRIGGER log_done AFTER UPDATE OF status ON KitchenTaskQueue
+WHEN NEW.status = 'COMPLETED' AND OLD.status <> 'COMPLETED'
+BEGIN INSERT INTO EventLog (event, row_id) VALUES ('DONE', NEW.queue_task_id); END;
+CREATE TRIGGER log_order AFTER UPDATE OF status ON CustomerOrders
+WHEN NEW.status = 'COMPLETED'
+BEGIN INSERT INTO EventLog (event, row_id) VALUES ('ORDER', NEW.order_id); END;
+"""
+
+def _run_worker(db_path, workstation_id, clock, deadline, reports, errors):
+    conn = connect(db_path)
+    try:
+        worker = StationWorker(conn, workstation_id, clock).load()
+        while time.monotonic() < deadline:
+            if worker.step():
+                continue
+            if not worker.running and not conn.execute(load_sql('select_open_task_count.sql')).fetchone()[0]:
+                break
+            time.sleep(0.001)
+        reports.append(worker.report())
+    except Exception as e:
+        errors.append(e)
+    finally:
+        conn.close()
+
+def test_concurrent_workers_claim_each_task_once(tmp_path):
+    db_path = str(tmp_path / 'workers.db')
+    conn = create_database(db_path)
+    conn.executescript(EVENT_LOG)
+    recipe_cache = RecipeGraphCache().refresh(conn)
+    orders = [order_info for _, order_info in generate_orders(sorted(recipe_cache.graphs), 40, 600, seed=11)]
+    place_orders(conn, orders, recipe_cache, START)
+    expand_new_order_items(conn, recipe_cache, START)
+    tasks = conn.execute("SELECT queue_task_id, order_item_id, task_definition_id FROM KitchenTaskQueue "
+                         "ORDER BY queue_task_id").fetchall()
+
+    # 작업장마다 워커 둘 (같은 작업을 두고 경합), 배속 0 이라 가져간 작업은 다음 단계에 완료
+    clock = KitchenClock(time.time(), 0)
+    deadline = time.monotonic() + 60
+    reports, errors = [], []
+    threads = [threading.Thread(target=_run_worker, args=(db_path, workstation_id, clock, deadline, reports, errors))
+               for (workstation_id,) in conn.execute("SELECT workstation_id FROM Workstations")
+               for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+
+    events = conn.execute("SELECT seq, event, row_id FROM EventLog ORDER BY seq").fetchall()
+    claims = {}
+    done = {}
+    for seq, event, row_id in events:
+        if event == 'CLAIM':
+            assert row_id not in claims, f"작업 {row_id} 를 두 번 가져감"
+            claims[row_id] = seq
+        elif event == 'DONE':
+            assert row_id not in done
+            done[row_id] = seq
+    assert set(claims) == set(done) == {queue_task_id for queue_task_id, _, _ in tasks}
+    assert sum(report['claimed'] for report in reports) == len(tasks)
+
+    # 같은 수량 단위(같은 항목·작업 정의의 k 번째 행)의 선행 작업이 끝난 뒤에만 시작
+    units = {}
+    unit_of = {}
+    for queue_task_id, order_item_id, task_def_id in tasks:
+        rows = units.setdefault((order_item_id, task_def_id), [])
+        unit_of[queue_task_id] = len(rows)
+        rows.append(queue_task_id)
+    dependencies = conn.execute("SELECT task_id, depends_on_task_id FROM TaskDependencies").fetchall()
+    checked = 0
+    for queue_task_id, order_item_id, task_def_id in tasks:
+        for task_id, depends_on in dependencies:
+            if task_id != task_def_id:
+                continue
+            predecessor = units[(order_item_id, depends_on)][unit_of[queue_task_id]]
+            assert done[predecessor] < claims[queue_task_id]
+            checked += 1
+    assert checked
+
+    completed_orders = [row_id for _, event, row_id in events if event == 'ORDER']
+    assert sorted(completed_orders) == sorted({order_id for (order_id,) in conn.execute(
+        "SELECT order_id FROM CustomerOrders")})
+    assert sum(len(report['latencies']) for report in reports) == len(orders)
+    conn.close()
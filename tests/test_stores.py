@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""매장 샤드 부분 집계 - 모든 항목이 같은 since 구간을 따르는지"""
+
+from archive import archive_completed
+from conftest import START
+from dal import create_database, transaction
+from order_intake import place_orders
+from stores import store_partial
+from task_queue import expand_new_order_items
+
+def _record_wait(conn, order_id, bottleneck_type, seconds):
+    with transaction(conn):
+        (queue_task_id,) = conn.execute("""
+            SELECT MIN(KTQ.queue_task_id) FROM KitchenTaskQueue KTQ
+            JOIN OrderItems OI ON KTQ.order_item_id = OI.order_item_id WHERE OI.order_id = ?
+        """, (order_id,)).fetchone()
+        conn.execute("INSERT INTO BottleneckAnalysis (queue_task_id, bottleneck_type, wait_duration_seconds, "
+                     "recorded_at) VALUES (?, ?, ?, ?)", (queue_task_id, bottleneck_type, seconds, START))
+
+def test_store_partial_filters_bottlenecks_by_since(tmp_path, recipe_cache):
+    path = str(tmp_path / 'store.db')
+    conn = create_database(path)
+    (old,) = place_orders(conn, [{'name': 'ORD-OLD', 'items': [(1, 1)]}], created_at=START)
+    (new,) = place_orders(conn, [{'name': 'ORD-NEW', 'items': [(3, 1)]}], created_at=START + 3600)
+    expand_new_order_items(conn, recipe_cache.refresh(conn), START + 3600)
+    _record_wait(conn, old['order_id'], 'NO_STAFF', 120)
+    _record_wait(conn, new['order_id'], 'NO_STAFF', 30)
+    _record_wait(conn, new['order_id'], 'NO_FRYER_ZONE', 45)
+    # 이전 주문은 끝나서 이력 테이블로 옮겨짐
+    with transaction(conn):
+        conn.execute("""
+            UPDATE KitchenTaskQueue SET status = 'COMPLETED', actual_start_time = ?, actual_end_time = ?
+            WHERE order_item_id IN (SELECT order_item_id FROM OrderItems WHERE order_id = ?)
+        """, (START, START + 60, old['order_id']))
+        conn.execute("UPDATE CustomerOrders SET status = 'COMPLETED' WHERE order_id = ?", (old['order_id'],))
+    assert archive_completed(conn)['bottlenecks'] == 1
+    conn.close()
+
+    everything = store_partial(path)
+    assert everything['orders'] == 2
+    assert everything['bottlenecks'] == {'NO_STAFF': [2, 150], 'NO_FRYER_ZONE': [1, 45]}
+
+    recent = store_partial(path, since=START + 1800)
+    assert recent['orders'] == 1
+    assert recent['bottlenecks'] == {'NO_STAFF': [1, 30], 'NO_FRYER_ZONE': [1, 45]}
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""작업 큐 전개 - 워터마크 멱등성, 보온 재고 충당의 롤백"""
+
+import sqlite3
+
+import pytest
+
+from conftest import START
+from holding import HoldingCache
+from order_intake import place_orders
+from task_queue import expand_new_order_items
+
+def _queue_rows(conn):
+    return conn.execute(
+        "SELECT order_item_id, task_definition_id, status FROM KitchenTaskQueue ORDER BY queue_task_id").fetchall()
+
+def test_expansion_is_idempotent(conn, recipe_cache):
+    receipts = place_orders(conn, [{'name': 'ORD-001', 'items': [(1, 2)]},
+                                   {'name': 'ORD-002', 'items': [(4, 1)]}], created_at=START)
+    expanded = expand_new_order_items(conn, recipe_cache, START)
+    rows = _queue_rows(conn)
+    assert [item[1] for item in expanded] == [receipts[0]['order_id'], receipts[1]['order_id']]
+    assert len(rows) == sum(len(recipe_cache.graph(menu).topo_order) * qty for menu, qty in ((1, 2), (4, 1)))
+
+    # 새 주문 항목이 없으면 다시 불러도 아무것도 넣지 않음
+    assert expand_new_order_items(conn, recipe_cache, START + 5) == []
+    assert _queue_rows(conn) == rows
+
+    # 새 주문만 이어서 전개
+    (receipt,) = place_orders(conn, [{'name': 'ORD-003', 'items': [(5, 1)]}], created_at=START + 10)
+    assert [item[1] for item in expand_new_order_items(conn, recipe_cache, START + 10)] == [receipt['order_id']]
+    assert expand_new_order_items(conn, recipe_cache, START + 15) == []
+    new_rows = _queue_rows(conn)
+    assert new_rows[:len(rows)] == rows
+    assert len(new_rows) == len(rows) + len(recipe_cache.graph(5).topo_order)
+
+def test_rollback_restores_holding_stock(conn, recipe_cache):
+    holding = HoldingCache(recipe_cache).load(conn)
+    holding.add('싸이패티', 3, START)
+    place_orders(conn, [{'name': 'ORD-001', 'items': [(1, 2)]}], created_at=START)
+
+    conn.execute("""
+        CREATE TEMP TRIGGER fail_watermark BEFORE UPDATE ON QueueExpansionState
+        BEGIN SELECT RAISE(ABORT, 'watermark'); END
+    """)
+    before = (holding.available('싸이패티'), dict(holding.served), dict(holding.missed), dict(holding.demand))
+    with pytest.raises(sqlite3.IntegrityError):
+        expand_new_order_items(conn, recipe_cache, START + 10, holding)
+    assert _queue_rows(conn) == []
+    assert (holding.available('싸이패티'), holding.served, holding.missed, holding.demand) == before
+
+    # 다시 전개하면 같은 재고로 충당 (재고가 두 번 빠지지 않음)
+    conn.execute("DROP TRIGGER fail_watermark")
+    expand_new_order_items(conn, recipe_cache, START + 10, holding)
+    assert holding.available('싸이패티') == 1
+    assert holding.served == {'싸이패티': 2}
+    assert conn.execute("SELECT COUNT(*) FROM HoldingLedger WHERE event = 'SERVED'").fetchone()[0] == 2
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""계층형 타이머 휠 - 여러 단계/넘침 목록에 걸친 항목이 제 틱에, 시각 순서로 만료되는지"""
+
+import random
+
+import pytest
+
+from timer_wheel import TimerWheel
+
+START = 1_000_000
+
+def _deadlines(seed, count, horizon):
+    rng = random.Random(seed)
+    return [(START + rng.randint(-3, horizon), i) for i in range(count)]
+
+def test_advance_fires_in_order_across_levels():
+    # 4칸 × 3단계 = 64틱, 그보다 먼 항목은 넘침 목록을 거침
+    wheel = TimerWheel(START, slots=4, levels=3)
+    deadlines = _deadlines(1, 500, 300)
+    for at, item in deadlines:
+        wheel.schedule(at, item)
+
+    fired = []
+    for now in [*range(START + 1, START + 300, 7), START + 300]:
+        for at, item in wheel.advance(now):
+            assert at <= now
+            fired.append((max(at, START + 1), at, item))
+    assert len(wheel) == 0
+    ticks = [tick for tick, _, _ in fired]
+    assert ticks == sorted(ticks)
+    assert sorted(item for _, _, item in fired) == list(range(500))
+
+def test_expire_next_returns_each_due_tick():
+    wheel = TimerWheel(START, slots=4, levels=2)
+    deadlines = _deadlines(2, 300, 200)
+    for at, item in deadlines:
+        wheel.schedule(at, item)
+
+    expected = {}
+    for at, item in deadlines:
+        expected.setdefault(max(at, START + 1), set()).add(item)
+    while len(wheel):
+        tick, fired = wheel.expire_next()
+        assert {item for _, item in fired} == expected.pop(tick)
+    assert not expected
+    assert wheel.expire_next() == (None, [])
+
+def test_expire_next_stops_at_limit():
+    wheel = TimerWheel(START, slots=4, levels=2)
+    wheel.schedule(START + 50, 'late')
+    assert wheel.expire_next(START + 20) == (START + 20, [])
+    wheel.schedule(START + 10, 'past')   # 이미 지난 시각은 다음 틱에
+    assert wheel.expire_next(START + 40) == (START + 21, [(START + 10, 'past')])
+    assert wheel.expire_next() == (START + 50, [(START + 50, 'late')])
+
+def test_slots_must_be_power_of_two():
+    with pytest.raises(ValueError):
+        TimerWheel(START, slots=6)
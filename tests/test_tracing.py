@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""파이프라인 추적 - 꺼져 있을 때 빈 경로, 켜면 쿼리 이름별 지연/바뀐 행/커밋, Chrome Trace 파일"""
+
+import json
+import sqlite3
+
+import pytest
+
+import tracing
+from dal import create_database, load_sql, transaction
+
+@pytest.fixture
+def tracer():
+    tracer = tracing.enable()
+    yield tracer
+    tracing.disable()
+
+def test_disabled_tracing_is_plain(tmp_path):
+    assert tracing.TRACER is None
+    assert tracing.span('expansion') is tracing.span('assignment')
+    conn = create_database(str(tmp_path / 'plain.db'))
+    assert type(conn) is sqlite3.Connection
+    conn.close()
+
+def test_histogram_percentiles():
+    histogram = tracing.LatencyHistogram()
+    for micros in (1, 3, 3, 100, 5000):
+        histogram.add(micros / 1e6, rows=2)
+    assert tracing.nearest_rank(5, 50) == 3
+    assert histogram.percentile(50) == 4 / 1e6         # 3µs 는 2~4µs 구간
+    assert histogram.percentile(99) == histogram.max == 0.005
+    summary = histogram.summary()
+    assert (summary['count'], summary['rows']) == (5, 10)
+    assert tracing.LatencyHistogram().percentile(50) == 0.0
+
+def test_statements_named_by_query_file(tracer, tmp_path):
+    conn = create_database(str(tmp_path / 'traced.db'))
+    assert isinstance(conn, tracing.TracedConnection)
+
+    @tracing.traced('assignment')
+    def update_staff(staff_id):
+        with transaction(conn):
+            conn.execute(load_sql('update_staff_status.sql'), ('BREAK', staff_id))
+
+    update_staff(1)
+    with tracing.span('report', rows=1):
+        conn.execute(load_sql('select_staff_roster.sql')).fetchall()
+    conn.execute("SELECT  1  -- 인라인").fetchone()
+    conn.close()
+
+    summary = tracer.summary()
+    assert summary['statements']['update_staff_status.sql']['rows'] == 1
+    assert summary['statements']['select_staff_roster.sql']['count'] == 1
+    assert 'SELECT 1' in summary['statements']
+    assert summary['counters']['commits'] >= 1
+    assert summary['spans']['assignment']['count'] == summary['spans']['report']['count'] == 1
+
+    path = tmp_path / 'trace.json'
+    count = tracer.write(str(path))
+    trace = json.loads(path.read_text(encoding='utf-8'))
+    assert len(trace['traceEvents']) == count
+    names = {event['name'] for event in trace['traceEvents'] if event['ph'] == 'X'}
+    assert {'assignment', 'report', 'update_staff_status.sql'} <= names
+    assert trace['otherData']['counters']['dropped_events'] == 0
+
+def test_timeline_stops_at_max_events_but_counters_continue():
+    tracer = tracing.Tracer(max_events=2)
+    for n in range(5):
+        tracer.span('step', n, n + 0.001)
+    assert len(tracer.events) == 2
+    assert tracer.dropped == 3
+    assert tracer.summary()['spans']['step']['count'] == 5
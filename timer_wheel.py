@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+계층형 타이머 휠 - 만료 시각이 된 항목을 틱마다 O(1) 로 꺼냄
+
+단계마다 slots 칸의 휠을 두고, 만료까지 남은 틱 수에 맞는 단계의 칸에 넣는다.
+0 단계 칸은 틱마다 그대로 비우고, 윗단계 칸은 아랫단계 휠이 한 바퀴 돌 때
+한 칸씩 아래 단계로 다시 나눠 넣는다(cascade). 정렬이나 힙 비교가 없어서
+예약/만료 모두 항목당 상수 비용이고, 예약된 항목이 없으면 시계만 건너뛴다.
+
+시각은 epoch 초 (tick_seconds 단위로 올림), 기본 64칸 × 4단계 = 약 194일 앞까지.
+그보다 먼 항목은 넘침 목록에 두었다가 맨 윗단계가 한 바퀴 돌 때 다시 넣는다.
+"""
+
+class TimerWheel:
+    """epoch 초 기준 계층형 타이머 휠"""
+
+    def __init__(self, now, tick_seconds=1, slots=64, levels=4):
+        if slots & (slots - 1):
+            raise ValueError(f"slots 는 2의 거듭제곱이어야 합니다: {slots}")
+        self.tick_seconds = tick_seconds
+        self.shift = slots.bit_length() - 1
+        self.mask = slots - 1
+        self.levels = levels
+        self.current = int(now // tick_seconds)   # 마지막으로 처리한 틱
+        self.wheels = [[[] for _ in range(slots)] for _ in range(levels)]
+        self.overflow = []
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def schedule(self, at, item):
+        """at 시각(epoch 초)에 만료될 항목 예약, 이미 지난 시각이면 다음 틱에 만료"""
+        tick = max(-(-at // self.tick_seconds), self.current + 1)
+        self._place(int(tick), (at, item))
+        self.count += 1
+
+    def _place(self, tick, entry):
+        delta = tick - self.current
+        for level in range(self.levels):
+            if delta < 1 << (self.shift * (level + 1)):
+                self.wheels[level][(tick >> (self.shift * level)) & self.mask].append((tick, entry))
+                return
+        self.overflow.append((tick, entry))
+
+    def _cascade(self, tick):
+        """아랫단계 휠이 한 바퀴 돈 단계의 현재 칸을 아래로 다시 나눠 넣음"""
+        for level in range(1, self.levels):
+            if tick & ((1 << (self.shift * level)) - 1):
+                return
+            slot = self.wheels[level][(tick >> (self.shift * level)) & self.mask]
+            if slot:
+                self.wheels[level][(tick >> (self.shift * level)) & self.mask] = []
+                for entry_tick, entry in slot:
+                    self._place(entry_tick, entry)
+        if self.overflow and not tick & ((1 << (self.shift * self.levels)) - 1):
+            overflow, self.overflow = self.overflow, []
+            for entry_tick, entry in overflow:
+                self._place(entry_tick, entry)
+
+    def advance(self, now):
+        """now 까지 틱을 진행하고 만료된 [(예약 시각, 항목)] 을 틱 순서로 반환"""
+        target = int(now // self.tick_seconds)
+        expired = []
+        while self.current < target:
+            if not self.count:
+                self.current = target
+                break
+            expired.extend(self._tick())
+        return expired
+
+    def expire_next(self, limit=None):
+        """
+        다음 만료가 있는 틱까지 (limit 시각을 넘지 않게) 진행
+
+        반환: (만료 틱 시각, [(예약 시각, 항목)]), limit 까지 만료가 없으면 (limit, [])
+              예약된 항목도 limit 도 없으면 (None, [])
+        """
+        target = None if limit is None else int(limit // self.tick_seconds)
+        while self.count and (target is None or self.current < target):
+            expired = self._tick()
+            if expired:
+                return self.current * self.tick_seconds, expired
+        if target is None:
+            return None, []
+        self.current = max(self.current, target)
+        return limit, []
+
+    def _tick(self):
+        """한 틱 진행하고 그 틱에 만료된 항목 반환"""
+        self.current += 1
+        index = self.current & self.mask
+        if not index:
+            self._cascade(self.current)
+        slot = self.wheels[0][index]
+        if not slot:
+            return ()
+        self.wheels[0][index] = []
+        self.count -= len(slot)
+        return [entry for _, entry in slot]
@@ -0,0 +1,318 @@
+# -*- coding: utf-8 -*-
+"""
+파이프라인 추적 - 단계 스팬, queries/*.sql 이름별 문장 지연 히스토그램, 커밋/행/잠금 대기 카운터
+
+꺼져 있을 때(기본)는 span() 이 공용 빈 컨텍스트를, traced 함수가 원래 함수를 바로 부를 뿐이라
+전역 변수 확인 한 번 외의 비용이 없고, dal.connect() 도 보통 sqlite3.Connection 을 만든다.
+enable() 뒤에 연 연결은 TracedConnection 이 되어 execute/executemany/commit 마다
+    - 문장 지연: SQL 문자열로 queries/ 파일 이름을 찾아(인라인 SQL 은 앞부분) log2 마이크로초 히스토그램
+    - 바뀐 행 수: total_changes 차이 (트리거가 바꾼 행 포함)
+    - 잠금 대기: BEGIN IMMEDIATE 가 LOCK_WAIT_SECONDS 보다 오래 걸린 횟수/시간, database is locked 오류
+를 모은다. 지연은 execute() 가 첫 행을 낼 때까지(집계/정렬은 이때 끝남), executemany 는 전체 시간이다.
+
+스팬과 문장은 Chrome Trace Event 형식(ph 'X', 마이크로초)으로 모아 write() 가 JSON 파일로 쓰므로
+chrome://tracing 이나 Perfetto(ui.perfetto.dev) 에서 스레드별 타임라인으로 열 수 있다.
+이벤트가 MAX_EVENTS 를 넘으면 타임라인 기록만 멈추고 히스토그램/카운터는 계속 모은다.
+
+사용 예:
+    tracer = tracing.enable()            # 연결을 열기 전에
+    ...
+    tracer.write('trace.json')
+    tracing.print_profile(tracer)
+"""
+
+import functools
+import json
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from tabulate import tabulate
+from colorama import Fore
+
+MAX_EVENTS = 500000
+LOCK_WAIT_SECONDS = 0.001
+INLINE_NAME_LENGTH = 60
+
+_COMMENT = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+
+TRACER = None       # 켜져 있을 때만 Tracer
+
+def nearest_rank(count, p):
+    """count 개 중 p 백분위수의 nearest-rank 순위 (1 ~ count), count 가 0 이면 0"""
+    return min(max(math.ceil(p / 100 * count), 1), count)
+
+class LatencyHistogram:
+    """log2 마이크로초 구간 히스토그램 (구간 b 는 2^(b-1) ~ 2^b µs)"""
+
+    __slots__ = ('count', 'total', 'max', 'rows', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.rows = 0
+        self.buckets = {}
+
+    def add(self, seconds, rows=0):
+        self.count += 1
+        self.total += seconds
+        self.rows += rows
+        if seconds > self.max:
+            self.max = seconds
+        bucket = int(seconds * 1e6).bit_length()
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+
+    def percentile(self, p):
+        """p 백분위수가 든 구간의 상한(초), 비어 있으면 0"""
+        if not self.count:
+            return 0.0
+        rank = nearest_rank(self.count, p)
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return min((1 << bucket) / 1e6, self.max)
+        return self.max
+
+    def summary(self):
+        return {
+            'count': self.count, 'rows': self.rows,
+            'total_ms': round(self.total * 1000, 3),
+            'mean_ms': round(self.total / self.count * 1000, 4) if self.count else 0.0,
+            'p50_ms': round(self.percentile(50) * 1000, 4),
+            'p95_ms': round(self.percentile(95) * 1000, 4),
+            'p99_ms': round(self.percentile(99) * 1000, 4),
+            'max_ms': round(self.max * 1000, 4),
+        }
+
+class Tracer:
+    """스팬/문장 이벤트와 히스토그램, 카운터 모음 (스레드 안전)"""
+
+    def __init__(self, max_events=MAX_EVENTS):
+        from dal import queries     # dal 이 이 모듈을 import 하므로 여기서
+        self.names = {sql: filename for filename, sql in queries.statements.items()}
+        self.max_events = max_events
+        self.origin = time.perf_counter()
+        self.pid = os.getpid()
+        self.events = []
+        self.dropped = 0
+        self.threads = {}           # tid -> 스레드 이름 (메타데이터 이벤트용)
+        self.spans = {}             # 스팬 이름 -> LatencyHistogram
+        self.statements = {}        # 쿼리 이름 -> LatencyHistogram
+        self.counters = {'commits': 0, 'rollbacks': 0, 'statements': 0, 'rows_changed': 0,
+                         'lock_waits': 0, 'lock_wait_seconds': 0.0, 'lock_errors': 0}
+        self._lock = threading.Lock()
+
+    def name_of(self, sql):
+        """SQL 문자열 → queries/ 파일 이름, 인라인 SQL 이면 주석을 빼고 공백을 줄인 앞부분 (EXPLAIN 은 하나로)"""
+        name = self.names.get(sql)
+        if name is None:
+            text = ' '.join(_COMMENT.sub(' ', sql).split())
+            name = 'EXPLAIN' if text.upper().startswith('EXPLAIN') else text[:INLINE_NAME_LENGTH]
+            with self._lock:
+                self.names[sql] = name
+        return name
+
+    def _event(self, name, category, start, end, args):
+        # 호출자가 self._lock 을 쥔 상태
+        if len(self.events) >= self.max_events:
+            self.dropped += 1
+            return
+        tid = threading.get_ident()
+        if tid not in self.threads:
+            self.threads[tid] = threading.current_thread().name
+        event = {'name': name, 'cat': category, 'ph': 'X', 'pid': self.pid, 'tid': tid,
+                 'ts': round((start - self.origin) * 1e6, 1), 'dur': round((end - start) * 1e6, 1)}
+        if args:
+            event['args'] = args
+        self.events.append(event)
+
+    def span(self, name, start, end, args=None):
+        with self._lock:
+            self.spans.setdefault(name, LatencyHistogram()).add(end - start)
+            self._event(name, 'stage', start, end, args)
+
+    def statement(self, sql, start, end, rows, many=False):
+        name = self.name_of(sql)
+        seconds = end - start
+        with self._lock:
+            self.statements.setdefault(name, LatencyHistogram()).add(seconds, rows)
+            counters = self.counters
+            counters['statements'] += 1
+            counters['rows_changed'] += rows
+            if seconds > LOCK_WAIT_SECONDS and name.startswith('BEGIN'):
+                counters['lock_waits'] += 1
+                counters['lock_wait_seconds'] += seconds
+            self._event(name, 'sql', start, end, {'rows': rows, 'many': True} if many else {'rows': rows})
+
+    def count(self, counter, amount=1):
+        with self._lock:
+            self.counters[counter] += amount
+
+    def summary(self):
+        with self._lock:
+            return {
+                'spans': {name: h.summary() for name, h in self.spans.items()},
+                'statements': {name: h.summary() for name, h in self.statements.items()},
+                'counters': dict(self.counters, lock_wait_seconds=round(self.counters['lock_wait_seconds'], 6),
+                                 dropped_events=self.dropped),
+            }
+
+    def write(self, path):
+        """Chrome Trace Event 형식 JSON 으로 저장 (임시 파일에 쓴 뒤 이름 바꿈)"""
+        summary = self.summary()
+        with self._lock:
+            metadata = [{'name': 'thread_name', 'ph': 'M', 'pid': self.pid, 'tid': tid, 'args': {'name': name}}
+                        for tid, name in self.threads.items()]
+            trace = {'traceEvents': metadata + self.events, 'displayTimeUnit': 'ms', 'otherData': summary}
+        building = f"{path}.{os.getpid()}.tmp"
+        with open(building, 'w', encoding='utf-8') as f:
+            json.dump(trace, f, ensure_ascii=False)
+        os.replace(building, path)
+        return len(trace['traceEvents'])
+
+class _NullSpan:
+    """추적이 꺼져 있을 때 span() 이 돌려주는 공용 빈 컨텍스트"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+class _Span:
+    __slots__ = ('tracer', 'name', 'args', 'start')
+
+    def __init__(self, tracer, name, args):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.args['error'] = exc_type.__name__
+        self.tracer.span(self.name, self.start, time.perf_counter(), self.args)
+        return False
+
+def span(name, **args):
+    """단계 스팬 컨텍스트 (꺼져 있으면 공용 빈 컨텍스트)"""
+    tracer = TRACER
+    if tracer is None:
+        return _NULL_SPAN
+    return _Span(tracer, name, args)
+
+def traced(name):
+    """함수 호출 전체를 name 스팬으로 감싸는 데코레이터 (꺼져 있으면 원래 함수를 바로 호출)"""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            tracer = TRACER
+            if tracer is None:
+                return func(*args, **kwargs)
+            with _Span(tracer, name, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def _run(conn, sql, call, many=False):
+    tracer = TRACER
+    if tracer is None:
+        return call()
+    changes = conn.total_changes
+    start = time.perf_counter()
+    try:
+        return call()
+    except sqlite3.OperationalError as e:
+        if 'locked' in str(e) or 'busy' in str(e):
+            tracer.count('lock_errors')
+        raise
+    finally:
+        tracer.statement(sql, start, time.perf_counter(), conn.total_changes - changes, many)
+
+class TracedCursor(sqlite3.Cursor):
+    """execute/executemany 시간을 재는 커서 (conn.cursor() 기본 팩토리)"""
+
+    def execute(self, sql, parameters=()):
+        return _run(self.connection, sql, lambda: super(TracedCursor, self).execute(sql, parameters))
+
+    def executemany(self, sql, seq_of_parameters):
+        return _run(self.connection, sql,
+                    lambda: super(TracedCursor, self).executemany(sql, seq_of_parameters), many=True)
+
+class TracedConnection(sqlite3.Connection):
+    """문장 지연/커밋/바뀐 행 수를 현재 Tracer 에 기록하는 연결 (enable() 뒤 dal.connect() 가 사용)"""
+
+    def cursor(self, factory=TracedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return _run(self, sql, lambda: super(TracedConnection, self).execute(sql, parameters))
+
+    def executemany(self, sql, seq_of_parameters):
+        return _run(self, sql, lambda: super(TracedConnection, self).executemany(sql, seq_of_parameters),
+                    many=True)
+
+    def commit(self):
+        tracer = TRACER
+        if tracer is None:
+            return super().commit()
+        start = time.perf_counter()
+        try:
+            return super().commit()
+        finally:
+            tracer.count('commits')
+            tracer.statement('COMMIT', start, time.perf_counter(), 0)
+
+    def rollback(self):
+        if TRACER is not None:
+            TRACER.count('rollbacks')
+        return super().rollback()
+
+def connection_factory():
+    """dal.connect() 가 쓸 연결 클래스 (추적 중이면 TracedConnection)"""
+    return sqlite3.Connection if TRACER is None else TracedConnection
+
+def enable(max_events=MAX_EVENTS):
+    """추적 시작, 새 Tracer 반환 (이후에 연 연결부터 문장 지연을 잰다)"""
+    global TRACER
+    TRACER = Tracer(max_events)
+    return TRACER
+
+def disable():
+    """추적 끄기, 모은 Tracer 반환 (TracedConnection 도 기록을 멈춤)"""
+    global TRACER
+    tracer, TRACER = TRACER, None
+    return tracer
+
+def print_profile(tracer, top=15):
+    """--profile 요약: 단계별 스팬, 총 시간 상위 문장, 카운터"""
+    summary = tracer.summary()
+    print(Fore.CYAN + "\n⏱️  단계별 시간")
+    print(tabulate([[name, s['count'], s['total_ms'], s['mean_ms'], s['p50_ms'], s['p95_ms'], s['p99_ms'], s['max_ms']]
+                    for name, s in sorted(summary['spans'].items(), key=lambda item: -item[1]['total_ms'])],
+                   headers=["단계", "호출", "총(ms)", "평균(ms)", "p50(ms)", "p95(ms)", "p99(ms)", "최대(ms)"],
+                   tablefmt="grid"))
+    statements = sorted(summary['statements'].items(), key=lambda item: -item[1]['total_ms'])
+    print(Fore.CYAN + f"\n🗄️  쿼리별 시간 (총 시간 상위 {min(top, len(statements))}개 / {len(statements)}개)")
+    print(tabulate([[name, s['count'], s['rows'], s['total_ms'], s['mean_ms'], s['p95_ms'], s['max_ms']]
+                    for name, s in statements[:top]],
+                   headers=["쿼리", "실행", "바뀐 행", "총(ms)", "평균(ms)", "p95(ms)", "최대(ms)"],
+                   tablefmt="grid"))
+    counters = summary['counters']
+    print(tabulate([["커밋", counters['commits']], ["롤백", counters['rollbacks']],
+                    ["문장 실행", counters['statements']], ["바뀐 행", counters['rows_changed']],
+                    ["잠금 대기", f"{counters['lock_waits']}회 / {counters['lock_wait_seconds'] * 1000:.1f}ms"],
+                    ["잠금 오류", counters['lock_errors']], ["버린 타임라인 이벤트", counters['dropped_events']]],
+                   tablefmt="grid"))